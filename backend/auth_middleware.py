@@ -1,57 +1,74 @@
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from typing import Optional
-from database import get_db
-from crud.admin import get_admin_by_email
-from crud.jugadores import get_jugador_by_email
+from services.sesiones import sesiones, TokenInvalido
 
 class CurrentUser:
-    def __init__(self, id: str, email: str, nombre: str, rol: str, cedula: Optional[str] = None):
+    def __init__(self, id: str, email: str, nombre: str, rol: str, cedula: Optional[str] = None,
+                 jti: Optional[str] = None, exp: Optional[int] = None):
         self.id = id
         self.email = email
         self.nombre = nombre
         self.rol = rol  # 'admin' o 'jugador'
         self.cedula = cedula
+        self.jti = jti  # Identificador del token, para revocarlo en el logout
+        self.exp = exp
 
-# Para implementación futura con JWT
-# Por ahora, usamos un sistema simple de verificación por parámetros
+    @classmethod
+    def desde_token(cls, datos: dict) -> "CurrentUser":
+        return cls(
+            id=str(datos["sub"]),
+            email=datos.get("email", ""),
+            nombre=datos.get("nombre", ""),
+            rol=datos["rol"],
+            cedula=datos.get("cedula"),
+            jti=datos.get("jti"),
+            exp=datos.get("exp")
+        )
 
-def get_current_user_simple(
-    user_email: Optional[str] = None,
-    user_role: Optional[str] = None,
-    db: Session = Depends(get_db)
+    def datos_token(self) -> dict:
+        """Datos que se firman en los tokens de sesión"""
+        datos = {"sub": self.id, "rol": self.rol, "nombre": self.nombre, "email": self.email}
+        if self.cedula:
+            datos["cedula"] = self.cedula
+        return datos
+
+# El usuario se toma del token de acceso firmado (Authorization: Bearer), sin consultar la base de datos
+_bearer = HTTPBearer(auto_error=False)
+
+def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)
 ) -> Optional[CurrentUser]:
     """
-    Función auxiliar para verificar usuario (implementación simple)
-    En el futuro se puede expandir para usar JWT tokens
+    Usuario del token de acceso, o None si la petición no trae token.
+    Un token inválido, expirado o revocado responde 401 en vez de tratarse como anónimo.
     """
-    if not user_email or not user_role:
+    if credentials is None:
         return None
-        
     try:
-        if user_role == "admin":
-            user = get_admin_by_email(db, user_email)
-            if user:
-                return CurrentUser(
-                    id=str(user.id),
-                    email=str(user.email),
-                    nombre=str(user.nombre),
-                    rol="admin"
-                )
-        elif user_role == "jugador":
-            user = get_jugador_by_email(db, user_email)
-            if user:
-                return CurrentUser(
-                    id=str(user.cedula),
-                    email=str(user.email),
-                    nombre=str(user.nombre),
-                    rol="jugador",
-                    cedula=str(user.cedula)
-                )
-    except Exception:
-        pass
-    
-    return None
+        return CurrentUser.desde_token(sesiones.verificar(credentials.credentials))
+    except (TokenInvalido, KeyError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e) if isinstance(e, TokenInvalido) else "Token inválido",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+def require_user(current_user: Optional[CurrentUser] = Depends(get_current_user)) -> CurrentUser:
+    """Dependencia para endpoints que exigen sesión iniciada"""
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No autenticado",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return current_user
+
+def require_admin(current_user: CurrentUser = Depends(require_user)) -> CurrentUser:
+    """Dependencia para endpoints exclusivos de administradores"""
+    if current_user.rol != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Requiere rol de administrador")
+    return current_user
 
 def require_admin_simple(current_user: Optional[CurrentUser]) -> bool:
     """
@@ -1,6 +1,6 @@
-from crud.admin import get_admin, get_admin_by_email, crear_admin, verificar_credenciales
+from crud.admin import get_admin, get_admin_by_email, crear_admin, verificar_credenciales, autenticar_admin
 from crud.jugadores import (
-    get_jugador, get_jugador_by_cedula, get_jugadores, create_jugador, buscar_jugadores,
+    get_jugador, get_jugador_detalle, get_jugador_by_cedula, get_jugadores, create_jugador, buscar_jugadores,
     get_estado_cuenta_jugador
 )
 from crud.multas import (
@@ -15,6 +15,7 @@ from crud.egresos import (
 )
 from crud.estado_cuenta import (
     calcular_estado_cuenta_equipo, obtener_egresos_por_categoria,
-    obtener_resumen_financiero_mensual, obtener_saldo_actual
+    obtener_resumen_financiero_mensual, obtener_saldo_actual,
+    obtener_serie_financiera, rango_mes
 )
 from crud.dashboard import obtener_resumen_dashboard, obtener_estadisticas_multas, obtener_ranking_jugadores_multas
@@ -1,8 +1,11 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, update
+from starlette.concurrency import run_in_threadpool
 import models
 from schemas import admin as schemas
-from typing import List
-import hashlib
+from services.credenciales import credenciales
+from crud.identidades import ROL_ADMIN, autenticar, normalizar_email
+from typing import List, Optional
 import secrets
 import datetime
 
@@ -10,14 +13,17 @@ def get_admin(db: Session, admin_id: int):
     return db.query(models.Administrador).filter(models.Administrador.id == admin_id).first()
 
 def get_admin_by_email(db: Session, email: str):
-    return db.query(models.Administrador).filter(models.Administrador.email == email).first()
+    # lower(email) usa el índice ix_administradores_email_normalizado
+    return db.query(models.Administrador)\
+        .filter(func.lower(models.Administrador.email) == normalizar_email(email))\
+        .first()
 
 def get_admins(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.Administrador).offset(skip).limit(limit).all()
 
 def crear_admin(db: Session, admin: schemas.AdministradorCreate):
     # Hash de la contraseña antes de guardarla
-    hashed_password = hashlib.sha256(admin.password.encode()).hexdigest()
+    hashed_password = credenciales.generar_hash_en_pool(admin.password)
     
     db_admin = models.Administrador(
         nombre=admin.nombre,
@@ -30,13 +36,36 @@ def crear_admin(db: Session, admin: schemas.AdministradorCreate):
     db.refresh(db_admin)
     return db_admin
 
+def _actualizar_hash(db: Session, admin: models.Administrador, nuevo_hash: str) -> None:
+    """Reemplaza un hash heredado tras un login exitoso"""
+    credenciales.registrar_rehash(admin.password)
+    db.execute(
+        update(models.Administrador.__table__)
+        .where(models.Administrador.__table__.c.id == admin.id)
+        .values(password=nuevo_hash)
+    )
+    db.commit()
+    db.refresh(admin)
+
 def verificar_credenciales(db: Session, email: str, password: str) -> bool:
     admin = get_admin_by_email(db, email)
     if not admin:
         return False
-    
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    return str(admin.password) == hashed_password  # Convertir a str para comparación segura
+
+    resultado = credenciales.verificar_en_pool(password, admin.password)
+    if resultado.valida and resultado.requiere_rehash:
+        _actualizar_hash(db, admin, credenciales.generar_hash_en_pool(password))
+    return resultado.valida
+
+async def autenticar_admin(db: Session, email: str, password: str) -> Optional[models.Administrador]:
+    """
+    Administrador con ese correo y contraseña, o None. Para endpoints async: la consulta
+    corre en el threadpool y el hash en el pool de credenciales, fuera del bucle de eventos.
+    """
+    identidad = await autenticar(db, email, password, roles=(ROL_ADMIN,))
+    if not identidad:
+        return None
+    return await run_in_threadpool(get_admin, db, int(identidad.id))
 
 def actualizar_password(db: Session, email: str, nueva_password: str) -> bool:
     """Actualiza la contraseña de un administrador"""
@@ -46,11 +75,11 @@ def actualizar_password(db: Session, email: str, nueva_password: str) -> bool:
             return False
         
         # Hash de la nueva contraseña
-        nueva_password_hash = hashlib.sha256(nueva_password.encode()).hexdigest()
+        nueva_password_hash = credenciales.generar_hash_en_pool(nueva_password)
         
         # Actualizar en la base de datos
         db.query(models.Administrador).filter(
-            models.Administrador.email == email
+            models.Administrador.id == admin.id
         ).update({"password": nueva_password_hash})
         
         db.commit()
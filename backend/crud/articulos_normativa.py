@@ -1,14 +1,23 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, or_, desc, asc, case
 from typing import List, Optional
 import models
 import schemas.articulos_normativa as schemas
+from services import indice_normativa
+from services import documento_normativa  # Sus listeners versionan la normativa en cada escritura
 from datetime import datetime
 
 def get_articulo(db: Session, articulo_id: int) -> Optional[models.ArticuloNormativa]:
     """Obtiene un artículo de normativa por su ID"""
     return db.query(models.ArticuloNormativa).filter(models.ArticuloNormativa.id == articulo_id).first()
 
+def get_articulo_con_causales(db: Session, articulo_id: int) -> Optional[models.ArticuloNormativa]:
+    """Obtiene un artículo de normativa por su ID con sus causales cargadas"""
+    return db.query(models.ArticuloNormativa)\
+        .options(selectinload(models.ArticuloNormativa.causales))\
+        .filter(models.ArticuloNormativa.id == articulo_id)\
+        .first()
+
 def get_articulo_by_numero(db: Session, numero_articulo: str) -> Optional[models.ArticuloNormativa]:
     """Obtiene un artículo de normativa por su número"""
     return db.query(models.ArticuloNormativa).filter(models.ArticuloNormativa.numero_articulo == numero_articulo).first()
@@ -32,7 +41,13 @@ def get_articulos(
     if tipo:
         query = query.filter(models.ArticuloNormativa.tipo == tipo)
     
-    # Filtro de búsqueda en número, título o contenido
+    # Búsqueda por relevancia con el índice de texto completo
+    if buscar and indice_normativa.disponible(db):
+        return [articulo for articulo, _ in buscar_articulos(
+            db, buscar, skip=skip, limit=limit, solo_activos=solo_activos, tipo=tipo
+        )]
+    
+    # Filtro de búsqueda en número, título o contenido (motor sin índice de texto completo)
     if buscar:
         buscar_pattern = f"%{buscar}%"
         query = query.filter(
@@ -51,6 +66,30 @@ def get_articulos(
     
     return query.offset(skip).limit(limit).all()
 
+def buscar_articulos(
+    db: Session,
+    consulta: str,
+    skip: int = 0,
+    limit: int = 20,
+    solo_activos: bool = True,
+    tipo: Optional[str] = None
+) -> List[tuple]:
+    """
+    Busca artículos ordenados por relevancia usando el índice de texto completo.
+    Retorna tuplas (articulo, resultado) donde resultado tiene relevancia y fragmento resaltado.
+    """
+    resultados = indice_normativa.buscar(
+        db, consulta, solo_activos=solo_activos, tipo=tipo, skip=skip, limit=limit
+    )
+    if not resultados:
+        return []
+    
+    articulos = db.query(models.ArticuloNormativa).filter(
+        models.ArticuloNormativa.id.in_([r.id for r in resultados])
+    ).all()
+    por_id = {articulo.id: articulo for articulo in articulos}
+    return [(por_id[r.id], r) for r in resultados if r.id in por_id]
+
 def get_articulos_sancionables(db: Session, solo_activos: bool = True) -> List[models.ArticuloNormativa]:
     """Obtiene solo artículos sancionables (que pueden tener causales)"""
     query = db.query(models.ArticuloNormativa).filter(models.ArticuloNormativa.tipo == "sancionable")
@@ -67,6 +106,8 @@ def create_articulo(db: Session, articulo: schemas.ArticuloNormativaCreate) -> m
     """Crea un nuevo artículo de normativa"""
     db_articulo = models.ArticuloNormativa(**articulo.dict())
     db.add(db_articulo)
+    db.flush()
+    indice_normativa.sincronizar_articulo(db, db_articulo)
     db.commit()
     db.refresh(db_articulo)
     return db_articulo
@@ -93,6 +134,7 @@ def update_articulo(
         models.ArticuloNormativa.id == articulo_id
     ).update({"updated_at": datetime.now()})
     
+    indice_normativa.sincronizar_articulo(db, db_articulo)
     db.commit()
     db.refresh(db_articulo)
     return db_articulo
@@ -121,6 +163,7 @@ def delete_articulo(db: Session, articulo_id: int) -> bool:
     else:
         # Eliminar físicamente si no tiene causales asociadas
         db.delete(db_articulo)
+        indice_normativa.eliminar_articulo(db, articulo_id)
         db.commit()
         return True
 
@@ -136,26 +179,98 @@ def get_count_articulos(db: Session, solo_activos: bool = True, tipo: Optional[s
     
     return query.count()
 
-def reordenar_articulos(db: Session, reordenes: List[dict]) -> bool:
+# Separación entre posiciones al renumerar: deja espacio para mover un artículo tocando una sola fila
+PASO_ORDEN = 10
+
+def _aplicar_orden(db: Session, nuevos_ordenes: dict) -> None:
+    """Aplica {id: orden_display} en una sola sentencia UPDATE ... SET orden_display = CASE id ..."""
+    if not nuevos_ordenes:
+        return
+    db.query(models.ArticuloNormativa).filter(
+        models.ArticuloNormativa.id.in_(list(nuevos_ordenes))
+    ).update({
+        models.ArticuloNormativa.orden_display: case(nuevos_ordenes, value=models.ArticuloNormativa.id),
+        models.ArticuloNormativa.updated_at: datetime.now()
+    }, synchronize_session=False)
+
+def reordenar_articulos(db: Session, reordenes: List[schemas.ReordenArticulo]) -> bool:
     """
-    Reordena múltiples artículos
-    reordenes: [{"id": 1, "orden_display": 1}, {"id": 2, "orden_display": 2}, ...]
+    Reordena múltiples artículos en una sola sentencia
+    reordenes: [ReordenArticulo(id=1, orden_display=1), ReordenArticulo(id=2, orden_display=2), ...]
     """
     try:
-        for reorden in reordenes:
-            db.query(models.ArticuloNormativa).filter(
-                models.ArticuloNormativa.id == reorden["id"]
-            ).update({
-                "orden_display": reorden["orden_display"],
-                "updated_at": datetime.now()
-            })
-        
+        _aplicar_orden(db, {reorden.id: reorden.orden_display for reorden in reordenes})
         db.commit()
         return True
     except Exception:
         db.rollback()
         return False
 
+def _ids_en_orden(db: Session) -> List[tuple]:
+    """(id, orden_display) de todos los artículos en el orden en que se muestran"""
+    return db.query(
+        models.ArticuloNormativa.id,
+        models.ArticuloNormativa.orden_display
+    ).order_by(
+        asc(models.ArticuloNormativa.orden_display),
+        asc(models.ArticuloNormativa.numero_articulo)
+    ).all()
+
+def renumerar_articulos(db: Session, paso: int = PASO_ORDEN) -> bool:
+    """Renumera todos los artículos conservando su orden actual, con huecos de `paso` entre posiciones"""
+    try:
+        ids = [fila.id for fila in _ids_en_orden(db)]
+        _aplicar_orden(db, {articulo_id: (i + 1) * paso for i, articulo_id in enumerate(ids)})
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        return False
+
+def mover_articulo(db: Session, articulo_id: int, despues_de_id: Optional[int] = None) -> Optional[models.ArticuloNormativa]:
+    """
+    Mueve un artículo justo después de `despues_de_id` (o al inicio si es None).
+
+    Si hay hueco entre los vecinos, solo se actualiza la fila del artículo movido;
+    si no, se renumera toda la normativa con huecos en una sola sentencia.
+    """
+    filas = _ids_en_orden(db)
+    ids = [fila.id for fila in filas]
+    if articulo_id not in ids or (despues_de_id is not None and despues_de_id not in ids):
+        return None
+    if despues_de_id == articulo_id:
+        return get_articulo(db, articulo_id)
+
+    orden_por_id = {fila.id: fila.orden_display for fila in filas}
+    ids.remove(articulo_id)
+    posicion = 0 if despues_de_id is None else ids.index(despues_de_id) + 1
+
+    anterior = orden_por_id[ids[posicion - 1]] if posicion > 0 else None
+    siguiente = orden_por_id[ids[posicion]] if posicion < len(ids) else None
+
+    if anterior is None and siguiente is None:
+        nuevo_orden = PASO_ORDEN
+    elif anterior is None:
+        nuevo_orden = siguiente // 2 if siguiente > 0 else None
+    elif siguiente is None:
+        nuevo_orden = anterior + PASO_ORDEN
+    else:
+        nuevo_orden = (anterior + siguiente) // 2 if siguiente - anterior > 1 else None
+
+    try:
+        if nuevo_orden is not None:
+            _aplicar_orden(db, {articulo_id: nuevo_orden})
+        else:
+            # Sin hueco disponible: renumerar todo con el artículo ya en su nueva posición
+            ids.insert(posicion, articulo_id)
+            _aplicar_orden(db, {id_: (i + 1) * PASO_ORDEN for i, id_ in enumerate(ids)})
+        db.commit()
+    except Exception:
+        db.rollback()
+        return None
+
+    return get_articulo(db, articulo_id)
+
 def duplicar_articulo(db: Session, articulo_id: int, nuevo_numero: str) -> Optional[models.ArticuloNormativa]:
     """Duplica un artículo existente con un nuevo número"""
     original = get_articulo(db, articulo_id)
@@ -177,6 +292,8 @@ def duplicar_articulo(db: Session, articulo_id: int, nuevo_numero: str) -> Optio
     )
     
     db.add(duplicado)
+    db.flush()
+    indice_normativa.sincronizar_articulo(db, duplicado)
     db.commit()
     db.refresh(duplicado)
     return duplicado
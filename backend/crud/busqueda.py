@@ -0,0 +1,272 @@
+import os
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+import models
+from database import SessionLocal
+from schemas import busqueda as schemas
+from services.busqueda_jugadores import normalizar_texto, puntuar_coincidencia
+from services import indice_busqueda, indice_normativa
+from crud.jugadores import buscar_jugadores
+from crud.articulos_normativa import buscar_articulos
+
+# Presupuesto total de la búsqueda global y tiempo máximo por fuente (milisegundos)
+PRESUPUESTO_BUSQUEDA_MS = int(os.getenv("BUSQUEDA_PRESUPUESTO_MS", "800"))
+TIMEOUT_FUENTE_MS = int(os.getenv("BUSQUEDA_TIMEOUT_FUENTE_MS", "500"))
+
+# Puntaje de un jugador que el índice encontró solo por similitud (errores de escritura)
+PUNTAJE_APROXIMADO = 0.5
+
+# Cada cuántas instrucciones de SQLite se revisa el plazo de la consulta
+PASOS_PROGRESO_SQLITE = 1000
+
+# Pool compartido para ejecutar las subconsultas en paralelo
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("BUSQUEDA_MAX_WORKERS", "8")), thread_name_prefix="busqueda")
+
+def _buscar_en_jugadores(db: Session, termino: str, consulta: str, limite: int) -> List[schemas.ResultadoBusqueda]:
+    resultados = []
+    for jugador in buscar_jugadores(db, termino, limite=limite):
+        titulo = f"{jugador.nombre} {jugador.apellido or ''}".strip()
+        resultados.append(schemas.ResultadoBusqueda(
+            tipo="jugador",
+            id=str(jugador.cedula),
+            titulo=titulo,
+            subtitulo=f"{jugador.nombre_inscripcion} - {'Activo' if jugador.activo else 'Inactivo'}",
+            # Misma escala que las demás fuentes; las coincidencias aproximadas del índice
+            # (errores de escritura) no puntúan por texto y quedan al final
+            puntaje=max(puntuar_coincidencia(titulo, consulta),
+                        puntuar_coincidencia(jugador.nombre, consulta),
+                        puntuar_coincidencia(jugador.apellido, consulta),
+                        puntuar_coincidencia(jugador.nombre_inscripcion, consulta),
+                        puntuar_coincidencia(jugador.cedula, consulta),
+                        PUNTAJE_APROXIMADO)
+        ))
+    return resultados
+
+def _buscar_en_causales(db: Session, termino: str, consulta: str, limite: int) -> List[schemas.ResultadoBusqueda]:
+    filas = db.query(
+        models.CausalMulta.id,
+        models.CausalMulta.descripcion,
+        models.CausalMulta.valor
+    ).filter(
+        indice_busqueda.filtro(db, "causales", models.CausalMulta.id, [models.CausalMulta.descripcion], consulta)
+    ).limit(limite * 2).all()
+
+    return [
+        schemas.ResultadoBusqueda(
+            tipo="causal",
+            id=str(fila.id),
+            titulo=fila.descripcion,
+            subtitulo=f"Causal de multa - ${fila.valor:,.0f}",
+            puntaje=puntuar_coincidencia(fila.descripcion, consulta)
+        )
+        for fila in filas
+    ]
+
+def _buscar_en_articulos(db: Session, termino: str, consulta: str, limite: int) -> List[schemas.ResultadoBusqueda]:
+    if indice_normativa.disponible(db):
+        # Índice de texto completo: también encuentra coincidencias dentro del contenido
+        return [
+            schemas.ResultadoBusqueda(
+                tipo="articulo",
+                id=str(articulo.id),
+                titulo=f"Art. {articulo.numero_articulo} - {articulo.titulo}",
+                subtitulo=resultado.fragmento or "Normativa",
+                puntaje=max(puntuar_coincidencia(articulo.numero_articulo, consulta),
+                            puntuar_coincidencia(articulo.titulo, consulta), 1.0)
+            )
+            for articulo, resultado in buscar_articulos(db, termino, limit=limite)
+        ]
+
+    # Sin índice de texto completo: el número o el título contienen el término
+    filas = db.query(
+        models.ArticuloNormativa.id,
+        models.ArticuloNormativa.numero_articulo,
+        models.ArticuloNormativa.titulo
+    ).filter(
+        models.ArticuloNormativa.activo == True,
+        indice_busqueda.filtro_contiene(
+            [models.ArticuloNormativa.numero_articulo, models.ArticuloNormativa.titulo], consulta
+        )
+    ).limit(limite * 2).all()
+
+    return [
+        schemas.ResultadoBusqueda(
+            tipo="articulo",
+            id=str(fila.id),
+            titulo=f"Art. {fila.numero_articulo} - {fila.titulo}",
+            subtitulo="Normativa",
+            puntaje=max(puntuar_coincidencia(fila.numero_articulo, consulta),
+                        puntuar_coincidencia(fila.titulo, consulta))
+        )
+        for fila in filas
+    ]
+
+def _buscar_en_egresos(db: Session, termino: str, consulta: str, limite: int) -> List[schemas.ResultadoBusqueda]:
+    filas = db.query(
+        models.Egreso.id,
+        models.Egreso.concepto,
+        models.Egreso.comprobante,
+        models.Egreso.valor,
+        models.Egreso.fecha
+    ).filter(
+        indice_busqueda.filtro(
+            db, "egresos", models.Egreso.id, [models.Egreso.concepto, models.Egreso.comprobante], consulta
+        )
+    ).order_by(models.Egreso.fecha.desc()).limit(limite * 2).all()
+
+    return [
+        schemas.ResultadoBusqueda(
+            tipo="egreso",
+            id=str(fila.id),
+            titulo=fila.concepto,
+            subtitulo=f"${fila.valor:,.0f} - {fila.fecha.strftime('%d/%m/%Y') if fila.fecha else 'Sin fecha'}"
+                      + (f" - Comprobante {fila.comprobante}" if fila.comprobante else ""),
+            puntaje=max(puntuar_coincidencia(fila.concepto, consulta),
+                        puntuar_coincidencia(fila.comprobante, consulta))
+        )
+        for fila in filas
+    ]
+
+def _buscar_en_aportes_grupales(db: Session, termino: str, consulta: str, limite: int) -> List[schemas.ResultadoBusqueda]:
+    filas = db.query(
+        models.Multa.grupo_multa_id,
+        models.Multa.concepto_aporte,
+        models.Multa.fecha_multa
+    ).filter(
+        models.Multa.es_aporte_grupal == True,
+        indice_busqueda.filtro(db, "aportes_grupales", models.Multa.id, [models.Multa.concepto_aporte], consulta)
+    ).distinct().limit(limite * 2).all()
+
+    return [
+        schemas.ResultadoBusqueda(
+            tipo="aporte_grupal",
+            id=str(fila.grupo_multa_id),
+            titulo=fila.concepto_aporte or "Aporte grupal",
+            subtitulo=f"Aporte grupal - {fila.fecha_multa}",
+            puntaje=puntuar_coincidencia(fila.concepto_aporte, consulta)
+        )
+        for fila in filas
+    ]
+
+FUENTES_BUSQUEDA: Dict[str, Callable] = {
+    "jugadores": _buscar_en_jugadores,
+    "causales": _buscar_en_causales,
+    "normativa": _buscar_en_articulos,
+    "egresos": _buscar_en_egresos,
+    "aportes_grupales": _buscar_en_aportes_grupales,
+}
+
+@contextmanager
+def _tiempo_maximo(db: Session, segundos: float):
+    """
+    Corta en la base de datos la consulta de una fuente que excede su tiempo: al vencer
+    la espera la búsqueda responde sin esa fuente, y así su hilo y su conexión también
+    se liberan en vez de seguir ocupados hasta que termine la consulta.
+
+    - PostgreSQL: statement_timeout de la transacción de la sesión (SET LOCAL).
+    - SQLite: manejador de progreso que interrumpe la sentencia al pasar el plazo.
+    """
+    conexion = db.connection()
+    dialecto = conexion.dialect.name
+    if dialecto == "postgresql":
+        conexion.exec_driver_sql(f"SET LOCAL statement_timeout = {max(1, int(segundos * 1000))}")
+        yield
+    elif dialecto == "sqlite":
+        plazo = time.perf_counter() + segundos
+        dbapi = conexion.connection.dbapi_connection
+        dbapi.set_progress_handler(lambda: time.perf_counter() > plazo, PASOS_PROGRESO_SQLITE)
+        try:
+            yield
+        finally:
+            # La conexión vuelve al pool: no debe conservar el plazo de esta búsqueda
+            dbapi.set_progress_handler(None, 0)
+    else:
+        yield
+
+def _ejecutar_fuente(fuente, session_factory, termino: str, consulta: str, limite: int, tiempo_maximo_s: float):
+    """Ejecuta una fuente con su propia sesión (las sesiones no se comparten entre hilos)"""
+    inicio = time.perf_counter()
+    db = session_factory()
+    try:
+        with _tiempo_maximo(db, tiempo_maximo_s):
+            resultados = fuente(db, termino, consulta, limite)
+    except OperationalError as e:
+        if time.perf_counter() - inicio >= tiempo_maximo_s:
+            raise TimeoutError(f"Consulta cancelada tras {tiempo_maximo_s * 1000:.0f} ms") from e
+        raise
+    finally:
+        db.close()
+    return resultados, (time.perf_counter() - inicio) * 1000
+
+def buscar_global(
+    termino: str,
+    limite: int = 20,
+    fuentes: Optional[List[str]] = None,
+    presupuesto_ms: Optional[int] = None,
+    timeout_fuente_ms: Optional[int] = None,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> schemas.RespuestaBusquedaGlobal:
+    """
+    Busca en jugadores, causales, normativa, egresos y aportes grupales en paralelo.
+
+    Cada fuente tiene su propio tiempo máximo y toda la búsqueda un presupuesto total;
+    las fuentes que no responden a tiempo se reportan como 'timeout' y se retornan
+    los resultados parciales del resto, combinados y ordenados por puntaje.
+    """
+    inicio = time.perf_counter()
+    consulta = normalizar_texto(termino)
+    presupuesto = (presupuesto_ms if presupuesto_ms is not None else PRESUPUESTO_BUSQUEDA_MS) / 1000
+    timeout_fuente = (timeout_fuente_ms if timeout_fuente_ms is not None else TIMEOUT_FUENTE_MS) / 1000
+    nombres = [nombre for nombre in (fuentes or FUENTES_BUSQUEDA) if nombre in FUENTES_BUSQUEDA]
+
+    espera = min(presupuesto, timeout_fuente)
+    futuros = {
+        nombre: _executor.submit(
+            _ejecutar_fuente, FUENTES_BUSQUEDA[nombre], session_factory, termino, consulta, limite, espera
+        )
+        for nombre in nombres
+    }
+    # Todas las fuentes arrancan juntas, así que basta una sola espera acotada
+    wait(list(futuros.values()), timeout=espera)
+
+    resultados: List[schemas.ResultadoBusqueda] = []
+    estados: Dict[str, schemas.EstadoFuenteBusqueda] = {}
+    for nombre, futuro in futuros.items():
+        if not futuro.done():
+            # cancel() solo evita que arranque una fuente aún en cola; la que ya consulta
+            # la corta la base de datos al vencer su plazo (_tiempo_maximo)
+            futuro.cancel()
+            estados[nombre] = schemas.EstadoFuenteBusqueda(
+                estado="timeout",
+                duracion_ms=round((time.perf_counter() - inicio) * 1000, 2)
+            )
+            continue
+        try:
+            encontrados, duracion_ms = futuro.result()
+            encontrados = [r for r in encontrados if r.puntaje > 0]
+            resultados.extend(encontrados)
+            estados[nombre] = schemas.EstadoFuenteBusqueda(
+                estado="ok", total=len(encontrados), duracion_ms=round(duracion_ms, 2)
+            )
+        except TimeoutError:
+            estados[nombre] = schemas.EstadoFuenteBusqueda(
+                estado="timeout",
+                duracion_ms=round((time.perf_counter() - inicio) * 1000, 2)
+            )
+        except Exception as e:
+            print(f"Error en búsqueda global ({nombre}): {e}")
+            estados[nombre] = schemas.EstadoFuenteBusqueda(estado="error", detalle=str(e))
+
+    resultados.sort(key=lambda r: (-r.puntaje, r.tipo, r.titulo))
+
+    return schemas.RespuestaBusquedaGlobal(
+        termino=termino,
+        resultados=resultados[:limite],
+        fuentes=estados,
+        parcial=any(estado.estado != "ok" for estado in estados.values()),
+        duracion_ms=round((time.perf_counter() - inicio) * 1000, 2)
+    )
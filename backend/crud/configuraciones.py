@@ -3,6 +3,7 @@ from sqlalchemy import desc
 from typing import Optional
 from models import Configuracion
 from schemas.configuraciones import ConfiguracionCreate, ConfiguracionUpdate
+from services.configuracion_sistema import configuracion_sistema
 
 def get_configuraciones(db: Session):
     """Obtener todas las configuraciones"""
@@ -21,7 +22,9 @@ def create_configuracion(db: Session, configuracion: ConfiguracionCreate, admin_
         actualizado_por=admin_id
     )
     db.add(db_configuracion)
+    configuracion_sistema.registrar_cambio(db)
     db.commit()
+    configuracion_sistema.invalidar()
     db.refresh(db_configuracion)
     return db_configuracion
 
@@ -33,7 +36,9 @@ def update_configuracion(db: Session, clave: str, configuracion: ConfiguracionUp
             setattr(db_configuracion, key, value)
         if admin_id is not None:
             setattr(db_configuracion, 'actualizado_por', admin_id)
+        configuracion_sistema.registrar_cambio(db)
         db.commit()
+        configuracion_sistema.invalidar()
         db.refresh(db_configuracion)
     return db_configuracion
 
@@ -42,5 +47,7 @@ def delete_configuracion(db: Session, clave: str):
     db_configuracion = get_configuracion_by_clave(db, clave)
     if db_configuracion:
         db.delete(db_configuracion)
+        configuracion_sistema.registrar_cambio(db)
         db.commit()
+        configuracion_sistema.invalidar()
     return db_configuracion
@@ -0,0 +1,15 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+import models
+
+def get_correos(db: Session, estado: Optional[str] = None, tipo: Optional[str] = None, limite: int = 50):
+    """Correos de la bandeja de salida, los más recientes primero"""
+    consulta = db.query(models.CorreoSaliente)
+    if estado:
+        consulta = consulta.filter(models.CorreoSaliente.estado == estado)
+    if tipo:
+        consulta = consulta.filter(models.CorreoSaliente.tipo == tipo)
+    return consulta.order_by(models.CorreoSaliente.id.desc()).limit(limite).all()
+
+def get_correo(db: Session, correo_id: int):
+    return db.query(models.CorreoSaliente).filter(models.CorreoSaliente.id == correo_id).first()
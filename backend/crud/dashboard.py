@@ -1,173 +1,78 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, asc, text
+from sqlalchemy import func, and_, or_, desc, asc, text, select, true
 from datetime import datetime, date
 from typing import Optional, List
 import models
 from schemas import dashboard as dashboard_schemas
 
-def obtener_resumen_dashboard(db: Session) -> dashboard_schemas.ResumenDashboard:
+def _suma(columna, *condiciones):
+    return select(func.coalesce(func.sum(columna), 0)).where(*condiciones).scalar_subquery()
+
+def _en_rango(columna, inicio: datetime, fin: datetime):
+    # Rango semiabierto [inicio, fin): comparable con el índice de la columna
+    return and_(columna >= inicio, columna < fin)
+
+def obtener_resumen_dashboard(db: Session, hoy: Optional[date] = None) -> dashboard_schemas.ResumenDashboard:
     """
-    Obtiene un resumen completo para el dashboard
+    Obtiene un resumen completo para el dashboard en una sola consulta: un CTE con los
+    totales históricos y del mes actual, unido al top 3 del ranking de multas.
+    El router lo sirve desde `cache_finanzas` entre escrituras.
     """
     try:
-        # Contar total de jugadores
-        total_jugadores = db.query(models.Jugador).count()
-        
-        # Contar jugadores al día (sin multas pendientes)
-        jugadores_con_multas_pendientes = db.query(models.Jugador.cedula).join(
-            models.Multa
-        ).filter(
-            models.Multa.pagada == False
-        ).distinct().count()
-        
-        jugadores_al_dia = total_jugadores - jugadores_con_multas_pendientes
-        jugadores_con_multas = jugadores_con_multas_pendientes
-        
-        # Calcular estadísticas financieras reales
-        # 1. Calcular ingresos totales (mensualidades + otros aportes + multas pagadas)
-        total_mensualidades = db.query(func.sum(models.Mensualidad.valor)).scalar() or 0.0
-        total_otros_aportes = db.query(func.sum(models.OtroAporte.valor)).scalar() or 0.0
-        total_multas_pagadas = db.query(func.sum(models.Multa.valor))\
-                               .filter(models.Multa.pagada == True)\
-                               .scalar() or 0.0
-        
-        total_ingresos = float(total_mensualidades) + float(total_otros_aportes) + float(total_multas_pagadas)
-        
-        # 2. Calcular egresos totales
-        total_egresos = db.query(func.sum(models.Egreso.valor)).scalar() or 0.0
-        total_egresos = float(total_egresos)
-        
-        # 3. Calcular saldo actual (ingresos - egresos)
-        saldo_actual = total_ingresos - total_egresos
-        
-        # 4. Ingresos y egresos del mes actual (simplificado por ahora)
-        # TODO: Implementar filtros por mes actual cuando sea necesario
-        ingresos_mes_actual = total_ingresos
-        egresos_mes_actual = total_egresos
-        
-        # Top 3 jugadores con más multas (simplificado)
-        top_3_jugadores_multas = []
-        
+        hoy = hoy or date.today()
+        inicio_mes = datetime(hoy.year, hoy.month, 1)
+        inicio_siguiente = datetime(hoy.year + 1, 1, 1) if hoy.month == 12 else datetime(hoy.year, hoy.month + 1, 1)
+        multa_pagada = models.Multa.pagada == True
+
+        totales = select(
+            select(func.count()).select_from(models.Jugador).scalar_subquery().label('total_jugadores'),
+            # Jugadores con multas pendientes
+            select(func.count(func.distinct(models.Multa.jugador_cedula)))
+                .where(models.Multa.pagada == False).scalar_subquery().label('jugadores_con_multas'),
+            # Ingresos (mensualidades + otros aportes + multas pagadas) y egresos históricos
+            _suma(models.Mensualidad.valor).label('suma_mensualidades'),
+            _suma(models.OtroAporte.valor).label('suma_otros_aportes'),
+            _suma(models.Multa.valor, multa_pagada).label('suma_multas_pagadas'),
+            _suma(models.Egreso.valor).label('suma_egresos'),
+            # Mismos conceptos en el mes actual
+            _suma(models.Mensualidad.valor,
+                  _en_rango(models.Mensualidad.fecha_pago, inicio_mes, inicio_siguiente)).label('suma_mensualidades_mes'),
+            _suma(models.OtroAporte.valor,
+                  _en_rango(models.OtroAporte.fecha_aporte, inicio_mes, inicio_siguiente)).label('suma_otros_aportes_mes'),
+            _suma(models.Multa.valor, multa_pagada,
+                  _en_rango(models.Multa.fecha_pago, inicio_mes, inicio_siguiente)).label('suma_multas_pagadas_mes'),
+            _suma(models.Egreso.valor,
+                  _en_rango(models.Egreso.fecha, inicio_mes, inicio_siguiente)).label('suma_egresos_mes')
+        ).cte('totales')
+
+        top = _consulta_ranking_multas().limit(3).subquery('top')
+        filas = db.execute(
+            select(totales, top)
+            .select_from(totales.outerjoin(top, true()))
+            .order_by(desc(top.c.total_multas), desc(top.c.valor_total_multas), asc(top.c.cedula))
+        ).all()
+        datos = filas[0]
+
+        total_ingresos = float(datos.suma_mensualidades) + float(datos.suma_otros_aportes) + float(datos.suma_multas_pagadas)
+        ingresos_mes_actual = float(datos.suma_mensualidades_mes) + float(datos.suma_otros_aportes_mes) + float(datos.suma_multas_pagadas_mes)
+        top_3_jugadores_multas = [
+            _jugador_ranking(posicion, fila)
+            for posicion, fila in enumerate((f for f in filas if f.cedula is not None), 1)
+        ]
+
         return dashboard_schemas.ResumenDashboard(
-            saldo_actual=saldo_actual,
+            saldo_actual=total_ingresos - float(datos.suma_egresos),
             ingresos_mes_actual=ingresos_mes_actual,
-            egresos_mes_actual=egresos_mes_actual,
-            total_jugadores=total_jugadores,
-            jugadores_al_dia=jugadores_al_dia,
-            jugadores_con_multas=jugadores_con_multas,
+            egresos_mes_actual=float(datos.suma_egresos_mes),
+            total_jugadores=datos.total_jugadores,
+            jugadores_al_dia=datos.total_jugadores - datos.jugadores_con_multas,
+            jugadores_con_multas=datos.jugadores_con_multas,
             top_3_jugadores_multas=top_3_jugadores_multas,
             fecha_generacion=datetime.now()
         )
         
     except Exception as e:
         raise Exception(f"Error al obtener resumen del dashboard: {str(e)}")
-    
-    # Enfoque simplificado: usar múltiples consultas simples para compatibilidad con SQLite
-    
-    # 1. Obtener todos los jugadores básicos
-    jugadores_base = db.query(
-        models.Jugador.cedula,
-        models.Jugador.nombre,
-        models.Jugador.nombre_inscripcion
-    ).all()
-    
-    ranking = []
-    
-    for jugador in jugadores_base:
-        # 2. Contar multas para este jugador específico
-        query_multas = db.query(models.Multa)\
-                        .filter(models.Multa.jugador_cedula == jugador.cedula)
-        
-        # Aplicar filtros de fecha
-        for filtro in filtros_multas:
-            if hasattr(filtro.left, 'key') and filtro.left.key == 'fecha_multa':
-                query_multas = query_multas.filter(filtro)
-        
-        # Contar total de multas
-        total_multas = query_multas.count()
-        
-        # Si no tiene multas y solo queremos jugadores con multas, saltar
-        if incluir_solo_con_multas and total_multas == 0:
-            continue
-        
-        # Contar multas pendientes y pagadas
-        multas_pendientes = 0
-        multas_pagadas = 0
-        if incluir_pendientes:
-            multas_pendientes = query_multas.filter(models.Multa.pagada == False).count()
-        if incluir_pagadas:
-            multas_pagadas = query_multas.filter(models.Multa.pagada == True).count()
-        
-        # Obtener valores monetarios
-        query_valores = db.query(func.sum(models.Multa.valor).label('total'))\
-                         .filter(models.Multa.jugador_cedula == jugador.cedula)
-        
-        # Aplicar filtros de fecha a valores
-        for filtro in filtros_multas:
-            if hasattr(filtro.left, 'key') and filtro.left.key == 'fecha_multa':
-                query_valores = query_valores.filter(filtro)
-        
-        valor_total = query_valores.scalar() or 0
-        
-        # Valores pendientes
-        valor_pendientes = 0
-        if incluir_pendientes:
-            valor_pendientes = db.query(func.sum(models.Multa.valor))\
-                                .filter(models.Multa.jugador_cedula == jugador.cedula)\
-                                .filter(models.Multa.pagada == False)\
-                                .scalar() or 0
-        
-        # Valores pagados
-        valor_pagadas = 0
-        if incluir_pagadas:
-            valor_pagadas = db.query(func.sum(models.Multa.valor))\
-                             .filter(models.Multa.jugador_cedula == jugador.cedula)\
-                             .filter(models.Multa.pagada == True)\
-                             .scalar() or 0
-        
-        # Última multa
-        ultima_multa = db.query(func.max(models.Multa.fecha_multa))\
-                        .filter(models.Multa.jugador_cedula == jugador.cedula)\
-                        .scalar()
-        
-        # Agregar al ranking si cumple criterios
-        if not incluir_solo_con_multas or total_multas > 0:
-            ranking.append({
-                'cedula': jugador.cedula,
-                'nombre': jugador.nombre,
-                'nombre_inscripcion': jugador.nombre_inscripcion,
-                'total_multas': total_multas,
-                'multas_pendientes': multas_pendientes,
-                'multas_pagadas': multas_pagadas,
-                'valor_total_multas': float(valor_total),
-                'valor_multas_pendientes': float(valor_pendientes),
-                'valor_multas_pagadas': float(valor_pagadas),
-                'ultima_multa': ultima_multa
-            })
-    
-    # Ordenar por total de multas y valor
-    ranking.sort(key=lambda x: (x['total_multas'], x['valor_total_multas']), reverse=True)
-    
-    # Aplicar límite
-    if limite > 0:
-        ranking = ranking[:limite]
-    
-    # Construir objetos del ranking con posición
-    ranking_objetos = []
-    for i, datos in enumerate(ranking, 1):
-        jugador_ranking = dashboard_schemas.JugadorRankingMultas(
-            posicion=i,
-            **datos
-        )
-        ranking_objetos.append(jugador_ranking)
-    
-    return dashboard_schemas.RankingMultasResponse(
-        fecha_generacion=datetime.now(),
-        total_jugadores=len(ranking_objetos),
-        periodo_inicio=fecha_inicio,
-        periodo_fin=fecha_fin,
-        ranking=ranking_objetos
-    )
 
 def obtener_estadisticas_multas(
     db: Session,
@@ -234,66 +139,97 @@ def obtener_estadisticas_multas(
         jugador_con_mayor_valor_multas=jugador_mayor_valor.jugador_cedula if jugador_mayor_valor else None
     )
 
+def _consulta_ranking_multas(
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    incluir_solo_con_multas: bool = True,
+    incluir_pagadas: bool = True,
+    incluir_pendientes: bool = True
+):
+    """
+    Consulta agregada del ranking de multas (una fila por jugador, ya ordenada).
+    Los filtros van en la condición del join para conservar (si se piden) los jugadores sin multas.
+    """
+    condiciones = [models.Multa.jugador_cedula == models.Jugador.cedula]
+    if fecha_inicio:
+        condiciones.append(models.Multa.fecha_multa >= fecha_inicio)
+    if fecha_fin:
+        condiciones.append(models.Multa.fecha_multa <= fecha_fin)
+    if not incluir_pagadas:
+        condiciones.append(models.Multa.pagada == False)
+    if not incluir_pendientes:
+        condiciones.append(models.Multa.pagada == True)
+
+    pendiente = models.Multa.pagada == False
+    pagada = models.Multa.pagada == True
+    total_multas = func.count(models.Multa.id)
+    valor_total = func.coalesce(func.sum(models.Multa.valor), 0)
+
+    consulta = select(
+        models.Jugador.cedula,
+        models.Jugador.nombre,
+        models.Jugador.nombre_inscripcion,
+        total_multas.label('total_multas'),
+        func.count(models.Multa.id).filter(pendiente).label('multas_pendientes'),
+        func.count(models.Multa.id).filter(pagada).label('multas_pagadas'),
+        valor_total.label('valor_total_multas'),
+        func.coalesce(func.sum(models.Multa.valor).filter(pendiente), 0).label('valor_multas_pendientes'),
+        func.coalesce(func.sum(models.Multa.valor).filter(pagada), 0).label('valor_multas_pagadas'),
+        func.max(models.Multa.fecha_multa).label('ultima_multa')
+    ).outerjoin(
+        models.Multa, and_(*condiciones)
+    ).group_by(
+        models.Jugador.cedula,
+        models.Jugador.nombre,
+        models.Jugador.nombre_inscripcion
+    )
+
+    if incluir_solo_con_multas:
+        consulta = consulta.having(total_multas > 0)
+
+    return consulta.order_by(desc(total_multas), desc(valor_total), asc(models.Jugador.cedula))
+
+def _jugador_ranking(posicion: int, row) -> dashboard_schemas.JugadorRankingMultas:
+    return dashboard_schemas.JugadorRankingMultas(
+        posicion=posicion,
+        cedula=row.cedula,
+        nombre=row.nombre,
+        nombre_inscripcion=row.nombre_inscripcion,
+        total_multas=row.total_multas,
+        multas_pendientes=row.multas_pendientes,
+        multas_pagadas=row.multas_pagadas,
+        valor_total_multas=float(row.valor_total_multas),
+        valor_multas_pendientes=float(row.valor_multas_pendientes),
+        valor_multas_pagadas=float(row.valor_multas_pagadas),
+        ultima_multa=row.ultima_multa
+    )
+
 def obtener_ranking_jugadores_multas(
-    db: Session, 
-    limite: int = 10
+    db: Session,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    incluir_solo_con_multas: bool = True,
+    limite: int = 50,
+    incluir_pagadas: bool = True,
+    incluir_pendientes: bool = True
 ) -> dashboard_schemas.RankingMultasResponse:
     """
-    Obtiene el ranking de jugadores con más multas - Versión simplificada
+    Obtiene el ranking de jugadores con más multas en una sola consulta agregada
     """
     try:
-        # Consulta simplificada: contar multas por jugador
-        ranking_data = db.query(
-            models.Jugador.cedula,
-            models.Jugador.nombre,
-            models.Jugador.nombre_inscripcion,
-            func.count(models.Multa.id).label('total_multas')
-        ).outerjoin(
-            models.Multa, 
-            and_(
-                models.Jugador.cedula == models.Multa.jugador_cedula,
-                models.Multa.pagada == False
-            )
-        ).group_by(
-            models.Jugador.cedula, 
-            models.Jugador.nombre, 
-            models.Jugador.nombre_inscripcion
-        ).order_by(
-            desc(func.count(models.Multa.id))
-        ).limit(limite).all()
-        
-        # Construir lista de jugadores en ranking
-        ranking_list = []
-        for idx, row in enumerate(ranking_data):
-            # Calcular valor de multas pendientes para este jugador
-            valor_multas = db.query(
-                func.coalesce(func.sum(models.Multa.valor), 0)
-            ).filter(
-                models.Multa.jugador_cedula == row.cedula,
-                models.Multa.pagada == False
-            ).scalar() or 0
-            
-            jugador_ranking = dashboard_schemas.JugadorRankingMultas(
-                posicion=idx + 1,
-                cedula=row.cedula,
-                nombre=row.nombre,
-                nombre_inscripcion=row.nombre_inscripcion,
-                total_multas=row.total_multas,
-                multas_pendientes=row.total_multas,
-                multas_pagadas=0,
-                valor_total_multas=float(valor_multas),
-                valor_multas_pendientes=float(valor_multas),
-                valor_multas_pagadas=0.0,
-                ultima_multa=None
-            )
-            ranking_list.append(jugador_ranking)
-        
-        # Construir respuesta completa
+        consulta = _consulta_ranking_multas(
+            fecha_inicio, fecha_fin, incluir_solo_con_multas, incluir_pagadas, incluir_pendientes
+        )
+        if limite > 0:
+            consulta = consulta.limit(limite)
+
+        ranking_list = [_jugador_ranking(idx, row) for idx, row in enumerate(db.execute(consulta).all(), 1)]
+
         return dashboard_schemas.RankingMultasResponse(
             fecha_generacion=datetime.now(),
             total_jugadores=len(ranking_list),
-            periodo_inicio=None,
-            periodo_fin=None,
+            periodo_inicio=fecha_inicio,
+            periodo_fin=fecha_fin,
             ranking=ranking_list
         )
         
@@ -303,8 +239,8 @@ def obtener_ranking_jugadores_multas(
         return dashboard_schemas.RankingMultasResponse(
             fecha_generacion=datetime.now(),
             total_jugadores=0,
-            periodo_inicio=None,
-            periodo_fin=None,
+            periodo_inicio=fecha_inicio,
+            periodo_fin=fecha_fin,
             ranking=[]
         )
 
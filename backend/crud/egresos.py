@@ -1,14 +1,22 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, and_, select, tuple_
+from collections import defaultdict
 import models
 from schemas import egresos as schemas
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 def get_egreso(db: Session, egreso_id: int):
-    return db.query(models.Egreso).filter(models.Egreso.id == egreso_id).first()
+    return db.query(models.Egreso)\
+        .options(joinedload(models.Egreso.categoria))\
+        .filter(models.Egreso.id == egreso_id)\
+        .first()
 
 def get_egresos(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Egreso).order_by(models.Egreso.fecha.desc()).offset(skip).limit(limit).all()
+    return db.query(models.Egreso)\
+        .options(joinedload(models.Egreso.categoria))\
+        .order_by(models.Egreso.fecha.desc())\
+        .offset(skip).limit(limit).all()
 
 def crear_egreso(db: Session, egreso: schemas.EgresoCreate, admin_id: int):
     # Verificar que existe la categoría
@@ -38,8 +46,8 @@ def crear_egreso(db: Session, egreso: schemas.EgresoCreate, admin_id: int):
     )
     db.add(db_egreso)
     db.commit()
-    db.refresh(db_egreso)
-    return db_egreso
+    # Recargar con su categoría, que la respuesta incluye
+    return get_egreso(db, db_egreso.id)
 
 def eliminar_egreso(db: Session, egreso_id: int):
     # Verificar que existe el egreso
@@ -120,37 +128,115 @@ def eliminar_categoria_egreso(db: Session, categoria_id: int):
     db.commit()
     return {"message": f"Categoría '{nombre_categoria}' eliminada exitosamente"}
 
-def get_resumen_egresos(db: Session, fecha_inicio: Optional[datetime] = None, fecha_fin: Optional[datetime] = None):
-    from typing import Optional  # Agregar importación
-    
-    query = db.query(models.Egreso)
-    
+def _condiciones_periodo(fecha_inicio: Optional[datetime], fecha_fin: Optional[datetime]) -> list:
+    """Filtros de fecha sobre egresos; fecha_fin es exclusiva"""
+    condiciones = []
     if fecha_inicio:
-        query = query.filter(models.Egreso.fecha >= fecha_inicio)
+        condiciones.append(models.Egreso.fecha >= fecha_inicio)
     if fecha_fin:
-        query = query.filter(models.Egreso.fecha <= fecha_fin)
-
-    egresos = query.all()
-    categorias = {}
-    total_egresos = 0
-
-    for egreso in egresos:
-        if egreso.categoria.nombre not in categorias:
-            categorias[egreso.categoria.nombre] = {
-                'total': 0,
-                'egresos': []
-            }
-        categorias[egreso.categoria.nombre]['total'] += egreso.valor
-        categorias[egreso.categoria.nombre]['egresos'].append(egreso)
-        total_egresos += egreso.valor
-
-    resumen_categorias = [
-        schemas.ResumenCategoria(
-            nombre=nombre,
-            total=datos['total'],
-            egresos=datos['egresos']
-        )
-        for nombre, datos in categorias.items()
-    ]
-
+        condiciones.append(models.Egreso.fecha < fecha_fin)
+    return condiciones
+
+def consulta_totales_por_categoria(fecha_inicio: Optional[datetime] = None, fecha_fin: Optional[datetime] = None):
+    """
+    Total y cantidad de egresos por categoría en un período, incluidas las categorías sin egresos.
+
+    Los filtros de fecha van en la condición del LEFT JOIN: en el WHERE descartarían
+    las categorías vacías y convertirían el join en uno interno.
+    """
+    return select(
+        models.CategoriaEgreso.id,
+        models.CategoriaEgreso.nombre,
+        func.coalesce(func.sum(models.Egreso.valor), 0).label('total'),
+        func.count(models.Egreso.id).label('cantidad')
+    ).select_from(models.CategoriaEgreso).outerjoin(
+        models.Egreso,
+        and_(models.Egreso.categoria_id == models.CategoriaEgreso.id,
+             *_condiciones_periodo(fecha_inicio, fecha_fin))
+    ).group_by(models.CategoriaEgreso.id, models.CategoriaEgreso.nombre)\
+     .order_by(models.CategoriaEgreso.nombre)
+
+def _codificar_cursor(egreso: models.Egreso) -> str:
+    return f"{egreso.fecha.isoformat()}_{egreso.id}"
+
+def _decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        fecha, egreso_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(fecha), int(egreso_id)
+    except ValueError:
+        raise ValueError("Cursor de paginación inválido")
+
+def get_egresos_categoria(
+    db: Session,
+    categoria_id: int,
+    fecha_inicio: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limite: int = 50
+) -> Tuple[List[models.Egreso], Optional[str]]:
+    """
+    Egresos de una categoría del más reciente al más antiguo, paginados por (fecha, id).
+
+    A diferencia de offset, el cursor continúa justo después del último egreso entregado,
+    así que cada página cuesta lo mismo y no se repiten filas si se registran egresos nuevos.
+    """
+    query = db.query(models.Egreso)\
+        .options(joinedload(models.Egreso.categoria))\
+        .filter(models.Egreso.categoria_id == categoria_id, *_condiciones_periodo(fecha_inicio, fecha_fin))
+    if cursor:
+        query = query.filter(tuple_(models.Egreso.fecha, models.Egreso.id) < tuple_(*_decodificar_cursor(cursor)))
+
+    # Se pide una fila extra para saber si hay otra página
+    egresos = query.order_by(models.Egreso.fecha.desc(), models.Egreso.id.desc()).limit(limite + 1).all()
+    if len(egresos) > limite:
+        egresos = egresos[:limite]
+        return egresos, _codificar_cursor(egresos[-1])
+    return egresos, None
+
+def get_resumen_egresos(
+    db: Session,
+    fecha_inicio: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = None,
+    egresos_por_categoria: int = 50
+):
+    """
+    Resumen de egresos por categoría: totales de todo el período y la primera página
+    de egresos de cada categoría (el resto se pide con get_egresos_categoria).
+
+    Son dos consultas sin importar cuántos egresos haya: la agregación y los primeros
+    `egresos_por_categoria` de cada categoría numerados con ROW_NUMBER.
+    """
+    totales = db.execute(consulta_totales_por_categoria(fecha_inicio, fecha_fin)).all()
+
+    egresos_por_id = defaultdict(list)
+    if egresos_por_categoria > 0 and any(fila.cantidad for fila in totales):
+        fila = func.row_number().over(
+            partition_by=models.Egreso.categoria_id,
+            order_by=(models.Egreso.fecha.desc(), models.Egreso.id.desc())
+        ).label('fila')
+        numerados = select(models.Egreso.id, fila)\
+            .where(*_condiciones_periodo(fecha_inicio, fecha_fin))\
+            .subquery()
+        primeros = db.query(models.Egreso)\
+            .options(joinedload(models.Egreso.categoria))\
+            .join(numerados, numerados.c.id == models.Egreso.id)\
+            .filter(numerados.c.fila <= egresos_por_categoria)\
+            .order_by(models.Egreso.fecha.desc(), models.Egreso.id.desc())\
+            .all()
+        for egreso in primeros:
+            egresos_por_id[egreso.categoria_id].append(egreso)
+
+    resumen_categorias = []
+    for categoria in totales:
+        egresos = egresos_por_id.get(categoria.id, [])
+        resumen_categorias.append(schemas.ResumenCategoria(
+            categoria_id=categoria.id,
+            nombre=categoria.nombre,
+            total=float(categoria.total),
+            cantidad=categoria.cantidad,
+            egresos=egresos,
+            siguiente_cursor=_codificar_cursor(egresos[-1]) if egresos and categoria.cantidad > len(egresos) else None
+        ))
+
+    total_egresos = sum(categoria.total for categoria in resumen_categorias)
     return resumen_categorias, total_egresos
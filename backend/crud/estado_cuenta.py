@@ -1,9 +1,10 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract
-from datetime import datetime, date
-from typing import Optional, List
+from sqlalchemy import func, and_, case, literal, select, union_all
+from datetime import datetime, date, timedelta
+from typing import Optional, List, Tuple
 import models
 import schemas
+from crud.egresos import consulta_totales_por_categoria
 
 def calcular_estado_cuenta_equipo(
     db: Session,
@@ -16,7 +17,7 @@ def calcular_estado_cuenta_equipo(
     Args:
         db: Sesión de base de datos
         fecha_inicio: Fecha de inicio del período (opcional)
-        fecha_fin: Fecha de fin del período (opcional)
+        fecha_fin: Fecha de fin del período, exclusiva (opcional)
     
     Returns:
         EstadoCuentaEquipo con todos los cálculos
@@ -27,19 +28,18 @@ def calcular_estado_cuenta_equipo(
     if fecha_inicio:
         query_mensualidades = query_mensualidades.filter(models.Mensualidad.fecha_pago >= fecha_inicio)
     if fecha_fin:
-        query_mensualidades = query_mensualidades.filter(models.Mensualidad.fecha_pago <= fecha_fin)
+        query_mensualidades = query_mensualidades.filter(models.Mensualidad.fecha_pago < fecha_fin)
     
     total_ingresos_mensualidades = query_mensualidades.scalar()
     
     # 2. INGRESOS POR MULTAS PAGADAS
-    query_multas = db.query(func.coalesce(func.sum(models.CausalMulta.valor), 0))\
-        .join(models.Multa, models.CausalMulta.id == models.Multa.causal_id)\
+    query_multas = db.query(func.coalesce(func.sum(models.Multa.valor), 0))\
         .filter(models.Multa.pagada == True)
     
     if fecha_inicio:
         query_multas = query_multas.filter(models.Multa.fecha_pago >= fecha_inicio)
     if fecha_fin:
-        query_multas = query_multas.filter(models.Multa.fecha_pago <= fecha_fin)
+        query_multas = query_multas.filter(models.Multa.fecha_pago < fecha_fin)
     
     total_ingresos_multas = query_multas.scalar()
     
@@ -48,7 +48,7 @@ def calcular_estado_cuenta_equipo(
     if fecha_inicio:
         query_otros_aportes = query_otros_aportes.filter(models.OtroAporte.fecha_aporte >= fecha_inicio)
     if fecha_fin:
-        query_otros_aportes = query_otros_aportes.filter(models.OtroAporte.fecha_aporte <= fecha_fin)
+        query_otros_aportes = query_otros_aportes.filter(models.OtroAporte.fecha_aporte < fecha_fin)
     
     total_otros_aportes = query_otros_aportes.scalar()
     
@@ -60,7 +60,7 @@ def calcular_estado_cuenta_equipo(
     if fecha_inicio:
         query_egresos = query_egresos.filter(models.Egreso.fecha >= fecha_inicio)
     if fecha_fin:
-        query_egresos = query_egresos.filter(models.Egreso.fecha <= fecha_fin)
+        query_egresos = query_egresos.filter(models.Egreso.fecha < fecha_fin)
     
     total_egresos = query_egresos.scalar()
     
@@ -89,22 +89,9 @@ def obtener_egresos_por_categoria(
     fecha_fin: Optional[datetime] = None
 ) -> List[schemas.EgresoPorCategoria]:
     """
-    Obtiene un resumen de egresos agrupados por categoría
+    Obtiene un resumen de egresos agrupados por categoría, incluidas las que no tienen egresos en el período
     """
-    query = db.query(
-        models.CategoriaEgreso.id,
-        models.CategoriaEgreso.nombre,
-        func.coalesce(func.sum(models.Egreso.valor), 0).label('total'),
-        func.count(models.Egreso.id).label('cantidad')
-    ).outerjoin(models.Egreso)\
-     .group_by(models.CategoriaEgreso.id, models.CategoriaEgreso.nombre)
-    
-    if fecha_inicio:
-        query = query.filter(models.Egreso.fecha >= fecha_inicio)
-    if fecha_fin:
-        query = query.filter(models.Egreso.fecha <= fecha_fin)
-    
-    resultados = query.all()
+    resultados = db.execute(consulta_totales_por_categoria(fecha_inicio, fecha_fin)).all()
     
     return [
         schemas.EgresoPorCategoria(
@@ -116,6 +103,86 @@ def obtener_egresos_por_categoria(
         for resultado in resultados
     ]
 
+def rango_mes(año: int, mes: int) -> Tuple[datetime, datetime]:
+    """Rango semiabierto [inicio, fin) de un mes, comparable con los índices de las fechas"""
+    inicio = datetime(año, mes, 1)
+    fin = datetime(año + 1, 1, 1) if mes == 12 else datetime(año, mes + 1, 1)
+    return inicio, fin
+
+def _clave_mes(columna, dialecto: str):
+    """Expresión 'YYYY-MM' del mes de una fecha según el motor"""
+    if dialecto == "postgresql":
+        return func.to_char(columna, 'YYYY-MM')
+    return func.strftime('%Y-%m', columna)
+
+def obtener_serie_financiera(db: Session, desde: date, hasta: date) -> schemas.SerieFinanciera:
+    """
+    Ingresos por fuente, egresos y saldo acumulado de cada mes entre `desde` y `hasta`
+    (meses completos), con un solo GROUP BY sobre los movimientos agrupados por mes.
+    Los movimientos anteriores al rango forman el saldo inicial y los posteriores
+    completan el saldo actual.
+    """
+    inicio, _ = rango_mes(desde.year, desde.month)
+    _, fin = rango_mes(hasta.year, hasta.month)
+
+    movimientos = union_all(
+        select(literal('mensualidades').label('tipo'), models.Mensualidad.fecha_pago.label('fecha'),
+               models.Mensualidad.valor.label('valor')),
+        select(literal('multas'), models.Multa.fecha_pago, models.Multa.valor)
+            .where(models.Multa.pagada == True),
+        select(literal('otros_aportes'), models.OtroAporte.fecha_aporte, models.OtroAporte.valor),
+        select(literal('egresos'), models.Egreso.fecha, models.Egreso.valor)
+    ).subquery('movimientos')
+
+    periodo = case(
+        (movimientos.c.fecha < inicio, literal('anterior')),
+        (movimientos.c.fecha >= fin, literal('posterior')),
+        else_=_clave_mes(movimientos.c.fecha, db.get_bind().dialect.name)
+    ).label('periodo')
+    filas = db.execute(
+        select(periodo, movimientos.c.tipo, func.coalesce(func.sum(movimientos.c.valor), 0).label('total'))
+        .group_by(periodo, movimientos.c.tipo)
+    ).all()
+
+    totales = {}
+    for fila in filas:
+        totales.setdefault(fila.periodo, {})[fila.tipo] = float(fila.total)
+
+    def _saldo(periodo_totales: dict) -> float:
+        return (periodo_totales.get('mensualidades', 0.0) + periodo_totales.get('multas', 0.0)
+                + periodo_totales.get('otros_aportes', 0.0) - periodo_totales.get('egresos', 0.0))
+
+    saldo_inicial = _saldo(totales.get('anterior', {}))
+    saldo = saldo_inicial
+    meses = []
+    año, mes = desde.year, desde.month
+    while (año, mes) <= (hasta.year, hasta.month):
+        del_mes = totales.get(f"{año:04d}-{mes:02d}", {})
+        total_ingresos = del_mes.get('mensualidades', 0.0) + del_mes.get('multas', 0.0) + del_mes.get('otros_aportes', 0.0)
+        total_egresos = del_mes.get('egresos', 0.0)
+        saldo += total_ingresos - total_egresos
+        meses.append(schemas.MesFinanciero(
+            ano=año,
+            mes=mes,
+            ingresos_mensualidades=del_mes.get('mensualidades', 0.0),
+            ingresos_multas=del_mes.get('multas', 0.0),
+            otros_aportes=del_mes.get('otros_aportes', 0.0),
+            total_ingresos=total_ingresos,
+            total_egresos=total_egresos,
+            diferencia=total_ingresos - total_egresos,
+            saldo_acumulado=saldo
+        ))
+        año, mes = (año + 1, 1) if mes == 12 else (año, mes + 1)
+
+    return schemas.SerieFinanciera(
+        desde=inicio.date(),
+        hasta=(fin - timedelta(days=1)).date(),
+        saldo_inicial=saldo_inicial,
+        saldo_actual=saldo + _saldo(totales.get('posterior', {})),
+        meses=meses,
+        fecha_calculo=datetime.now()
+    )
+
 def obtener_resumen_financiero_mensual(
     db: Session,
     año: Optional[int] = None,
@@ -123,50 +190,21 @@ def obtener_resumen_financiero_mensual(
 ) -> schemas.ResumenFinancieroEquipo:
     """
     Obtiene un resumen financiero del mes actual o del mes especificado
+    (serie de un solo mes: una consulta que también da el saldo actual)
     """
     if not año:
         año = datetime.now().year
     if not mes:
         mes = datetime.now().month
     
-    # Ingresos del mes
-    ingresos_mensualidades = db.query(func.coalesce(func.sum(models.Mensualidad.valor), 0))\
-        .filter(
-            extract('year', models.Mensualidad.fecha_pago) == año,
-            extract('month', models.Mensualidad.fecha_pago) == mes
-        ).scalar()
-    
-    ingresos_multas = db.query(func.coalesce(func.sum(models.CausalMulta.valor), 0))\
-        .join(models.Multa, models.CausalMulta.id == models.Multa.causal_id)\
-        .filter(
-            models.Multa.pagada == True,
-            extract('year', models.Multa.fecha_pago) == año,
-            extract('month', models.Multa.fecha_pago) == mes
-        ).scalar()
-    
-    ingresos_otros = db.query(func.coalesce(func.sum(models.OtroAporte.valor), 0))\
-        .filter(
-            extract('year', models.OtroAporte.fecha_aporte) == año,
-            extract('month', models.OtroAporte.fecha_aporte) == mes
-        ).scalar()
-    
-    total_ingresos_mes = ingresos_mensualidades + ingresos_multas + ingresos_otros
-    
-    # Egresos del mes
-    total_egresos_mes = db.query(func.coalesce(func.sum(models.Egreso.valor), 0))\
-        .filter(
-            extract('year', models.Egreso.fecha) == año,
-            extract('month', models.Egreso.fecha) == mes
-        ).scalar()
-    
-    # Saldo actual total (histórico)
-    estado_total = calcular_estado_cuenta_equipo(db)
+    serie = obtener_serie_financiera(db, date(año, mes, 1), date(año, mes, 1))
+    del_mes = serie.meses[0]
     
     return schemas.ResumenFinancieroEquipo(
-        saldo_actual=estado_total.saldo_actual,
-        total_ingresos_mes_actual=float(total_ingresos_mes),
-        total_egresos_mes_actual=float(total_egresos_mes),
-        diferencia_mes_actual=float(total_ingresos_mes - total_egresos_mes)
+        saldo_actual=serie.saldo_actual,
+        total_ingresos_mes_actual=del_mes.total_ingresos,
+        total_egresos_mes_actual=del_mes.total_egresos,
+        diferencia_mes_actual=del_mes.diferencia
     )
 
 def obtener_saldo_actual(db: Session) -> float:
@@ -176,8 +214,7 @@ def obtener_saldo_actual(db: Session) -> float:
     # Total ingresos históricos
     total_mensualidades = db.query(func.coalesce(func.sum(models.Mensualidad.valor), 0)).scalar()
     
-    total_multas = db.query(func.coalesce(func.sum(models.CausalMulta.valor), 0))\
-        .join(models.Multa, models.CausalMulta.id == models.Multa.causal_id)\
+    total_multas = db.query(func.coalesce(func.sum(models.Multa.valor), 0))\
         .filter(models.Multa.pagada == True).scalar()
     
     total_otros_aportes = db.query(func.coalesce(func.sum(models.OtroAporte.valor), 0)).scalar()
@@ -0,0 +1,113 @@
+"""
+Índice unificado de identidades: administradores y jugadores por correo normalizado.
+
+El login unificado buscaba el correo en administradores, lo volvía a leer para verificar
+la contraseña y repetía lo mismo con jugadores (hasta cuatro consultas, la última sin
+índice). Aquí una sola consulta UNION ALL resuelve rol, identificador, nombre y hash:
+
+    SELECT 'admin', id, ... FROM administradores WHERE lower(email) = :email
+    UNION ALL
+    SELECT 'jugador', cedula, ... FROM jugadores WHERE lower(email) = :email AND password IS NOT NULL
+
+Cada rama usa el índice funcional único sobre lower(email) de su tabla
+(ix_administradores_email_normalizado, ix_jugadores_email_normalizado), que además
+impide dos cuentas con el mismo correo escrito con distintas mayúsculas. La unicidad
+entre tablas se valida al escribir con `email_en_uso`. Si el correo existe en ambas
+tablas (datos anteriores a esta validación), gana el administrador, como antes.
+
+Un login fallido cuesta una consulta; uno exitoso no vuelve a leer al usuario.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import String, cast, func, literal, select, union_all, update
+from starlette.concurrency import run_in_threadpool
+import models
+from services.credenciales import credenciales
+from typing import NamedTuple, Optional
+
+ROL_ADMIN = "admin"
+ROL_JUGADOR = "jugador"
+
+class Identidad(NamedTuple):
+    rol: str  # 'admin' o 'jugador'
+    id: str  # id del administrador o cédula del jugador
+    nombre: str
+    email: str
+    password: Optional[str]
+
+def normalizar_email(email: str) -> str:
+    """Forma canónica del correo: sin espacios alrededor y en minúsculas"""
+    return (email or "").strip().lower()
+
+def email_o_nulo(email: Optional[str]) -> Optional[str]:
+    """Correo sin espacios alrededor, o None si viene vacío: el índice único sobre
+    lower(email) admite muchos NULL pero un solo ''"""
+    email = (email or "").strip()
+    return email or None
+
+def _consulta_identidad(email: str, roles=(ROL_ADMIN, ROL_JUGADOR), solo_con_password: bool = True):
+    admin = models.Administrador.__table__.c
+    jugador = models.Jugador.__table__.c
+    ramas = []
+    if ROL_ADMIN in roles:
+        ramas.append(select(
+            literal(ROL_ADMIN).label("rol"), cast(admin.id, String).label("id"), admin.nombre,
+            admin.email, admin.password, literal(0).label("prioridad")
+        ).where(func.lower(admin.email) == email))
+    if ROL_JUGADOR in roles:
+        condiciones = [func.lower(jugador.email) == email]
+        if solo_con_password:
+            condiciones.append(jugador.password.isnot(None))
+        ramas.append(select(
+            literal(ROL_JUGADOR).label("rol"), jugador.cedula.label("id"), jugador.nombre,
+            jugador.email, jugador.password, literal(1).label("prioridad")
+        ).where(*condiciones))
+    consulta = union_all(*ramas).subquery()
+    return select(consulta.c.rol, consulta.c.id, consulta.c.nombre, consulta.c.email, consulta.c.password)\
+        .order_by(consulta.c.prioridad)\
+        .limit(1)
+
+def buscar_identidad(db: Session, email: str, roles=(ROL_ADMIN, ROL_JUGADOR)) -> Optional[Identidad]:
+    """Identidad con ese correo (sin distinguir mayúsculas) en una consulta, o None"""
+    email = normalizar_email(email)
+    if not email:
+        return None
+    fila = db.execute(_consulta_identidad(email, roles)).first()
+    return Identidad(*fila) if fila else None
+
+def email_en_uso(db: Session, email: str, excepto: Optional[Identidad] = None) -> bool:
+    """True si otro administrador o jugador ya usa ese correo (aunque el jugador no tenga contraseña)"""
+    email = normalizar_email(email)
+    if not email:
+        return False
+    filas = db.execute(_consulta_identidad(email, solo_con_password=False).limit(2)).all()
+    return any(excepto is None or (fila.rol, fila.id) != (excepto.rol, excepto.id) for fila in filas)
+
+def _actualizar_hash(db: Session, identidad: Identidad, nuevo_hash: str) -> None:
+    """Reemplaza un hash heredado tras un login exitoso"""
+    credenciales.registrar_rehash(identidad.password)
+    # Sentencia sobre la tabla, no sobre el mapper: cambiar la contraseña no
+    # afecta las finanzas y no debe invalidar cache_finanzas
+    if identidad.rol == ROL_ADMIN:
+        tabla = models.Administrador.__table__
+        condicion = tabla.c.id == int(identidad.id)
+    else:
+        tabla = models.Jugador.__table__
+        condicion = tabla.c.cedula == identidad.id
+    db.execute(update(tabla).where(condicion).values(password=nuevo_hash))
+    db.commit()
+
+async def autenticar(db: Session, email: str, password: str, roles=(ROL_ADMIN, ROL_JUGADOR)) -> Optional[Identidad]:
+    """
+    Identidad con ese correo y contraseña, o None. Si el correo no existe se verifica contra
+    un hash ficticio, para que la respuesta tarde lo mismo y no revele qué correos existen.
+    """
+    identidad = await run_in_threadpool(buscar_identidad, db, email, roles)
+
+    resultado = await credenciales.verificar_async(password, identidad.password if identidad else None)
+    if not resultado.valida:
+        return None
+    if resultado.requiere_rehash:
+        nuevo_hash = await credenciales.generar_hash_async(password)
+        await run_in_threadpool(_actualizar_hash, db, identidad, nuevo_hash)
+    return identidad
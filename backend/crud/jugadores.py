@@ -1,15 +1,26 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, func, update
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 import models
 from schemas import jugadores as schemas
-from services.estado_cuenta_service import EstadoCuentaService
+from services.estado_cuenta_service import EstadoCuentaService, cargar_movimientos
+from services.busqueda_jugadores import indice_jugadores
+from services.metricas import registrar_cache
+from services.credenciales import credenciales
+from crud.identidades import ROL_JUGADOR, autenticar, email_o_nulo, normalizar_email
 from typing import List, Optional
-import hashlib
 
 def get_jugador(db: Session, cedula: str):
     return db.query(models.Jugador).filter(models.Jugador.cedula == cedula).first()
 
+def get_jugador_detalle(db: Session, cedula: str):
+    """Jugador con quien lo recomendó y a quiénes recomendó (JugadorDetalle)"""
+    return db.query(models.Jugador)\
+        .options(joinedload(models.Jugador.recomendado_por), selectinload(models.Jugador.recomendados))\
+        .filter(models.Jugador.cedula == cedula)\
+        .first()
+
 def get_jugador_by_cedula(db: Session, cedula: str):
     return db.query(models.Jugador).filter(models.Jugador.cedula == cedula).first()
 
@@ -18,11 +29,12 @@ def get_jugadores(db: Session, skip: int = 0, limit: int = 100):
 
 def create_jugador(db: Session, jugador: schemas.JugadorCreate):
     # Crear hash de la contraseña inicial (cédula)
-    password_hash = hashlib.sha256(jugador.cedula.encode()).hexdigest()
+    password_hash = credenciales.generar_hash_en_pool(jugador.cedula)
     
     # Crear el jugador con credenciales automáticas
     jugador_data = jugador.dict()
     jugador_data['password'] = password_hash  # Cédula como contraseña inicial
+    jugador_data['email'] = email_o_nulo(jugador.email)  # Sin correo: NULL, no ''
     
     db_jugador = models.Jugador(**jugador_data)
     db.add(db_jugador)
@@ -35,13 +47,42 @@ def create_jugador(db: Session, jugador: schemas.JugadorCreate):
     
     return db_jugador
 
-def buscar_jugadores(db: Session, termino: str):
-    """Busca jugadores por nombre, cédula o alias de inscripción"""
-    return db.query(models.Jugador).filter(
-        (models.Jugador.nombre.ilike(f"%{termino}%")) |
-        (models.Jugador.cedula.ilike(f"%{termino}%")) |
-        (models.Jugador.nombre_inscripcion.ilike(f"%{termino}%"))
+def _cargar_indice_busqueda(db: Session):
+    """
+    Reconstruye el índice de búsqueda proyectando solo las columnas necesarias.
+    La generación y la versión se leen antes que los registros: si una escritura
+    llega en medio, el índice no se publica o se vuelve a construir.
+    """
+    generacion = indice_jugadores.generacion
+    version = indice_jugadores.leer_version(db)
+    registros = db.query(
+        models.Jugador.cedula,
+        models.Jugador.nombre,
+        models.Jugador.apellido,
+        models.Jugador.nombre_inscripcion
     ).all()
+    indice_jugadores.reconstruir(registros, generacion=generacion, version=version)
+
+def buscar_jugadores(db: Session, termino: str, limite: int = 20):
+    """
+    Busca jugadores por nombre, apellido, cédula o alias de inscripción.
+
+    Usa el índice en memoria (sin tildes, por prefijo y aproximado) y retorna
+    los jugadores ordenados por relevancia, como máximo `limite`.
+    """
+    vigente = indice_jugadores.vigente_en(db)
+    registrar_cache("indice_jugadores", vigente)
+    if not vigente:
+        _cargar_indice_busqueda(db)
+
+    resultados = indice_jugadores.buscar(termino, limite=limite)
+    if not resultados:
+        return []
+
+    cedulas = [cedula for cedula, _ in resultados]
+    jugadores = db.query(models.Jugador).filter(models.Jugador.cedula.in_(cedulas)).all()
+    por_cedula = {jugador.cedula: jugador for jugador in jugadores}
+    return [por_cedula[cedula] for cedula in cedulas if cedula in por_cedula]
 
 def get_estado_cuenta_jugador(db: Session, cedula: str) -> schemas.EstadoCuentaJugador:
     """Obtiene el estado de cuenta detallado de un jugador"""
@@ -49,40 +90,27 @@ def get_estado_cuenta_jugador(db: Session, cedula: str) -> schemas.EstadoCuentaJ
     if not jugador:
         raise ValueError("Jugador no encontrado")
 
-    # Usar el nuevo servicio para calcular el estado
+    # Mensualidades, multas y aportes en una sola consulta, compartida con el servicio
+    movimientos = cargar_movimientos(db, cedula)
     detalles_estado = EstadoCuentaService.obtener_detalles_estado(jugador, db)
 
-    # Obtener mensualidades pagadas
     meses_pagados = [
-        schemas.MesPago(
-            mes=m.mes,
-            ano=m.ano,
-            valor=m.valor,
-            fecha_pago=m.fecha_pago
-        ) for m in jugador.mensualidades
+        schemas.MesPago(mes=m.mes, ano=m.ano, valor=m.valor, fecha_pago=m.fecha)
+        for m in movimientos.mensualidades
     ]
-
-    # Obtener multas
     multas = [
         schemas.MultaResumen(
-            descripcion=m.causal.descripcion,
-            valor=m.causal.valor,
+            descripcion=m.texto,
+            valor=m.valor,
             fecha_multa=m.fecha_multa,
             pagada=m.pagada,
-            fecha_pago=m.fecha_pago
-        ) for m in jugador.multas
+            fecha_pago=m.fecha
+        ) for m in movimientos.multas
+    ]
+    otros_aportes = [
+        schemas.OtroAporteResumen(concepto=a.texto, valor=a.valor, fecha_aporte=a.fecha)
+        for a in movimientos.otros_aportes
     ]
-
-    # Obtener otros aportes (si existe la relación)
-    otros_aportes = []
-    if hasattr(jugador, 'otros_aportes'):
-        otros_aportes = [
-            schemas.OtroAporteResumen(
-                concepto=a.concepto,
-                valor=a.valor,
-                fecha_aporte=a.fecha_aporte
-            ) for a in jugador.otros_aportes
-        ]
 
     # Calcular totales
     total_pagado = sum(m.valor for m in meses_pagados)
@@ -152,16 +180,44 @@ def cambiar_estado_jugador(db: Session, cedula: str, activo: bool):
 
 def get_jugador_by_email(db: Session, email: str):
     """Obtiene un jugador por su email"""
-    return db.query(models.Jugador).filter(models.Jugador.email == email).first()
+    # lower(email) usa el índice ix_jugadores_email_normalizado
+    return db.query(models.Jugador)\
+        .filter(func.lower(models.Jugador.email) == normalizar_email(email))\
+        .first()
+
+def _actualizar_hash(db: Session, jugador: models.Jugador, nuevo_hash: str) -> None:
+    """Reemplaza un hash heredado tras un login exitoso"""
+    credenciales.registrar_rehash(jugador.password)
+    # Sentencia sobre la tabla, no sobre el mapper: cambiar la contraseña no
+    # afecta las finanzas y no debe invalidar cache_finanzas
+    db.execute(
+        update(models.Jugador.__table__)
+        .where(models.Jugador.__table__.c.cedula == jugador.cedula)
+        .values(password=nuevo_hash)
+    )
+    db.commit()
+    db.refresh(jugador)
 
 def verificar_credenciales_jugador(db: Session, email: str, password: str) -> bool:
     """Verifica las credenciales de un jugador"""
     jugador = get_jugador_by_email(db, email)
     if not jugador or jugador.password is None:
         return False
-    
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    return str(jugador.password) == hashed_password
+
+    resultado = credenciales.verificar_en_pool(password, jugador.password)
+    if resultado.valida and resultado.requiere_rehash:
+        _actualizar_hash(db, jugador, credenciales.generar_hash_en_pool(password))
+    return resultado.valida
+
+async def autenticar_jugador(db: Session, email: str, password: str) -> Optional[models.Jugador]:
+    """
+    Jugador con ese correo y contraseña, o None. Si el correo no existe se verifica contra
+    un hash ficticio, para que la respuesta tarde lo mismo y no revele qué correos existen.
+    """
+    identidad = await autenticar(db, email, password, roles=(ROL_JUGADOR,))
+    if not identidad:
+        return None
+    return await run_in_threadpool(get_jugador, db, identidad.id)
 
 def actualizar_credenciales_jugador(db: Session, cedula: str, email: str, password: str) -> bool:
     """Actualiza email y contraseña de un jugador"""
@@ -171,13 +227,13 @@ def actualizar_credenciales_jugador(db: Session, cedula: str, email: str, passwo
             return False
         
         # Hash de la contraseña
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        password_hash = credenciales.generar_hash_en_pool(password)
         
         # Actualizar en la base de datos
         db.query(models.Jugador).filter(
             models.Jugador.cedula == cedula
         ).update({
-            "email": email,
+            "email": email_o_nulo(email),
             "password": password_hash
         })
         
@@ -0,0 +1,78 @@
+"""
+Jugadores morosos con correo, calculados en una sola consulta.
+
+El estado de cuenta de un jugador (services/estado_cuenta_service.py) recorre sus
+movimientos en Python; hacerlo para todo el equipo serían dos consultas por jugador.
+Aquí las mismas reglas se expresan sobre conjuntos:
+
+- Mensualidades pendientes: meses desde el de inscripción hasta el actual, menos los
+  meses distintos pagados en ese rango. Los arqueros no pagan mensualidades.
+- Multas pendientes: multas no pagadas, con su valor total.
+
+Los meses se comparan como índices año * 12 + mes, así que no depende del motor.
+Solo se incluyen jugadores activos con correo registrado.
+"""
+
+from datetime import date
+from typing import List, NamedTuple, Optional
+from sqlalchemy import case, extract, func, or_, select
+from sqlalchemy.orm import Session
+import models
+
+class Moroso(NamedTuple):
+    cedula: str
+    nombre: str
+    apellido: str
+    email: str
+    mensualidades_pendientes: int
+    multas_pendientes: int
+    valor_multas_pendientes: float
+
+def _indice_mes(año, mes):
+    return año * 12 + mes
+
+def consulta_morosos(hoy: date):
+    jugador = models.Jugador
+    mensualidad = models.Mensualidad
+    multa = models.Multa
+
+    actual = _indice_mes(hoy.year, hoy.month)
+    inscripcion = _indice_mes(extract('year', jugador.fecha_inscripcion), extract('month', jugador.fecha_inscripcion))
+    pagado = _indice_mes(mensualidad.ano, mensualidad.mes)
+
+    meses_pagados = select(func.count(func.distinct(pagado)))\
+        .where(mensualidad.jugador_cedula == jugador.cedula, pagado >= inscripcion, pagado <= actual)\
+        .scalar_subquery()
+    multa_pendiente = (multa.jugador_cedula == jugador.cedula, multa.pagada.isnot(True))
+    multas_pendientes = select(func.count(multa.id)).where(*multa_pendiente).scalar_subquery()
+    valor_multas = select(func.coalesce(func.sum(multa.valor), 0)).where(*multa_pendiente).scalar_subquery()
+
+    mensualidades_pendientes = case(
+        (func.coalesce(jugador.posicion, '') == 'arquero', 0),
+        (inscripcion > actual, 0),
+        else_=actual - inscripcion + 1 - meses_pagados
+    )
+
+    deudas = select(
+        jugador.cedula, jugador.nombre, jugador.apellido, jugador.email,
+        mensualidades_pendientes.label('mensualidades_pendientes'),
+        multas_pendientes.label('multas_pendientes'),
+        valor_multas.label('valor_multas_pendientes')
+    ).where(
+        jugador.activo == True,
+        jugador.email.isnot(None),
+        jugador.email != ''
+    ).subquery('deudas')
+
+    return select(deudas).where(
+        or_(deudas.c.mensualidades_pendientes > 0, deudas.c.multas_pendientes > 0)
+    ).order_by(deudas.c.cedula)
+
+def get_morosos(db: Session, hoy: Optional[date] = None) -> List[Moroso]:
+    """Jugadores activos con correo que deben mensualidades o multas"""
+    filas = db.execute(consulta_morosos(hoy or date.today())).all()
+    return [
+        Moroso(fila.cedula, fila.nombre, fila.apellido, fila.email, int(fila.mensualidades_pendientes),
+               int(fila.multas_pendientes), float(fila.valor_multas_pendientes))
+        for fila in filas
+    ]
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 import models
 from schemas import multas as schemas
+from services import documento_normativa  # Sus listeners versionan la normativa en cada escritura
 
 def get_multa(db: Session, multa_id: int):
     return db.query(models.Multa).filter(models.Multa.id == multa_id).first()
@@ -153,6 +154,7 @@ def crear_aporte_grupal(db: Session, aporte: schemas.AporteGrupalCreate, admin_i
         db_multa = models.Multa(
             jugador_cedula=jugador.cedula,
             causal_id=aporte.causal_id,
+            valor=causal.valor,  # Guardar el valor actual de la causal
             fecha_multa=aporte.fecha_multa,
             registrado_por=admin_id,
             es_aporte_grupal=True,
@@ -3,7 +3,7 @@ from datetime import datetime
 import models
 from schemas.pagos import PagoCombinado
 from sqlalchemy import and_
-from crud.configuraciones import get_configuracion_by_clave
+from services.configuracion_sistema import configuracion_sistema
 
 def registrar_pago_combinado(db: Session, pago: PagoCombinado):
     """
@@ -18,11 +18,7 @@ def registrar_pago_combinado(db: Session, pago: PagoCombinado):
             raise ValueError("Jugador no encontrado")
 
         # Obtener el valor de la mensualidad desde la configuración
-        config_mensualidad = get_configuracion_by_clave(db, "mensualidad")
-        if not config_mensualidad:
-            raise ValueError("No se ha configurado el valor de la mensualidad en el sistema")
-        
-        valor_mensualidad = config_mensualidad.valor  # Ya es float en la base de datos
+        valor_mensualidad = configuracion_sistema.mensualidad(db)
 
         # Registrar pagos de mensualidades
         for mensualidad in pago.mensualidades:
@@ -1,8 +1,9 @@
 from sqlalchemy import Column, ForeignKey, Integer, String, Date, DateTime, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from sqlalchemy.sql import func
 
 from ..database import Base
+from ..models import CARGA_PEREZOSA
 
 class Inscripcion(Base):
     __tablename__ = "inscripciones"
@@ -16,4 +17,5 @@ class Inscripcion(Base):
     mensaje_whatsapp = Column(Text, nullable=True)  # Para guardar el mensaje original de WhatsApp
 
     # Relaciones
-    jugador = relationship("Jugador", backref="inscripciones")
+    jugador = relationship("Jugador", lazy=CARGA_PEREZOSA,
+                           backref=backref("inscripciones", lazy=CARGA_PEREZOSA))
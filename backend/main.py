@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from database import engine
 import models
@@ -19,11 +20,30 @@ from routers.estado_cuenta import router as estado_cuenta_router
 from routers.dashboard import router as dashboard_router
 from routers.configuraciones import router as configuraciones_router
 from routers.articulos_normativa import router as articulos_normativa_router
+from routers.busqueda import router as busqueda_router
 
 # Crear todas las tablas en la base de datos
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="API Equipo de Fútbol")
+# Índice de texto completo de la normativa (GIN en PostgreSQL, FTS5 en SQLite)
+from services.indice_normativa import asegurar_indice as asegurar_indice_normativa
+asegurar_indice_normativa(engine)
+
+# Índices de texto de la búsqueda global (trigramas en PostgreSQL, FTS5 en SQLite)
+from services.indice_busqueda import asegurar_indices as asegurar_indices_busqueda
+asegurar_indices_busqueda(engine)
+
+# Enviador de la bandeja de correo en segundo plano (services/bandeja_correo.py)
+from contextlib import asynccontextmanager
+from services.bandeja_correo import bandeja_correo
+
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    bandeja_correo.iniciar()
+    yield
+    bandeja_correo.detener()
+
+app = FastAPI(title="API Equipo de Fútbol", lifespan=ciclo_de_vida)
 
 # Configurar CORS
 # Desarrollo: localhost
@@ -55,6 +75,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Instrumentación SQL por petición: Server-Timing y aviso de posibles N+1
+from services.instrumentacion_sql import instrumentar_peticion
+import services.consultas_lentas  # registra el log de consultas lentas sobre el engine
+app.middleware("http")(instrumentar_peticion)
+
+# Métricas de Prometheus: latencia por ruta, peticiones en curso, pool de BD, cachés y reportes
+from services.metricas import metricas, medir_peticion, registrar_pool
+app.middleware("http")(medir_peticion)
+registrar_pool(engine)
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN")
+
+# Perfilado bajo demanda (firma de administrador) o por muestreo; sin configuración no se registra
+from services import perfilado
+if perfilado.habilitado():
+    app.middleware("http")(perfilado.perfilar_peticion)
+
 # Incluir todos los routers
 app.include_router(auth_router, prefix="/api", tags=["autenticacion"])
 app.include_router(admin_router, prefix="/api", tags=["administradores"])
@@ -67,11 +103,19 @@ app.include_router(estado_cuenta_router, prefix="/api", tags=["estado-cuenta"])
 app.include_router(dashboard_router, prefix="/api", tags=["dashboard"])
 app.include_router(configuraciones_router, prefix="/api/configuraciones", tags=["configuraciones"])
 app.include_router(articulos_normativa_router, prefix="/api", tags=["normativa"])
+app.include_router(busqueda_router, prefix="/api", tags=["busqueda"])
 
 @app.get("/")
 def root():
     return {"message": "API del Equipo de Fútbol funcionando correctamente"}
 
+@app.get("/metrics", include_in_schema=False)
+def exponer_metricas(request: Request):
+    """Métricas del proceso en formato de texto de Prometheus"""
+    if METRICAS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICAS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,22 @@
+-- Migración: Bandeja de salida de correos
+-- Descripción: Los correos (recuperación de contraseña, recordatorios) se encolan en
+-- esta tabla y un hilo en segundo plano los envía reutilizando la conexión SMTP, con
+-- reintentos y estado de entrega (services/bandeja_correo.py).
+-- main.py la crea automáticamente con create_all.
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    destinatario VARCHAR NOT NULL,
+    asunto VARCHAR NOT NULL,
+    cuerpo_html TEXT NOT NULL,
+    tipo VARCHAR(50) NOT NULL DEFAULT 'general',
+    clave VARCHAR UNIQUE,
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    proximo_intento TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ultimo_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    enviado_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_email_outbox_estado_proximo ON email_outbox (estado, proximo_intento);
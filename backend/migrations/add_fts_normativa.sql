@@ -0,0 +1,15 @@
+-- Migración: Índice de texto completo para articulos_normativa
+-- Descripción: Búsqueda por relevancia en número, título y contenido de la normativa.
+-- Nota: main.py crea este índice automáticamente al iniciar (services/indice_normativa.py).
+
+-- PostgreSQL: índice GIN con lematización en español (PostgreSQL lo mantiene solo)
+CREATE INDEX IF NOT EXISTS idx_articulos_normativa_fts ON articulos_normativa
+USING GIN (to_tsvector('spanish', coalesce(numero_articulo, '') || ' ' || coalesce(titulo, '') || ' ' || coalesce(contenido, '')));
+
+-- SQLite: tabla virtual FTS5 (sin tildes); el CRUD la mantiene al crear/actualizar/duplicar/eliminar
+-- CREATE VIRTUAL TABLE IF NOT EXISTS articulos_normativa_fts USING fts5(
+--     numero_articulo, titulo, contenido,
+--     tokenize = 'unicode61 remove_diacritics 2'
+-- );
+-- INSERT INTO articulos_normativa_fts (rowid, numero_articulo, titulo, contenido)
+-- SELECT id, numero_articulo, titulo, contenido FROM articulos_normativa;
@@ -0,0 +1,6 @@
+-- Migración: Índice de egresos por categoría y fecha
+-- Descripción: Sirve a los totales por categoría con filtro de período y a la
+-- paginación por cursor (fecha, id) de los egresos de cada categoría
+-- (crud/egresos.py). main.py lo crea automáticamente con create_all en bases nuevas.
+
+CREATE INDEX IF NOT EXISTS ix_egresos_categoria_fecha ON egresos (categoria_id, fecha, id);
@@ -0,0 +1,41 @@
+-- Migración: Índices de texto para la búsqueda global
+-- Descripción: La búsqueda global (crud/busqueda.py) encuentra el término en cualquier
+-- parte de causales, egresos y aportes grupales, sin distinguir mayúsculas ni tildes.
+-- Reemplaza los índices por prefijo de lower(columna), que ya no se usan.
+-- Nota: main.py crea estos índices automáticamente al iniciar (services/indice_busqueda.py).
+
+DROP INDEX IF EXISTS ix_causales_multa_descripcion_prefijo;
+DROP INDEX IF EXISTS ix_multas_concepto_aporte_prefijo;
+DROP INDEX IF EXISTS ix_egresos_concepto_prefijo;
+DROP INDEX IF EXISTS ix_egresos_comprobante_prefijo;
+
+-- PostgreSQL: trigramas sobre el texto sin tildes y en minúsculas (LIKE '%término%')
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE OR REPLACE FUNCTION busqueda_normalizar(texto text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, coalesce(texto, ''))) $$;
+CREATE INDEX IF NOT EXISTS ix_causales_multa_descripcion_trgm ON causales_multa USING GIN (busqueda_normalizar(descripcion) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_egresos_concepto_trgm ON egresos USING GIN (busqueda_normalizar(concepto) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_egresos_comprobante_trgm ON egresos USING GIN (busqueda_normalizar(comprobante) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_multas_concepto_aporte_trgm ON multas USING GIN (busqueda_normalizar(concepto_aporte) gin_trgm_ops);
+
+-- SQLite: tablas FTS5 sin tildes con contenido externo, mantenidas por triggers
+-- (una por tabla; ejemplo para causales_multa, igual para egresos y multas)
+-- CREATE VIRTUAL TABLE IF NOT EXISTS causales_multa_busqueda_fts USING fts5(
+--     descripcion, content = 'causales_multa', content_rowid = 'id',
+--     tokenize = 'unicode61 remove_diacritics 2'
+-- );
+-- CREATE TRIGGER IF NOT EXISTS causales_multa_busqueda_fts_insertar AFTER INSERT ON causales_multa BEGIN
+--     INSERT INTO causales_multa_busqueda_fts (rowid, descripcion) VALUES (new.id, new.descripcion);
+-- END;
+-- CREATE TRIGGER IF NOT EXISTS causales_multa_busqueda_fts_eliminar AFTER DELETE ON causales_multa BEGIN
+--     INSERT INTO causales_multa_busqueda_fts (causales_multa_busqueda_fts, rowid, descripcion)
+--     VALUES ('delete', old.id, old.descripcion);
+-- END;
+-- CREATE TRIGGER IF NOT EXISTS causales_multa_busqueda_fts_actualizar AFTER UPDATE ON causales_multa BEGIN
+--     INSERT INTO causales_multa_busqueda_fts (causales_multa_busqueda_fts, rowid, descripcion)
+--     VALUES ('delete', old.id, old.descripcion);
+--     INSERT INTO causales_multa_busqueda_fts (rowid, descripcion) VALUES (new.id, new.descripcion);
+-- END;
+-- INSERT INTO causales_multa_busqueda_fts (causales_multa_busqueda_fts) VALUES ('rebuild');
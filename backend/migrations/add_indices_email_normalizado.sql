@@ -0,0 +1,17 @@
+-- Migración: Índices únicos por correo normalizado
+-- Descripción: El login unificado (crud/identidades.py) resuelve administradores y
+-- jugadores con una sola consulta sobre lower(email); estos índices la sirven y
+-- evitan cuentas duplicadas que solo difieren en mayúsculas.
+-- main.py los crea automáticamente con create_all en bases nuevas.
+--
+-- Los correos guardados no se reescriben (password_reset_tokens los referencia); las
+-- búsquedas comparan lower(email). Antes de aplicarla, verificar que no haya
+-- duplicados (deben devolver cero filas):
+--   SELECT lower(email), COUNT(*) FROM administradores GROUP BY lower(email) HAVING COUNT(*) > 1;
+--   SELECT lower(email), COUNT(*) FROM jugadores WHERE email IS NOT NULL GROUP BY lower(email) HAVING COUNT(*) > 1;
+
+-- Los jugadores sin correo se guardan con NULL: el índice único admite varios NULL pero un solo ''
+UPDATE jugadores SET email = NULL WHERE trim(email) = '';
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_administradores_email_normalizado ON administradores (lower(email));
+CREATE UNIQUE INDEX IF NOT EXISTS ix_jugadores_email_normalizado ON jugadores (lower(email));
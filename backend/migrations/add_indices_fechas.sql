@@ -0,0 +1,10 @@
+-- Migración: Índices de fechas de pagos, aportes y egresos
+-- Descripción: Sirven a los filtros por rango [inicio, fin) del estado de cuenta del
+-- equipo (crud/estado_cuenta.py, rango_mes). El índice ix_egresos_categoria_fecha no
+-- sirve para un rango sin categoría, por eso egresos lleva uno solo por fecha.
+-- main.py los crea automáticamente con create_all en bases nuevas.
+
+CREATE INDEX IF NOT EXISTS ix_mensualidades_fecha_pago ON mensualidades (fecha_pago);
+CREATE INDEX IF NOT EXISTS ix_multas_fecha_pago ON multas (fecha_pago);
+CREATE INDEX IF NOT EXISTS ix_otros_aportes_fecha_aporte ON otros_aportes (fecha_aporte);
+CREATE INDEX IF NOT EXISTS ix_egresos_fecha ON egresos (fecha);
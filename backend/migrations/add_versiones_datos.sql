@@ -0,0 +1,13 @@
+-- Migración: Tabla de versiones para invalidar cachés entre procesos
+-- Descripción: Cada escritura en configuraciones sube la versión de 'configuraciones';
+-- los workers la comparan periódicamente y recargan su caché si cambió
+-- (services/configuracion_sistema.py). main.py la crea automáticamente con create_all.
+
+CREATE TABLE IF NOT EXISTS versiones_datos (
+    nombre VARCHAR(100) PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO versiones_datos (nombre, version)
+SELECT 'configuraciones', 0
+WHERE NOT EXISTS (SELECT 1 FROM versiones_datos WHERE nombre = 'configuraciones');
@@ -0,0 +1,10 @@
+-- Migración: Normalizar la fecha de los egresos en SQLite
+-- Descripción: Los egresos registrados sin fecha tomaban CURRENT_TIMESTAMP de la base,
+-- que SQLite guarda como 'YYYY-MM-DD HH:MM:SS'; SQLAlchemy guarda y compara
+-- 'YYYY-MM-DD HH:MM:SS.ffffff'. Como SQLite compara esas fechas como texto, la
+-- paginación por cursor (fecha, id) y los filtros de período fallaban con esas filas.
+-- Ahora la fecha por defecto se asigna en Python (models.Egreso.fecha).
+-- PostgreSQL guarda timestamps nativos y no necesita esta migración.
+
+-- SQLite
+UPDATE egresos SET fecha = fecha || '.000000' WHERE length(fecha) = 19;
@@ -1,9 +1,20 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Date, DateTime, Float, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Date, DateTime, Float, Text
+from sqlalchemy.orm import backref, relationship
 from sqlalchemy.sql import func
+from datetime import datetime
+import os
 
 from database import Base
 
+# Política de carga de relaciones: ninguna relación se carga de forma implícita en
+# código que recorre listas. Cada consulta declara lo que necesita con opciones:
+# joinedload() para relaciones muchos-a-uno (Multa.causal, Egreso.categoria) y
+# selectinload() para colecciones (Jugador.multas, ArticuloNormativa.causales).
+# Con SQL_CARGA_PEREZOSA=raise (desarrollo y pruebas, ver tests/conftest.py) toda
+# carga perezosa que necesite SQL lanza una excepción en vez de ejecutar un N+1
+# silencioso; las que se resuelven con el identity map siguen permitidas.
+CARGA_PEREZOSA = "raise_on_sql" if os.getenv("SQL_CARGA_PEREZOSA") == "raise" else "select"
+
 class Administrador(Base):
     __tablename__ = "administradores"
 
@@ -13,6 +24,11 @@ class Administrador(Base):
     password = Column(String, nullable=False)
     rol = Column(String, nullable=False)
 
+    __table_args__ = (
+        # Login por correo sin distinguir mayúsculas (crud/identidades.py)
+        Index("ix_administradores_email_normalizado", func.lower(email), unique=True),
+    )
+
 class PasswordResetToken(Base):
     __tablename__ = "password_reset_tokens"
 
@@ -53,9 +69,15 @@ class Jugador(Base):
     
     created_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
 
-    mensualidades = relationship("Mensualidad", back_populates="jugador")
-    multas = relationship("Multa", back_populates="jugador")
-    recomendado_por = relationship("Jugador", remote_side=[cedula], backref="recomendados")
+    mensualidades = relationship("Mensualidad", back_populates="jugador", lazy=CARGA_PEREZOSA)
+    multas = relationship("Multa", back_populates="jugador", lazy=CARGA_PEREZOSA)
+    recomendado_por = relationship("Jugador", remote_side=[cedula], lazy=CARGA_PEREZOSA,
+                                   backref=backref("recomendados", lazy=CARGA_PEREZOSA))
+
+    __table_args__ = (
+        # Login por correo sin distinguir mayúsculas (crud/identidades.py); los NULL no chocan
+        Index("ix_jugadores_email_normalizado", func.lower(email), unique=True),
+    )
 
 class Mensualidad(Base):
     __tablename__ = "mensualidades"
@@ -65,10 +87,11 @@ class Mensualidad(Base):
     mes = Column(Integer, nullable=False)
     ano = Column(Integer, nullable=False)
     valor = Column(Float, nullable=False)
-    fecha_pago = Column(DateTime, nullable=False, server_default=func.current_timestamp())
+    # Indexadas: filtros por rango de fechas del estado de cuenta (crud.rango_mes)
+    fecha_pago = Column(DateTime, nullable=False, server_default=func.current_timestamp(), index=True)
     registrado_por = Column(Integer, ForeignKey("administradores.id"))
 
-    jugador = relationship("Jugador", back_populates="mensualidades")
+    jugador = relationship("Jugador", back_populates="mensualidades", lazy=CARGA_PEREZOSA)
 
 class CausalMulta(Base):
     __tablename__ = "causales_multa"
@@ -78,8 +101,8 @@ class CausalMulta(Base):
     valor = Column(Float, nullable=False)
     articulo_id = Column(Integer, ForeignKey("articulos_normativa.id"), nullable=True, comment="Referencia al artículo de normativa que respalda esta causal")
 
-    multas = relationship("Multa", back_populates="causal")
-    articulo = relationship("ArticuloNormativa", back_populates="causales")
+    multas = relationship("Multa", back_populates="causal", lazy=CARGA_PEREZOSA)
+    articulo = relationship("ArticuloNormativa", back_populates="causales", lazy=CARGA_PEREZOSA)
 
 class ArticuloNormativa(Base):
     __tablename__ = "articulos_normativa"
@@ -95,7 +118,7 @@ class ArticuloNormativa(Base):
     created_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
     updated_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
 
-    causales = relationship("CausalMulta", back_populates="articulo")
+    causales = relationship("CausalMulta", back_populates="articulo", lazy=CARGA_PEREZOSA)
 
 class Multa(Base):
     __tablename__ = "multas"
@@ -106,15 +129,15 @@ class Multa(Base):
     valor = Column(Float, nullable=False, comment="Valor de la multa al momento de creación")
     fecha_multa = Column(Date, nullable=False, server_default=func.current_date())
     pagada = Column(Boolean, default=False)
-    fecha_pago = Column(DateTime)
+    fecha_pago = Column(DateTime, index=True)
     registrado_por = Column(Integer, ForeignKey("administradores.id"))
     # Campos para multas grupales/aportes
     es_aporte_grupal = Column(Boolean, default=False, comment="Indica si es un aporte que se asigna a todo el equipo")
     grupo_multa_id = Column(String, nullable=True, comment="ID único para agrupar multas del mismo aporte grupal")
     concepto_aporte = Column(String, nullable=True, comment="Descripción específica del aporte grupal")
 
-    jugador = relationship("Jugador", back_populates="multas")
-    causal = relationship("CausalMulta", back_populates="multas")
+    jugador = relationship("Jugador", back_populates="multas", lazy=CARGA_PEREZOSA)
+    causal = relationship("CausalMulta", back_populates="multas", lazy=CARGA_PEREZOSA)
 
 class CategoriaEgreso(Base):
     __tablename__ = "categorias_egreso"
@@ -123,7 +146,7 @@ class CategoriaEgreso(Base):
     nombre = Column(String, nullable=False, unique=True)  # "Equipamiento", "Implementos", "Aportes Sociales", etc.
     descripcion = Column(Text, nullable=True)
 
-    egresos = relationship("Egreso", back_populates="categoria")
+    egresos = relationship("Egreso", back_populates="categoria", lazy=CARGA_PEREZOSA)
 
 class Egreso(Base):
     __tablename__ = "egresos"
@@ -132,12 +155,21 @@ class Egreso(Base):
     categoria_id = Column(Integer, ForeignKey("categorias_egreso.id"), nullable=False)
     concepto = Column(String, nullable=False)  # Descripción específica del gasto
     valor = Column(Float, nullable=False)
-    fecha = Column(DateTime, nullable=False, default=func.current_timestamp())
+    # Default en Python: en SQLite CURRENT_TIMESTAMP guarda 'YYYY-MM-DD HH:MM:SS' sin microsegundos
+    # y no se compara bien como texto con las fechas que envía SQLAlchemy (cursor de paginación)
+    fecha = Column(DateTime, nullable=False, default=datetime.now)
     comprobante = Column(String, nullable=True)  # Número de factura o recibo
     notas = Column(Text, nullable=True)
     registrado_por = Column(Integer, ForeignKey("administradores.id"))
 
-    categoria = relationship("CategoriaEgreso", back_populates="egresos")
+    categoria = relationship("CategoriaEgreso", back_populates="egresos", lazy=CARGA_PEREZOSA)
+
+    __table_args__ = (
+        # Totales por categoría y paginación por cursor (fecha, id) dentro de cada categoría
+        Index("ix_egresos_categoria_fecha", "categoria_id", "fecha", "id"),
+        # Totales de todas las categorías en un período (estado de cuenta del equipo)
+        Index("ix_egresos_fecha", "fecha"),
+    )
 
 class OtroAporte(Base):
     __tablename__ = "otros_aportes"
@@ -146,10 +178,11 @@ class OtroAporte(Base):
     jugador_cedula = Column(String, ForeignKey("jugadores.cedula"))
     concepto = Column(String, nullable=False)  # Nombre/descripción del aporte
     valor = Column(Float, nullable=False)
-    fecha_aporte = Column(DateTime, nullable=False, server_default=func.current_timestamp())
+    fecha_aporte = Column(DateTime, nullable=False, server_default=func.current_timestamp(), index=True)
     registrado_por = Column(Integer, ForeignKey("administradores.id"))
 
-    jugador = relationship("Jugador", backref="otros_aportes")
+    jugador = relationship("Jugador", lazy=CARGA_PEREZOSA,
+                           backref=backref("otros_aportes", lazy=CARGA_PEREZOSA))
 
 class Configuracion(Base):
     __tablename__ = "configuraciones"
@@ -161,4 +194,32 @@ class Configuracion(Base):
     actualizado_en = Column(DateTime, server_default=func.current_timestamp())
     actualizado_por = Column(Integer, ForeignKey("administradores.id"))
 
+class VersionDatos(Base):
+    """Contador de cambios por conjunto de datos, para invalidar cachés entre procesos"""
+    __tablename__ = "versiones_datos"
+
+    nombre = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class CorreoSaliente(Base):
+    """Bandeja de salida: los correos se encolan aquí y los envía services/bandeja_correo.py"""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    destinatario = Column(String, nullable=False)
+    asunto = Column(String, nullable=False)
+    cuerpo_html = Column(Text, nullable=False)
+    tipo = Column(String(50), nullable=False, default="general", comment="recuperacion, recordatorio, ...")
+    clave = Column(String, unique=True, nullable=True, comment="Clave de idempotencia: el mismo correo no se encola dos veces")
+    estado = Column(String(20), nullable=False, default="pendiente", comment="pendiente, enviando, enviado o fallido")
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime, nullable=False, server_default=func.current_timestamp(),
+                             comment="Cuándo puede tomarlo el enviador (reintentos y reserva de lotes en curso)")
+    ultimo_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
+    enviado_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # El enviador busca los pendientes vencidos en orden
+        Index("ix_email_outbox_estado_proximo", "estado", "proximo_intento"),
+    )
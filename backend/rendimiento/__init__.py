@@ -0,0 +1,8 @@
+"""
+Herramientas de rendimiento: datos sintéticos, benchmarks de endpoints y pruebas de carga
+"""
+
+# Presets de escala: número de jugadores del conjunto sintético.
+# Vive aquí (sin importar modelos ni base de datos) para que las herramientas puedan
+# fijar DATABASE_URL antes de que se importe database.py.
+PRESETS = {"100": 100, "1k": 1_000, "10k": 10_000, "100k": 100_000}
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark de endpoints con umbrales de regresión.
+
+Ejecuta la aplicación completa en proceso (TestClient) sobre un conjunto de datos
+sintético (rendimiento/generador_datos.py) y mide por endpoint:
+- latencia: mediana de varias repeticiones, después de una llamada de calentamiento
+- consultas SQL: encabezado X-DB-Consultas del middleware de instrumentación
+- memoria pico: tracemalloc durante una llamada adicional (no cronometrada)
+
+Los resultados se comparan con la línea base guardada en rendimiento/baselines/<preset>.json
+y el proceso termina con error si alguno empeora más allá de la tolerancia.
+
+Uso:
+    python -m rendimiento.benchmark_endpoints --preset 1k
+    python -m rendimiento.benchmark_endpoints --preset 1k --actualizar-baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date
+from typing import Dict, List, Optional
+
+from rendimiento import PRESETS
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_DATOS = os.path.join(DIRECTORIO, "datos")
+DIRECTORIO_BASELINES = os.path.join(DIRECTORIO, "baselines")
+SEMILLA = 42
+CEDULA_EJEMPLO = "10000000"  # primer jugador del generador
+
+# (nombre, ruta) de los endpoints medidos
+ENDPOINTS = [
+    ("dashboard_resumen", "/api/dashboard/resumen"),
+    ("estado_pagos_por_mes", "/api/dashboard/estado-pagos-por-mes"),
+    ("ranking_multas", "/api/dashboard/ranking-multas"),
+    ("estado_cuenta_equipo", "/api/estado-cuenta-equipo/"),
+    ("jugador_estado_cuenta", f"/api/jugadores/{CEDULA_EJEMPLO}/estado-cuenta"),
+    ("pagos", "/api/pagos/"),
+    ("pdf_listado_basico", "/api/jugadores/export/listado-basico/pdf"),
+    ("pdf_listado_completo", "/api/jugadores/export/listado-completo/pdf"),
+    ("pdf_pagos_mensuales", "/api/jugadores/export/pagos-mensuales/pdf"),
+    ("pdf_reporte_ejecutivo", "/api/dashboard/reporte-ejecutivo/pdf"),
+]
+
+# Tolerancias por defecto: la latencia es ruidosa, las consultas son deterministas
+TOLERANCIA_LATENCIA = 0.5       # +50 %
+HOLGURA_LATENCIA_MS = 10.0      # además, diferencias menores a 10 ms no cuentan
+TOLERANCIA_CONSULTAS = 0        # ni una consulta más
+TOLERANCIA_MEMORIA = 0.3        # +30 %
+
+def ruta_base_datos(preset: str) -> str:
+    # El mes va en el nombre: los datos terminan "hoy" y el dashboard depende del mes actual
+    return os.path.join(DIRECTORIO_DATOS, f"benchmark_{preset}_{date.today():%Y%m}.db")
+
+def url_base_datos(preset: str) -> str:
+    return f"sqlite:///{ruta_base_datos(preset)}"
+
+def preparar_datos(preset: str) -> str:
+    """Retorna la URL de la base sintética del preset, generándola si no existe"""
+    from sqlalchemy import create_engine
+    from rendimiento.generador_datos import generar_dataset
+
+    ruta = ruta_base_datos(preset)
+    url = url_base_datos(preset)
+    if not os.path.exists(ruta):
+        os.makedirs(DIRECTORIO_DATOS, exist_ok=True)
+        print(f"🏗️ Generando datos del preset {preset} en {ruta}")
+        generar_dataset(create_engine(url), PRESETS[preset], semilla=SEMILLA)
+    return url
+
+def crear_cliente(url: str):
+    """
+    TestClient de la aplicación completa apuntando a la base sintética.
+
+    main.py crea tablas e índices en la base de `database.py` al importarse; para que no
+    toque la base de desarrollo, main() fija DATABASE_URL antes de cualquier import de
+    modelos. En cualquier caso get_db se sobreescribe con una sesión de la base sintética.
+    """
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import main
+    from database import get_db
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db_benchmark():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = get_db_benchmark
+    return TestClient(main.app)
+
+def medir_endpoint(cliente, ruta: str, repeticiones: int = 5) -> Dict[str, float]:
+    respuesta = cliente.get(ruta)  # calentamiento (cachés, compilación de consultas)
+    if respuesta.status_code != 200:
+        raise RuntimeError(f"{ruta} respondió {respuesta.status_code}: {respuesta.text[:200]}")
+
+    latencias = []
+    consultas = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        respuesta = cliente.get(ruta)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        consultas = int(respuesta.headers.get("X-DB-Consultas", 0))
+
+    tracemalloc.start()
+    try:
+        cliente.get(ruta)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "latencia_ms": round(statistics.median(latencias), 2),
+        "latencia_min_ms": round(min(latencias), 2),
+        "consultas": consultas,
+        "memoria_pico_kb": round(pico / 1024, 1),
+    }
+
+def ejecutar_benchmark(preset: str, repeticiones: int = 5, solo: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    cliente = crear_cliente(preparar_datos(preset))
+    resultados = {}
+    for nombre, ruta in ENDPOINTS:
+        if solo and nombre not in solo:
+            continue
+        resultados[nombre] = medir_endpoint(cliente, ruta, repeticiones)
+        r = resultados[nombre]
+        print(f"   {nombre:<24} {r['latencia_ms']:>9.1f} ms {r['consultas']:>6} consultas {r['memoria_pico_kb']:>10.1f} KB")
+    return resultados
+
+def ruta_baseline(preset: str) -> str:
+    return os.path.join(DIRECTORIO_BASELINES, f"{preset}.json")
+
+def cargar_baseline(preset: str) -> Dict[str, Dict[str, float]]:
+    ruta = ruta_baseline(preset)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)["endpoints"]
+
+def guardar_baseline(preset: str, resultados: Dict[str, Dict[str, float]]) -> None:
+    os.makedirs(DIRECTORIO_BASELINES, exist_ok=True)
+    endpoints = {**cargar_baseline(preset), **resultados}
+    with open(ruta_baseline(preset), "w", encoding="utf-8") as f:
+        json.dump({"preset": preset, "jugadores": PRESETS[preset], "endpoints": endpoints}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+def comparar(resultados: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+             tolerancia_latencia: float = TOLERANCIA_LATENCIA, verificar_latencia: bool = True) -> List[str]:
+    """Retorna la lista de regresiones respecto a la línea base"""
+    regresiones = []
+    for nombre, actual in resultados.items():
+        base = baseline.get(nombre)
+        if not base:
+            continue
+        if actual["consultas"] > base["consultas"] + TOLERANCIA_CONSULTAS:
+            regresiones.append(f"{nombre}: {actual['consultas']} consultas (línea base {base['consultas']})")
+        if verificar_latencia:
+            limite = max(base["latencia_ms"] * (1 + tolerancia_latencia), base["latencia_ms"] + HOLGURA_LATENCIA_MS)
+            if actual["latencia_ms"] > limite:
+                regresiones.append(f"{nombre}: {actual['latencia_ms']} ms (línea base {base['latencia_ms']} ms)")
+            limite_memoria = base["memoria_pico_kb"] * (1 + TOLERANCIA_MEMORIA)
+            if actual["memoria_pico_kb"] > limite_memoria:
+                regresiones.append(f"{nombre}: {actual['memoria_pico_kb']} KB pico (línea base {base['memoria_pico_kb']} KB)")
+    return regresiones
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de endpoints contra datos sintéticos")
+    parser.add_argument("--preset", choices=sorted(PRESETS, key=PRESETS.get), default="1k")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--solo", nargs="*", help="Nombres de endpoints a medir")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_LATENCIA, help="Tolerancia de latencia (0.5 = +50 %%)")
+    parser.add_argument("--actualizar-baseline", action="store_true", help="Guarda los resultados como nueva línea base")
+    parser.add_argument("--solo-consultas", action="store_true",
+                        help="Compara solo el número de consultas (determinista, útil en CI)")
+    args = parser.parse_args(argumentos)
+    if "database" not in sys.modules:
+        os.environ["DATABASE_URL"] = url_base_datos(args.preset)
+    # Los avisos de N+1 y de peticiones lentas del middleware ensucian la salida del benchmark
+    os.environ.setdefault("SQL_N_MAS_1_UMBRAL", "1000000")
+    os.environ.setdefault("SQL_PETICION_LENTA_MS", "1000000000")
+    # Las repeticiones de cada PDF superarían el límite por IP de services/limites.py
+    os.environ.setdefault("LIMITES_HABILITADO", "0")
+
+    print(f"⏱️ Benchmark de endpoints - preset {args.preset} ({PRESETS[args.preset]:,} jugadores)")
+    resultados = ejecutar_benchmark(args.preset, args.repeticiones, args.solo)
+
+    if args.actualizar_baseline:
+        guardar_baseline(args.preset, resultados)
+        print(f"💾 Línea base actualizada: {ruta_baseline(args.preset)}")
+        return 0
+
+    baseline = cargar_baseline(args.preset)
+    if not baseline:
+        print("⚠️ No hay línea base para este preset; use --actualizar-baseline para crearla")
+        return 0
+    regresiones = comparar(resultados, baseline, args.tolerancia, verificar_latencia=not args.solo_consultas)
+    for regresion in regresiones:
+        print(f"❌ {regresion}")
+    if regresiones:
+        return 1
+    print("✅ Sin regresiones respecto a la línea base")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Pruebas de carga con escenarios de día de partido.
+
+Un día de partido tiene una forma particular: muchos jugadores inician sesión y
+consultan su estado de cuenta al mismo tiempo, mientras los administradores
+registran pagos y aportes grupales y el dashboard se refresca periódicamente.
+Este módulo simula ese tráfico con usuarios virtuales asíncronos (httpx) contra
+un uvicorn local y reporta throughput y latencias p50/p95/p99 por endpoint.
+
+Todo corre sin conexión: con --iniciar-servidor se levanta uvicorn sobre una copia
+de la base sintética del preset (los pagos de la prueba no ensucian la original);
+--en-proceso ejecuta la aplicación en este mismo proceso (ASGI, sin red ni uvicorn).
+
+El escenario "login" mide solo la avalancha de inicios de sesión de antes del partido
+(cada login verifica un hash bcrypt). El reporte incluye el retraso del bucle de
+eventos: con --en-proceso la aplicación comparte el bucle, así que un retraso alto
+indica trabajo de CPU que lo bloquea.
+
+Uso:
+    python -m rendimiento.carga --iniciar-servidor --preset 1k --duracion 60 --jugadores 50 --admins 3
+    python -m rendimiento.carga --en-proceso --preset 100 --duracion 20
+    python -m rendimiento.carga --en-proceso --preset 100 --escenario login --jugadores 30 --pausa 0
+    python -m rendimiento.carga --url http://127.0.0.1:8000 --duracion 30
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from rendimiento import PRESETS
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+CEDULA_BASE = 10_000_000  # cédulas del generador: 10000000, 10000001, ...
+ADMIN_ID = 1
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (valores ya ordenados)"""
+    if not valores:
+        return 0.0
+    posicion = max(math.ceil(p / 100 * len(valores)) - 1, 0)
+    return valores[posicion]
+
+class Resultados:
+    """Latencias y estados por endpoint"""
+
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.errores: Dict[str, int] = defaultdict(int)
+        self.inicio = time.perf_counter()
+        self.fin: Optional[float] = None
+
+    def registrar(self, endpoint: str, latencia_ms: float, exitoso: bool) -> None:
+        self.latencias[endpoint].append(latencia_ms)
+        if not exitoso:
+            self.errores[endpoint] += 1
+
+    def resumen(self) -> Dict[str, Dict[str, float]]:
+        duracion = (self.fin or time.perf_counter()) - self.inicio
+        resumen = {}
+        for endpoint, latencias in sorted(self.latencias.items()):
+            ordenadas = sorted(latencias)
+            resumen[endpoint] = {
+                "peticiones": len(ordenadas),
+                "errores": self.errores.get(endpoint, 0),
+                "rps": round(len(ordenadas) / duracion, 2) if duracion else 0.0,
+                "p50_ms": round(percentil(ordenadas, 50), 1),
+                "p95_ms": round(percentil(ordenadas, 95), 1),
+                "p99_ms": round(percentil(ordenadas, 99), 1),
+                "max_ms": round(ordenadas[-1], 1),
+            }
+        return resumen
+
+async def medir(cliente: httpx.AsyncClient, resultados: Resultados, endpoint: str,
+                metodo: str, ruta: str, **kwargs) -> Optional[httpx.Response]:
+    """Ejecuta una petición y registra su latencia bajo el nombre lógico `endpoint`"""
+    inicio = time.perf_counter()
+    try:
+        respuesta = await cliente.request(metodo, ruta, **kwargs)
+        exitoso = respuesta.status_code < 400
+    except httpx.HTTPError:
+        respuesta, exitoso = None, False
+    resultados.registrar(endpoint, (time.perf_counter() - inicio) * 1000, exitoso)
+    return respuesta
+
+# Acciones: corrutinas (cliente, resultados, contexto) que ejecutan una o más peticiones
+Accion = Callable[[httpx.AsyncClient, Resultados, dict], Awaitable[None]]
+
+async def login_jugador(cliente, resultados, contexto):
+    cedula = contexto["cedula"]
+    indice = int(cedula) - CEDULA_BASE
+    await medir(cliente, resultados, "POST /auth/login", "POST", "/api/auth/login",
+                json={"email": f"jugador{indice}@equipo.com", "password": cedula})
+
+async def estado_cuenta_propio(cliente, resultados, contexto):
+    await medir(cliente, resultados, "GET /jugadores/{cedula}/estado-cuenta", "GET",
+                f"/api/jugadores/{contexto['cedula']}/estado-cuenta")
+
+async def pago_combinado(cliente, resultados, contexto):
+    # Cada pago es de un mes futuro distinto para no chocar con meses ya pagados
+    cedula = str(CEDULA_BASE + contexto["random"].randrange(contexto["total_jugadores"]))
+    ano, mes = contexto["proximo_mes"].get(cedula, (date.today().year + 1, 1))
+    contexto["proximo_mes"][cedula] = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+    await medir(cliente, resultados, "POST /pagos/combinado", "POST", "/api/pagos/combinado/", json={
+        "jugador_cedula": cedula,
+        "mensualidades": [{"mes": mes, "ano": ano}],
+        "multas": [],
+        "registrado_por": ADMIN_ID,
+    })
+
+async def aporte_grupal(cliente, resultados, contexto):
+    if not contexto.get("causal_id"):
+        return
+    await medir(cliente, resultados, "POST /aportes-grupales", "POST", "/api/aportes-grupales/", json={
+        "causal_id": contexto["causal_id"],
+        "concepto_aporte": f"Prueba de carga {contexto['random'].randint(1, 10**6)}",
+    })
+
+async def dashboard(cliente, resultados, contexto):
+    await medir(cliente, resultados, "GET /dashboard/resumen", "GET", "/api/dashboard/resumen")
+    await medir(cliente, resultados, "GET /dashboard/ranking-multas", "GET", "/api/dashboard/ranking-multas")
+
+# Escenarios por rol: [(acción, peso)]
+ESCENARIOS: Dict[str, List[Tuple[Accion, int]]] = {
+    "jugador": [(estado_cuenta_propio, 8), (login_jugador, 2)],
+    "admin": [(pago_combinado, 6), (dashboard, 3), (aporte_grupal, 1)],
+    "dashboard": [(dashboard, 1)],
+    "login": [(login_jugador, 1)],
+}
+
+# Escenarios de la prueba de carga (--escenario)
+ESCENARIOS_CARGA = ("partido", "login")
+RETRASO_BUCLE = "retraso bucle de eventos"
+
+async def monitor_bucle(resultados: Resultados, fin: float, intervalo_s: float = 0.01) -> None:
+    """Registra cuánto se atrasa el bucle de eventos respecto a un temporizador fijo"""
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        await asyncio.sleep(intervalo_s)
+        resultados.registrar(RETRASO_BUCLE, max(time.perf_counter() - inicio - intervalo_s, 0) * 1000, True)
+
+async def usuario_virtual(cliente, resultados, rol: str, contexto: dict, fin: float, pausa_s: float) -> None:
+    acciones, pesos = zip(*ESCENARIOS[rol])
+    aleatorio = contexto["random"]
+    if rol == "jugador":
+        await login_jugador(cliente, resultados, contexto)
+    while time.perf_counter() < fin:
+        accion = aleatorio.choices(acciones, weights=pesos)[0]
+        await accion(cliente, resultados, contexto)
+        # Tiempo de "pensar" con variación, para no sincronizar a todos los usuarios
+        await asyncio.sleep(pausa_s * aleatorio.uniform(0.5, 1.5))
+
+async def ejecutar_carga(
+    url: str,
+    duracion_s: float = 30,
+    jugadores: int = 50,
+    admins: int = 3,
+    paneles: int = 2,
+    pausa_s: float = 1.0,
+    total_jugadores: int = 1000,
+    semilla: int = 42,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    escenario: str = "partido",
+) -> Resultados:
+    """Lanza los usuarios virtuales durante `duracion_s` y retorna los resultados"""
+    if escenario == "login":
+        roles = (("login", jugadores),)
+    else:
+        roles = (("jugador", jugadores), ("admin", admins), ("dashboard", paneles))
+    limites = httpx.Limits(max_connections=jugadores + admins + paneles)
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limites, transport=transport) as cliente:
+        causal_id = None
+        try:
+            causales = (await cliente.get("/api/multas/causales/")).json()
+            causal_id = causales[-1]["id"] if causales else None
+        except (httpx.HTTPError, ValueError, KeyError):
+            pass
+
+        aleatorio = random.Random(semilla)
+        proximo_mes: Dict[str, tuple] = {}
+        resultados = Resultados()
+        fin = time.perf_counter() + duracion_s
+        tareas = [monitor_bucle(resultados, fin)]
+        for rol, cantidad in roles:
+            for _ in range(cantidad):
+                contexto = {
+                    "cedula": str(CEDULA_BASE + aleatorio.randrange(total_jugadores)),
+                    "random": random.Random(aleatorio.random()),
+                    "total_jugadores": total_jugadores,
+                    "proximo_mes": proximo_mes,
+                    "causal_id": causal_id,
+                }
+                tareas.append(usuario_virtual(cliente, resultados, rol, contexto, fin, pausa_s))
+        await asyncio.gather(*tareas)
+        resultados.fin = time.perf_counter()
+    return resultados
+
+def imprimir_reporte(resumen: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'Endpoint':<42} {'Pet.':>6} {'Err.':>5} {'RPS':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for endpoint, datos in resumen.items():
+        print(f"{endpoint:<42} {datos['peticiones']:>6} {datos['errores']:>5} {datos['rps']:>7.1f} "
+              f"{datos['p50_ms']:>8.1f} {datos['p95_ms']:>8.1f} {datos['p99_ms']:>8.1f} {datos['max_ms']:>8.1f}")
+
+def ruta_copia_datos(preset: str) -> str:
+    return os.path.join(DIRECTORIO, "datos", f"carga_{preset}.db")
+
+def copiar_datos(preset: str) -> str:
+    """URL de una copia nueva de la base sintética del preset (la prueba escribe pagos y multas)"""
+    from rendimiento.benchmark_endpoints import preparar_datos, ruta_base_datos
+
+    preparar_datos(preset)
+    copia = ruta_copia_datos(preset)
+    shutil.copyfile(ruta_base_datos(preset), copia)
+    return f"sqlite:///{copia}"
+
+def iniciar_servidor(url_datos: str, puerto: int, workers: int = 1) -> subprocess.Popen:
+    """Levanta uvicorn local sobre la base indicada y espera a que responda"""
+    # Todos los usuarios simulados salen de la misma IP: sin límites de tasa (services/limites.py)
+    entorno = dict(os.environ, DATABASE_URL=url_datos, SQL_N_MAS_1_UMBRAL="1000000", LIMITES_HABILITADO="0")
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(puerto),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=os.path.dirname(DIRECTORIO), env=entorno
+    )
+    url = f"http://127.0.0.1:{puerto}"
+    for _ in range(100):
+        if proceso.poll() is not None:
+            raise RuntimeError(f"uvicorn terminó con código {proceso.returncode}")
+        try:
+            if httpx.get(f"{url}/", timeout=1).status_code == 200:
+                return proceso
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga de día de partido")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL del servidor (si no se inicia uno)")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--iniciar-servidor", action="store_true", help="Levanta uvicorn local sobre datos sintéticos")
+    modo.add_argument("--en-proceso", action="store_true", help="Ejecuta la aplicación en este proceso sobre datos sintéticos")
+    parser.add_argument("--preset", choices=sorted(PRESETS, key=PRESETS.get), default="1k")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn al iniciar el servidor")
+    parser.add_argument("--duracion", type=float, default=30, help="Segundos de carga")
+    parser.add_argument("--jugadores", type=int, default=50, help="Jugadores concurrentes consultando su estado de cuenta")
+    parser.add_argument("--admins", type=int, default=3, help="Administradores registrando pagos y aportes")
+    parser.add_argument("--paneles", type=int, default=2, help="Dashboards abiertos refrescándose")
+    parser.add_argument("--pausa", type=float, default=1.0, help="Pausa media entre acciones de cada usuario (s)")
+    parser.add_argument("--escenario", choices=ESCENARIOS_CARGA, default="partido",
+                        help="partido: tráfico mixto; login: solo inicios de sesión de jugadores")
+    parser.add_argument("--json", help="Guarda el resumen en este archivo")
+    args = parser.parse_args(argumentos)
+
+    proceso = None
+    transport = None
+    url = args.url
+    if (args.iniciar_servidor or args.en_proceso) and "database" not in sys.modules:
+        # Como en el benchmark: generar los datos importa los modelos, y con ellos database.py;
+        # DATABASE_URL debe apuntar a la copia antes para no tocar la base de desarrollo
+        os.environ["DATABASE_URL"] = f"sqlite:///{ruta_copia_datos(args.preset)}"
+    if args.iniciar_servidor:
+        proceso = iniciar_servidor(copiar_datos(args.preset), args.puerto, args.workers)
+        url = f"http://127.0.0.1:{args.puerto}"
+    elif args.en_proceso:
+        copiar_datos(args.preset)
+        os.environ.setdefault("SQL_N_MAS_1_UMBRAL", "1000000")
+        os.environ.setdefault("SQL_PETICION_LENTA_MS", "1000000000")
+        os.environ.setdefault("LIMITES_HABILITADO", "0")
+        import main as aplicacion
+        transport = httpx.ASGITransport(app=aplicacion.app, raise_app_exceptions=False)
+        url = "http://en-proceso"
+    try:
+        if args.escenario == "login":
+            print(f"🔐 Avalancha de logins: {args.jugadores} jugadores durante {args.duracion:.0f} s contra {url}")
+        else:
+            print(f"🏟️ Día de partido: {args.jugadores} jugadores, {args.admins} admins, "
+                  f"{args.paneles} paneles durante {args.duracion:.0f} s contra {url}")
+        resultados = asyncio.run(ejecutar_carga(
+            url, args.duracion, args.jugadores, args.admins, args.paneles, args.pausa,
+            total_jugadores=PRESETS[args.preset], transport=transport, escenario=args.escenario
+        ))
+    finally:
+        if proceso:
+            proceso.terminate()
+            proceso.wait(timeout=10)
+
+    resumen = resultados.resumen()
+    imprimir_reporte(resumen)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resumen, f, indent=2, ensure_ascii=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
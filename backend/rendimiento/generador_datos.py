@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos para pruebas de carga y escala.
+
+Construye un conjunto de datos realista y reproducible (misma semilla = mismos datos):
+jugadores inscritos a lo largo de varios años, mensualidades con meses sin pagar,
+multas sobre las causales de la normativa, aportes grupales, egresos por categoría
+y otros aportes. Inserta por lotes con sentencias INSERT de SQLAlchemy Core, así que
+funciona igual en SQLite y en PostgreSQL.
+
+Uso:
+    python -m rendimiento.generador_datos --preset 1k --url sqlite:///./datos_1k.db
+    python -m rendimiento.generador_datos --jugadores 2500 --anos 2 --semilla 7 --limpiar
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Engine
+
+import models
+from rendimiento import PRESETS
+
+VALOR_MENSUALIDAD = 20000
+TAMANO_LOTE = 5000
+ADMIN_EMAIL = "admin@equipo.com"
+ADMIN_PASSWORD = "admin123"
+
+NOMBRES = ["Andrés", "Juan", "Carlos", "Santiago", "Felipe", "Mateo", "Sebastián", "Daniel", "Camilo", "Julián",
+           "David", "Alejandro", "Nicolás", "Diego", "Miguel", "Óscar", "Jorge", "Luis", "Esteban", "Simón"]
+APELLIDOS = ["Gómez", "Rodríguez", "Martínez", "López", "García", "Pérez", "Sánchez", "Ramírez", "Torres", "Díaz",
+             "Vargas", "Moreno", "Jiménez", "Muñoz", "Rojas", "Castro", "Ortiz", "Núñez", "Herrera", "Cárdenas"]
+TALLAS = ["S", "M", "M", "L", "L", "XL"]
+
+NORMATIVA = [
+    ("1.1", "Puntualidad en partidos", "Todo jugador debe presentarse 30 minutos antes del partido.", [("Llegar tarde al partido", 5000)]),
+    ("1.2", "Asistencia a entrenamientos", "La asistencia a los entrenamientos es obligatoria.", [("Inasistencia injustificada a entrenamiento", 3000)]),
+    ("2.1", "Uniforme", "El jugador debe usar el uniforme completo en cada partido.", [("Uniforme incompleto", 4000), ("No traer petos", 2000)]),
+    ("3.1", "Conducta", "Se exige respeto a compañeros, rivales y árbitros.", [("Tarjeta amarilla por reclamo", 5000), ("Tarjeta roja", 15000)]),
+    ("4.1", "Compromiso", "Los jugadores convocados deben confirmar su asistencia.", [("No confirmar convocatoria", 2000)]),
+]
+CATEGORIAS_EGRESO = {
+    "Arbitraje": (60000, 120000),
+    "Cancha": (150000, 300000),
+    "Implementos": (30000, 250000),
+    "Hidratación": (20000, 60000),
+    "Aportes Sociales": (50000, 200000),
+}
+CONCEPTOS_APORTE = ["Inscripción torneo", "Uniformes nuevos", "Balones", "Integración fin de año", "Arbitraje final"]
+CONCEPTOS_OTRO_APORTE = ["Donación", "Rifa", "Venta de camisetas", "Patrocinio"]
+
+def _meses(desde: date, hasta: date) -> Iterable[tuple]:
+    ano, mes = desde.year, desde.month
+    while (ano, mes) <= (hasta.year, hasta.month):
+        yield ano, mes
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+def _insertar(conn, tabla, filas: List[dict], tamano_lote: int) -> int:
+    for inicio in range(0, len(filas), tamano_lote):
+        conn.execute(tabla.insert(), filas[inicio:inicio + tamano_lote])
+    return len(filas)
+
+class GeneradorDatos:
+    """Genera e inserta un conjunto de datos sintético reproducible"""
+
+    def __init__(self, jugadores: int, anos: int = 3, semilla: int = 42, hasta: Optional[date] = None,
+                 tamano_lote: int = TAMANO_LOTE):
+        self.total_jugadores = jugadores
+        self.anos = anos
+        self.hasta = hasta or date.today()
+        self.desde = date(self.hasta.year - anos, self.hasta.month, 1)
+        self.tamano_lote = tamano_lote
+        self.random = random.Random(semilla)
+
+    def _fecha_entre(self, desde: date, hasta: date) -> date:
+        return desde + timedelta(days=self.random.randint(0, max((hasta - desde).days, 0)))
+
+    def _jugadores(self) -> List[dict]:
+        filas = []
+        for i in range(self.total_jugadores):
+            nombre = self.random.choice(NOMBRES)
+            apellido = f"{self.random.choice(APELLIDOS)} {self.random.choice(APELLIDOS)}"
+            cedula = str(10_000_000 + i)
+            # La mitad de la plantilla viene desde el inicio; el resto se inscribe a lo largo de los años
+            inscripcion = self.desde if self.random.random() < 0.5 else self._fecha_entre(self.desde, self.hasta)
+            filas.append({
+                "cedula": cedula,
+                "nombre": nombre,
+                "apellido": apellido,
+                "nombre_inscripcion": f"{nombre} {apellido.split()[0]} {i}",
+                "telefono": str(3_000_000_000 + i),
+                "fecha_nacimiento": date(self.random.randint(1975, 2006), self.random.randint(1, 12), self.random.randint(1, 28)),
+                "talla_uniforme": self.random.choice(TALLAS),
+                "numero_camiseta": i + 1 if i < 99 else None,
+                "contacto_emergencia_nombre": self.random.choice(NOMBRES),
+                "contacto_emergencia_telefono": str(3_100_000_000 + i),
+                "fecha_inscripcion": inscripcion,
+                "posicion": "arquero" if self.random.random() < 0.08 else None,
+                "estado_cuenta": True,
+                "activo": self.random.random() < 0.9,
+                "email": f"jugador{i}@equipo.com",
+                # SHA-256 heredado (rápido de generar); el primer login lo migra a bcrypt
+                "password": hashlib.sha256(cedula.encode()).hexdigest(),
+                "created_at": datetime.combine(inscripcion, datetime.min.time()),
+            })
+        return filas
+
+    def _mensualidades(self, jugadores: List[dict], admin_id: int) -> List[dict]:
+        filas = []
+        for jugador in jugadores:
+            # Cada jugador tiene su propia propensión a dejar meses sin pagar
+            probabilidad_pago = self.random.choice([0.98, 0.95, 0.9, 0.8, 0.6])
+            for ano, mes in _meses(jugador["fecha_inscripcion"], self.hasta):
+                if self.random.random() > probabilidad_pago:
+                    continue
+                filas.append({
+                    "jugador_cedula": jugador["cedula"],
+                    "mes": mes,
+                    "ano": ano,
+                    "valor": VALOR_MENSUALIDAD,
+                    "fecha_pago": datetime(ano, mes, self.random.randint(1, 28), self.random.randint(7, 21)),
+                    "registrado_por": admin_id,
+                })
+        return filas
+
+    def _multas(self, jugadores: List[dict], causales: List[tuple], admin_id: int) -> List[dict]:
+        filas = []
+        for jugador in jugadores:
+            for _ in range(min(int(self.random.expovariate(0.6)), 12)):
+                causal_id, valor = self.random.choice(causales)
+                fecha = self._fecha_entre(jugador["fecha_inscripcion"], self.hasta)
+                pagada = self.random.random() < 0.65
+                filas.append({
+                    "jugador_cedula": jugador["cedula"],
+                    "causal_id": causal_id,
+                    "valor": valor,
+                    "fecha_multa": fecha,
+                    "pagada": pagada,
+                    "fecha_pago": datetime.combine(fecha + timedelta(days=self.random.randint(0, 60)), datetime.min.time()) if pagada else None,
+                    "registrado_por": admin_id,
+                    "es_aporte_grupal": False,
+                })
+        return filas
+
+    def _aportes_grupales(self, jugadores: List[dict], causal_id: int, admin_id: int) -> List[dict]:
+        filas = []
+        # Un aporte grupal cada cuatro meses, asignado a los jugadores activos ya inscritos
+        for numero, (ano, mes) in enumerate(list(_meses(self.desde, self.hasta))[::4]):
+            fecha = date(ano, mes, 15)
+            concepto = f"{self.random.choice(CONCEPTOS_APORTE)} {ano}"
+            valor = self.random.choice([10000, 15000, 20000, 30000])
+            grupo = f"sintetico-{ano}{mes:02d}-{numero}"
+            for jugador in jugadores:
+                if not jugador["activo"] or jugador["fecha_inscripcion"] > fecha:
+                    continue
+                pagada = self.random.random() < 0.75
+                filas.append({
+                    "jugador_cedula": jugador["cedula"],
+                    "causal_id": causal_id,
+                    "valor": valor,
+                    "fecha_multa": fecha,
+                    "pagada": pagada,
+                    "fecha_pago": datetime.combine(fecha + timedelta(days=self.random.randint(0, 45)), datetime.min.time()) if pagada else None,
+                    "registrado_por": admin_id,
+                    "es_aporte_grupal": True,
+                    "grupo_multa_id": grupo,
+                    "concepto_aporte": concepto,
+                })
+        return filas
+
+    def _egresos(self, categorias: Dict[str, int], admin_id: int) -> List[dict]:
+        filas = []
+        # El gasto crece con el tamaño de la plantilla (más equipos, más canchas)
+        por_mes = max(3, self.total_jugadores // 40)
+        for ano, mes in _meses(self.desde, self.hasta):
+            for _ in range(self.random.randint(por_mes // 2 + 1, por_mes)):
+                categoria = self.random.choice(list(CATEGORIAS_EGRESO))
+                minimo, maximo = CATEGORIAS_EGRESO[categoria]
+                filas.append({
+                    "categoria_id": categorias[categoria],
+                    "concepto": f"{categoria} {mes:02d}/{ano}",
+                    "valor": self.random.randrange(minimo, maximo, 1000),
+                    "fecha": datetime(ano, mes, self.random.randint(1, 28), 12),
+                    "comprobante": f"FAC-{self.random.randint(1000, 99999)}" if self.random.random() < 0.7 else None,
+                    "registrado_por": admin_id,
+                })
+        return filas
+
+    def _otros_aportes(self, jugadores: List[dict], admin_id: int) -> List[dict]:
+        filas = []
+        for jugador in jugadores:
+            if self.random.random() < 0.1:
+                fecha = self._fecha_entre(jugador["fecha_inscripcion"], self.hasta)
+                filas.append({
+                    "jugador_cedula": jugador["cedula"],
+                    "concepto": self.random.choice(CONCEPTOS_OTRO_APORTE),
+                    "valor": self.random.randrange(10000, 200000, 5000),
+                    "fecha_aporte": datetime.combine(fecha, datetime.min.time()),
+                    "registrado_por": admin_id,
+                })
+        return filas
+
+    def generar(self, engine: Engine) -> Dict[str, int]:
+        """Inserta el conjunto de datos en el engine (las tablas deben estar vacías) y retorna los conteos"""
+        conteos: Dict[str, int] = {}
+        with engine.begin() as conn:
+            admin_id = conn.execute(models.Administrador.__table__.insert().values(
+                nombre="Administrador", email=ADMIN_EMAIL, rol="admin",
+                password=hashlib.sha256(ADMIN_PASSWORD.encode()).hexdigest()
+            )).inserted_primary_key[0]
+            conn.execute(models.Configuracion.__table__.insert().values(
+                clave="mensualidad", valor=VALOR_MENSUALIDAD, descripcion="Valor de la mensualidad del equipo"
+            ))
+
+            causales = []
+            for orden, (numero, titulo, contenido, causales_articulo) in enumerate(NORMATIVA, start=1):
+                articulo_id = conn.execute(models.ArticuloNormativa.__table__.insert().values(
+                    numero_articulo=numero, titulo=titulo, contenido=contenido,
+                    tipo="sancionable", orden_display=orden * 10, activo=True
+                )).inserted_primary_key[0]
+                for descripcion, valor in causales_articulo:
+                    causal_id = conn.execute(models.CausalMulta.__table__.insert().values(
+                        descripcion=descripcion, valor=valor, articulo_id=articulo_id
+                    )).inserted_primary_key[0]
+                    causales.append((causal_id, valor))
+            causal_aporte = conn.execute(models.CausalMulta.__table__.insert().values(
+                descripcion="Aporte grupal", valor=10000  # CausalMulta exige valor > 0; cada aporte lleva su propio valor
+            )).inserted_primary_key[0]
+
+            categorias = {}
+            for nombre in CATEGORIAS_EGRESO:
+                categorias[nombre] = conn.execute(models.CategoriaEgreso.__table__.insert().values(
+                    nombre=nombre
+                )).inserted_primary_key[0]
+
+            jugadores = self._jugadores()
+            conteos["jugadores"] = _insertar(conn, models.Jugador.__table__, jugadores, self.tamano_lote)
+            conteos["mensualidades"] = _insertar(
+                conn, models.Mensualidad.__table__, self._mensualidades(jugadores, admin_id), self.tamano_lote
+            )
+            conteos["multas"] = _insertar(
+                conn, models.Multa.__table__, self._multas(jugadores, causales, admin_id), self.tamano_lote
+            )
+            conteos["aportes_grupales"] = _insertar(
+                conn, models.Multa.__table__, self._aportes_grupales(jugadores, causal_aporte, admin_id), self.tamano_lote
+            )
+            conteos["egresos"] = _insertar(
+                conn, models.Egreso.__table__, self._egresos(categorias, admin_id), self.tamano_lote
+            )
+            conteos["otros_aportes"] = _insertar(
+                conn, models.OtroAporte.__table__, self._otros_aportes(jugadores, admin_id), self.tamano_lote
+            )
+        return conteos
+
+def preparar_base(engine: Engine, limpiar: bool = False) -> None:
+    """Crea las tablas; con `limpiar` borra primero todos los datos. Falla si ya hay jugadores."""
+    if limpiar:
+        models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        existentes = conn.execute(select(func.count()).select_from(models.Jugador.__table__)).scalar()
+    if existentes:
+        raise RuntimeError(f"La base de datos ya tiene {existentes} jugadores; use --limpiar para reemplazarlos")
+
+def generar_dataset(engine: Engine, jugadores: int, anos: int = 3, semilla: int = 42,
+                    hasta: Optional[date] = None, limpiar: bool = False) -> Dict[str, int]:
+    """Prepara la base y genera el conjunto de datos; también reconstruye el índice de la normativa"""
+    from services.indice_normativa import asegurar_indice
+
+    preparar_base(engine, limpiar=limpiar)
+    conteos = GeneradorDatos(jugadores, anos=anos, semilla=semilla, hasta=hasta).generar(engine)
+    asegurar_indice(engine)
+    return conteos
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos para pruebas de rendimiento")
+    parser.add_argument("--url", default="sqlite:///./datos_sinteticos.db", help="URL de SQLAlchemy de la base destino")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--preset", choices=sorted(PRESETS, key=PRESETS.get), help="Escala predefinida de jugadores")
+    grupo.add_argument("--jugadores", type=int, help="Número de jugadores")
+    parser.add_argument("--anos", type=int, default=3, help="Años de historia (por defecto 3)")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla para reproducir el mismo conjunto")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="Fecha final de la historia (AAAA-MM-DD); por defecto hoy")
+    parser.add_argument("--limpiar", action="store_true", help="Borra todas las tablas antes de generar")
+    args = parser.parse_args(argumentos)
+
+    jugadores = args.jugadores or PRESETS[args.preset or "1k"]
+    engine = create_engine(args.url)
+    print(f"🏗️ Generando {jugadores} jugadores con {args.anos} años de historia en {engine.url.render_as_string(hide_password=True)}")
+    inicio = time.perf_counter()
+    try:
+        conteos = generar_dataset(engine, jugadores, anos=args.anos, semilla=args.semilla,
+                                  hasta=args.hasta, limpiar=args.limpiar)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    for tabla, total in conteos.items():
+        print(f"   {tabla}: {total:,}")
+    print(f"✅ Datos generados en {time.perf_counter() - inicio:.1f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
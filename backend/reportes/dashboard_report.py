@@ -9,6 +9,7 @@ from io import BytesIO
 from crud import dashboard as dashboard_crud
 from crud import estado_cuenta as estado_cuenta_crud
 from utils.pdf_generator import PDFGenerator
+from services.metricas import medir_reporte
 import models
 from sqlalchemy import func
 
@@ -18,6 +19,7 @@ class ReporteDashboard:
     def __init__(self, db: Session):
         self.db = db
         
+    @medir_reporte("dashboard_ejecutivo")
     def generar_reporte_ejecutivo(
         self,
         fecha_inicio: Optional[date] = None,
@@ -50,7 +52,7 @@ class ReporteDashboard:
         pdf.add_alert_section(alertas)
         
         # 3. Ranking de multas
-        ranking_multas = self._obtener_ranking_multas_resumido()
+        ranking_multas = self._obtener_ranking_multas_resumido(fecha_inicio, fecha_fin)
         pdf.add_table(
             data=ranking_multas['data'],
             headers=ranking_multas['headers'],
@@ -210,11 +212,17 @@ class ReporteDashboard:
         
         return alertas
     
-    def _obtener_ranking_multas_resumido(self) -> Dict[str, Any]:
-        """Obtener top 10 jugadores con más multas"""
+    def _obtener_ranking_multas_resumido(
+        self,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """Obtener top 10 jugadores con más multas (misma consulta del ranking del dashboard)"""
         
         ranking_response = dashboard_crud.obtener_ranking_jugadores_multas(
             db=self.db,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
             limite=10
         )
         
@@ -267,21 +275,12 @@ class ReporteDashboard:
     def _obtener_estado_financiero_resumido(self) -> Dict[str, Any]:
         """Obtener resumen del estado financiero"""
         
-        # Obtener datos financieros básicos
-        saldo_actual = estado_cuenta_crud.obtener_saldo_actual(self.db)
-        
-        # Ingresos del mes actual (usando Mensualidad en lugar de Pago)
+        # Saldo actual e ingresos/egresos del mes en una sola consulta
         hoy = date.today()
-        ingresos_mes = self.db.query(func.sum(models.Mensualidad.valor))\
-                             .filter(func.extract('month', models.Mensualidad.fecha_pago) == hoy.month)\
-                             .filter(func.extract('year', models.Mensualidad.fecha_pago) == hoy.year)\
-                             .scalar() or 0
-        
-        # Egresos del mes actual  
-        egresos_mes = self.db.query(func.sum(models.Egreso.valor))\
-                            .filter(func.extract('month', models.Egreso.fecha) == hoy.month)\
-                            .filter(func.extract('year', models.Egreso.fecha) == hoy.year)\
-                            .scalar() or 0
+        resumen_mes = estado_cuenta_crud.obtener_resumen_financiero_mensual(self.db, hoy.year, hoy.month)
+        saldo_actual = resumen_mes.saldo_actual
+        ingresos_mes = resumen_mes.total_ingresos_mes_actual
+        egresos_mes = resumen_mes.total_egresos_mes_actual
         
         # Multas pendientes de cobro
         multas_por_cobrar = self.db.query(func.sum(models.CausalMulta.valor))\
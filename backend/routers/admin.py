@@ -1,51 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import hashlib
 import secrets
 import datetime
 from database import get_db
 from schemas import admin as schemas
 from crud import admin as crud
+from crud import identidades as crud_identidades
+from crud import correos as crud_correos
+from schemas import correos as schemas_correos
 from services.email_service import email_service
+from services.bandeja_correo import bandeja_correo
+from services.recordatorios_deuda import recordatorios_deuda
+from services import consultas_lentas, perfilado
+from routers.auth import usuario_admin, respuesta_sesion
+from auth_middleware import require_admin
+from services.limites import limites, limitar_login, limitar_recuperacion
 
 router = APIRouter()
 
+PATRON_PERIODO = r"^\d{4}-(0[1-9]|1[0-2])$"
+
 @router.post("/admin/", response_model=schemas.Administrador)
 def crear_admin(
     admin: schemas.AdministradorCreate,
     db: Session = Depends(get_db)
 ):
     """Crea un nuevo administrador"""
-    db_admin = crud.get_admin_by_email(db, admin.email)
-    if db_admin:
+    # El correo es la credencial de login: obligatorio y único entre administradores y jugadores
+    if not crud_identidades.normalizar_email(admin.email):
+        raise HTTPException(status_code=400, detail="Email requerido")
+    if crud_identidades.email_en_uso(db, admin.email):
         raise HTTPException(status_code=400, detail="Email ya registrado")
     return crud.crear_admin(db, admin)
 
-@router.post("/admin/login")
-def login_admin(credentials: schemas.LoginRequest, db: Session = Depends(get_db)):
+@router.post("/admin/login", dependencies=[Depends(limitar_login)])
+async def login_admin(credentials: schemas.LoginRequest, db: Session = Depends(get_db)):
     """Verifica las credenciales de un administrador"""
-    if not crud.verificar_credenciales(db, credentials.email, credentials.password):
+    limites.verificar("login_email", crud_identidades.normalizar_email(credentials.email))
+    admin = await crud.autenticar_admin(db, credentials.email, credentials.password)
+    if not admin:
         raise HTTPException(
             status_code=401,
             detail="Credenciales incorrectas"
         )
-    admin = crud.get_admin_by_email(db, credentials.email)
-    if not admin:
-        raise HTTPException(
-            status_code=404,
-            detail="Administrador no encontrado"
-        )
-    return {
+    return respuesta_sesion(usuario_admin(admin), {
         "id": admin.id,
         "nombre": admin.nombre,
         "email": admin.email,
         "rol": admin.rol
-    }
+    })
 
-@router.post("/admin/recuperar-password")
+@router.post("/admin/recuperar-password", dependencies=[Depends(limitar_recuperacion)])
 def solicitar_recuperacion_password(request: schemas.RecuperarPasswordRequest, db: Session = Depends(get_db)):
     """Solicita recuperación de contraseña"""
+    # Límite por correo antes de buscarlo: la respuesta no revela si existe
+    limites.verificar("recuperacion_email", crud_identidades.normalizar_email(request.email))
+
     admin = crud.get_admin_by_email(db, request.email)
     if not admin:
         # Por seguridad, no revelamos si el email existe o no
@@ -63,8 +76,9 @@ def solicitar_recuperacion_password(request: schemas.RecuperarPasswordRequest, d
             detail="Error creando token de recuperación"
         )
     
-    # Enviar email de recuperación
+    # Encolar email de recuperación (lo envía la bandeja de correo en segundo plano)
     email_sent = email_service.send_password_reset_email(
+        db,
         to_email=request.email,
         token=token,
         recipient_name=str(admin.nombre)
@@ -121,3 +135,74 @@ def verificar_configuracion_email():
         "sender_email": email_service.sender_email if email_service.sender_email else "No configurado",
         "message": "Email configurado correctamente" if is_configured else "Configuración de email pendiente"
     }
+
+@router.get("/admin/correos", dependencies=[Depends(require_admin)])
+def listar_correos(
+    estado: Optional[str] = Query(None, pattern="^(pendiente|enviando|enviado|fallido)$"),
+    tipo: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=500, description="Número máximo de correos a retornar"),
+    db: Session = Depends(get_db)
+):
+    """Estado de entrega de la bandeja de salida: conteo por estado y últimos correos"""
+    return {
+        "simulado": bandeja_correo.simulado,
+        "por_estado": {estado: cantidad for (estado,), cantidad in bandeja_correo.profundidad(db).items()},
+        "correos": [schemas_correos.CorreoSaliente.model_validate(c) for c in crud_correos.get_correos(db, estado, tipo, limite)]
+    }
+
+@router.get("/admin/correos/{correo_id}", response_model=schemas_correos.CorreoSaliente,
+            dependencies=[Depends(require_admin)])
+def obtener_correo(correo_id: int, db: Session = Depends(get_db)):
+    """Estado de entrega de un correo"""
+    correo = crud_correos.get_correo(db, correo_id)
+    if not correo:
+        raise HTTPException(status_code=404, detail="Correo no encontrado")
+    return correo
+
+@router.post("/admin/recordatorios-deuda", response_model=schemas_correos.ResultadoRecordatorios,
+             dependencies=[Depends(require_admin)])
+def enviar_recordatorios_deuda(
+    periodo: Optional[str] = Query(None, pattern=PATRON_PERIODO, description="Campaña YYYY-MM (por defecto el mes actual)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Encola un recordatorio de deuda para cada jugador moroso con correo.
+    Repetir la misma campaña solo encola a quienes aún no tenían su recordatorio.
+    """
+    return recordatorios_deuda.encolar(db, periodo)
+
+@router.get("/admin/recordatorios-deuda/{periodo}", response_model=schemas_correos.ProgresoRecordatorios,
+            dependencies=[Depends(require_admin)])
+def progreso_recordatorios_deuda(periodo: str = Path(..., pattern=PATRON_PERIODO), db: Session = Depends(get_db)):
+    """Avance del envío de una campaña de recordatorios"""
+    progreso = recordatorios_deuda.progreso(db, periodo)
+    if not progreso["total"]:
+        raise HTTPException(status_code=404, detail="No hay recordatorios para ese periodo")
+    return progreso
+
+@router.get("/admin/consultas-lentas", dependencies=[Depends(require_admin)])
+def listar_consultas_lentas(limite: int = Query(50, ge=1, le=500, description="Número máximo de consultas a retornar")):
+    """Últimas consultas que superaron el umbral de lentitud (parámetros personales enmascarados)"""
+    return {
+        "umbral_ms": consultas_lentas.UMBRAL_MS,
+        "explain": consultas_lentas.MODO_EXPLAIN,
+        "consultas": consultas_lentas.leer_consultas_lentas(limite)
+    }
+
+@router.get("/admin/perfiles", dependencies=[Depends(require_admin)])
+def listar_perfiles(limite: int = Query(50, ge=1, le=500, description="Número máximo de perfiles a retornar")):
+    """Perfiles de peticiones guardados por el perfilado bajo demanda o por muestreo"""
+    return {
+        "habilitado": perfilado.habilitado(),
+        "muestreo": perfilado.MUESTREO,
+        "perfiles": perfilado.listar_perfiles(limite)
+    }
+
+@router.get("/admin/perfiles/{nombre}", dependencies=[Depends(require_admin)])
+def obtener_perfil(nombre: str, formato: str = Query("html", pattern="^(html|folded)$")):
+    """Flame graph HTML de un perfil, o sus pilas en formato folded (speedscope, flamegraph.pl)"""
+    ruta = perfilado.ruta_perfil(nombre, formato)
+    if not ruta:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    tipo = "text/html" if formato == "html" else "text/plain"
+    return FileResponse(ruta, media_type=tipo)
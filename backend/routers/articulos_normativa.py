@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import crud.articulos_normativa as crud
 import schemas.articulos_normativa as schemas
 from database import get_db
+from services import indice_normativa
+from services.documento_normativa import documento_normativa
+from services.limites import admitir_reporte
 
 router = APIRouter(
     prefix="/articulos-normativa",
@@ -41,6 +44,69 @@ def listar_articulos_sancionables(
     """Obtiene solo los artículos sancionables (para vincular con causales)"""
     return crud.get_articulos_sancionables(db=db, solo_activos=solo_activos)
 
+@router.get("/buscar", response_model=List[schemas.ArticuloNormativaBusqueda])
+def buscar_articulos(
+    q: str = Query(..., min_length=2, description="Texto a buscar en número, título o contenido"),
+    skip: int = Query(0, ge=0, description="Número de registros a saltar"),
+    limit: int = Query(20, ge=1, le=100, description="Número máximo de registros a retornar"),
+    solo_activos: bool = Query(True, description="Solo artículos activos"),
+    tipo: Optional[str] = Query(None, description="Filtrar por tipo: 'informativo' o 'sancionable'"),
+    db: Session = Depends(get_db)
+):
+    """Búsqueda de texto completo en la normativa, ordenada por relevancia y con extractos resaltados"""
+    if tipo and tipo not in ["informativo", "sancionable"]:
+        raise HTTPException(status_code=400, detail="Tipo debe ser 'informativo' o 'sancionable'")
+    
+    if not indice_normativa.disponible(db):
+        raise HTTPException(status_code=503, detail="El índice de búsqueda de normativa no está disponible")
+    
+    resultados = crud.buscar_articulos(
+        db=db,
+        consulta=q,
+        skip=skip,
+        limit=limit,
+        solo_activos=solo_activos,
+        tipo=tipo
+    )
+    return [
+        schemas.ArticuloNormativaBusqueda(
+            **schemas.ArticuloNormativaResponse.model_validate(articulo).model_dump(),
+            relevancia=resultado.relevancia,
+            fragmento=resultado.fragmento
+        )
+        for articulo, resultado in resultados
+    ]
+
+def _respuesta_con_etag(request: Request, contenido: bytes, etag: str, media_type: str, headers: Optional[dict] = None) -> Response:
+    """Responde 304 si el cliente ya tiene la versión vigente (If-None-Match)"""
+    cabeceras = {"ETag": etag, "Cache-Control": "no-cache"}
+    cabeceras.update(headers or {})
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [valor.strip() for valor in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=cabeceras)
+    return Response(content=contenido, media_type=media_type, headers=cabeceras)
+
+@router.get("/documento")
+def obtener_documento_normativa(request: Request, db: Session = Depends(get_db)):
+    """
+    Normativa completa (artículos activos en orden, con sus causales) precompilada en JSON.
+    Se sirve desde caché con ETag; solo se recompila cuando cambian artículos o causales.
+    """
+    contenido, etag = documento_normativa.obtener_json(db)
+    return _respuesta_con_etag(request, contenido, etag, "application/json")
+
+@router.get("/documento/pdf", dependencies=[Depends(admitir_reporte)])
+def obtener_documento_normativa_pdf(request: Request, db: Session = Depends(get_db)):
+    """Normativa completa en PDF, cacheada igual que el documento JSON"""
+    try:
+        contenido, etag = documento_normativa.obtener_pdf(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generando PDF de normativa: {str(e)}")
+    return _respuesta_con_etag(
+        request, contenido, etag, "application/pdf",
+        headers={"Content-Disposition": "attachment; filename=normativa.pdf"}
+    )
+
 @router.get("/count")
 def contar_articulos(
     solo_activos: bool = Query(True, description="Solo artículos activos"),
@@ -60,7 +126,7 @@ def obtener_articulo(
     db: Session = Depends(get_db)
 ):
     """Obtiene un artículo de normativa por su ID, incluyendo causales asociadas"""
-    articulo = crud.get_articulo(db=db, articulo_id=articulo_id)
+    articulo = crud.get_articulo_con_causales(db=db, articulo_id=articulo_id)
     if not articulo:
         raise HTTPException(status_code=404, detail="Artículo de normativa no encontrado")
     return articulo
@@ -122,32 +188,48 @@ def eliminar_articulo(
 
 @router.post("/reordenar")
 def reordenar_articulos(
-    reordenes: List[dict],
+    reordenes: List[schemas.ReordenArticulo],
     db: Session = Depends(get_db)
 ):
     """
-    Reordena múltiples artículos
+    Reordena múltiples artículos en una sola sentencia
     Body: [{"id": 1, "orden_display": 1}, {"id": 2, "orden_display": 2}, ...]
     """
-    # Validar formato de entrada
-    for reorden in reordenes:
-        if "id" not in reorden or "orden_display" not in reorden:
-            raise HTTPException(
-                status_code=400, 
-                detail="Cada elemento debe tener 'id' y 'orden_display'"
-            )
-        if not isinstance(reorden["id"], int) or not isinstance(reorden["orden_display"], int):
-            raise HTTPException(
-                status_code=400, 
-                detail="'id' y 'orden_display' deben ser números enteros"
-            )
-    
+    ids = [reorden.id for reorden in reordenes]
+    if len(ids) != len(set(ids)):
+        raise HTTPException(status_code=400, detail="Un artículo no puede aparecer más de una vez")
+
     success = crud.reordenar_articulos(db=db, reordenes=reordenes)
     if not success:
         raise HTTPException(status_code=500, detail="Error al reordenar artículos")
     
     return {"message": "Artículos reordenados exitosamente"}
 
+@router.post("/renumerar")
+def renumerar_articulos(
+    paso: int = Query(crud.PASO_ORDEN, ge=1, le=1000, description="Separación entre posiciones consecutivas"),
+    db: Session = Depends(get_db)
+):
+    """Renumera todos los artículos conservando su orden, dejando huecos para futuros movimientos"""
+    success = crud.renumerar_articulos(db=db, paso=paso)
+    if not success:
+        raise HTTPException(status_code=500, detail="Error al renumerar artículos")
+
+    return {"message": "Artículos renumerados exitosamente"}
+
+@router.post("/{articulo_id}/mover", response_model=schemas.ArticuloNormativaResponse)
+def mover_articulo(
+    articulo_id: int,
+    movimiento: schemas.MoverArticulo,
+    db: Session = Depends(get_db)
+):
+    """Mueve un artículo justo después de otro; normalmente solo actualiza la fila movida"""
+    articulo = crud.mover_articulo(db=db, articulo_id=articulo_id, despues_de_id=movimiento.despues_de_id)
+    if not articulo:
+        raise HTTPException(status_code=404, detail="Artículo no encontrado")
+
+    return articulo
+
 @router.post("/{articulo_id}/duplicar", response_model=schemas.ArticuloNormativaResponse)
 def duplicar_articulo(
     articulo_id: int,
@@ -1,42 +1,103 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import get_db
-from schemas.admin import LoginRequest
+from schemas.admin import LoginRequest, RefreshRequest, LogoutRequest
 from crud import admin as crud_admin
 from crud import jugadores as crud_jugadores
-import hashlib
+from crud import identidades as crud_identidades
+from auth_middleware import CurrentUser, require_user
+from services.sesiones import sesiones, TokenInvalido, TIPO_REFRESCO
+from services.limites import limites, limitar_login
 
 router = APIRouter()
 
-@router.post("/auth/login")
-def login_unificado(credentials: LoginRequest, db: Session = Depends(get_db)):
+def usuario_admin(admin) -> CurrentUser:
+    """Administrador o Identidad de administrador"""
+    return CurrentUser(id=str(admin.id), email=str(admin.email), nombre=str(admin.nombre), rol="admin")
+
+def usuario_jugador(jugador) -> CurrentUser:
+    """Jugador o Identidad de jugador (su id es la cédula)"""
+    cedula = str(jugador.id if isinstance(jugador, crud_identidades.Identidad) else jugador.cedula)
+    return CurrentUser(id=cedula, email=str(jugador.email), nombre=str(jugador.nombre),
+                       rol="jugador", cedula=cedula)
+
+def respuesta_sesion(usuario: CurrentUser, datos_usuario: dict) -> dict:
+    """Datos del usuario junto con los tokens de acceso y refresco"""
+    return {**datos_usuario, **sesiones.emitir_par(usuario.datos_token())}
+
+@router.post("/auth/login", dependencies=[Depends(limitar_login)])
+async def login_unificado(credentials: LoginRequest, db: Session = Depends(get_db)):
     """Login unificado para administradores y jugadores"""
-    
-    # Primero intentar como administrador
-    admin = crud_admin.get_admin_by_email(db, credentials.email)
-    if admin and crud_admin.verificar_credenciales(db, credentials.email, credentials.password):
-        return {
-            "id": admin.id,
-            "nombre": str(admin.nombre),
-            "email": str(admin.email),
+    # Async: el hash de la contraseña corre en el pool de credenciales, no en el threadpool de la API
+
+    limites.verificar("login_email", crud_identidades.normalizar_email(credentials.email))
+
+    # Una consulta resuelve si el correo es de un administrador o de un jugador
+    identidad = await crud_identidades.autenticar(db, credentials.email, credentials.password)
+    if identidad and identidad.rol == crud_identidades.ROL_ADMIN:
+        return respuesta_sesion(usuario_admin(identidad), {
+            "id": int(identidad.id),
+            "nombre": str(identidad.nombre),
+            "email": str(identidad.email),
             "rol": "admin",
             "tipo_usuario": "administrador"
-        }
+        })
     
-    # Luego intentar como jugador
-    jugador = crud_jugadores.get_jugador_by_email(db, credentials.email)
-    if jugador and crud_jugadores.verificar_credenciales_jugador(db, credentials.email, credentials.password):
-        return {
-            "id": str(jugador.cedula),
-            "nombre": str(jugador.nombre),
-            "email": str(jugador.email),
+    if identidad:
+        return respuesta_sesion(usuario_jugador(identidad), {
+            "id": str(identidad.id),
+            "nombre": str(identidad.nombre),
+            "email": str(identidad.email),
             "rol": "jugador",
             "tipo_usuario": "jugador",
-            "cedula": str(jugador.cedula)
-        }
+            "cedula": str(identidad.id)
+        })
     
     # Si no es ni admin ni jugador
     raise HTTPException(
         status_code=401,
         detail="Credenciales incorrectas"
     )
+
+@router.post("/auth/refresh")
+def renovar_sesion(request: RefreshRequest, db: Session = Depends(get_db)):
+    """Cambia un token de refresco vigente por un par nuevo (el anterior queda revocado)"""
+    try:
+        # Verifica y revoca a la vez: dos renovaciones simultáneas no obtienen dos pares
+        datos = sesiones.consumir(request.refresh_token, TIPO_REFRESCO)
+    except TokenInvalido as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    # Única consulta de la sesión fuera del login: el usuario pudo ser eliminado o cambiar de datos
+    if datos.get("rol") == "admin":
+        admin = crud_admin.get_admin(db, int(datos["sub"]))
+        usuario = usuario_admin(admin) if admin else None
+    else:
+        jugador = crud_jugadores.get_jugador(db, datos["sub"])
+        usuario = usuario_jugador(jugador) if jugador and jugador.email else None
+    if usuario is None:
+        raise HTTPException(status_code=401, detail="Usuario no encontrado")
+
+    return sesiones.emitir_par(usuario.datos_token())
+
+@router.post("/auth/logout")
+def cerrar_sesion(request: LogoutRequest = LogoutRequest(), current_user: CurrentUser = Depends(require_user)):
+    """Revoca el token de acceso de la petición y, si se envía, el de refresco"""
+    sesiones.revocar({"jti": current_user.jti, "exp": current_user.exp})
+    if request.refresh_token:
+        try:
+            sesiones.revocar(sesiones.verificar(request.refresh_token, TIPO_REFRESCO))
+        except TokenInvalido:
+            pass  # Ya expirado o revocado: nada que hacer
+    return {"message": "Sesión cerrada"}
+
+@router.get("/auth/me")
+def usuario_actual(current_user: CurrentUser = Depends(require_user)):
+    """Usuario de la sesión, leído del token sin consultar la base de datos"""
+    return {
+        "id": current_user.id,
+        "nombre": current_user.nombre,
+        "email": current_user.email,
+        "rol": current_user.rol,
+        "cedula": current_user.cedula
+    }
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from crud import busqueda as crud
+from schemas import busqueda as schemas
+
+router = APIRouter()
+
+@router.get("/buscar", response_model=schemas.RespuestaBusquedaGlobal)
+def buscar_global(
+    q: str = Query(..., min_length=2, description="Texto a buscar"),
+    limite: int = Query(20, ge=1, le=100, description="Número máximo de resultados combinados"),
+    fuentes: Optional[str] = Query(
+        None,
+        description="Fuentes separadas por coma: jugadores, causales, normativa, egresos, aportes_grupales"
+    )
+):
+    """
+    Búsqueda global en jugadores, causales de multa, normativa, egresos y aportes grupales.
+
+    Las fuentes se consultan en paralelo con un tiempo máximo; si alguna no responde
+    a tiempo se retornan los resultados parciales (`parcial = true`).
+    """
+    lista_fuentes = None
+    if fuentes:
+        lista_fuentes = [f.strip() for f in fuentes.split(",") if f.strip()]
+        invalidas = [f for f in lista_fuentes if f not in crud.FUENTES_BUSQUEDA]
+        if invalidas:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Fuentes no válidas: {', '.join(invalidas)}"
+            )
+
+    return crud.buscar_global(q, limite=limite, fuentes=lista_fuentes)
@@ -9,6 +9,8 @@ from database import get_db
 from crud import dashboard as dashboard_crud
 from schemas import dashboard as dashboard_schemas
 from reportes.dashboard_report import ReporteDashboard
+from services.cache_finanzas import cache_finanzas
+from services.limites import admitir_reporte
 
 router = APIRouter(
     prefix="/dashboard",
@@ -94,7 +96,12 @@ async def obtener_ranking_jugadores_multas(
     try:
         ranking = dashboard_crud.obtener_ranking_jugadores_multas(
             db=db,
-            limite=limite
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            incluir_solo_con_multas=incluir_solo_con_multas,
+            limite=limite,
+            incluir_pagadas=incluir_pagadas,
+            incluir_pendientes=incluir_pendientes
         )
         return ranking
     except Exception as e:
@@ -145,15 +152,19 @@ async def obtener_resumen_dashboard(db: Session = Depends(get_db)):
     """
     
     try:
-        resumen = dashboard_crud.obtener_resumen_dashboard(db=db)
-        return resumen
+        hoy = date.today()
+        # El mes va en la clave: al cambiar de mes las cifras "del mes actual" se recalculan
+        return cache_finanzas.obtener(
+            db, ("resumen", hoy.year, hoy.month),
+            lambda: dashboard_crud.obtener_resumen_dashboard(db=db, hoy=hoy)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error al obtener resumen del dashboard: {str(e)}"
         )
 
-@router.get("/reporte-ejecutivo/pdf")
+@router.get("/reporte-ejecutivo/pdf", dependencies=[Depends(admitir_reporte)])
 async def generar_reporte_ejecutivo_pdf(
     fecha_inicio: Optional[date] = None,
     fecha_fin: Optional[date] = None,
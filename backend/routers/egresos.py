@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Tuple, Optional
 from datetime import datetime
@@ -89,12 +89,33 @@ def eliminar_categoria_egreso(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/egresos/categorias/{categoria_id}/egresos/", response_model=schemas.PaginaEgresos)
+def listar_egresos_categoria(
+    categoria_id: int,
+    fecha_inicio: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = Query(None, description="Fecha de fin del período (exclusiva)"),
+    cursor: Optional[str] = Query(None, description="siguiente_cursor de la página anterior"),
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Lista los egresos de una categoría, del más reciente al más antiguo, paginados por cursor"""
+    if not crud.get_categoria_egreso(db, categoria_id):
+        raise HTTPException(status_code=404, detail="Categoría no encontrada")
+    try:
+        egresos, siguiente_cursor = crud.get_egresos_categoria(
+            db, categoria_id, fecha_inicio, fecha_fin, cursor=cursor, limite=limite
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schemas.PaginaEgresos(egresos=egresos, siguiente_cursor=siguiente_cursor)
+
 @router.get("/egresos/resumen/", response_model=List[schemas.ResumenCategoria])
 def obtener_resumen_egresos(
     fecha_inicio: Optional[datetime] = None,
-    fecha_fin: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = Query(None, description="Fecha de fin del período (exclusiva)"),
+    egresos_por_categoria: int = Query(50, ge=0, le=500, description="Egresos incluidos por categoría; el resto se pagina"),
     db: Session = Depends(get_db)
 ):
     """Obtiene un resumen de egresos agrupados por categoría"""
-    resumen_categorias, _ = crud.get_resumen_egresos(db, fecha_inicio, fecha_fin)
+    resumen_categorias, _ = crud.get_resumen_egresos(db, fecha_inicio, fecha_fin, egresos_por_categoria)
     return resumen_categorias
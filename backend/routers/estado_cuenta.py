@@ -5,13 +5,17 @@ from datetime import datetime, date
 import crud
 import schemas
 from database import get_db
+from services.cache_finanzas import cache_finanzas
 
 router = APIRouter()
 
+MESES_SERIE_POR_DEFECTO = 12
+MAXIMO_MESES_SERIE = 120
+
 @router.get("/estado-cuenta-equipo/", response_model=schemas.EstadoCuentaEquipo)
 def obtener_estado_cuenta_equipo(
     fecha_inicio: Optional[datetime] = Query(None, description="Fecha de inicio del período (YYYY-MM-DD HH:MM:SS)"),
-    fecha_fin: Optional[datetime] = Query(None, description="Fecha de fin del período (YYYY-MM-DD HH:MM:SS)"),
+    fecha_fin: Optional[datetime] = Query(None, description="Fecha de fin del período, exclusiva (YYYY-MM-DD HH:MM:SS)"),
     db: Session = Depends(get_db)
 ):
     """
@@ -81,10 +85,35 @@ def obtener_resumen_financiero_mensual(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener resumen financiero: {str(e)}")
 
+@router.get("/serie-financiera/", response_model=schemas.SerieFinanciera)
+def obtener_serie_financiera(
+    desde: Optional[date] = Query(None, description="Cualquier día del primer mes (por defecto: hace 11 meses)"),
+    hasta: Optional[date] = Query(None, description="Cualquier día del último mes (por defecto: mes actual)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Serie mensual para gráficas: ingresos por fuente, egresos y saldo acumulado
+    de cada mes del rango, calculada en una sola consulta.
+    """
+    hoy = date.today()
+    hasta = hasta or hoy
+    if not desde:
+        meses_atras = hasta.year * 12 + hasta.month - 1 - (MESES_SERIE_POR_DEFECTO - 1)
+        desde = date(meses_atras // 12, meses_atras % 12 + 1, 1)
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha 'desde' no puede ser posterior a 'hasta'")
+    if (hasta.year - desde.year) * 12 + hasta.month - desde.month >= MAXIMO_MESES_SERIE:
+        raise HTTPException(status_code=400, detail=f"El rango máximo es de {MAXIMO_MESES_SERIE} meses")
+    try:
+        clave = ("serie", desde.year, desde.month, hasta.year, hasta.month)
+        return cache_finanzas.obtener(db, clave, lambda: crud.obtener_serie_financiera(db, desde, hasta))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener la serie financiera: {str(e)}")
+
 @router.get("/egresos-por-categoria/", response_model=list[schemas.EgresoPorCategoria])
 def obtener_egresos_por_categoria(
     fecha_inicio: Optional[datetime] = Query(None, description="Fecha de inicio del período"),
-    fecha_fin: Optional[datetime] = Query(None, description="Fecha de fin del período"),
+    fecha_fin: Optional[datetime] = Query(None, description="Fecha de fin del período (exclusiva)"),
     db: Session = Depends(get_db)
 ):
     """
@@ -123,11 +152,7 @@ def obtener_estado_cuenta_periodo(
         
         if mes:
             # Período específico de un mes
-            fecha_inicio = datetime(año, mes, 1)
-            if mes == 12:
-                fecha_fin = datetime(año + 1, 1, 1)
-            else:
-                fecha_fin = datetime(año, mes + 1, 1)
+            fecha_inicio, fecha_fin = crud.rango_mes(año, mes)
         else:
             # Todo el año
             fecha_inicio = datetime(año, 1, 1)
@@ -4,14 +4,19 @@ from database import get_db
 from schemas.admin import RecuperarPasswordRequest, ResetPasswordRequest
 from crud import jugadores as crud_jugadores
 from services.email_service import email_service
+from services.limites import limites, limitar_recuperacion
+from crud.identidades import normalizar_email
 import secrets
 import datetime
 
 router = APIRouter()
 
-@router.post("/jugadores/recuperar-password")
+@router.post("/jugadores/recuperar-password", dependencies=[Depends(limitar_recuperacion)])
 def solicitar_recuperacion_password_jugador(request: RecuperarPasswordRequest, db: Session = Depends(get_db)):
     """Solicita recuperación de contraseña para jugador"""
+    # Límite por correo antes de buscarlo: la respuesta no revela si existe
+    limites.verificar("recuperacion_email", normalizar_email(request.email))
+
     jugador = crud_jugadores.get_jugador_by_email(db, request.email)
     if not jugador:
         # Por seguridad, no revelamos si el email existe o no
@@ -29,8 +34,9 @@ def solicitar_recuperacion_password_jugador(request: RecuperarPasswordRequest, d
             detail="Error creando token de recuperación"
         )
     
-    # Enviar email de recuperación
+    # Encolar email de recuperación (lo envía la bandeja de correo en segundo plano)
     email_sent = email_service.send_password_reset_email(
+        db,
         to_email=request.email,
         token=token,
         recipient_name=str(jugador.nombre)
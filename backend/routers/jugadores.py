@@ -7,13 +7,19 @@ from io import BytesIO
 from database import get_db
 from schemas import jugadores as schemas
 from crud import jugadores as crud
+from crud import identidades as crud_identidades
 import models
+from services.metricas import medir_reporte
+from services.limites import admitir_reporte
 
 router = APIRouter()
 
 @router.post("/jugadores/", response_model=schemas.Jugador)
 def crear_jugador(jugador: schemas.JugadorCreate, db: Session = Depends(get_db)):
     """Crea un nuevo jugador"""
+    # El correo es la credencial de login: único entre administradores y jugadores
+    if crud_identidades.email_en_uso(db, jugador.email):
+        raise HTTPException(status_code=400, detail="Email ya registrado")
     return crud.create_jugador(db, jugador)
 
 @router.get("/jugadores/", response_model=List[schemas.Jugador])
@@ -28,18 +34,19 @@ def listar_jugadores(
 @router.get("/jugadores/{cedula}", response_model=schemas.JugadorDetalle)
 def obtener_jugador(cedula: str, db: Session = Depends(get_db)):
     """Obtiene los detalles de un jugador específico por cédula"""
-    jugador = crud.get_jugador(db, cedula)
+    jugador = crud.get_jugador_detalle(db, cedula)
     if not jugador:
         raise HTTPException(status_code=404, detail="Jugador no encontrado")
     return jugador
 
 @router.get("/jugadores/buscar/", response_model=List[schemas.Jugador])
 def buscar_jugadores(
-    termino: str = Query(..., min_length=3, description="Nombre o parte del nombre a buscar"),
+    termino: str = Query(..., min_length=2, description="Nombre o parte del nombre a buscar"),
+    limite: int = Query(20, ge=1, le=100, description="Número máximo de resultados"),
     db: Session = Depends(get_db)
 ):
-    """Busca jugadores por nombre, documento o alias"""
-    return crud.buscar_jugadores(db, termino)
+    """Busca jugadores por nombre, apellido, documento o alias (ordenados por relevancia)"""
+    return crud.buscar_jugadores(db, termino, limite=limite)
 
 @router.get("/jugadores/{cedula}/estado-cuenta", response_model=schemas.EstadoCuentaJugador)
 def obtener_estado_cuenta(cedula: str, db: Session = Depends(get_db)):
@@ -83,7 +90,8 @@ def cambiar_estado_jugador(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/jugadores/export/listado-basico/pdf")
+@router.get("/jugadores/export/listado-basico/pdf", dependencies=[Depends(admitir_reporte)])
+@medir_reporte("jugadores_listado_basico")
 async def exportar_listado_basico_pdf(
     solo_activos: bool = False,
     db: Session = Depends(get_db)
@@ -198,7 +206,8 @@ async def exportar_listado_basico_pdf(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generando reporte: {str(e)}")
 
-@router.get("/jugadores/export/listado-completo/pdf")
+@router.get("/jugadores/export/listado-completo/pdf", dependencies=[Depends(admitir_reporte)])
+@medir_reporte("jugadores_listado_completo")
 async def exportar_listado_completo_pdf(
     solo_activos: bool = False,
     db: Session = Depends(get_db)
@@ -308,7 +317,8 @@ async def exportar_listado_completo_pdf(
         print(f"Error en export detallado: {error_details}")  # Para debug
         raise HTTPException(status_code=500, detail=f"Error generando reporte: {str(e)}")
 
-@router.get("/jugadores/export/pagos-mensuales/pdf")
+@router.get("/jugadores/export/pagos-mensuales/pdf", dependencies=[Depends(admitir_reporte)])
+@medir_reporte("jugadores_pagos_mensuales")
 async def exportar_listado_pagos_mensuales_pdf(
     año: Optional[int] = None,
     db: Session = Depends(get_db)
@@ -10,9 +10,10 @@ from .pagos import (
 )
 from .egresos import (
     Egreso, EgresoCreate, CategoriaEgreso, CategoriaEgresoCreate,
-    ResumenFinanciero, ResumenCategoria
+    ResumenFinanciero, ResumenCategoria, PaginaEgresos
 )
 from .estado_cuenta import (
     EstadoCuentaEquipo, EgresoPorCategoria, ResumenFinanciero as ResumenFinancieroEquipo,
-    FiltroEstadoCuenta
+    FiltroEstadoCuenta, MesFinanciero, SerieFinanciera
 )
+from .correos import CorreoSaliente, ResultadoRecordatorios, ProgresoRecordatorios
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class AdministradorBase(BaseModel):
     nombre: str
@@ -18,6 +19,12 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
 class RecuperarPasswordRequest(BaseModel):
     email: str
 
@@ -28,6 +28,15 @@ class ArticuloNormativaUpdate(BaseModel):
     orden_display: Optional[int] = Field(None, ge=0)
     activo: Optional[bool] = None
 
+class ReordenArticulo(BaseModel):
+    """Nueva posición de un artículo dentro de la normativa"""
+    id: int = Field(..., gt=0)
+    orden_display: int = Field(..., ge=0)
+
+class MoverArticulo(BaseModel):
+    """Mueve un artículo justo después de otro (o al inicio si despues_de_id es None)"""
+    despues_de_id: Optional[int] = Field(None, gt=0, description="ID del artículo que quedará antes; None para moverlo al inicio")
+
 class ArticuloNormativaResponse(ArticuloNormativaBase):
     """Schema para respuesta de artículo de normativa"""
     id: int
@@ -38,6 +47,11 @@ class ArticuloNormativaResponse(ArticuloNormativaBase):
     class Config:
         from_attributes = True
 
+class ArticuloNormativaBusqueda(ArticuloNormativaResponse):
+    """Schema para un resultado de búsqueda de texto completo en la normativa"""
+    relevancia: float
+    fragmento: Optional[str] = Field(None, description="Extracto del contenido con coincidencias entre <mark></mark>")
+
 class ArticuloNormativaCompleto(ArticuloNormativaResponse):
     """Schema para artículo de normativa con sus causales asociadas"""
     causales: List["CausalMultaResponse"] = []
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class ResultadoBusqueda(BaseModel):
+    """Un resultado de la búsqueda global, de cualquier fuente"""
+    tipo: str  # 'jugador', 'causal', 'articulo', 'egreso', 'aporte_grupal'
+    id: str
+    titulo: str
+    subtitulo: Optional[str] = None
+    puntaje: float
+
+class EstadoFuenteBusqueda(BaseModel):
+    """Resultado de ejecutar la búsqueda en una fuente"""
+    estado: str  # 'ok', 'timeout' o 'error'
+    total: int = 0
+    duracion_ms: float = 0.0
+    detalle: Optional[str] = None
+
+class RespuestaBusquedaGlobal(BaseModel):
+    """Respuesta de la búsqueda global combinada por puntaje"""
+    termino: str
+    resultados: List[ResultadoBusqueda]
+    fuentes: Dict[str, EstadoFuenteBusqueda]
+    parcial: bool  # True si alguna fuente no respondió a tiempo o falló
+    duracion_ms: float
@@ -0,0 +1,34 @@
+from typing import Dict, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class CorreoSaliente(BaseModel):
+    """Estado de entrega de un correo de la bandeja de salida (sin el cuerpo)"""
+    id: int
+    destinatario: str
+    asunto: str
+    tipo: str
+    estado: str  # pendiente, enviando, enviado o fallido
+    intentos: int
+    proximo_intento: Optional[datetime] = None
+    ultimo_error: Optional[str] = None
+    created_at: datetime
+    enviado_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ResultadoRecordatorios(BaseModel):
+    """Resultado de encolar una campaña de recordatorios de deuda"""
+    periodo: str
+    morosos: int
+    encolados: int
+    omitidos: int  # ya tenían su recordatorio en esta campaña
+
+class ProgresoRecordatorios(BaseModel):
+    """Avance del envío de una campaña de recordatorios de deuda"""
+    periodo: str
+    total: int
+    por_estado: Dict[str, int]
+    porcentaje: float  # correos enviados o fallidos sobre el total
+    completado: bool
@@ -36,9 +36,17 @@ class Egreso(EgresoBase):
         from_attributes = True
 
 class ResumenCategoria(BaseModel):
+    categoria_id: int
     nombre: str
     total: float
+    cantidad: int
+    egresos: List[Egreso]  # Primera página, del más reciente al más antiguo
+    siguiente_cursor: Optional[str] = None  # Presente si la categoría tiene más egresos
+
+class PaginaEgresos(BaseModel):
+    """Página de egresos de una categoría, paginada por cursor (fecha, id)"""
     egresos: List[Egreso]
+    siguiente_cursor: Optional[str] = None
 
 class ResumenFinanciero(BaseModel):
     # Ingresos
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, date
 
 class EstadoCuentaEquipo(BaseModel):
     """Estado financiero del equipo"""
@@ -42,6 +42,27 @@ class ResumenFinanciero(BaseModel):
     class Config:
         from_attributes = True
 
+class MesFinanciero(BaseModel):
+    """Ingresos por fuente, egresos y saldo acumulado de un mes"""
+    ano: int
+    mes: int
+    ingresos_mensualidades: float
+    ingresos_multas: float
+    otros_aportes: float
+    total_ingresos: float
+    total_egresos: float
+    diferencia: float  # total_ingresos - total_egresos
+    saldo_acumulado: float  # saldo al cierre del mes
+
+class SerieFinanciera(BaseModel):
+    """Serie mensual de ingresos, egresos y saldo para un rango de meses"""
+    desde: date
+    hasta: date
+    saldo_inicial: float  # saldo antes del primer mes del rango
+    saldo_actual: float  # saldo con todos los movimientos registrados
+    meses: List[MesFinanciero]
+    fecha_calculo: datetime
+
 class FiltroEstadoCuenta(BaseModel):
     """Filtros para el estado de cuenta"""
     fecha_inicio: Optional[datetime] = None
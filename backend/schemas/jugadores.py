@@ -9,7 +9,7 @@ class JugadorBase(BaseModel):
     apellido: str
     cedula: str
     telefono: str
-    email: str  # Email para credenciales
+    email: Optional[str] = None  # Email para credenciales; None si el jugador no tiene
     fecha_nacimiento: date
     talla_uniforme: str
     numero_camiseta: Optional[int]
@@ -24,6 +24,7 @@ class JugadorBase(BaseModel):
     rh: Optional[str] = None
 
 class JugadorCreate(JugadorBase):
+    email: str  # Requerido en la creación; vacío se guarda como NULL
     nombre_inscripcion: str  # Requerido en la creación
 
 class JugadorUpdate(BaseModel):
@@ -0,0 +1,369 @@
+"""
+Bandeja de salida de correos (tabla email_outbox) con un enviador en segundo plano.
+
+Antes cada correo abría su propia conexión SMTP con STARTTLS y login dentro de la
+petición: un servidor de correo lento frenaba la recuperación de contraseñas. Ahora:
+
+- `encolar` guarda el correo en email_outbox y despierta al enviador; la petición
+  responde sin tocar SMTP. Con `clave` el encolado es idempotente; `encolar_lote`
+  hace lo mismo para envíos masivos con un INSERT por lote.
+- Un hilo por proceso toma lotes de pendientes vencidos y los envía por una sola
+  conexión SMTP autenticada, que se reutiliza mientras haya trabajo y se cierra al
+  quedar la cola vacía. Si el servidor corta la conexión se reabre una vez.
+- Los errores temporales (conexión, respuestas 4xx) se reintentan con espera
+  exponencial; los permanentes (5xx, destinatario rechazado) o agotar los intentos
+  dejan el correo como 'fallido' con el último error.
+
+Reservar un lote es una sola sentencia UPDATE ... RETURNING que pasa los correos a
+'enviando' y corre su `proximo_intento` CORREO_RESERVA_S hacia adelante: dos workers
+nunca toman el mismo correo, y si un worker muere con un lote reservado, el lote
+vuelve a estar disponible al vencer la reserva. Antes de enviar cada correo la reserva
+se renueva, solo si sigue siendo la que tomó este worker: un lote frenado por
+CORREO_PAUSA_MS o por un servidor lento no se reenvía desde otro worker, porque los
+correos que este ya no tiene reservados se saltan en lugar de enviarse.
+
+Sin SENDER_EMAIL configurado los correos se marcan como enviados en modo simulación
+(como antes, el aviso con el enlace se imprime al encolar). Sin SENDER_PASSWORD se
+envía sin login, útil para un relay local o un servidor de prueba como aiosmtpd.
+
+Variables de entorno:
+- CORREO_ENVIO_HABILITADO: "0" no inicia el hilo enviador en este proceso (1)
+- SMTP_STARTTLS: "0" para servidores sin TLS (1)
+- SMTP_TIMEOUT_S: tiempo máximo de cada operación SMTP (30)
+- CORREO_LOTE: correos por lote (50)
+- CORREO_MAX_INTENTOS: intentos antes de marcarlo como fallido (6)
+- CORREO_ESPERA_BASE_S: espera del primer reintento; se duplica en cada uno (30)
+- CORREO_INTERVALO_S: cada cuánto revisar la cola si nadie despierta al enviador (10)
+- CORREO_RESERVA_S: vigencia de la reserva de cada correo en curso; se renueva antes de enviarlo (300)
+- CORREO_PAUSA_MS: pausa entre correos, para respetar límites del proveedor (0)
+"""
+
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import SessionLocal
+import models
+from services.metricas import metricas, correos_enviados
+
+ENVIO_HABILITADO = os.getenv("CORREO_ENVIO_HABILITADO", "1") != "0"
+LOTE = int(os.getenv("CORREO_LOTE", "50"))
+MAX_INTENTOS = int(os.getenv("CORREO_MAX_INTENTOS", "6"))
+ESPERA_BASE_S = float(os.getenv("CORREO_ESPERA_BASE_S", "30"))
+INTERVALO_S = float(os.getenv("CORREO_INTERVALO_S", "10"))
+RESERVA_S = float(os.getenv("CORREO_RESERVA_S", "300"))
+PAUSA_MS = float(os.getenv("CORREO_PAUSA_MS", "0"))
+
+PENDIENTE = "pendiente"
+ENVIANDO = "enviando"
+ENVIADO = "enviado"
+FALLIDO = "fallido"
+ESTADOS = (PENDIENTE, ENVIANDO, ENVIADO, FALLIDO)
+
+class ConexionSMTP:
+    """Una conexión SMTP autenticada que se reutiliza entre envíos"""
+
+    def __init__(self, servidor: str = None, puerto: int = None, usuario: str = None, password: str = None,
+                 starttls: bool = None, timeout: float = None, fabrica: Callable = smtplib.SMTP):
+        self.servidor = servidor or os.getenv("SMTP_SERVER", "smtp.gmail.com")
+        self.puerto = puerto or int(os.getenv("SMTP_PORT", "587"))
+        self.usuario = usuario if usuario is not None else os.getenv("SENDER_EMAIL", "")
+        self.password = password if password is not None else os.getenv("SENDER_PASSWORD", "")
+        self.starttls = starttls if starttls is not None else os.getenv("SMTP_STARTTLS", "1") != "0"
+        self.timeout = timeout or float(os.getenv("SMTP_TIMEOUT_S", "30"))
+        self._fabrica = fabrica
+        self._smtp = None
+        self.aperturas = 0
+
+    def abrir(self) -> None:
+        smtp = self._fabrica(self.servidor, self.puerto, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.password:
+                smtp.login(self.usuario, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self.aperturas += 1
+
+    def enviar(self, remitente: str, destinatario: str, mensaje: str) -> None:
+        """Envía por la conexión abierta; si el servidor la cerró, reconecta una vez"""
+        if self._smtp is None:
+            self.abrir()
+        try:
+            self._smtp.sendmail(remitente, destinatario, mensaje)
+        except smtplib.SMTPServerDisconnected:
+            self.cerrar()
+            self.abrir()
+            self._smtp.sendmail(remitente, destinatario, mensaje)
+
+    def cerrar(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    @property
+    def abierta(self) -> bool:
+        return self._smtp is not None
+
+def _es_permanente(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    codigo = getattr(error, "smtp_code", None)
+    return isinstance(codigo, int) and 500 <= codigo < 600
+
+class BandejaCorreo:
+    """Encolado de correos y enviador en segundo plano con conexión SMTP reutilizada"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 conexion: Optional[ConexionSMTP] = None, lote: int = LOTE, max_intentos: int = MAX_INTENTOS,
+                 espera_base_s: float = ESPERA_BASE_S, pausa_ms: float = PAUSA_MS, reserva_s: float = RESERVA_S):
+        self.session_factory = session_factory
+        self.conexion = conexion or ConexionSMTP()
+        self.lote = lote
+        self.max_intentos = max_intentos
+        self.espera_base_s = espera_base_s
+        self.pausa_ms = pausa_ms
+        self.reserva_s = reserva_s
+        self.remitente = os.getenv("SENDER_EMAIL", "")
+        self.nombre_remitente = os.getenv("SENDER_NAME", "Equipo de Fútbol")
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def simulado(self) -> bool:
+        return not self.remitente
+
+    # Encolado
+
+    def encolar(self, db: Session, destinatario: str, asunto: str, cuerpo_html: str,
+                tipo: str = "general", clave: Optional[str] = None, confirmar: bool = True) -> models.CorreoSaliente:
+        """
+        Agrega un correo a la bandeja. Si ya existe uno con la misma `clave`, lo devuelve
+        sin duplicarlo. Con confirmar=False el llamador hace el commit. Para muchos correos
+        usar `encolar_lote`.
+        """
+        if clave:
+            existente = db.query(models.CorreoSaliente).filter(models.CorreoSaliente.clave == clave).first()
+            if existente:
+                return existente
+        correo = models.CorreoSaliente(
+            destinatario=destinatario, asunto=asunto, cuerpo_html=cuerpo_html, tipo=tipo, clave=clave,
+            estado=PENDIENTE, intentos=0, proximo_intento=datetime.now()
+        )
+        db.add(correo)
+        if confirmar:
+            db.commit()
+            self.despertar()
+        return correo
+
+    def encolar_lote(self, db: Session, correos: List[dict], tipo: str = "general") -> int:
+        """
+        Encola varios correos (dicts con destinatario, asunto, cuerpo_html y clave) con una
+        consulta de claves existentes y un INSERT por lote. Devuelve cuántos se agregaron;
+        los que ya tenían su clave en la bandeja se omiten, así que repetir el lote no duplica.
+        """
+        tabla = models.CorreoSaliente.__table__
+        for intento in range(2):
+            claves = [correo["clave"] for correo in correos if correo.get("clave")]
+            existentes = set(db.execute(select(tabla.c.clave).where(tabla.c.clave.in_(claves))).scalars()) if claves else set()
+            ahora = datetime.now()
+            nuevos = [
+                dict(destinatario=correo["destinatario"], asunto=correo["asunto"], cuerpo_html=correo["cuerpo_html"],
+                     tipo=tipo, clave=correo.get("clave"), estado=PENDIENTE, intentos=0, proximo_intento=ahora)
+                for correo in correos if correo.get("clave") not in existentes
+            ]
+            if not nuevos:
+                return 0
+            try:
+                db.execute(insert(tabla), nuevos)
+                db.commit()
+            except IntegrityError:
+                # Otro proceso encoló alguna de estas claves entre la consulta y el INSERT
+                db.rollback()
+                if intento:
+                    raise
+                continue
+            self.despertar()
+            return len(nuevos)
+
+    def despertar(self) -> None:
+        self._despertar.set()
+
+    # Envío
+
+    def _reservar_lote(self, db: Session, ahora: datetime) -> List[int]:
+        tabla = models.CorreoSaliente.__table__
+        disponibles = (tabla.c.estado.in_((PENDIENTE, ENVIANDO)), tabla.c.proximo_intento <= ahora)
+        candidatos = select(tabla.c.id).where(*disponibles)\
+            .order_by(tabla.c.proximo_intento, tabla.c.id)\
+            .limit(self.lote)
+        # Las condiciones se repiten fuera de la subconsulta: si otro worker reservó la
+        # fila entre medio, PostgreSQL las reevalúa y la descarta
+        reservados = db.execute(
+            update(tabla)
+            .where(tabla.c.id.in_(candidatos), *disponibles)
+            .values(estado=ENVIANDO, proximo_intento=ahora + timedelta(seconds=self.reserva_s))
+            .returning(tabla.c.id)
+        ).scalars().all()
+        db.commit()
+        return sorted(reservados)
+
+    def _renovar_reserva(self, db: Session, correo_id: int, reservado_hasta: datetime) -> bool:
+        """
+        Corre la reserva de un correo justo antes de enviarlo. False si ya no es de este
+        worker: la reserva venció y otro worker lo tomó (o ya lo envió).
+        """
+        tabla = models.CorreoSaliente.__table__
+        renovados = db.execute(
+            update(tabla)
+            .where(tabla.c.id == correo_id, tabla.c.estado == ENVIANDO, tabla.c.proximo_intento == reservado_hasta)
+            .values(proximo_intento=datetime.now() + timedelta(seconds=self.reserva_s))
+        ).rowcount
+        db.commit()
+        return renovados == 1
+
+    def _mensaje(self, correo: models.CorreoSaliente) -> str:
+        mensaje = MIMEMultipart()
+        mensaje['From'] = f"{self.nombre_remitente} <{self.remitente}>"
+        mensaje['To'] = correo.destinatario
+        mensaje['Subject'] = correo.asunto
+        mensaje.attach(MIMEText(correo.cuerpo_html, 'html', 'utf-8'))
+        return mensaje.as_string()
+
+    def _entregar(self, correo: models.CorreoSaliente) -> None:
+        if self.simulado:
+            print(f"📧 SIMULACIÓN: correo '{correo.asunto}' para {correo.destinatario} marcado como enviado")
+            correos_enviados.inc(resultado="simulado")
+            return
+        self.conexion.enviar(self.remitente, correo.destinatario, self._mensaje(correo))
+        correos_enviados.inc(resultado="enviado")
+
+    def _registrar_fallo(self, correo: models.CorreoSaliente, error: Exception) -> None:
+        correo.intentos += 1
+        correo.ultimo_error = f"{type(error).__name__}: {error}"[:1000]
+        if _es_permanente(error) or correo.intentos >= self.max_intentos:
+            correo.estado = FALLIDO
+            correos_enviados.inc(resultado="error")
+            print(f"❌ Correo {correo.id} a {correo.destinatario} fallido: {correo.ultimo_error}")
+        else:
+            correo.estado = PENDIENTE
+            espera = self.espera_base_s * 2 ** (correo.intentos - 1)
+            correo.proximo_intento = datetime.now() + timedelta(seconds=espera)
+            correos_enviados.inc(resultado="reintento")
+            print(f"⚠️ Correo {correo.id} a {correo.destinatario}: reintento en {espera:.0f} s ({correo.ultimo_error})")
+
+    def procesar_lote(self) -> int:
+        """Envía un lote de pendientes vencidos por la conexión compartida; devuelve cuántos tomó"""
+        db = self.session_factory()
+        try:
+            ahora = datetime.now()
+            ids = self._reservar_lote(db, ahora)
+            if not ids:
+                return 0
+            reservado_hasta = ahora + timedelta(seconds=self.reserva_s)
+            correos = db.query(models.CorreoSaliente)\
+                .filter(models.CorreoSaliente.id.in_(ids))\
+                .order_by(models.CorreoSaliente.id)\
+                .all()
+            for correo in correos:
+                if not self._renovar_reserva(db, correo.id, reservado_hasta):
+                    print(f"⚠️ Correo {correo.id}: su reserva venció y lo tomó otro worker; no se envía")
+                    continue
+                try:
+                    self._entregar(correo)
+                    correo.estado = ENVIADO
+                    correo.intentos += 1
+                    correo.enviado_at = datetime.now()
+                    correo.ultimo_error = None
+                except (smtplib.SMTPException, OSError) as e:
+                    # La conexión puede haber quedado en un estado desconocido: la próxima se abre de nuevo
+                    if not isinstance(e, smtplib.SMTPRecipientsRefused):
+                        self.conexion.cerrar()
+                    self._registrar_fallo(correo, e)
+                # Un commit por correo: el estado refleja lo enviado aunque el proceso muera a mitad del lote
+                db.commit()
+                if self.pausa_ms:
+                    time.sleep(self.pausa_ms / 1000)
+            return len(ids)
+        finally:
+            db.close()
+
+    def procesar_pendientes(self, maximo_lotes: Optional[int] = None) -> int:
+        """Procesa lotes hasta vaciar la cola (o `maximo_lotes`) y cierra la conexión"""
+        total = lotes = 0
+        try:
+            while maximo_lotes is None or lotes < maximo_lotes:
+                procesados = self.procesar_lote()
+                if not procesados:
+                    break
+                total += procesados
+                lotes += 1
+        finally:
+            self.conexion.cerrar()
+        return total
+
+    # Hilo enviador
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            try:
+                self.procesar_pendientes()
+            except Exception as e:
+                print(f"❌ Error en el enviador de correos: {e}")
+            self._despertar.wait(INTERVALO_S)
+            self._despertar.clear()
+
+    def iniciar(self) -> None:
+        if not ENVIO_HABILITADO or (self._hilo and self._hilo.is_alive()):
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="bandeja-correo", daemon=True)
+        self._hilo.start()
+        print("📮 Enviador de correos iniciado" + (" (modo simulación)" if self.simulado else ""))
+
+    def detener(self, espera_s: float = 5) -> None:
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo:
+            self._hilo.join(espera_s)
+            self._hilo = None
+
+    # Estado
+
+    def profundidad(self, db: Optional[Session] = None) -> Dict[Tuple, float]:
+        """Correos por estado, para la métrica email_outbox_depth y el resumen del API"""
+        propia = db is None
+        db = db or self.session_factory()
+        try:
+            filas = db.query(models.CorreoSaliente.estado, func.count(models.CorreoSaliente.id))\
+                .group_by(models.CorreoSaliente.estado)\
+                .all()
+        finally:
+            if propia:
+                db.close()
+        conteos = {(estado,): 0 for estado in ESTADOS}
+        conteos.update({(estado,): cantidad for estado, cantidad in filas})
+        return conteos
+
+# Instancia global de la bandeja de correo
+bandeja_correo = BandejaCorreo()
+
+metricas.medidor(
+    "email_outbox_depth", "Correos en la bandeja de salida por estado", ("estado",),
+    funcion=bandeja_correo.profundidad
+)
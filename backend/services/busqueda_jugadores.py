@@ -0,0 +1,273 @@
+"""
+Índice en memoria para la búsqueda de jugadores.
+
+Cada worker construye su propio índice desde la tabla `jugadores`. Unos listeners sobre
+la sesión de SQLAlchemy detectan las escrituras de jugadores (objetos del ORM y
+`query.update()/delete()` masivos) y, dentro de la misma transacción, suben la versión
+"jugadores" en `versiones_datos`; tras el commit se invalida el índice local. Los demás
+workers comparan esa versión como máximo cada `BUSQUEDA_JUGADORES_REVALIDAR_S` segundos,
+igual que `cache_finanzas`.
+
+Las escrituras hechas fuera del ORM o por scripts que no importan este módulo no suben
+la versión; por eso el índice se reconstruye de todas formas pasados
+`BUSQUEDA_JUGADORES_MAXIMO_S` segundos.
+"""
+
+import os
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+import models
+
+NOMBRE_VERSION = "jugadores"
+
+# Cada cuánto se verifica la versión compartida (segundos); 0 = en cada búsqueda
+REVALIDAR_S = float(os.getenv("BUSQUEDA_JUGADORES_REVALIDAR_S", "5"))
+# Edad máxima del índice aunque la versión no cambie (segundos)
+MAXIMO_S = float(os.getenv("BUSQUEDA_JUGADORES_MAXIMO_S", "300"))
+
+_MARCA_SESION = "jugadores_modificados"
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Convierte a minúsculas y elimina tildes: 'Núñez' -> 'nunez'"""
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize("NFKD", str(texto))
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_tildes.lower().split())
+
+def puntuar_coincidencia(texto: Optional[str], consulta: str) -> float:
+    """
+    Puntaje simple de relevancia de `consulta` (ya normalizada) dentro de `texto`:
+    3 = igual, 2 = empieza por, 1.5 = alguna palabra empieza por, 1 = contiene, 0 = no aparece
+    """
+    normalizado = normalizar_texto(texto)
+    if not normalizado or not consulta:
+        return 0.0
+    if normalizado == consulta:
+        return 3.0
+    if normalizado.startswith(consulta):
+        return 2.0
+    if any(palabra.startswith(consulta) for palabra in normalizado.split()):
+        return 1.5
+    if consulta in normalizado:
+        return 1.0
+    return 0.0
+
+def _trigramas(texto: str) -> Set[str]:
+    """Trigramas de un texto normalizado, con relleno en los bordes de cada palabra"""
+    trigramas = set()
+    for palabra in texto.split():
+        relleno = f"  {palabra} "
+        for i in range(len(relleno) - 2):
+            trigramas.add(relleno[i:i + 3])
+    return trigramas
+
+class IndiceBusquedaJugadores:
+    """
+    Índice en memoria para buscar jugadores por nombre, apellido, alias y cédula.
+
+    - Normaliza tildes y mayúsculas ("Nuñez" encuentra "Núñez")
+    - Soporta coincidencia por prefijo de cualquier palabra
+    - Tolera errores de escritura usando similitud por trigramas
+    - Ordena por relevancia y aplica un límite
+
+    El índice se reconstruye de forma perezosa en la siguiente búsqueda
+    después de cualquier escritura sobre jugadores (ver `invalidar`).
+    Cada invalidación sube la generación local: una reconstrucción que leyó
+    los registros antes de una escritura concurrente no se publica.
+    """
+
+    # Similitud mínima por trigramas para considerar una coincidencia aproximada
+    SIMILITUD_MINIMA = 0.4
+
+    def __init__(self, revalidar_s: float = REVALIDAR_S, maximo_s: float = MAXIMO_S):
+        self._lock = threading.Lock()
+        self._revalidar_s = revalidar_s
+        self._maximo_s = maximo_s
+        self._vigente = False
+        self._generacion = 0
+        self._version: Optional[int] = None
+        self._construido_en = 0.0
+        self._verificado_en = 0.0
+        self._cedulas: List[str] = []
+        self._textos: List[str] = []
+        self._palabras: List[Tuple[str, int]] = []  # (palabra, indice) ordenadas para búsqueda por prefijo
+        self._trigramas: Dict[str, Set[int]] = {}
+
+    @property
+    def vigente(self) -> bool:
+        return self._vigente
+
+    @property
+    def generacion(self) -> int:
+        """Capturar antes de leer los registros y pasarla a `reconstruir`"""
+        return self._generacion
+
+    @staticmethod
+    def leer_version(db: Session) -> int:
+        version = db.query(models.VersionDatos.version)\
+            .filter(models.VersionDatos.nombre == NOMBRE_VERSION)\
+            .scalar()
+        return version or 0
+
+    @staticmethod
+    def registrar_cambio(db: Session) -> None:
+        """Sube la versión compartida dentro de la transacción en curso"""
+        actualizadas = db.execute(
+            update(models.VersionDatos.__table__)
+            .where(models.VersionDatos.__table__.c.nombre == NOMBRE_VERSION)
+            .values(version=models.VersionDatos.__table__.c.version + 1)
+        ).rowcount
+        if not actualizadas:
+            db.add(models.VersionDatos(nombre=NOMBRE_VERSION, version=1))
+
+    def invalidar(self) -> None:
+        """Marca el índice como desactualizado; se reconstruye en la próxima búsqueda"""
+        with self._lock:
+            self._generacion += 1
+            self._vigente = False
+
+    def vigente_en(self, db: Session) -> bool:
+        """Si el índice sigue vigente, verificando la versión compartida cada `revalidar_s`"""
+        if not self._vigente:
+            return False
+        ahora = time.monotonic()
+        if ahora - self._construido_en >= self._maximo_s:
+            self.invalidar()
+            return False
+        if ahora - self._verificado_en < self._revalidar_s:
+            return True
+        # Otro worker pudo haber creado o modificado jugadores
+        if self.leer_version(db) != self._version:
+            self.invalidar()
+            return False
+        self._verificado_en = ahora
+        return True
+
+    def reconstruir(self, registros: Iterable[Tuple[str, str, str, str]],
+                    generacion: Optional[int] = None, version: Optional[int] = None) -> bool:
+        """
+        Reconstruye el índice completo. Retorna False (y no publica) si hubo una
+        invalidación después de capturar `generacion`.
+
+        registros: tuplas (cedula, nombre, apellido, nombre_inscripcion)
+        version: versión compartida leída antes que los registros
+        """
+        cedulas: List[str] = []
+        textos: List[str] = []
+        palabras: List[Tuple[str, int]] = []
+        trigramas: Dict[str, Set[int]] = {}
+
+        for indice, (cedula, nombre, apellido, alias) in enumerate(registros):
+            texto = normalizar_texto(f"{nombre or ''} {apellido or ''} {alias or ''} {cedula or ''}")
+            cedulas.append(str(cedula))
+            textos.append(texto)
+            for palabra in set(texto.split()):
+                palabras.append((palabra, indice))
+            for trigrama in _trigramas(texto):
+                trigramas.setdefault(trigrama, set()).add(indice)
+
+        palabras.sort()
+
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return False
+            self._cedulas = cedulas
+            self._textos = textos
+            self._palabras = palabras
+            self._trigramas = trigramas
+            self._version = version
+            self._construido_en = self._verificado_en = time.monotonic()
+            self._vigente = True
+        return True
+
+    def _por_prefijo(self, prefijo: str) -> Set[int]:
+        """Índices de jugadores con alguna palabra que empieza por `prefijo`"""
+        resultado = set()
+        posicion = bisect_left(self._palabras, (prefijo, -1))
+        while posicion < len(self._palabras) and self._palabras[posicion][0].startswith(prefijo):
+            resultado.add(self._palabras[posicion][1])
+            posicion += 1
+        return resultado
+
+    def buscar(self, termino: str, limite: int = 20) -> List[Tuple[str, float]]:
+        """
+        Busca jugadores y retorna una lista de (cedula, puntaje) ordenada por relevancia.
+        """
+        consulta = normalizar_texto(termino)
+        if not consulta or limite <= 0:
+            return []
+
+        with self._lock:
+            textos = self._textos
+            cedulas = self._cedulas
+            palabras_consulta = consulta.split()
+
+            # 1. Coincidencias por prefijo: todas las palabras de la consulta deben coincidir
+            candidatos_prefijo: Optional[Set[int]] = None
+            for palabra in palabras_consulta:
+                encontrados = self._por_prefijo(palabra)
+                candidatos_prefijo = encontrados if candidatos_prefijo is None else candidatos_prefijo & encontrados
+
+            # 2. Coincidencias aproximadas por trigramas
+            trigramas_consulta = _trigramas(consulta)
+            conteo: Dict[int, int] = {}
+            for trigrama in trigramas_consulta:
+                for indice in self._trigramas.get(trigrama, ()):
+                    conteo[indice] = conteo.get(indice, 0) + 1
+
+        puntajes: Dict[int, float] = {}
+        total_trigramas = len(trigramas_consulta) or 1
+        for indice, compartidos in conteo.items():
+            similitud = compartidos / total_trigramas
+            if similitud >= self.SIMILITUD_MINIMA:
+                puntajes[indice] = similitud
+
+        for indice in candidatos_prefijo or ():
+            puntajes[indice] = puntajes.get(indice, 0.0) + 1.0
+
+        for indice in list(puntajes):
+            texto = textos[indice]
+            palabras_texto = texto.split()
+            if consulta in palabras_texto or consulta == cedulas[indice]:
+                puntajes[indice] += 2.0  # Coincidencia exacta de palabra o cédula
+            elif consulta in texto:
+                puntajes[indice] += 0.5  # Coincidencia como subcadena
+
+        ordenados = sorted(puntajes.items(), key=lambda item: (-item[1], textos[item[0]]))
+        return [(cedulas[indice], round(puntaje, 4)) for indice, puntaje in ordenados[:limite]]
+
+# Instancia global del índice de búsqueda de jugadores
+indice_jugadores = IndiceBusquedaJugadores()
+
+def _marcar_cambio(session: Session) -> None:
+    if not session.info.get(_MARCA_SESION):
+        session.info[_MARCA_SESION] = True
+        IndiceBusquedaJugadores.registrar_cambio(session)
+
+@event.listens_for(Session, "before_flush")
+def _detectar_escrituras(session, flush_context, instances):
+    for objeto in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(objeto, models.Jugador):
+            _marcar_cambio(session)
+            return
+
+@event.listens_for(Session, "do_orm_execute")
+def _detectar_escrituras_masivas(estado):
+    if (estado.is_update or estado.is_delete) and estado.bind_mapper is not None \
+            and issubclass(estado.bind_mapper.class_, models.Jugador):
+        _marcar_cambio(estado.session)
+
+@event.listens_for(Session, "after_commit")
+def _despues_del_commit(session):
+    if session.info.pop(_MARCA_SESION, False):
+        indice_jugadores.invalidar()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _despues_del_rollback(session, transaccion_previa):
+    session.info.pop(_MARCA_SESION, None)
@@ -0,0 +1,130 @@
+"""
+Caché en memoria de los agregados financieros del dashboard.
+
+Los agregados (resumen del dashboard, series mensuales) recorren mensualidades,
+aportes, multas y egresos completos, pero solo cambian cuando se registra algo.
+Unos listeners sobre la sesión de SQLAlchemy detectan cualquier escritura en esas
+tablas (objetos del ORM y `query.update()/delete()` masivos) y, dentro de la misma
+transacción, suben la versión "finanzas" en `versiones_datos`; tras el commit se
+descarta la caché local. Los demás workers comparan esa versión como máximo cada
+`FINANZAS_CACHE_REVALIDAR_S` segundos, igual que `configuracion_sistema`.
+
+Las escrituras hechas fuera del ORM o por scripts que no importan este módulo no
+suben la versión; por eso ningún valor se sirve más de `FINANZAS_CACHE_MAXIMO_S`.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+import models
+from services.metricas import registrar_cache
+
+NOMBRE_VERSION = "finanzas"
+
+# Cada cuánto se verifica la versión compartida (segundos); 0 = en cada lectura
+REVALIDAR_S = float(os.getenv("FINANZAS_CACHE_REVALIDAR_S", "5"))
+# Edad máxima de un valor aunque la versión no cambie (segundos)
+MAXIMO_S = float(os.getenv("FINANZAS_CACHE_MAXIMO_S", "300"))
+
+# Modelos cuyas escrituras cambian los agregados financieros
+MODELOS_FINANZAS = (models.Jugador, models.Mensualidad, models.OtroAporte, models.Multa, models.Egreso)
+
+_MARCA_SESION = "finanzas_modificadas"
+
+class CacheFinanzas:
+    """Valores calculados por clave, válidos mientras no cambie la versión "finanzas" """
+
+    def __init__(self, revalidar_s: float = REVALIDAR_S, maximo_s: float = MAXIMO_S):
+        self._lock = threading.Lock()
+        self._revalidar_s = revalidar_s
+        self._maximo_s = maximo_s
+        self._valores: Dict[Hashable, Tuple[float, Any]] = {}  # clave -> (calculado_en, valor)
+        self._version: Optional[int] = None
+        self._verificado_en = 0.0
+
+    @staticmethod
+    def _leer_version(db: Session) -> int:
+        version = db.query(models.VersionDatos.version)\
+            .filter(models.VersionDatos.nombre == NOMBRE_VERSION)\
+            .scalar()
+        return version or 0
+
+    @staticmethod
+    def registrar_cambio(db: Session) -> None:
+        """Sube la versión compartida dentro de la transacción en curso"""
+        actualizadas = db.execute(
+            update(models.VersionDatos.__table__)
+            .where(models.VersionDatos.__table__.c.nombre == NOMBRE_VERSION)
+            .values(version=models.VersionDatos.__table__.c.version + 1)
+        ).rowcount
+        if not actualizadas:
+            db.add(models.VersionDatos(nombre=NOMBRE_VERSION, version=1))
+
+    def invalidar(self) -> None:
+        """Descarta los valores locales; se recalculan en la próxima lectura"""
+        with self._lock:
+            self._valores = {}
+            self._version = None
+
+    def _vigente(self, db: Session) -> bool:
+        if self._version is None:
+            return False
+        if time.monotonic() - self._verificado_en < self._revalidar_s:
+            return True
+        # Otro worker pudo haber registrado pagos o egresos
+        if self._leer_version(db) != self._version:
+            self.invalidar()
+            return False
+        self._verificado_en = time.monotonic()
+        return True
+
+    def obtener(self, db: Session, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Valor en caché para `clave`, o el resultado de `calcular()` si no está vigente"""
+        if self._vigente(db):
+            guardado = self._valores.get(clave)
+            if guardado and time.monotonic() - guardado[0] < self._maximo_s:
+                registrar_cache("finanzas", True)
+                return guardado[1]
+        registrar_cache("finanzas", False)
+        version = self._leer_version(db)
+        valor = calcular()
+        with self._lock:
+            if self._version != version:
+                self._valores = {}
+                self._version = version
+            self._valores[clave] = (time.monotonic(), valor)
+            self._verificado_en = time.monotonic()
+        return valor
+
+# Instancia global de la caché financiera
+cache_finanzas = CacheFinanzas()
+
+def _marcar_cambio(session: Session) -> None:
+    if not session.info.get(_MARCA_SESION):
+        session.info[_MARCA_SESION] = True
+        CacheFinanzas.registrar_cambio(session)
+
+@event.listens_for(Session, "before_flush")
+def _detectar_escrituras(session, flush_context, instances):
+    for objeto in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(objeto, MODELOS_FINANZAS):
+            _marcar_cambio(session)
+            return
+
+@event.listens_for(Session, "do_orm_execute")
+def _detectar_escrituras_masivas(estado):
+    if (estado.is_update or estado.is_delete) and estado.bind_mapper is not None \
+            and issubclass(estado.bind_mapper.class_, MODELOS_FINANZAS):
+        _marcar_cambio(estado.session)
+
+@event.listens_for(Session, "after_commit")
+def _despues_del_commit(session):
+    if session.info.pop(_MARCA_SESION, False):
+        cache_finanzas.invalidar()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _despues_del_rollback(session, transaccion_previa):
+    session.info.pop(_MARCA_SESION, None)
@@ -0,0 +1,101 @@
+"""
+Caché en memoria de las configuraciones del sistema (tabla `configuraciones`).
+
+Las configuraciones se leen en cada pago pero casi nunca cambian, así que se cargan
+una sola vez por proceso. Las escrituras del CRUD llaman a `registrar_cambio()`
+dentro de su transacción (sube la versión en `versiones_datos`) y a `invalidar()`
+después del commit. Los demás workers comparan esa versión como máximo cada
+`CONFIG_CACHE_REVALIDAR_S` segundos y recargan si cambió.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+import models
+from services.metricas import registrar_cache
+
+NOMBRE_VERSION = "configuraciones"
+
+# Cada cuánto se verifica la versión compartida (segundos); 0 = en cada lectura
+REVALIDAR_S = float(os.getenv("CONFIG_CACHE_REVALIDAR_S", "5"))
+
+class ConfiguracionNoDefinida(ValueError):
+    """La clave solicitada no existe en la tabla de configuraciones"""
+
+class ConfiguracionSistema:
+    """Caché de lectura de las configuraciones con accesores tipados"""
+
+    def __init__(self, revalidar_s: float = REVALIDAR_S):
+        self._lock = threading.Lock()
+        self._revalidar_s = revalidar_s
+        self._valores: Optional[Dict[str, float]] = None
+        self._version: Optional[int] = None
+        self._verificado_en = 0.0
+
+    @staticmethod
+    def _leer_version(db: Session) -> int:
+        version = db.query(models.VersionDatos.version)\
+            .filter(models.VersionDatos.nombre == NOMBRE_VERSION)\
+            .scalar()
+        return version or 0
+
+    def registrar_cambio(self, db: Session) -> None:
+        """Sube la versión compartida; llamar dentro de la transacción que modifica configuraciones"""
+        actualizadas = db.query(models.VersionDatos)\
+            .filter(models.VersionDatos.nombre == NOMBRE_VERSION)\
+            .update({models.VersionDatos.version: models.VersionDatos.version + 1}, synchronize_session=False)
+        if not actualizadas:
+            db.add(models.VersionDatos(nombre=NOMBRE_VERSION, version=1))
+
+    def invalidar(self) -> None:
+        """Descarta la caché local; se recarga en la próxima lectura"""
+        with self._lock:
+            self._valores = None
+            self._version = None
+
+    def _cargar(self, db: Session) -> Dict[str, float]:
+        version = self._leer_version(db)
+        valores = {clave: valor for clave, valor in db.query(models.Configuracion.clave, models.Configuracion.valor)}
+        with self._lock:
+            self._valores = valores
+            self._version = version
+            self._verificado_en = time.monotonic()
+        return valores
+
+    def _vigentes(self, db: Session) -> Dict[str, float]:
+        valores = self._valores
+        if valores is None:
+            registrar_cache("configuraciones", False)
+            return self._cargar(db)
+        if time.monotonic() - self._verificado_en < self._revalidar_s:
+            registrar_cache("configuraciones", True)
+            return valores
+        # Otro worker pudo haber modificado las configuraciones
+        if self._leer_version(db) != self._version:
+            registrar_cache("configuraciones", False)
+            return self._cargar(db)
+        self._verificado_en = time.monotonic()
+        registrar_cache("configuraciones", True)
+        return valores
+
+    def obtener(self, db: Session, clave: str, por_defecto: Optional[float] = None) -> Optional[float]:
+        """Valor de una configuración, o `por_defecto` si no existe"""
+        return self._vigentes(db).get(clave, por_defecto)
+
+    def requerido(self, db: Session, clave: str, mensaje: Optional[str] = None) -> float:
+        """Valor de una configuración obligatoria; lanza ConfiguracionNoDefinida si no existe"""
+        valor = self.obtener(db, clave)
+        if valor is None:
+            raise ConfiguracionNoDefinida(mensaje or f"No se ha configurado '{clave}' en el sistema")
+        return valor
+
+    # Accesores tipados de las claves conocidas
+
+    def mensualidad(self, db: Session) -> float:
+        """Valor de la mensualidad del equipo"""
+        return self.requerido(db, "mensualidad", "No se ha configurado el valor de la mensualidad en el sistema")
+
+# Instancia global de las configuraciones
+configuracion_sistema = ConfiguracionSistema()
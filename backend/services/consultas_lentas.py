@@ -0,0 +1,189 @@
+"""
+Registro de consultas lentas.
+
+Cada sentencia que supera `SQL_LENTA_MS` se escribe como una línea JSON en un
+archivo local con rotación, junto con sus parámetros (cédulas, teléfonos y
+correos enmascarados), la función del CRUD que la originó y, si se activa,
+el plan de ejecución. `leer_consultas_lentas()` alimenta GET /api/admin/consultas-lentas.
+
+Variables de entorno:
+- SQL_LENTA_MS: umbral en milisegundos (500); 0 desactiva el registro
+- SQL_LENTA_EXPLAIN: "0" sin plan (por defecto), "1" EXPLAIN. Nunca se usa EXPLAIN ANALYZE:
+  volvería a ejecutar la consulta lenta dentro de la petición
+
+El EXPLAIN corre en la conexión y la transacción de la petición. En PostgreSQL va dentro
+de un SAVEPOINT: si falla (por ejemplo por el statement_timeout de la búsqueda global),
+se vuelve al savepoint y la transacción de la petición sigue utilizable.
+- SQL_LENTA_ARCHIVO: ruta del archivo (logs/consultas_lentas.log)
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+UMBRAL_MS = float(os.getenv("SQL_LENTA_MS", "500"))
+MODO_EXPLAIN = os.getenv("SQL_LENTA_EXPLAIN", "0").lower()
+ARCHIVO = os.getenv(
+    "SQL_LENTA_ARCHIVO",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "consultas_lentas.log")
+)
+TAMANO_MAXIMO_BYTES = 1_000_000
+ARCHIVOS_RESPALDO = 3
+
+# Nombres de parámetros con datos personales o secretos (tokens de recuperación, cuerpos de
+# correo con el enlace de recuperación) y valores con forma de correo o documento/teléfono
+_CAMPOS_SENSIBLES = re.compile(r"cedula|telefono|email|correo|password|token|cuerpo", re.IGNORECASE)
+_RE_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+_RE_DOCUMENTO = re.compile(r"^\+?\d[\d\s-]{5,}$")
+_CARPETAS_ORIGEN = ("crud", "routers", "services", "reportes")
+_RAIZ_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_logger: Optional[logging.Logger] = None
+
+def _obtener_logger() -> logging.Logger:
+    global _logger
+    if _logger is None:
+        os.makedirs(os.path.dirname(ARCHIVO), exist_ok=True)
+        logger = logging.getLogger("consultas_lentas")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.handlers.clear()
+        manejador = RotatingFileHandler(
+            ARCHIVO, maxBytes=TAMANO_MAXIMO_BYTES, backupCount=ARCHIVOS_RESPALDO, encoding="utf-8"
+        )
+        manejador.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(manejador)
+        _logger = logger
+    return _logger
+
+def _enmascarar_valor(valor: Any) -> Any:
+    if isinstance(valor, str) and (_RE_EMAIL.search(valor) or _RE_DOCUMENTO.match(valor.strip())):
+        return "***"
+    if isinstance(valor, (str, int, float, bool)) or valor is None:
+        return valor
+    return str(valor)
+
+def enmascarar_parametros(parametros: Any, nombres: Optional[List[str]] = None) -> Any:
+    """Oculta cédulas, teléfonos y correos en los parámetros de una sentencia"""
+    if isinstance(parametros, dict):
+        return {
+            clave: "***" if _CAMPOS_SENSIBLES.search(str(clave)) else _enmascarar_valor(valor)
+            for clave, valor in parametros.items()
+        }
+    if isinstance(parametros, (list, tuple)):
+        if parametros and isinstance(parametros[0], (list, tuple, dict)):
+            # executemany: se conserva solo el primer conjunto
+            return [enmascarar_parametros(parametros[0], nombres), f"... {len(parametros)} filas"]
+        return [
+            "***" if nombres and i < len(nombres) and _CAMPOS_SENSIBLES.search(nombres[i]) else _enmascarar_valor(valor)
+            for i, valor in enumerate(parametros)
+        ]
+    return parametros
+
+def _nombres_posicionales(context) -> Optional[List[str]]:
+    compilado = getattr(context, "compiled", None)
+    nombres = getattr(compilado, "positiontup", None)
+    return list(nombres) if nombres else None
+
+def _funcion_origen() -> Optional[str]:
+    """Primera función del backend (crud, routers, services, reportes) en la pila de llamadas"""
+    marco = sys._getframe(2)
+    while marco is not None:
+        archivo = marco.f_code.co_filename
+        if archivo.startswith(_RAIZ_BACKEND) and not archivo.endswith("consultas_lentas.py"):
+            relativo = os.path.relpath(archivo, _RAIZ_BACKEND)
+            if relativo.split(os.sep)[0] in _CARPETAS_ORIGEN:
+                modulo = relativo[:-3].replace(os.sep, ".")
+                return f"{modulo}.{marco.f_code.co_name}:{marco.f_lineno}"
+        marco = marco.f_back
+    return None
+
+SAVEPOINT_PLAN = "plan_consulta_lenta"
+
+def _capturar_plan(cursor, dialecto: str, statement: str, parameters) -> Optional[List[str]]:
+    if MODO_EXPLAIN != "1" or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    if dialecto == "postgresql":
+        prefijo = "EXPLAIN "
+    elif dialecto == "sqlite":
+        prefijo = "EXPLAIN QUERY PLAN "
+    else:
+        return None
+    conexion = cursor.connection
+    # Un error en PostgreSQL aborta la transacción abierta; en autocommit no hay nada que proteger
+    aislar = dialecto == "postgresql" and not getattr(conexion, "autocommit", False)
+    try:
+        # Cursor nuevo sobre la misma conexión DBAPI: no dispara los eventos de SQLAlchemy
+        explicar = conexion.cursor()
+        try:
+            if aislar:
+                explicar.execute(f"SAVEPOINT {SAVEPOINT_PLAN}")
+            try:
+                explicar.execute(prefijo + statement, parameters)
+                plan = [" | ".join(str(columna) for columna in fila) for fila in explicar.fetchall()]
+            except Exception:
+                if aislar:
+                    explicar.execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT_PLAN}")
+                raise
+            finally:
+                if aislar:
+                    explicar.execute(f"RELEASE SAVEPOINT {SAVEPOINT_PLAN}")
+            return plan
+        finally:
+            explicar.close()
+    except Exception as e:
+        return [f"No se pudo obtener el plan: {e}"]
+
+def registrar_consulta_lenta(entrada: Dict[str, Any]) -> None:
+    _obtener_logger().info(json.dumps(entrada, ensure_ascii=False, default=str))
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if UMBRAL_MS > 0:
+        conn.info.setdefault("inicio_consultas_lentas", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("inicio_consultas_lentas")
+    if UMBRAL_MS <= 0 or not inicios:
+        return
+    duracion_ms = (time.perf_counter() - inicios.pop()) * 1000
+    if duracion_ms < UMBRAL_MS:
+        return
+    try:
+        registrar_consulta_lenta({
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "duracion_ms": round(duracion_ms, 2),
+            "origen": _funcion_origen(),
+            "sql": re.sub(r"\s+", " ", statement).strip(),
+            "parametros": enmascarar_parametros(parameters, _nombres_posicionales(context)),
+            "plan": _capturar_plan(cursor, conn.dialect.name, statement, parameters),
+        })
+    except Exception as e:
+        print(f"⚠️ No se pudo registrar la consulta lenta: {e}")
+
+def leer_consultas_lentas(limite: int = 50) -> List[Dict[str, Any]]:
+    """Últimas consultas lentas registradas (las más recientes primero), incluyendo archivos rotados"""
+    entradas: List[Dict[str, Any]] = []
+    archivos = [ARCHIVO] + [f"{ARCHIVO}.{i}" for i in range(1, ARCHIVOS_RESPALDO + 1)]
+    for archivo in archivos:
+        if len(entradas) >= limite or not os.path.exists(archivo):
+            break
+        with open(archivo, encoding="utf-8") as f:
+            lineas = f.readlines()
+        for linea in reversed(lineas):
+            try:
+                entradas.append(json.loads(linea))
+            except ValueError:
+                continue
+            if len(entradas) >= limite:
+                break
+    return entradas
@@ -0,0 +1,126 @@
+"""
+Hash y verificación de contraseñas con bcrypt en un pool de hilos acotado.
+
+Las contraseñas se guardaban como SHA-256 sin sal de una sola ronda, que se revierte
+con tablas precalculadas (y la contraseña inicial de cada jugador es su cédula). bcrypt
+(ya fijado en requirements.txt) es una KDF con sal y costo configurable; el hash guardado
+es el formato estándar `$2b$<rondas>$<sal y hash>`, que incluye el costo. bcrypt solo
+usa los primeros 72 bytes de la contraseña.
+
+Cada verificación cuesta cientos de milisegundos a propósito. Para no bloquear el bucle
+de eventos ni ocupar el threadpool de los endpoints síncronos, el trabajo corre en un
+`ThreadPoolExecutor` propio de `CREDENCIALES_HILOS` hilos (bcrypt libera el GIL mientras
+calcula): con una avalancha de logins, los que exceden el pool esperan en su cola en vez
+de competir por CPU con el resto de la API.
+
+Los hashes SHA-256 heredados (64 caracteres hexadecimales) se siguen aceptando y, tras
+un login exitoso, se reemplazan por bcrypt. Lo mismo pasa con hashes bcrypt de un costo
+distinto al configurado, así que subir CREDENCIALES_BCRYPT_RONDAS migra a los usuarios
+a medida que inician sesión.
+
+Variables de entorno:
+- CREDENCIALES_BCRYPT_RONDAS: factor de costo, log2 de las iteraciones (12, unos 250 ms por hash)
+- CREDENCIALES_HILOS: hilos del pool de hash (2)
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+import bcrypt
+from services.metricas import metricas
+
+RONDAS = int(os.getenv("CREDENCIALES_BCRYPT_RONDAS", "12"))
+HILOS = int(os.getenv("CREDENCIALES_HILOS", "2"))
+
+MAXIMO_BYTES_BCRYPT = 72
+
+_RE_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+_RE_BCRYPT = re.compile(r"^\$2[aby]\$(\d{2})\$[./A-Za-z0-9]{53}$")
+
+duracion_hash = metricas.histograma(
+    "password_hash_duration_seconds", "Tiempo de cálculo de hashes de contraseña", ("operacion",)
+)
+rehash_total = metricas.contador(
+    "password_rehash_total", "Hashes de contraseña actualizados al iniciar sesión", ("origen",)
+)
+
+class Verificacion(NamedTuple):
+    valida: bool
+    requiere_rehash: bool  # Hash heredado o con otro costo: guardar uno nuevo
+
+def _bytes_password(password: str) -> bytes:
+    # bcrypt ignora lo que pase de 72 bytes; se recorta explícitamente
+    return password.encode("utf-8")[:MAXIMO_BYTES_BCRYPT]
+
+class Credenciales:
+    """KDF de contraseñas con costo configurable y pool de hilos propio"""
+
+    def __init__(self, rondas: int = RONDAS, hilos: int = HILOS):
+        if not 4 <= rondas <= 31:
+            raise ValueError("CREDENCIALES_BCRYPT_RONDAS debe estar entre 4 y 31")
+        self.rondas = rondas
+        self._pool = ThreadPoolExecutor(max_workers=max(hilos, 1), thread_name_prefix="credenciales")
+        self._hash_ficticio: Optional[str] = None
+
+    def generar_hash(self, password: str) -> str:
+        """Hash bcrypt con sal aleatoria, en el hilo que llama"""
+        inicio = time.perf_counter()
+        guardado = bcrypt.hashpw(_bytes_password(password), bcrypt.gensalt(self.rondas))
+        duracion_hash.observar(time.perf_counter() - inicio, operacion="generar")
+        return guardado.decode("ascii")
+
+    def verificar(self, password: str, hash_guardado: Optional[str]) -> Verificacion:
+        """Compara la contraseña con el hash guardado (bcrypt o SHA-256 heredado), en el hilo que llama"""
+        inicio = time.perf_counter()
+        try:
+            if not hash_guardado:
+                # Mismo costo que un usuario real, para no revelar qué correos existen
+                self._verificar_bcrypt(password, self._obtener_hash_ficticio())
+                return Verificacion(False, False)
+            if _RE_SHA256.match(hash_guardado):
+                calculado = hashlib.sha256(password.encode()).hexdigest()
+                return Verificacion(hmac.compare_digest(calculado, hash_guardado), True)
+            return self._verificar_bcrypt(password, hash_guardado)
+        finally:
+            duracion_hash.observar(time.perf_counter() - inicio, operacion="verificar")
+
+    def _verificar_bcrypt(self, password: str, hash_guardado: str) -> Verificacion:
+        coincidencia = _RE_BCRYPT.match(hash_guardado)
+        if not coincidencia:
+            return Verificacion(False, False)
+        valida = bcrypt.checkpw(_bytes_password(password), hash_guardado.encode("ascii"))
+        return Verificacion(valida, valida and int(coincidencia.group(1)) != self.rondas)
+
+    def _obtener_hash_ficticio(self) -> str:
+        if self._hash_ficticio is None:
+            self._hash_ficticio = self.generar_hash(secrets.token_hex(16))
+        return self._hash_ficticio
+
+    # Variantes que corren en el pool propio
+
+    async def generar_hash_async(self, password: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self._pool, self.generar_hash, password)
+
+    async def verificar_async(self, password: str, hash_guardado: Optional[str]) -> Verificacion:
+        return await asyncio.get_running_loop().run_in_executor(self._pool, self.verificar, password, hash_guardado)
+
+    def verificar_en_pool(self, password: str, hash_guardado: Optional[str]) -> Verificacion:
+        """Para código síncrono: espera el resultado del pool (acota los hashes simultáneos)"""
+        return self._pool.submit(self.verificar, password, hash_guardado).result()
+
+    def generar_hash_en_pool(self, password: str) -> str:
+        return self._pool.submit(self.generar_hash, password).result()
+
+    @staticmethod
+    def registrar_rehash(hash_anterior: Optional[str]) -> None:
+        origen = "sha256" if hash_anterior and _RE_SHA256.match(hash_anterior) else "bcrypt"
+        rehash_total.inc(origen=origen)
+
+# Instancia global de credenciales
+credenciales = Credenciales()
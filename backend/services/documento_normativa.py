@@ -0,0 +1,182 @@
+"""
+Documento compilado de la normativa (artículos activos con sus causales).
+
+La normativa cambia muy poco, así que se compila una sola vez a JSON (y a PDF
+bajo demanda) y se sirve desde memoria con un ETag fuerte. Unos listeners sobre la
+sesión de SQLAlchemy detectan las escrituras sobre artículos o causales y, dentro de
+la misma transacción, suben la versión "normativa" en `versiones_datos`; tras el
+commit `invalidar()` sube la versión local y el documento se recompila en la
+siguiente petición. Los demás workers comparan la versión compartida como máximo
+cada `NORMATIVA_CACHE_REVALIDAR_S` segundos, igual que `cache_finanzas`.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional, Tuple
+from sqlalchemy import asc, event, update
+from sqlalchemy.orm import Session, selectinload
+import models
+from services.metricas import medir_reporte, registrar_cache
+
+NOMBRE_VERSION = "normativa"
+
+# Cada cuánto se verifica la versión compartida (segundos); 0 = en cada lectura
+REVALIDAR_S = float(os.getenv("NORMATIVA_CACHE_REVALIDAR_S", "5"))
+
+# Modelos cuyas escrituras cambian el documento
+MODELOS_NORMATIVA = (models.ArticuloNormativa, models.CausalMulta)
+
+_MARCA_SESION = "normativa_modificada"
+
+class DocumentoNormativa:
+    """Caché versionada del documento de normativa"""
+
+    def __init__(self, revalidar_s: float = REVALIDAR_S):
+        self._lock = threading.Lock()
+        self._revalidar_s = revalidar_s
+        self._version = 0
+        self._version_compartida: Optional[int] = None
+        self._verificado_en = 0.0
+        self._json: Optional[Tuple[int, bytes, str]] = None  # (version, contenido, etag)
+        self._pdf: Optional[Tuple[int, bytes, str]] = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidar(self) -> None:
+        """Sube la versión local; el documento se recompila en la próxima lectura"""
+        with self._lock:
+            self._version += 1
+
+    @staticmethod
+    def _leer_version(db: Session) -> int:
+        version = db.query(models.VersionDatos.version)\
+            .filter(models.VersionDatos.nombre == NOMBRE_VERSION)\
+            .scalar()
+        return version or 0
+
+    @staticmethod
+    def registrar_cambio(db: Session) -> None:
+        """Sube la versión compartida dentro de la transacción en curso"""
+        actualizadas = db.execute(
+            update(models.VersionDatos.__table__)
+            .where(models.VersionDatos.__table__.c.nombre == NOMBRE_VERSION)
+            .values(version=models.VersionDatos.__table__.c.version + 1)
+        ).rowcount
+        if not actualizadas:
+            db.add(models.VersionDatos(nombre=NOMBRE_VERSION, version=1))
+
+    def _revalidar(self, db: Session) -> None:
+        """Invalida el documento local si otro worker cambió la normativa"""
+        if time.monotonic() - self._verificado_en < self._revalidar_s:
+            return
+        compartida = self._leer_version(db)
+        with self._lock:
+            if compartida != self._version_compartida:
+                self._version += 1
+                self._version_compartida = compartida
+            self._verificado_en = time.monotonic()
+
+    @staticmethod
+    def _etag(contenido: bytes) -> str:
+        # ETag fuerte derivado del contenido: igual en todos los workers para los mismos datos
+        return f'"{hashlib.sha256(contenido).hexdigest()[:32]}"'
+
+    @staticmethod
+    def _cargar_articulos(db: Session):
+        return db.query(models.ArticuloNormativa)\
+            .options(selectinload(models.ArticuloNormativa.causales))\
+            .filter(models.ArticuloNormativa.activo == True)\
+            .order_by(asc(models.ArticuloNormativa.orden_display), asc(models.ArticuloNormativa.numero_articulo))\
+            .all()
+
+    def _compilar_json(self, db: Session) -> bytes:
+        from schemas.articulos_normativa import ArticuloNormativaCompleto
+
+        articulos = self._cargar_articulos(db)
+        actualizado_en = max((a.updated_at for a in articulos if a.updated_at), default=None)
+        documento = {
+            "actualizado_en": actualizado_en.isoformat() if actualizado_en else None,
+            "total_articulos": len(articulos),
+            "articulos": [
+                ArticuloNormativaCompleto.model_validate(articulo).model_dump(mode="json")
+                for articulo in articulos
+            ],
+        }
+        return json.dumps(documento, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @medir_reporte("normativa")
+    def _compilar_pdf(self, db: Session) -> bytes:
+        from utils.pdf_generator import PDFGenerator
+
+        pdf = PDFGenerator(title="Normativa del Equipo", author="Sistema de Gestión Deportiva")
+        pdf.add_header("📘 Normativa del Equipo")
+        for articulo in self._cargar_articulos(db):
+            pdf.add_section_title(f"Artículo {articulo.numero_articulo}. {articulo.titulo}")
+            pdf.add_paragraph(articulo.contenido)
+            if articulo.causales:
+                pdf.add_table(
+                    data=[[causal.descripcion, f"${causal.valor:,.0f}"] for causal in articulo.causales],
+                    headers=["Causal de multa", "Valor"]
+                )
+        pdf.add_footer_info()
+        return pdf.build_pdf().getvalue()
+
+    def _obtener(self, atributo: str, compilar, db: Session) -> Tuple[bytes, str]:
+        self._revalidar(db)
+        cache = getattr(self, atributo)
+        version = self._version
+        if cache is not None and cache[0] == version:
+            registrar_cache(f"documento_normativa{atributo}", True)
+            return cache[1], cache[2]
+
+        registrar_cache(f"documento_normativa{atributo}", False)
+        contenido = compilar(db)
+        etag = self._etag(contenido)
+        with self._lock:
+            # Si hubo una escritura mientras se compilaba, no se guarda un documento viejo como vigente
+            if self._version == version:
+                setattr(self, atributo, (version, contenido, etag))
+        return contenido, etag
+
+    def obtener_json(self, db: Session) -> Tuple[bytes, str]:
+        """Retorna (json, etag) del documento vigente, recompilando solo si cambió la versión"""
+        return self._obtener("_json", self._compilar_json, db)
+
+    def obtener_pdf(self, db: Session) -> Tuple[bytes, str]:
+        """Retorna (pdf, etag) del documento vigente, recompilando solo si cambió la versión"""
+        return self._obtener("_pdf", self._compilar_pdf, db)
+
+# Instancia global del documento de normativa
+documento_normativa = DocumentoNormativa()
+
+def _marcar_cambio(session: Session) -> None:
+    if not session.info.get(_MARCA_SESION):
+        session.info[_MARCA_SESION] = True
+        DocumentoNormativa.registrar_cambio(session)
+
+@event.listens_for(Session, "before_flush")
+def _detectar_escrituras(session, flush_context, instances):
+    for objeto in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(objeto, MODELOS_NORMATIVA):
+            _marcar_cambio(session)
+            return
+
+@event.listens_for(Session, "do_orm_execute")
+def _detectar_escrituras_masivas(estado):
+    if (estado.is_update or estado.is_delete) and estado.bind_mapper is not None \
+            and issubclass(estado.bind_mapper.class_, MODELOS_NORMATIVA):
+        _marcar_cambio(estado.session)
+
+@event.listens_for(Session, "after_commit")
+def _despues_del_commit(session):
+    if session.info.pop(_MARCA_SESION, False):
+        documento_normativa.invalidar()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _despues_del_rollback(session, transaccion_previa):
+    session.info.pop(_MARCA_SESION, None)
@@ -1,8 +1,6 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
-from typing import Optional
+from sqlalchemy.orm import Session
+from services.bandeja_correo import bandeja_correo, ConexionSMTP
 
 class EmailService:
     def __init__(self):
@@ -13,14 +11,13 @@ class EmailService:
         self.sender_password = os.getenv("SENDER_PASSWORD", "")
         self.sender_name = os.getenv("SENDER_NAME", "Equipo de Fútbol")
         
-    def send_password_reset_email(self, to_email: str, token: str, recipient_name: str = "Administrador") -> bool:
-        """Envía email de recuperación de contraseña"""
+    def send_password_reset_email(self, db: Session, to_email: str, token: str, recipient_name: str = "Administrador") -> bool:
+        """
+        Encola el email de recuperación de contraseña en la bandeja de salida.
+        El envío SMTP lo hace el enviador en segundo plano (services/bandeja_correo.py).
+        """
         try:
-            # Crear mensaje
-            msg = MIMEMultipart()
-            msg['From'] = f"{self.sender_name} <{self.sender_email}>"
-            msg['To'] = to_email
-            msg['Subject'] = "Recuperación de Contraseña - Sistema de Gestión del Equipo"
+            asunto = "Recuperación de Contraseña - Sistema de Gestión del Equipo"
             
             # URL de reset
             reset_url = f"http://localhost:5173/reset-password?token={token}&email={to_email}"
@@ -83,11 +80,8 @@ class EmailService:
             </html>
             """
             
-            # Agregar el cuerpo HTML
-            msg.attach(MIMEText(html_body, 'html', 'utf-8'))
-            
-            # Si no hay configuración de email, simular envío
-            if not self.sender_email or not self.sender_password:
+            # Si no hay configuración de email, mostrar el enlace en consola (el envío se simula)
+            if not self.sender_email:
                 print("=" * 60)
                 print("📧 SIMULACIÓN DE EMAIL - CONFIGURACIÓN PENDIENTE")
                 print("=" * 60)
@@ -102,22 +96,14 @@ class EmailService:
                 print("   - SENDER_PASSWORD (contraseña de aplicación)")
                 print("   - SMTP_SERVER (opcional, default: smtp.gmail.com)")
                 print("=" * 60)
-                return True
-            
-            # Conectar y enviar email real
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.sender_email, self.sender_password)
-            
-            text = msg.as_string()
-            server.sendmail(self.sender_email, to_email, text)
-            server.quit()
             
-            print(f"✅ Email de recuperación enviado exitosamente a {to_email}")
+            bandeja_correo.encolar(db, to_email, asunto, html_body, tipo="recuperacion")
+            print(f"📮 Email de recuperación encolado para {to_email}")
             return True
             
         except Exception as e:
-            print(f"❌ Error enviando email: {e}")
+            db.rollback()
+            print(f"❌ Error encolando email: {e}")
             return False
     
     def test_email_config(self) -> bool:
@@ -127,10 +113,9 @@ class EmailService:
                 print("❌ Configuración de email incompleta")
                 return False
                 
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.sender_email, self.sender_password)
-            server.quit()
+            conexion = ConexionSMTP()
+            conexion.abrir()
+            conexion.cerrar()
             
             print("✅ Configuración de email válida")
             return True
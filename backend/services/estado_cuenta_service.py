@@ -1,7 +1,67 @@
 from datetime import datetime, date
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
+from sqlalchemy import Boolean, Date, DateTime, Integer, String, event, literal, null, select, union_all, cast
 from sqlalchemy.orm import Session
-from models import Jugador, Mensualidad, Multa
+from models import CausalMulta, Jugador, Mensualidad, Multa, OtroAporte
+
+_CLAVE_MEMORIA = "movimientos_jugador"
+
+class MovimientosJugador(NamedTuple):
+    """Filas (solo columnas) de mensualidades, multas y otros aportes de un jugador"""
+    mensualidades: list
+    multas: list
+    otros_aportes: list
+
+def _consulta_movimientos(cedula: str):
+    """
+    Una sola sentencia UNION ALL con las columnas que usa el estado de cuenta.
+    El primer SELECT fija los tipos de las columnas del resultado.
+    """
+    mensualidades = select(
+        literal("mensualidad").label("tipo"),
+        Mensualidad.ano.label("ano"),
+        Mensualidad.mes.label("mes"),
+        Mensualidad.valor.label("valor"),
+        Mensualidad.fecha_pago.label("fecha"),
+        cast(null(), Date).label("fecha_multa"),
+        cast(null(), String).label("texto"),
+        cast(null(), Boolean).label("pagada"),
+    ).where(Mensualidad.jugador_cedula == cedula)
+    multas = select(
+        literal("multa"), cast(null(), Integer), cast(null(), Integer),
+        Multa.valor, Multa.fecha_pago, Multa.fecha_multa, CausalMulta.descripcion, Multa.pagada,
+    ).join(CausalMulta, CausalMulta.id == Multa.causal_id).where(Multa.jugador_cedula == cedula)
+    aportes = select(
+        literal("aporte"), cast(null(), Integer), cast(null(), Integer),
+        OtroAporte.valor, OtroAporte.fecha_aporte, cast(null(), Date), OtroAporte.concepto, cast(null(), Boolean),
+    ).where(OtroAporte.jugador_cedula == cedula)
+    return union_all(mensualidades, multas, aportes)
+
+def cargar_movimientos(db: Session, cedula: str) -> MovimientosJugador:
+    """
+    Movimientos de un jugador, memorizados en la sesión (una sesión por petición):
+    el estado de cuenta y el cálculo de "al día" comparten las mismas filas.
+    Cualquier flush de la sesión descarta la memoria.
+    """
+    memoria = db.info.setdefault(_CLAVE_MEMORIA, {})
+    if cedula not in memoria:
+        movimientos = MovimientosJugador([], [], [])
+        for fila in db.execute(_consulta_movimientos(cedula)):
+            if fila.tipo == "mensualidad":
+                movimientos.mensualidades.append(fila)
+            elif fila.tipo == "multa":
+                movimientos.multas.append(fila)
+            else:
+                movimientos.otros_aportes.append(fila)
+        movimientos.mensualidades.sort(key=lambda m: (m.ano, m.mes))
+        movimientos.multas.sort(key=lambda m: m.fecha_multa)
+        movimientos.otros_aportes.sort(key=lambda a: a.fecha)
+        memoria[cedula] = movimientos
+    return memoria[cedula]
+
+@event.listens_for(Session, "after_flush")
+def _olvidar_movimientos(session, flush_context):
+    session.info.pop(_CLAVE_MEMORIA, None)
 
 class EstadoCuentaService:
     @staticmethod
@@ -22,12 +82,8 @@ class EstadoCuentaService:
         """
         
         # 1. Verificar multas pendientes (aplica para todos)
-        multas_pendientes = db.query(Multa).filter(
-            Multa.jugador_cedula == jugador.cedula,
-            Multa.pagada == False
-        ).count()
-        
-        if multas_pendientes > 0:
+        movimientos = cargar_movimientos(db, jugador.cedula)
+        if any(not multa.pagada for multa in movimientos.multas):
             return False
         
         # 2. Solo los arqueros no pagan mensualidades
@@ -58,13 +114,8 @@ class EstadoCuentaService:
             año_inscripcion, mes_inscripcion, año_actual, mes_actual
         )
         
-        # Obtener mensualidades pagadas
-        mensualidades_pagadas = db.query(Mensualidad).filter(
-            Mensualidad.jugador_cedula == jugador.cedula
-        ).all()
-        
         # Crear set de (año, mes) pagados
-        meses_pagados = {(m.ano, m.mes) for m in mensualidades_pagadas}
+        meses_pagados = {(m.ano, m.mes) for m in cargar_movimientos(db, jugador.cedula).mensualidades}
         
         # Verificar si todos los meses requeridos están pagados
         for año, mes in meses_debe_pagar:
@@ -102,12 +153,10 @@ class EstadoCuentaService:
         Returns:
             dict con información detallada del estado
         """
-        multas_pendientes = db.query(Multa).filter(
-            Multa.jugador_cedula == jugador.cedula,
-            Multa.pagada == False
-        ).all()
+        movimientos = cargar_movimientos(db, jugador.cedula)
+        multas_pendientes = [multa for multa in movimientos.multas if not multa.pagada]
         
-        valor_multas = sum(multa.causal.valor for multa in multas_pendientes)
+        valor_multas = sum(multa.valor for multa in multas_pendientes)
         
         resultado = {
             "cedula": jugador.cedula,
@@ -132,11 +181,7 @@ class EstadoCuentaService:
                 mes_actual
             )
             
-            mensualidades_pagadas = db.query(Mensualidad).filter(
-                Mensualidad.jugador_cedula == jugador.cedula
-            ).all()
-            
-            meses_pagados = {(m.ano, m.mes) for m in mensualidades_pagadas}
+            meses_pagados = {(m.ano, m.mes) for m in movimientos.mensualidades}
             meses_pendientes = [
                 f"{año}-{mes:02d}" for año, mes in meses_debe_pagar 
                 if (año, mes) not in meses_pagados
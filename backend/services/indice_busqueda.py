@@ -0,0 +1,141 @@
+"""
+Índices de texto para la búsqueda global en causales, egresos y aportes grupales.
+
+La búsqueda encuentra el término en cualquier parte del texto y sin distinguir
+mayúsculas ni tildes ("arbitro" encuentra "Árbitro", "partido" encuentra "Llegar tarde
+al partido"). Un LIKE '%término%' recorre la tabla completa en cada pulsación; en su lugar:
+
+- PostgreSQL: índices GIN de trigramas (pg_trgm) sobre busqueda_normalizar(columna), que
+  es lower(unaccent(columna)) envuelto en una función IMMUTABLE para poder indexarlo.
+  LIKE '%término%' sobre esa expresión usa el índice (términos de 3 o más caracteres).
+- SQLite: una tabla FTS5 de contenido externo por tabla de origen, con el mismo
+  tokenizador sin tildes que la normativa (services/indice_normativa.py) y mantenida por
+  triggers. Cada palabra del término se busca como prefijo de las palabras del texto.
+
+Si el motor no permite crearlos (extensiones no instaladas, SQLite sin FTS5),
+`disponible()` retorna False y `filtro()` vuelve a LIKE '%término%' sobre lower(columna).
+"""
+
+import re
+import weakref
+from typing import Dict, List, NamedTuple, Tuple
+from sqlalchemy import column, false, func, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+class FuenteTexto(NamedTuple):
+    tabla: str
+    columnas: Tuple[str, ...]
+
+FUENTES: Dict[str, FuenteTexto] = {
+    "causales": FuenteTexto("causales_multa", ("descripcion",)),
+    "egresos": FuenteTexto("egresos", ("concepto", "comprobante")),
+    "aportes_grupales": FuenteTexto("multas", ("concepto_aporte",)),
+}
+
+FUNCION_POSTGRES = "busqueda_normalizar"
+
+# Disponibilidad de los índices por engine (se calcula en asegurar_indices), como en la normativa
+_disponible = weakref.WeakKeyDictionary()
+
+def _tabla_fts(fuente: FuenteTexto) -> str:
+    return f"{fuente.tabla}_busqueda_fts"
+
+def _sentencias_postgres() -> List[str]:
+    sentencias = [
+        "CREATE EXTENSION IF NOT EXISTS unaccent",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        # unaccent() no es IMMUTABLE; con el diccionario explícito sí se puede declarar así
+        f"CREATE OR REPLACE FUNCTION {FUNCION_POSTGRES}(texto text) RETURNS text "
+        f"LANGUAGE sql IMMUTABLE PARALLEL SAFE "
+        f"AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, coalesce(texto, ''))) $$",
+    ]
+    for fuente in FUENTES.values():
+        for nombre_columna in fuente.columnas:
+            sentencias.append(
+                f"CREATE INDEX IF NOT EXISTS ix_{fuente.tabla}_{nombre_columna}_trgm ON {fuente.tabla} "
+                f"USING GIN ({FUNCION_POSTGRES}({nombre_columna}) gin_trgm_ops)"
+            )
+    return sentencias
+
+def _sentencias_sqlite() -> List[str]:
+    sentencias = []
+    for fuente in FUENTES.values():
+        fts = _tabla_fts(fuente)
+        columnas = ", ".join(fuente.columnas)
+        nuevos = ", ".join(f"new.{c}" for c in fuente.columnas)
+        viejos = ", ".join(f"old.{c}" for c in fuente.columnas)
+        sentencias += [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columnas}, "
+            f"content = '{fuente.tabla}', content_rowid = 'id', "
+            f"tokenize = 'unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insertar AFTER INSERT ON {fuente.tabla} BEGIN "
+            f"INSERT INTO {fts} (rowid, {columnas}) VALUES (new.id, {nuevos}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_eliminar AFTER DELETE ON {fuente.tabla} BEGIN "
+            f"INSERT INTO {fts} ({fts}, rowid, {columnas}) VALUES ('delete', old.id, {viejos}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_actualizar AFTER UPDATE ON {fuente.tabla} BEGIN "
+            f"INSERT INTO {fts} ({fts}, rowid, {columnas}) VALUES ('delete', old.id, {viejos}); "
+            f"INSERT INTO {fts} (rowid, {columnas}) VALUES (new.id, {nuevos}); END",
+            # Repuebla desde la tabla de origen (filas anteriores a los triggers)
+            f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+        ]
+    return sentencias
+
+def disponible(db: Session) -> bool:
+    """Indica si los índices de texto están listos para el motor de la sesión"""
+    return _disponible.get(db.get_bind().engine, False)
+
+def asegurar_indices(engine: Engine) -> bool:
+    """Crea los índices (y en SQLite las tablas FTS con sus triggers) si no existen"""
+    dialecto = engine.dialect.name
+    if dialecto == "postgresql":
+        sentencias = _sentencias_postgres()
+    elif dialecto == "sqlite":
+        sentencias = _sentencias_sqlite()
+    else:
+        _disponible[engine] = False
+        return False
+    try:
+        with engine.begin() as conn:
+            for sentencia in sentencias:
+                conn.exec_driver_sql(sentencia)
+        _disponible[engine] = True
+    except Exception as e:
+        print(f"⚠️ No se pudieron crear los índices de la búsqueda global: {e}")
+        _disponible[engine] = False
+    return _disponible[engine]
+
+def _escapar_like(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def filtro_contiene(columnas, consulta: str):
+    """LIKE '%consulta%' sobre lower(columna): sin índice, recorre la tabla"""
+    if not consulta:
+        return false()
+    patron = f"%{_escapar_like(consulta)}%"
+    return or_(*(func.lower(columna).like(patron, escape="\\") for columna in columnas))
+
+def filtro(db: Session, nombre: str, id_columna, columnas, consulta: str):
+    """
+    Condición sobre la tabla de la fuente `nombre` para los textos que contienen la
+    `consulta` (ya normalizada con normalizar_texto: minúsculas y sin tildes).
+    """
+    if not consulta:
+        return false()
+    if not disponible(db):
+        return filtro_contiene(columnas, consulta)
+
+    fuente = FUENTES[nombre]
+    if db.get_bind().dialect.name == "postgresql":
+        patron = f"%{_escapar_like(consulta)}%"
+        return or_(*(getattr(func, FUNCION_POSTGRES)(columna).like(patron, escape="\\") for columna in columnas))
+
+    # Palabras sin operadores ni signos (evita inyección de sintaxis FTS), cada una como prefijo
+    terminos = re.findall(r"\w+", consulta)
+    if not terminos:
+        return false()
+    fts = _tabla_fts(fuente)
+    coincidencias = text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :consulta_fts")\
+        .bindparams(consulta_fts=" ".join(f'"{t}"*' for t in terminos))\
+        .columns(column("rowid"))
+    return id_columna.in_(coincidencias)
@@ -0,0 +1,163 @@
+"""
+Índice de texto completo para los artículos de normativa.
+
+- PostgreSQL: índice GIN sobre to_tsvector('spanish', ...) (lematización en español).
+  Es un índice de expresión, así que PostgreSQL lo mantiene solo.
+- SQLite: tabla virtual FTS5 `articulos_normativa_fts` (sin tildes, por prefijo),
+  mantenida explícitamente desde el CRUD al crear, actualizar, duplicar o eliminar.
+
+Si el motor no soporta ninguno de los dos, `disponible()` retorna False y el CRUD
+vuelve a la búsqueda con ILIKE.
+"""
+
+import re
+import weakref
+from typing import List, NamedTuple, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+TABLA_FTS = "articulos_normativa_fts"
+MARCA_INICIO = "<mark>"
+MARCA_FIN = "</mark>"
+
+def _vector_postgres(alias: str = "") -> str:
+    """Expresión tsvector indexada; debe coincidir con la del índice GIN para que se use"""
+    p = f"{alias}." if alias else ""
+    return (
+        f"to_tsvector('spanish', coalesce({p}numero_articulo, '') || ' ' || "
+        f"coalesce({p}titulo, '') || ' ' || coalesce({p}contenido, ''))"
+    )
+
+# Disponibilidad del índice por engine (se calcula en asegurar_indice). Es por base de
+# datos y no por dialecto: otra base SQLite del mismo proceso puede no tener la tabla FTS
+_disponible = weakref.WeakKeyDictionary()
+
+class ResultadoNormativa(NamedTuple):
+    id: int
+    relevancia: float
+    fragmento: Optional[str]
+
+def _dialecto(bind) -> str:
+    return bind.dialect.name
+
+def disponible(db: Session) -> bool:
+    """Indica si el índice de texto completo está listo para el motor de la sesión"""
+    return _disponible.get(db.get_bind().engine, False)
+
+def asegurar_indice(engine: Engine) -> bool:
+    """Crea el índice si no existe y, en SQLite, lo repuebla si está desactualizado"""
+    dialecto = _dialecto(engine)
+    try:
+        with engine.begin() as conn:
+            if dialecto == "postgresql":
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS idx_articulos_normativa_fts "
+                    f"ON articulos_normativa USING GIN ({_vector_postgres()})"
+                ))
+            elif dialecto == "sqlite":
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS} USING fts5("
+                    f"numero_articulo, titulo, contenido, "
+                    f"tokenize = 'unicode61 remove_diacritics 2')"
+                ))
+                total_fts = conn.execute(text(f"SELECT count(*) FROM {TABLA_FTS}")).scalar()
+                total = conn.execute(text("SELECT count(*) FROM articulos_normativa")).scalar()
+                if total_fts != total:
+                    conn.execute(text(f"DELETE FROM {TABLA_FTS}"))
+                    conn.execute(text(
+                        f"INSERT INTO {TABLA_FTS} (rowid, numero_articulo, titulo, contenido) "
+                        f"SELECT id, numero_articulo, titulo, contenido FROM articulos_normativa"
+                    ))
+            else:
+                _disponible[engine] = False
+                return False
+        _disponible[engine] = True
+    except Exception as e:
+        print(f"⚠️ No se pudo crear el índice de texto completo de normativa: {e}")
+        _disponible[engine] = False
+    return _disponible[engine]
+
+def sincronizar_articulo(db: Session, articulo) -> None:
+    """Actualiza la entrada del índice de un artículo (solo necesario en SQLite)"""
+    if not disponible(db) or _dialecto(db.get_bind()) != "sqlite":
+        return
+    db.execute(text(f"DELETE FROM {TABLA_FTS} WHERE rowid = :id"), {"id": articulo.id})
+    db.execute(
+        text(
+            f"INSERT INTO {TABLA_FTS} (rowid, numero_articulo, titulo, contenido) "
+            f"VALUES (:id, :numero_articulo, :titulo, :contenido)"
+        ),
+        {
+            "id": articulo.id,
+            "numero_articulo": articulo.numero_articulo,
+            "titulo": articulo.titulo,
+            "contenido": articulo.contenido,
+        }
+    )
+
+def eliminar_articulo(db: Session, articulo_id: int) -> None:
+    """Quita un artículo eliminado físicamente del índice (solo necesario en SQLite)"""
+    if not disponible(db) or _dialecto(db.get_bind()) != "sqlite":
+        return
+    db.execute(text(f"DELETE FROM {TABLA_FTS} WHERE rowid = :id"), {"id": articulo_id})
+
+def _terminos(consulta: str) -> List[str]:
+    """Palabras de la consulta sin operadores ni signos (evita inyección de sintaxis FTS)"""
+    return re.findall(r"\w+", consulta.lower())
+
+def buscar(
+    db: Session,
+    consulta: str,
+    solo_activos: bool = True,
+    tipo: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> List[ResultadoNormativa]:
+    """
+    Busca artículos por relevancia. Cada palabra se busca por prefijo y todas deben aparecer.
+    Retorna (id, relevancia, fragmento resaltado con <mark>) ordenado de mayor a menor relevancia.
+    """
+    terminos = _terminos(consulta)
+    if not terminos:
+        return []
+
+    filtros = []
+    parametros = {"skip": skip, "limit": limit}
+    if solo_activos:
+        filtros.append("a.activo = :activo")
+        parametros["activo"] = True
+    if tipo:
+        filtros.append("a.tipo = :tipo")
+        parametros["tipo"] = tipo
+
+    if _dialecto(db.get_bind()) == "postgresql":
+        parametros["consulta"] = " & ".join(f"{t}:*" for t in terminos)
+        condiciones = " AND ".join([f"{_vector_postgres('a')} @@ q.query"] + filtros)
+        sql = f"""
+            SELECT a.id,
+                   ts_rank({_vector_postgres('a')}, q.query) AS relevancia,
+                   ts_headline('spanish', a.contenido, q.query,
+                               'StartSel={MARCA_INICIO}, StopSel={MARCA_FIN}, MaxWords=35, MinWords=15') AS fragmento
+            FROM articulos_normativa a, to_tsquery('spanish', :consulta) AS q(query)
+            WHERE {condiciones}
+            ORDER BY relevancia DESC, a.orden_display, a.numero_articulo
+            OFFSET :skip LIMIT :limit
+        """
+    else:
+        parametros["consulta"] = " ".join(f'"{t}"*' for t in terminos)
+        condiciones = " AND ".join([f"{TABLA_FTS} MATCH :consulta"] + filtros)
+        # bm25 es menor cuanto más relevante: se invierte el signo para ordenar igual que en PostgreSQL
+        sql = f"""
+            SELECT a.id,
+                   -bm25({TABLA_FTS}, 10.0, 5.0, 1.0) AS relevancia,
+                   snippet({TABLA_FTS}, 2, '{MARCA_INICIO}', '{MARCA_FIN}', '…', 24) AS fragmento
+            FROM {TABLA_FTS}
+            JOIN articulos_normativa a ON a.id = {TABLA_FTS}.rowid
+            WHERE {condiciones}
+            ORDER BY relevancia DESC, a.orden_display, a.numero_articulo
+            LIMIT :limit OFFSET :skip
+        """
+
+    filas = db.execute(text(sql), parametros).all()
+    return [ResultadoNormativa(fila.id, float(fila.relevancia), fila.fragmento) for fila in filas]
@@ -0,0 +1,144 @@
+"""
+Instrumentación de las consultas SQL por petición.
+
+Un listener sobre los eventos de SQLAlchemy anota cada sentencia en el registro de
+la petición en curso (guardado en un ContextVar, así que funciona también en los
+endpoints síncronos que FastAPI ejecuta en el threadpool). El middleware
+`instrumentar_peticion` agrega el encabezado `Server-Timing`, imprime las
+sentencias repetidas (posible N+1) y, para pruebas, `presupuesto_consultas()` y
+`verificar_presupuesto()` fallan si un bloque o un endpoint ejecuta más consultas
+de las permitidas.
+
+Variables de entorno:
+- SQL_INSTRUMENTACION: "0" para desactivar el middleware (por defecto activo)
+- SQL_N_MAS_1_UMBRAL: repeticiones de una misma sentencia para marcarla como N+1 (10)
+- SQL_PETICION_LENTA_MS: tiempo en BD a partir del cual se imprimen las sentencias más lentas (500)
+"""
+
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+INSTRUMENTACION_ACTIVA = os.getenv("SQL_INSTRUMENTACION", "1") != "0"
+UMBRAL_N_MAS_1 = int(os.getenv("SQL_N_MAS_1_UMBRAL", "10"))
+PETICION_LENTA_MS = float(os.getenv("SQL_PETICION_LENTA_MS", "500"))
+MAX_LENTAS = 3
+
+_registro_actual: ContextVar[Optional["RegistroConsultas"]] = ContextVar("registro_consultas", default=None)
+
+_RE_LISTA_PARAMETROS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)|\((?:\s*%\(\w+\)s\s*,)+\s*%\(\w+\)s\s*\)")
+_RE_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+def forma_sentencia(sql: str) -> str:
+    """Normaliza una sentencia para agrupar las que solo difieren en literales o tamaño de IN (...)"""
+    forma = _RE_LISTA_PARAMETROS.sub("(?)", sql)
+    forma = _RE_LITERALES.sub("?", forma)
+    return _RE_ESPACIOS.sub(" ", forma).strip()
+
+class RegistroConsultas:
+    """Consultas ejecutadas durante una petición (o un bloque de código)"""
+
+    def __init__(self):
+        self.total = 0
+        self.duracion_ms = 0.0
+        self.formas: Counter = Counter()
+        self.lentas: List[Tuple[float, str]] = []
+
+    def anotar(self, sql: str, duracion_ms: float) -> None:
+        self.total += 1
+        self.duracion_ms += duracion_ms
+        self.formas[forma_sentencia(sql)] += 1
+        if len(self.lentas) < MAX_LENTAS or duracion_ms > self.lentas[-1][0]:
+            self.lentas.append((duracion_ms, sql))
+            self.lentas.sort(key=lambda item: -item[0])
+            del self.lentas[MAX_LENTAS:]
+
+    def repetidas(self, umbral: int = UMBRAL_N_MAS_1) -> List[Tuple[str, int]]:
+        """Sentencias ejecutadas `umbral` veces o más (patrón típico de N+1)"""
+        return [(forma, veces) for forma, veces in self.formas.most_common() if veces >= umbral]
+
+    def resumen(self, maximo: int = 5) -> str:
+        lineas = [f"{self.total} consultas, {self.duracion_ms:.1f} ms"]
+        lineas += [f"  {veces} x {forma[:160]}" for forma, veces in self.formas.most_common(maximo)]
+        return "\n".join(lineas)
+
+# Listeners globales: cuestan un ContextVar.get() cuando no hay registro activo
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _registro_actual.get() is not None:
+        conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    registro = _registro_actual.get()
+    inicios = conn.info.get("inicio_consultas")
+    if registro is None or not inicios:
+        return
+    registro.anotar(statement, (time.perf_counter() - inicios.pop()) * 1000)
+
+@contextmanager
+def registrar_consultas():
+    """Registra las consultas ejecutadas dentro del bloque"""
+    registro = RegistroConsultas()
+    token = _registro_actual.set(registro)
+    try:
+        yield registro
+    finally:
+        _registro_actual.reset(token)
+
+@contextmanager
+def presupuesto_consultas(maximo: int):
+    """Para pruebas: falla si el bloque ejecuta más de `maximo` consultas"""
+    with registrar_consultas() as registro:
+        yield registro
+    assert registro.total <= maximo, (
+        f"Se esperaban como máximo {maximo} consultas y se ejecutaron {registro.resumen()}"
+    )
+
+def verificar_presupuesto(respuesta, maximo: int):
+    """
+    Para pruebas de endpoints: falla si la petición ejecutó más de `maximo` consultas.
+    Usa el encabezado X-DB-Consultas del middleware, porque TestClient atiende la
+    petición en otro hilo y el registro del bloque que llama no la vería.
+    """
+    total = int(respuesta.headers["X-DB-Consultas"])
+    assert total <= maximo, (
+        f"{respuesta.request.method} {respuesta.request.url.path}: se esperaban como máximo "
+        f"{maximo} consultas y se ejecutaron {total}"
+    )
+    return respuesta
+
+def encabezado_server_timing(registro: RegistroConsultas, total_ms: float) -> str:
+    return (
+        f'db;dur={registro.duracion_ms:.1f};desc="{registro.total} consultas", '
+        f"app;dur={total_ms:.1f}"
+    )
+
+async def instrumentar_peticion(request, call_next):
+    """Middleware HTTP: Server-Timing por petición y aviso de posibles N+1"""
+    if not INSTRUMENTACION_ACTIVA:
+        return await call_next(request)
+
+    inicio = time.perf_counter()
+    with registrar_consultas() as registro:
+        response = await call_next(request)
+    total_ms = (time.perf_counter() - inicio) * 1000
+
+    response.headers["Server-Timing"] = encabezado_server_timing(registro, total_ms)
+    response.headers["X-DB-Consultas"] = str(registro.total)
+
+    for forma, veces in registro.repetidas():
+        print(f"⚠️ Posible N+1 en {request.method} {request.url.path}: {veces} x {forma[:200]}")
+    if registro.duracion_ms >= PETICION_LENTA_MS:
+        print(f"🐢 {request.method} {request.url.path}: {registro.total} consultas en {registro.duracion_ms:.1f} ms")
+        for duracion_ms, sql in registro.lentas:
+            print(f"   {duracion_ms:.1f} ms - {_RE_ESPACIOS.sub(' ', sql)[:200]}")
+    return response
@@ -0,0 +1,273 @@
+"""
+Límites de tasa (token bucket) y control de admisión por clase de endpoint.
+
+Login, recuperación de contraseña y exportación de PDF no tenían ningún freno: una
+ráfaga ocupaba el worker (bcrypt, envío de correos, renderizado de reportes) y dejaba sin
+servicio al resto de la API. Dos mecanismos, ambos responden 429 con Retry-After:
+
+- Cubetas de tokens por regla y clave (IP del cliente o correo normalizado). Cada
+  cubeta admite ráfagas de hasta `capacidad` peticiones y se rellena a razón de
+  `capacidad / periodo` por segundo. Las reglas se configuran como "capacidad/segundos".
+- Semáforos por clase de trabajo (reportes): si todos los cupos están ocupados la
+  petición se rechaza de inmediato en vez de encolarse detrás de trabajos lentos.
+
+Las cubetas viven en memoria del proceso. Con LIMITES_ALMACEN=sqlite:///ruta se guardan en
+un archivo SQLite que comparten los workers del mismo servidor (un sustituto local de un
+almacén compartido como Redis: cualquier objeto con el método `consumir` sirve). Los
+semáforos siempre son por proceso, porque limitan el trabajo que hace cada worker.
+
+La IP sale de `request.client.host`. Si la conexión viene de un proxy confiable
+(LIMITES_PROXIES_CONFIABLES), se recorre X-Forwarded-For de derecha a izquierda y se toma
+el primer salto que no es un proxy confiable: lo que el cliente escriba a la izquierda del
+encabezado no le sirve para cambiar de cubeta. Sin proxies configurados el encabezado se
+ignora (detrás del proxy de Render todos compartirían una cubeta, ver start.sh).
+
+Variables de entorno:
+- LIMITES_HABILITADO: "0" desactiva límites y semáforos (1)
+- LIMITES_ALMACEN: "memoria" o "sqlite:///ruta/archivo.db" (memoria)
+- LIMITES_PROXIES_CONFIABLES: IPs o redes CIDR de los proxies, separadas por comas (ninguno)
+- LIMITE_LOGIN_IP, LIMITE_LOGIN_EMAIL: intentos de login (20/60, 5/300)
+- LIMITE_RECUPERACION_IP, LIMITE_RECUPERACION_EMAIL: solicitudes de recuperación (5/300, 3/3600)
+- LIMITE_REPORTES_IP: exportaciones de PDF (10/60)
+- CONCURRENCIA_REPORTES: reportes PDF generándose a la vez por worker (2)
+
+Los correos ya no se envían dentro de la petición: la bandeja de salida
+(services/bandeja_correo.py) los despacha con un solo hilo por worker.
+"""
+
+import ipaddress
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+from fastapi import HTTPException, Request
+from services.metricas import metricas
+
+HABILITADO = os.getenv("LIMITES_HABILITADO", "1") != "0"
+ALMACEN = os.getenv("LIMITES_ALMACEN", "memoria")
+PROXIES_CONFIABLES = os.getenv("LIMITES_PROXIES_CONFIABLES", "")
+
+REGLAS_POR_DEFECTO = {
+    "login_ip": "20/60",
+    "login_email": "5/300",
+    "recuperacion_ip": "5/300",
+    "recuperacion_email": "3/3600",
+    "reportes_ip": "10/60",
+}
+CONCURRENCIA_POR_DEFECTO = {
+    "reportes": 2,
+}
+
+# Tope de cubetas en memoria (una por regla y clave); al alcanzarlo se descartan las ya llenas
+MAX_CUBETAS = 10000
+
+rechazos_total = metricas.contador(
+    "rate_limit_rejections_total", "Peticiones rechazadas con 429 por límite de tasa o admisión", ("regla",)
+)
+
+class Regla(NamedTuple):
+    capacidad: int
+    periodo: float  # segundos para rellenar la cubeta completa
+
+    @property
+    def por_segundo(self) -> float:
+        return self.capacidad / self.periodo
+
+    @classmethod
+    def desde_texto(cls, texto: str) -> "Regla":
+        capacidad, periodo = texto.split("/")
+        regla = cls(int(capacidad), float(periodo))
+        if regla.capacidad < 1 or regla.periodo <= 0:
+            raise ValueError(f"Regla de límite inválida: {texto}")
+        return regla
+
+class AlmacenMemoria:
+    """Cubetas en un diccionario del proceso: clave -> (tokens, último relleno, periodo)"""
+
+    def __init__(self, max_cubetas: int = MAX_CUBETAS):
+        self._cubetas: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._max_cubetas = max_cubetas
+
+    def consumir(self, clave: str, regla: Regla, ahora: Optional[float] = None) -> float:
+        """Toma un token; devuelve 0 si se admitió o los segundos hasta que haya uno"""
+        ahora = time.monotonic() if ahora is None else ahora
+        with self._lock:
+            tokens, ultimo, _ = self._cubetas.get(clave, (regla.capacidad, ahora, regla.periodo))
+            tokens = min(regla.capacidad, tokens + (ahora - ultimo) * regla.por_segundo)
+            if tokens < 1:
+                self._cubetas[clave] = (tokens, ahora, regla.periodo)
+                return (1 - tokens) / regla.por_segundo
+            if len(self._cubetas) >= self._max_cubetas and clave not in self._cubetas:
+                self._purgar(ahora)
+            self._cubetas[clave] = (tokens - 1, ahora, regla.periodo)
+            return 0.0
+
+    def _purgar(self, ahora: float) -> None:
+        # Una cubeta que lleva un periodo completo sin uso está llena: equivale a no tenerla
+        self._cubetas = {clave: cubeta for clave, cubeta in self._cubetas.items()
+                         if ahora - cubeta[1] < cubeta[2]}
+        if len(self._cubetas) >= self._max_cubetas:
+            self._cubetas.clear()
+
+class AlmacenSQLite:
+    """
+    Cubetas en un archivo SQLite compartido por los workers del servidor. Cada consumo es
+    una transacción BEGIN IMMEDIATE, así que dos procesos no toman el mismo token.
+    """
+
+    # Cada tantos consumos se borran las cubetas sin uso en un día (ninguna regla dura más)
+    LIMPIAR_CADA = 1000
+    ANTIGUEDAD_MAXIMA_S = 86400
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._consumos = 0
+        with self._conexion() as conexion:
+            conexion.execute(
+                "CREATE TABLE IF NOT EXISTS cubetas (clave TEXT PRIMARY KEY, tokens REAL NOT NULL, ultimo REAL NOT NULL)"
+            )
+
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def consumir(self, clave: str, regla: Regla, ahora: Optional[float] = None) -> float:
+        # Reloj de pared: el monotónico no es comparable entre procesos
+        ahora = time.time() if ahora is None else ahora
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            fila = conexion.execute("SELECT tokens, ultimo FROM cubetas WHERE clave = ?", (clave,)).fetchone()
+            tokens, ultimo = fila if fila else (regla.capacidad, ahora)
+            tokens = min(regla.capacidad, tokens + max(ahora - ultimo, 0) * regla.por_segundo)
+            espera = 0.0 if tokens >= 1 else (1 - tokens) / regla.por_segundo
+            conexion.execute(
+                "INSERT OR REPLACE INTO cubetas (clave, tokens, ultimo) VALUES (?, ?, ?)",
+                (clave, tokens - 1 if espera == 0 else tokens, ahora)
+            )
+            self._consumos += 1
+            if self._consumos % self.LIMPIAR_CADA == 0:
+                conexion.execute("DELETE FROM cubetas WHERE ultimo < ?", (ahora - self.ANTIGUEDAD_MAXIMA_S,))
+            conexion.execute("COMMIT")
+            return espera
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+
+def crear_almacen(configuracion: str = ALMACEN):
+    if configuracion.startswith("sqlite:///"):
+        return AlmacenSQLite(configuracion[len("sqlite:///"):])
+    if configuracion != "memoria":
+        raise ValueError(f"LIMITES_ALMACEN no soportado: {configuracion}")
+    return AlmacenMemoria()
+
+def _error_429(detalle: str, espera: float, regla: str) -> HTTPException:
+    rechazos_total.inc(regla=regla)
+    return HTTPException(status_code=429, detail=detalle,
+                         headers={"Retry-After": str(max(1, math.ceil(espera)))})
+
+class Limites:
+    """Reglas de tasa y semáforos de admisión del proceso"""
+
+    def __init__(self, almacen=None, reglas: Optional[Dict[str, str]] = None,
+                 concurrencia: Optional[Dict[str, int]] = None, habilitado: bool = HABILITADO):
+        self.habilitado = habilitado
+        self.almacen = almacen if almacen is not None else crear_almacen()
+        reglas = reglas or {nombre: os.getenv(f"LIMITE_{nombre.upper()}", valor)
+                            for nombre, valor in REGLAS_POR_DEFECTO.items()}
+        self.reglas = {nombre: Regla.desde_texto(texto) for nombre, texto in reglas.items()}
+        concurrencia = concurrencia or {clase: int(os.getenv(f"CONCURRENCIA_{clase.upper()}", cupos))
+                                        for clase, cupos in CONCURRENCIA_POR_DEFECTO.items()}
+        self._semaforos = {clase: threading.BoundedSemaphore(cupos) for clase, cupos in concurrencia.items()}
+        self._cupos = dict(concurrencia)
+        self._en_uso = {clase: 0 for clase in concurrencia}
+        self._lock = threading.Lock()
+
+    def verificar(self, nombre: str, clave: Optional[str]) -> None:
+        """Consume un token de la regla para la clave; 429 con Retry-After si no hay"""
+        if not self.habilitado or not clave:
+            return
+        espera = self.almacen.consumir(f"{nombre}:{clave}", self.reglas[nombre])
+        if espera > 0:
+            raise _error_429("Demasiadas solicitudes, intenta de nuevo más tarde", espera, nombre)
+
+    @contextmanager
+    def admitir(self, clase: str, reintentar_en: float = 5):
+        """Ocupa un cupo de la clase mientras dura el bloque; 429 si están todos ocupados"""
+        if not self.habilitado:
+            yield
+            return
+        semaforo = self._semaforos[clase]
+        if not semaforo.acquire(blocking=False):
+            raise _error_429("Servidor ocupado, intenta de nuevo en unos segundos", reintentar_en, clase)
+        with self._lock:
+            self._en_uso[clase] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._en_uso[clase] -= 1
+            semaforo.release()
+
+    def en_uso(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return {(clase,): usados for clase, usados in self._en_uso.items()}
+
+Red = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+def redes_confiables(texto: str) -> Tuple[Red, ...]:
+    """Redes de "10.0.0.0/8, 127.0.0.1"; una IP sola es una red de una dirección"""
+    return tuple(ipaddress.ip_network(parte.strip(), strict=False) for parte in texto.split(",") if parte.strip())
+
+_PROXIES = redes_confiables(PROXIES_CONFIABLES)
+
+def _es_proxy(ip: str, proxies: Sequence[Red]) -> bool:
+    try:
+        direccion = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(direccion in red for red in proxies)
+
+def ip_cliente(request: Request, proxies: Optional[Sequence[Red]] = None) -> Optional[str]:
+    """IP con la que se cuentan los límites: el salto más a la derecha que no es un proxy confiable"""
+    proxies = _PROXIES if proxies is None else proxies
+    ip = request.client.host if request.client else None
+    if not ip or not _es_proxy(ip, proxies):
+        return ip
+    saltos = [salto.strip() for valor in request.headers.getlist("x-forwarded-for") for salto in valor.split(",")]
+    for salto in reversed([salto for salto in saltos if salto]):
+        if not _es_proxy(salto, proxies):
+            return salto
+        ip = salto
+    return ip
+
+# Instancia global de límites
+limites = Limites()
+
+metricas.medidor(
+    "admission_slots_in_use", "Cupos de admisión ocupados por clase de trabajo", ("clase",),
+    funcion=limites.en_uso
+)
+
+# Dependencias para las rutas
+
+def limitar_login(request: Request) -> None:
+    limites.verificar("login_ip", ip_cliente(request))
+
+def limitar_recuperacion(request: Request) -> None:
+    limites.verificar("recuperacion_ip", ip_cliente(request))
+
+async def admitir_reporte(request: Request):
+    """Límite por IP y cupo de renderizado durante toda la generación del PDF"""
+    limites.verificar("reportes_ip", ip_cliente(request))
+    with limites.admitir("reportes"):
+        yield
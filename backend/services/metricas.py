@@ -0,0 +1,248 @@
+"""
+Métricas en proceso con salida en formato de texto de Prometheus (GET /metrics).
+
+Colectores propios y livianos (un lock por métrica, sin dependencias externas):
+- Contador: solo sube (peticiones, aciertos/fallos de caché, correos)
+- Medidor: valor puntual, fijo o calculado al momento de exponer (peticiones en curso, pool de BD)
+- Histograma: buckets acumulados, suma y conteo (latencias, duración de reportes)
+
+Cada proceso de uvicorn expone sus propias métricas; el scraper debe consultar cada worker.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_REPORTES = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _etiquetas(nombres: Sequence[str], valores: Tuple, extra: str = "") -> str:
+    partes = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas: Dict[str, str]) -> Tuple:
+        return tuple(str(etiquetas.get(nombre, "")) for nombre in self.etiquetas)
+
+    def exponer(self) -> List[str]:
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"] + self._muestras()
+
+    def _muestras(self) -> List[str]:
+        raise NotImplementedError
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple, float] = {}
+
+    def inc(self, cantidad: float = 1, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def valor(self, **etiquetas) -> float:
+        return self._valores.get(self._clave(etiquetas), 0)
+
+    def _muestras(self) -> List[str]:
+        with self._lock:
+            valores = list(self._valores.items())
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}" for clave, valor in valores]
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 funcion: Optional[Callable[[], Dict[Tuple, float]]] = None):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple, float] = {}
+        # Si se da `funcion`, los valores se calculan al exponer: {(etiquetas...): valor}
+        self._funcion = funcion
+
+    def inc(self, cantidad: float = 1, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def dec(self, cantidad: float = 1, **etiquetas) -> None:
+        self.inc(-cantidad, **etiquetas)
+
+    def set(self, valor: float, **etiquetas) -> None:
+        with self._lock:
+            self._valores[self._clave(etiquetas)] = valor
+
+    def _muestras(self) -> List[str]:
+        if self._funcion is not None:
+            try:
+                valores = list(self._funcion().items())
+            except Exception as e:
+                print(f"Error calculando la métrica {self.nombre}: {e}")
+                valores = []
+        else:
+            with self._lock:
+                valores = list(self._valores.items())
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}" for clave, valor in valores]
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple, List[float]] = {}  # clave -> [conteo por bucket..., suma]
+
+    def observar(self, valor: float, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [0] * len(self.buckets) + [0.0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[i] += 1
+                    break
+            serie[-1] += valor
+
+    @contextmanager
+    def medir(self, **etiquetas):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **etiquetas)
+
+    def conteo(self, **etiquetas) -> int:
+        serie = self._series.get(self._clave(etiquetas))
+        return int(sum(serie[:-1])) if serie else 0
+
+    def _muestras(self) -> List[str]:
+        with self._lock:
+            series = [(clave, list(serie)) for clave, serie in self._series.items()]
+        lineas = []
+        for clave, serie in series:
+            acumulado = 0
+            for limite, cantidad in zip(self.buckets, serie[:-1]):
+                acumulado += cantidad
+                le = 'le="' + _numero(limite) + '"'
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, le)} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(serie[-1])}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {acumulado}")
+        return lineas
+
+class RegistroMetricas:
+    """Conjunto de métricas expuestas en /metrics"""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        # Idempotente: un segundo registro con el mismo nombre retorna la métrica existente
+        return self._metricas.setdefault(metrica.nombre, metrica)
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Contador:
+        return self.registrar(Contador(nombre, ayuda, etiquetas))
+
+    def medidor(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (), funcion=None) -> Medidor:
+        return self.registrar(Medidor(nombre, ayuda, etiquetas, funcion))
+
+    def histograma(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                   buckets: Sequence[float] = BUCKETS_LATENCIA) -> Histograma:
+        return self.registrar(Histograma(nombre, ayuda, etiquetas, buckets))
+
+    def exponer(self) -> str:
+        lineas = []
+        for metrica in self._metricas.values():
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+# Registro global de métricas del proceso
+metricas = RegistroMetricas()
+
+peticiones_total = metricas.contador(
+    "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status")
+)
+duracion_peticiones = metricas.histograma(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP por ruta", ("method", "route")
+)
+peticiones_en_curso = metricas.medidor(
+    "http_requests_in_flight", "Peticiones HTTP en curso", ("method",)
+)
+duracion_reportes = metricas.histograma(
+    "reporte_render_duration_seconds", "Tiempo de generación de reportes PDF", ("reporte",), BUCKETS_REPORTES
+)
+cache_aciertos = metricas.contador("cache_hits_total", "Lecturas servidas desde caché", ("cache",))
+cache_fallos = metricas.contador("cache_misses_total", "Lecturas que tuvieron que recalcular la caché", ("cache",))
+correos_enviados = metricas.contador("email_enviados_total", "Correos enviados por resultado", ("resultado",))
+
+def registrar_cache(cache: str, acierto: bool) -> None:
+    (cache_aciertos if acierto else cache_fallos).inc(cache=cache)
+
+def registrar_pool(engine) -> None:
+    """Expone el uso del pool de conexiones del engine (si el pool lo reporta)"""
+    def uso_pool():
+        pool = engine.pool
+        valores = {}
+        for estado, metodo in (("en_uso", "checkedout"), ("disponibles", "checkedin"),
+                               ("tamano", "size"), ("desborde", "overflow")):
+            if hasattr(pool, metodo):
+                valores[(estado,)] = getattr(pool, metodo)()
+        return valores
+
+    metricas.medidor("db_pool_connections", "Conexiones del pool de base de datos", ("estado",), uso_pool)
+
+def medir_reporte(nombre: str):
+    """Decorador: registra la duración de una función (sync o async) que genera un reporte"""
+    def decorador(funcion):
+        if asyncio.iscoroutinefunction(funcion):
+            @functools.wraps(funcion)
+            async def envoltura_async(*args, **kwargs):
+                with duracion_reportes.medir(reporte=nombre):
+                    return await funcion(*args, **kwargs)
+            return envoltura_async
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with duracion_reportes.medir(reporte=nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+async def medir_peticion(request, call_next):
+    """Middleware HTTP: latencia por plantilla de ruta, conteo por estado y peticiones en curso"""
+    metodo = request.method
+    peticiones_en_curso.inc(method=metodo)
+    inicio = time.perf_counter()
+    estado = 500
+    try:
+        response = await call_next(request)
+        estado = response.status_code
+        return response
+    finally:
+        peticiones_en_curso.dec(method=metodo)
+        # Plantilla de la ruta (/api/jugadores/{cedula}) para no crear una serie por cada valor
+        ruta = getattr(request.scope.get("route"), "path", "sin_ruta")
+        duracion_peticiones.observar(time.perf_counter() - inicio, method=metodo, route=ruta)
+        peticiones_total.inc(method=metodo, route=ruta, status=str(estado))
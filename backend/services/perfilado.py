@@ -0,0 +1,272 @@
+"""
+Perfilado de peticiones bajo demanda.
+
+Una petición se perfila cuando trae una firma válida en el encabezado `X-Perfilar`
+(o en el parámetro `?perfilar=`), o al azar según `PERFILADO_MUESTREO` para tener un
+perfilado continuo de baja frecuencia. Mientras la petición corre, un hilo muestrea
+las pilas de llamadas cada `PERFILADO_INTERVALO_MS`; al terminar se guarda un flame
+graph HTML autocontenido y las pilas en formato "folded" (speedscope, flamegraph.pl)
+en `PERFILADO_DIRECTORIO`. La respuesta indica el artefacto en `X-Perfil` y se
+consulta en GET /api/admin/perfiles/{nombre} (con sesión de administrador).
+
+Se muestrean todos los hilos (los endpoints síncronos corren en el threadpool), pero
+solo cuentan las pilas que pasan por código de la aplicación (routers, crud, services,
+reportes); con tráfico concurrente el perfil puede incluir trabajo de otras peticiones.
+
+Las firmas son HMAC-SHA256 de "<expiración>:<ruta>" con `PERFILADO_SECRETO`, así que
+solo quien tiene el secreto (un administrador) puede activar el perfilado:
+    python -m services.perfilado /api/dashboard/resumen --vigencia 600
+
+Si no hay secreto ni muestreo, main.py no registra el middleware (cero costo).
+
+Variables de entorno:
+- PERFILADO_SECRETO: clave para firmar y verificar las solicitudes de perfilado
+- PERFILADO_MUESTREO: fracción de peticiones perfiladas al azar (0 = ninguna)
+- PERFILADO_INTERVALO_MS: intervalo de muestreo (5)
+- PERFILADO_DIRECTORIO: carpeta de los artefactos (logs/perfiles)
+- PERFILADO_MAXIMO: perfiles conservados; los más antiguos se borran (100)
+"""
+
+import hashlib
+import hmac
+import html
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+SECRETO = os.getenv("PERFILADO_SECRETO", "")
+MUESTREO = float(os.getenv("PERFILADO_MUESTREO", "0"))
+INTERVALO_S = float(os.getenv("PERFILADO_INTERVALO_MS", "5")) / 1000
+DIRECTORIO = os.getenv(
+    "PERFILADO_DIRECTORIO",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "perfiles")
+)
+MAXIMO_PERFILES = int(os.getenv("PERFILADO_MAXIMO", "100"))
+PERFILES_SIMULTANEOS = 2  # acota el costo si llegan muchas peticiones firmadas a la vez
+
+ENCABEZADO_FIRMA = "X-Perfilar"
+PARAMETRO_FIRMA = "perfilar"
+CARPETAS_APLICACION = ("routers", "crud", "services", "reportes")
+_RAIZ_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ESTE_ARCHIVO = os.path.abspath(__file__)
+_RE_NOMBRE = re.compile(r"^[\w.-]+$")
+
+_cupos = threading.BoundedSemaphore(PERFILES_SIMULTANEOS)
+
+def habilitado() -> bool:
+    return bool(SECRETO) or MUESTREO > 0
+
+# Firmas
+
+def _firma(expiracion: int, ruta: str) -> str:
+    return hmac.new(SECRETO.encode(), f"{expiracion}:{ruta}".encode(), hashlib.sha256).hexdigest()
+
+def firmar(ruta: str, vigencia_s: int = 300) -> str:
+    """Token "<expiración>.<firma>" que autoriza perfilar `ruta` durante `vigencia_s` segundos"""
+    if not SECRETO:
+        raise ValueError("PERFILADO_SECRETO no está configurado")
+    expiracion = int(time.time()) + vigencia_s
+    return f"{expiracion}.{_firma(expiracion, ruta)}"
+
+def verificar_firma(token: str, ruta: str) -> bool:
+    if not SECRETO:
+        return False
+    expiracion, _, firma = token.partition(".")
+    if not expiracion.isdigit() or int(expiracion) < time.time():
+        return False
+    # compare_digest sobre bytes: con str falla (TypeError) si la firma trae caracteres no ASCII
+    return hmac.compare_digest(firma.encode("utf-8"), _firma(int(expiracion), ruta).encode("utf-8"))
+
+# Muestreo de pilas
+
+def _es_de_aplicacion(archivo: str) -> bool:
+    if not archivo.startswith(_RAIZ_BACKEND) or archivo == _ESTE_ARCHIVO:
+        return False
+    relativo = os.path.relpath(archivo, _RAIZ_BACKEND)
+    return relativo.split(os.sep)[0] in CARPETAS_APLICACION
+
+def _nombre_funcion(codigo) -> str:
+    # co_qualname (Clase.metodo) existe desde Python 3.11; antes solo el nombre de la función
+    return getattr(codigo, "co_qualname", codigo.co_name)
+
+def _pila(marco) -> Optional[str]:
+    """Pila "raíz;...;hoja" desde el primer marco de la aplicación, o None si no pasa por ella"""
+    marcos = []
+    while marco is not None:
+        marcos.append(marco)
+        marco = marco.f_back
+    marcos.reverse()
+    for inicio, actual in enumerate(marcos):
+        if _es_de_aplicacion(actual.f_code.co_filename):
+            return ";".join(f"{m.f_globals.get('__name__', '?')}.{_nombre_funcion(m.f_code)}" for m in marcos[inicio:])
+    return None
+
+class Muestreador(threading.Thread):
+    """Hilo que cuenta las pilas de los demás hilos cada `intervalo_s` mientras está activo"""
+
+    def __init__(self, intervalo_s: float = INTERVALO_S):
+        super().__init__(name="perfilado", daemon=True)
+        self.intervalo_s = intervalo_s
+        self.pilas: Counter = Counter()
+        self.muestras = 0
+        self._detener = threading.Event()
+
+    def run(self) -> None:
+        while not self._detener.wait(self.intervalo_s):
+            self.muestras += 1
+            for hilo, marco in sys._current_frames().items():
+                if hilo == self.ident:
+                    continue
+                pila = _pila(marco)
+                if pila:
+                    self.pilas[pila] += 1
+
+    def detener(self) -> None:
+        self._detener.set()
+        self.join()
+
+# Artefactos
+
+def _arbol(pilas: Counter) -> dict:
+    raiz = {"nombre": "todas", "valor": 0, "hijos": {}}
+    for pila, cantidad in pilas.items():
+        raiz["valor"] += cantidad
+        nodo = raiz
+        for funcion in pila.split(";"):
+            nodo = nodo["hijos"].setdefault(funcion, {"nombre": funcion, "valor": 0, "hijos": {}})
+            nodo["valor"] += cantidad
+    return raiz
+
+def _html_nodo(nodo: dict, total: int, intervalo_ms: float) -> str:
+    hijos = sorted(nodo["hijos"].values(), key=lambda n: -n["valor"])
+    partes = []
+    for hijo in hijos:
+        ancho = hijo["valor"] / nodo["valor"] * 100
+        porcentaje = hijo["valor"] / total * 100
+        titulo = html.escape(f"{hijo['nombre']} - {hijo['valor']} muestras (~{hijo['valor'] * intervalo_ms:.0f} ms, {porcentaje:.1f} %)")
+        tono = zlib.crc32(hijo["nombre"].rsplit(".", 1)[0].encode()) % 60
+        partes.append(
+            f'<div class="n" style="width:{ancho:.3f}%"><div class="e" style="background:hsl({tono},80%,65%)" '
+            f'title="{titulo}">{html.escape(hijo["nombre"])}</div>'
+            f'<div class="h">{_html_nodo(hijo, total, intervalo_ms)}</div></div>'
+        )
+    return "".join(partes)
+
+def generar_html(pilas: Counter, datos: Dict[str, str], intervalo_ms: float) -> str:
+    """Flame graph (raíz arriba) en un HTML sin dependencias externas"""
+    arbol = _arbol(pilas)
+    encabezado = " · ".join(f"<b>{html.escape(k)}</b>: {html.escape(str(v))}" for k, v in datos.items())
+    cuerpo = _html_nodo(arbol, arbol["valor"], intervalo_ms) if arbol["valor"] else "<p>Sin muestras de la aplicación</p>"
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Perfil</title><style>"
+        "body{font:12px sans-serif;margin:12px}.h{display:flex}.n{overflow:hidden}"
+        ".e{height:18px;line-height:18px;padding:0 3px;margin:1px;white-space:nowrap;overflow:hidden;"
+        "text-overflow:ellipsis;border-radius:2px;cursor:default}"
+        f"</style></head><body><p>{encabezado}</p><div class='h'>{cuerpo}</div></body></html>"
+    )
+
+def _limpiar_antiguos() -> None:
+    perfiles = sorted(n for n in os.listdir(DIRECTORIO) if n.endswith(".html"))
+    for nombre in perfiles[:-MAXIMO_PERFILES] if MAXIMO_PERFILES > 0 else []:
+        for extension in (".html", ".folded"):
+            ruta = os.path.join(DIRECTORIO, nombre[:-5] + extension)
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+def guardar_perfil(muestreador: Muestreador, metodo: str, ruta: str, estado: int, duracion_ms: float, motivo: str) -> str:
+    """Escribe el HTML y las pilas "folded" del perfil; retorna el nombre del artefacto"""
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    ahora = datetime.now()
+    ruta_archivo = re.sub(r"[^\w]+", "_", ruta).strip("_")[:60] or "raiz"
+    nombre = f"{ahora:%Y%m%d-%H%M%S-%f}_{metodo}_{ruta_archivo}_{duracion_ms:.0f}ms"
+    datos = {
+        "petición": f"{metodo} {ruta}",
+        "estado": estado,
+        "duración": f"{duracion_ms:.1f} ms",
+        "muestras": muestreador.muestras,
+        "intervalo": f"{muestreador.intervalo_s * 1000:g} ms",
+        "motivo": motivo,
+        "fecha": ahora.isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(DIRECTORIO, f"{nombre}.html"), "w", encoding="utf-8") as f:
+        f.write(generar_html(muestreador.pilas, datos, muestreador.intervalo_s * 1000))
+    with open(os.path.join(DIRECTORIO, f"{nombre}.folded"), "w", encoding="utf-8") as f:
+        for pila, cantidad in muestreador.pilas.most_common():
+            f.write(f"{pila} {cantidad}\n")
+    _limpiar_antiguos()
+    return nombre
+
+def listar_perfiles(limite: int = 50) -> List[Dict[str, object]]:
+    """Perfiles guardados, los más recientes primero"""
+    if not os.path.isdir(DIRECTORIO):
+        return []
+    nombres = sorted((n[:-5] for n in os.listdir(DIRECTORIO) if n.endswith(".html")), reverse=True)
+    return [
+        {"nombre": nombre, "tamano_bytes": os.path.getsize(os.path.join(DIRECTORIO, f"{nombre}.html"))}
+        for nombre in nombres[:limite]
+    ]
+
+def ruta_perfil(nombre: str, formato: str = "html") -> Optional[str]:
+    """Ruta del artefacto si existe (el nombre se valida para no salir de la carpeta)"""
+    if not _RE_NOMBRE.match(nombre) or formato not in ("html", "folded"):
+        return None
+    ruta = os.path.join(DIRECTORIO, f"{nombre}.{formato}")
+    return ruta if os.path.exists(ruta) else None
+
+# Middleware
+
+def _motivo(request) -> Optional[str]:
+    token = request.headers.get(ENCABEZADO_FIRMA) or request.query_params.get(PARAMETRO_FIRMA)
+    if token:
+        if verificar_firma(token, request.url.path):
+            return "firma"
+        print(f"⚠️ Firma de perfilado inválida o vencida para {request.url.path}")
+        return None
+    if MUESTREO > 0 and random.random() < MUESTREO:
+        return "muestreo"
+    return None
+
+async def perfilar_peticion(request, call_next):
+    """Middleware: perfila la petición si está firmada o cae en el muestreo"""
+    motivo = _motivo(request)
+    if motivo is None or not _cupos.acquire(blocking=False):
+        return await call_next(request)
+    try:
+        muestreador = Muestreador()
+        inicio = time.perf_counter()
+        muestreador.start()
+        try:
+            respuesta = await call_next(request)
+        finally:
+            muestreador.detener()
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        try:
+            nombre = guardar_perfil(muestreador, request.method, request.url.path,
+                                    respuesta.status_code, duracion_ms, motivo)
+            respuesta.headers["X-Perfil"] = nombre
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el perfil: {e}")
+        return respuesta
+    finally:
+        _cupos.release()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Firma una solicitud de perfilado")
+    parser.add_argument("ruta", help="Ruta a perfilar, por ejemplo /api/dashboard/resumen")
+    parser.add_argument("--vigencia", type=int, default=300, help="Segundos de validez de la firma")
+    args = parser.parse_args()
+    try:
+        token = firmar(args.ruta, args.vigencia)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"{ENCABEZADO_FIRMA}: {token}")
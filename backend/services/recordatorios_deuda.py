@@ -0,0 +1,145 @@
+"""
+Recordatorios masivos de deuda para los jugadores morosos.
+
+Enviar un correo por jugador con EmailService abriría una sesión SMTP bloqueante por
+cada uno. El recordatorio masivo, en cambio:
+
+1. Obtiene todos los morosos con una consulta sobre conjuntos (crud/morosos.py).
+2. Arma cada mensaje sobre plantillas preparadas una sola vez al importar el módulo;
+   por jugador solo se sustituyen los valores (escapados para HTML).
+3. Encola los mensajes en la bandeja de salida por lotes de RECORDATORIOS_LOTE, con un
+   INSERT por lote (`bandeja_correo.encolar_lote`). El enviador en segundo plano los
+   despacha por su conexión SMTP reutilizada, con la pausa CORREO_PAUSA_MS entre
+   correos para respetar el límite del proveedor.
+
+Cada campaña se identifica por su periodo ('YYYY-MM', por defecto el mes actual) y cada
+correo por la clave recordatorio:<periodo>:<cedula>. Repetir una campaña (por ejemplo
+tras un corte) solo encola a los morosos que aún no tenían su recordatorio, y el avance
+se consulta contando los correos de la campaña por estado.
+
+Variables de entorno:
+- RECORDATORIOS_LOTE: correos por INSERT al encolar la campaña (500)
+"""
+
+import os
+from datetime import date
+from html import escape
+from typing import Dict, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+import models
+from crud import morosos as crud_morosos
+from services.bandeja_correo import BandejaCorreo, bandeja_correo, ESTADOS, ENVIADO, FALLIDO
+from services.configuracion_sistema import configuracion_sistema
+
+LOTE = int(os.getenv("RECORDATORIOS_LOTE", "500"))
+
+TIPO = "recordatorio"
+
+ASUNTO = "Recordatorio de pagos pendientes - {periodo}"
+
+CUERPO = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background-color: #1f2937; color: white; padding: 20px; text-align: center; }}
+        .content {{ padding: 30px; background-color: #f9fafb; }}
+        .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #666; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Sistema de Gestión Club de Futbol Mi Equipo</h1>
+        </div>
+        <div class="content">
+            <h2>Hola {nombre},</h2>
+            <p>Según nuestros registros tienes los siguientes pagos pendientes:</p>
+            <ul>
+{detalle}            </ul>
+            <p>Por favor ponte al día con la tesorería del equipo. Si ya realizaste el pago, ignora este mensaje.</p>
+            <p>Saludos,<br>Junta Administrativa</p>
+        </div>
+        <div class="footer">
+            <p>Este es un email automático, por favor no respondas a este mensaje.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+MENSUALIDADES = "                <li>{cantidad} mensualidad(es) pendiente(s){valor}</li>\n"
+MULTAS = "                <li>{cantidad} multa(s) pendiente(s) por ${valor:,.0f}</li>\n"
+
+def clave(periodo: str, cedula: str) -> str:
+    return f"{TIPO}:{periodo}:{cedula}"
+
+class RecordatoriosDeuda:
+    """Campañas de recordatorios de deuda sobre la bandeja de salida"""
+
+    def __init__(self, bandeja: BandejaCorreo = bandeja_correo, lote: int = LOTE):
+        self.bandeja = bandeja
+        self.lote = lote
+
+    def _correo(self, moroso: crud_morosos.Moroso, periodo: str, asunto: str,
+                valor_mensualidad: Optional[float]) -> dict:
+        detalle = ""
+        if moroso.mensualidades_pendientes:
+            valor = f" por ${moroso.mensualidades_pendientes * valor_mensualidad:,.0f}" if valor_mensualidad else ""
+            detalle += MENSUALIDADES.format(cantidad=moroso.mensualidades_pendientes, valor=valor)
+        if moroso.multas_pendientes:
+            detalle += MULTAS.format(cantidad=moroso.multas_pendientes, valor=moroso.valor_multas_pendientes)
+        return {
+            "destinatario": moroso.email,
+            "asunto": asunto,
+            "cuerpo_html": CUERPO.format(nombre=escape(f"{moroso.nombre} {moroso.apellido}"), detalle=detalle),
+            "clave": clave(periodo, moroso.cedula),
+        }
+
+    def encolar(self, db: Session, periodo: Optional[str] = None, hoy: Optional[date] = None) -> dict:
+        """Encola el recordatorio de cada moroso que aún no lo tenga en la campaña del periodo"""
+        hoy = hoy or date.today()
+        periodo = periodo or hoy.strftime("%Y-%m")
+        morosos = crud_morosos.get_morosos(db, hoy)
+        valor_mensualidad = configuracion_sistema.obtener(db, "mensualidad")
+        asunto = ASUNTO.format(periodo=periodo)
+
+        encolados = 0
+        for inicio in range(0, len(morosos), self.lote):
+            correos = [self._correo(moroso, periodo, asunto, valor_mensualidad)
+                       for moroso in morosos[inicio:inicio + self.lote]]
+            encolados += self.bandeja.encolar_lote(db, correos, tipo=TIPO)
+
+        print(f"📨 Recordatorios {periodo}: {len(morosos)} morosos, {encolados} correos encolados")
+        return {
+            "periodo": periodo,
+            "morosos": len(morosos),
+            "encolados": encolados,
+            "omitidos": len(morosos) - encolados,
+        }
+
+    def progreso(self, db: Session, periodo: str) -> dict:
+        """Correos de la campaña por estado y porcentaje ya resuelto (enviados o fallidos)"""
+        tabla = models.CorreoSaliente.__table__
+        filas = db.execute(
+            select(tabla.c.estado, func.count())
+            .where(tabla.c.tipo == TIPO, tabla.c.clave.startswith(clave(periodo, "")))
+            .group_by(tabla.c.estado)
+        ).all()
+        por_estado: Dict[str, int] = {estado: 0 for estado in ESTADOS}
+        por_estado.update({estado: cantidad for estado, cantidad in filas})
+        total = sum(por_estado.values())
+        resueltos = por_estado[ENVIADO] + por_estado[FALLIDO]
+        return {
+            "periodo": periodo,
+            "total": total,
+            "por_estado": por_estado,
+            "porcentaje": round(100 * resueltos / total, 1) if total else 0.0,
+            "completado": total > 0 and resueltos == total,
+        }
+
+# Instancia global de los recordatorios de deuda
+recordatorios_deuda = RecordatoriosDeuda()
@@ -0,0 +1,130 @@
+"""
+Tokens de sesión firmados (JWT HS256) con renovación y lista de revocación en memoria.
+
+El login entrega dos tokens:
+- acceso: vida corta (`SESION_ACCESO_MIN`), viaja en `Authorization: Bearer` en cada
+  petición. Lleva el rol, el id y la cédula firmados, así que `auth_middleware`
+  identifica al usuario sin consultar la base de datos.
+- refresco: vida larga (`SESION_REFRESCO_DIAS`), solo se usa en POST /api/auth/refresh,
+  que vuelve a leer al usuario (pudo cambiar de rol o ser eliminado) y rota ambos tokens.
+
+El formato es JWT estándar (HS256), firmado y verificado con python-jose (ya fijado en
+requirements.txt); cualquier librería JWT puede leer los tokens.
+
+Logout revoca el `jti` de los tokens en una lista en memoria, que se purga sola al
+expirar cada token. Es local a cada proceso: con varios workers, un token de acceso
+revocado sigue siendo válido en los demás hasta que expira (minutos); el de refresco
+también se revoca al rotarse, así que no se puede reutilizar en el mismo worker.
+
+Variables de entorno:
+- SESION_SECRETO: clave de firma de al menos 32 bytes; compartirla entre workers. Sin
+  ella se genera una aleatoria por proceso y las sesiones no sobreviven a un reinicio.
+  Una clave corta o el ejemplo de .env.example se rechazan al iniciar
+- SESION_ACCESO_MIN: vigencia del token de acceso en minutos (15)
+- SESION_REFRESCO_DIAS: vigencia del token de refresco en días (7)
+"""
+
+import os
+import secrets
+import threading
+import time
+from typing import Dict, Optional
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+SECRETO = os.getenv("SESION_SECRETO", "")
+ACCESO_S = int(float(os.getenv("SESION_ACCESO_MIN", "15")) * 60)
+REFRESCO_S = int(float(os.getenv("SESION_REFRESCO_DIAS", "7")) * 86400)
+
+TIPO_ACCESO = "acceso"
+TIPO_REFRESCO = "refresco"
+
+ALGORITMO = "HS256"
+
+# HS256 con una clave corta o conocida permite fabricar tokens de administrador
+MINIMO_BYTES_SECRETO = 32
+SECRETOS_DE_EJEMPLO = {"cambia-esta-clave"}
+
+class TokenInvalido(ValueError):
+    """Token mal formado, con firma incorrecta, expirado, revocado o de otro tipo"""
+
+class Sesiones:
+    """Emisión y verificación de tokens con revocación en memoria"""
+
+    def __init__(self, secreto: str = SECRETO, acceso_s: int = ACCESO_S, refresco_s: int = REFRESCO_S):
+        if not secreto:
+            print("⚠️ SESION_SECRETO no está configurado: las sesiones no sobreviven reinicios ni se comparten entre workers")
+            secreto = secrets.token_urlsafe(32)
+        elif secreto in SECRETOS_DE_EJEMPLO or len(secreto.encode("utf-8")) < MINIMO_BYTES_SECRETO:
+            raise ValueError(
+                f"SESION_SECRETO debe ser una clave aleatoria de al menos {MINIMO_BYTES_SECRETO} bytes, "
+                "no el valor de ejemplo"
+            )
+        self._clave = secreto
+        self.acceso_s = acceso_s
+        self.refresco_s = refresco_s
+        self._lock = threading.Lock()
+        self._revocados: Dict[str, int] = {}  # jti -> expiración
+
+    def emitir(self, datos: dict, tipo: str = TIPO_ACCESO, ahora: Optional[int] = None) -> str:
+        """Token firmado con los `datos` del usuario (sub, rol, cedula, nombre, email)"""
+        ahora = int(time.time()) if ahora is None else ahora
+        vigencia = self.acceso_s if tipo == TIPO_ACCESO else self.refresco_s
+        carga = {**datos, "tipo": tipo, "iat": ahora, "exp": ahora + vigencia, "jti": secrets.token_urlsafe(12)}
+        return jwt.encode(carga, self._clave, algorithm=ALGORITMO)
+
+    def emitir_par(self, datos: dict) -> dict:
+        """Tokens de acceso y refresco para la respuesta del login o de la renovación"""
+        return {
+            "access_token": self.emitir(datos, TIPO_ACCESO),
+            "refresh_token": self.emitir(datos, TIPO_REFRESCO),
+            "token_type": "bearer",
+            "expires_in": self.acceso_s,
+        }
+
+    def verificar(self, token: str, tipo: str = TIPO_ACCESO) -> dict:
+        """Datos del token si la firma es válida, no expiró, no está revocado y es del tipo pedido"""
+        if not isinstance(token, str):
+            raise TokenInvalido("Token mal formado")
+        try:
+            # Valida la firma, el algoritmo y la expiración
+            datos = jwt.decode(token, self._clave, algorithms=[ALGORITMO])
+        except ExpiredSignatureError:
+            raise TokenInvalido("Token expirado")
+        except (JWTError, UnicodeError, ValueError):
+            raise TokenInvalido("Token mal formado o con firma inválida")
+        if datos.get("tipo") != tipo:
+            raise TokenInvalido("Tipo de token incorrecto")
+        if datos.get("jti") in self._revocados:
+            raise TokenInvalido("Token revocado")
+        return datos
+
+    def revocar(self, datos: dict) -> None:
+        """Agrega el jti de un token ya verificado a la lista de revocación"""
+        with self._lock:
+            self._agregar_revocado(datos)
+
+    def consumir(self, token: str, tipo: str = TIPO_REFRESCO) -> dict:
+        """
+        Verifica el token y lo revoca en un solo paso: de dos peticiones simultáneas
+        con el mismo token de refresco, solo una lo consume y la otra recibe TokenInvalido.
+        """
+        datos = self.verificar(token, tipo)
+        with self._lock:
+            if datos["jti"] in self._revocados:
+                raise TokenInvalido("Token revocado")
+            self._agregar_revocado(datos)
+        return datos
+
+    def _agregar_revocado(self, datos: dict) -> None:
+        # Se llama con el lock tomado. Los tokens expirados ya no pasan la verificación:
+        # no hace falta recordarlos
+        ahora = time.time()
+        self._revocados = {jti: exp for jti, exp in self._revocados.items() if exp > ahora}
+        self._revocados[datos["jti"]] = datos["exp"]
+
+    def revocados(self) -> int:
+        return len(self._revocados)
+
+# Instancia global de sesiones
+sesiones = Sesiones()
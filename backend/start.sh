@@ -7,6 +7,10 @@ echo "🚀 Iniciando aplicación en Render..."
 # Configurar variables de entorno para producción
 export PYTHONPATH="${PYTHONPATH}:/opt/render/project/src"
 
+# El proxy de Render se conecta desde su red interna y agrega la IP real al final de
+# X-Forwarded-For; los límites por IP (services/limites.py) solo confían en esos saltos
+export LIMITES_PROXIES_CONFIABLES="${LIMITES_PROXIES_CONFIABLES:-10.0.0.0/8}"
+
 # Iniciar el servidor con Uvicorn optimizado para producción
 exec uvicorn main:app \
     --host 0.0.0.0 \
@@ -0,0 +1,8 @@
+"""
+Configuración de pytest: las pruebas corren con la guardia de cargas perezosas
+(SQL_CARGA_PEREZOSA=raise, ver models.py), así que un N+1 por una relación sin
+opción de carga explícita hace fallar la suite.
+"""
+import os
+
+os.environ.setdefault("SQL_CARGA_PEREZOSA", "raise")
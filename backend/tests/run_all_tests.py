@@ -13,8 +13,10 @@ def run_test_file(test_file):
     print(f"{'='*60}")
     
     try:
+        # Guardia de cargas perezosas activa, igual que con pytest (tests/conftest.py)
+        env = {**os.environ, "SQL_CARGA_PEREZOSA": os.environ.get("SQL_CARGA_PEREZOSA", "raise")}
         result = subprocess.run([sys.executable, test_file], 
-                              capture_output=True, text=True, cwd=os.path.dirname(test_file))
+                              capture_output=True, text=True, cwd=os.path.dirname(test_file), env=env)
         
         if result.returncode == 0:
             print(f"✅ {test_file} - EXITOSO")
@@ -44,6 +46,31 @@ def main():
         "test_crud.py",
         "test_dashboard.py", 
         "test_multa_model.py",
+        "test_busqueda_jugadores.py",
+        "test_busqueda_global.py",
+        "test_indice_normativa.py",
+        "test_documento_normativa.py",
+        "test_reorden_normativa.py",
+        "test_configuracion_sistema.py",
+        "test_instrumentacion_sql.py",
+        "test_metricas.py",
+        "test_consultas_lentas.py",
+        "test_generador_datos.py",
+        "test_benchmark_endpoints.py",
+        "test_carga.py",
+        "test_perfilado.py",
+        "test_ranking_multas.py",
+        "test_resumen_dashboard.py",
+        "test_serie_financiera.py",
+        "test_egresos_categoria.py",
+        "test_estado_cuenta_jugador.py",
+        "test_politica_carga.py",
+        "test_credenciales.py",
+        "test_sesiones.py",
+        "test_identidades.py",
+        "test_limites.py",
+        "test_bandeja_correo.py",
+        "test_recordatorios_deuda.py",
         "test_api.py"  # Este último porque levanta un servidor
     ]
     
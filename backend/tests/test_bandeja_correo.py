@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la bandeja de salida de correos: conexión SMTP reutilizada, reintentos y estado de entrega
+"""
+import sys
+import os
+import smtplib
+import socket
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import get_db
+from routers.admin import router
+from services.sesiones import sesiones
+from services.bandeja_correo import BandejaCorreo, ConexionSMTP, ENVIADO, FALLIDO, PENDIENTE, ENVIANDO
+
+class SMTPFalso:
+    """Servidor SMTP en memoria: registra conexiones y envíos; `fallos` decide qué falla"""
+    conexiones = []
+    fallos = {}  # destinatario -> lista de excepciones a lanzar en orden
+
+    def __init__(self, servidor, puerto, timeout=None):
+        self.enviados = []
+        self.autenticado = False
+        SMTPFalso.conexiones.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, usuario, password):
+        self.autenticado = True
+
+    def sendmail(self, remitente, destinatario, mensaje):
+        errores = SMTPFalso.fallos.get(destinatario)
+        if errores:
+            raise errores.pop(0)
+        self.enviados.append((destinatario, mensaje))
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+def _bandeja(**opciones):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    SMTPFalso.conexiones, SMTPFalso.fallos = [], {}
+    conexion = ConexionSMTP("smtp.prueba", 587, "club@equipo.com", "clave", starttls=True, fabrica=SMTPFalso)
+    bandeja = BandejaCorreo(session_factory=Sesion, conexion=conexion, espera_base_s=30, **opciones)
+    bandeja.remitente = "club@equipo.com"
+    return bandeja, Sesion
+
+def _encolar(bandeja, Sesion, cantidad, **datos):
+    db = Sesion()
+    ids = [bandeja.encolar(db, f"j{i}@equipo.com", f"Asunto {i}", f"<p>Hola {i}</p>", **datos).id
+           for i in range(cantidad)]
+    db.close()
+    return ids
+
+def test_lote_por_una_conexion():
+    bandeja, Sesion = _bandeja(lote=3)
+    _encolar(bandeja, Sesion, 7)
+    assert bandeja.procesar_pendientes() == 7
+    # Tres lotes, una sola conexión autenticada, cerrada al vaciar la cola
+    assert len(SMTPFalso.conexiones) == 1 and SMTPFalso.conexiones[0].autenticado
+    assert len(SMTPFalso.conexiones[0].enviados) == 7
+    assert not bandeja.conexion.abierta
+    assert "Subject: Asunto 0" in SMTPFalso.conexiones[0].enviados[0][1]
+
+    db = Sesion()
+    assert {c.estado for c in db.query(models.CorreoSaliente)} == {ENVIADO}
+    assert bandeja.profundidad(db)[(ENVIADO,)] == 7 and bandeja.profundidad(db)[(PENDIENTE,)] == 0
+
+def test_reintentos_y_fallos():
+    bandeja, Sesion = _bandeja(max_intentos=2)
+    SMTPFalso.fallos = {
+        # Desconexión: se reabre la conexión y el mismo correo sale al segundo intento
+        "j0@equipo.com": [smtplib.SMTPServerDisconnected("cerrada")],
+        # Error temporal: vuelve a pendiente con espera
+        "j1@equipo.com": [smtplib.SMTPResponseException(451, b"intente luego")] * 2,
+        # Rechazo permanente: fallido sin reintentar
+        "j2@equipo.com": [smtplib.SMTPRecipientsRefused({"j2@equipo.com": (550, b"no existe")})],
+    }
+    ids = _encolar(bandeja, Sesion, 3)
+    antes = datetime.now()
+    bandeja.procesar_pendientes()
+
+    db = Sesion()
+    correos = {c.id: c for c in db.query(models.CorreoSaliente)}
+    assert correos[ids[0]].estado == ENVIADO
+    assert correos[ids[1]].estado == PENDIENTE and correos[ids[1]].intentos == 1
+    assert "451" in correos[ids[1]].ultimo_error
+    assert correos[ids[1]].proximo_intento >= antes + timedelta(seconds=29)
+    assert correos[ids[2]].estado == FALLIDO and correos[ids[2]].intentos == 1
+    db.close()
+
+    # Aún no vence la espera: no se toma
+    assert bandeja.procesar_pendientes() == 0
+
+    # Vencida la espera, segundo intento fallido: se agotan los intentos
+    db = Sesion()
+    db.get(models.CorreoSaliente, ids[1]).proximo_intento = datetime.now() - timedelta(seconds=1)
+    db.commit()
+    db.close()
+    assert bandeja.procesar_pendientes() == 1
+    db = Sesion()
+    assert db.get(models.CorreoSaliente, ids[1]).estado == FALLIDO
+
+def test_encolado_idempotente_y_reservas():
+    bandeja, Sesion = _bandeja(lote=2)
+    primero = _encolar(bandeja, Sesion, 1, clave="recordatorio:1000:2025-06")
+    assert _encolar(bandeja, Sesion, 1, clave="recordatorio:1000:2025-06") == primero
+    _encolar(bandeja, Sesion, 3)
+
+    # Dos workers no reservan los mismos correos
+    db = Sesion()
+    ahora = datetime.now()
+    lote_a = bandeja._reservar_lote(db, ahora)
+    lote_b = BandejaCorreo(session_factory=Sesion, lote=2)._reservar_lote(db, ahora)
+    assert len(lote_a) == len(lote_b) == 2 and not set(lote_a) & set(lote_b)
+    assert bandeja._reservar_lote(db, ahora) == []
+    assert bandeja.profundidad(db)[(ENVIANDO,)] == 4
+
+    # Una reserva vencida (worker caído) vuelve a estar disponible
+    assert sorted(bandeja._reservar_lote(db, ahora + timedelta(hours=1))) == sorted(lote_a)
+
+def test_lote_lento_no_se_reenvia_desde_otro_worker():
+    # Reserva que vence de inmediato: el lote tarda más que su reserva
+    bandeja, Sesion = _bandeja(lote=3, reserva_s=0)
+    ids = _encolar(bandeja, Sesion, 3)
+    otro_worker = BandejaCorreo(
+        session_factory=Sesion, lote=3, reserva_s=300,
+        conexion=ConexionSMTP("smtp.prueba", 587, "club@equipo.com", "clave", fabrica=SMTPFalso)
+    )
+    otro_worker.remitente = "club@equipo.com"
+
+    entregar = bandeja._entregar
+    def entregar_lento(correo):
+        entregar(correo)
+        if correo.id == ids[0]:
+            # Mientras tanto otro worker toma los correos con la reserva vencida
+            assert otro_worker.procesar_lote() == 3
+
+    bandeja._entregar = entregar_lento
+    bandeja.procesar_lote()
+
+    enviados = [destinatario for conexion in SMTPFalso.conexiones for destinatario, _ in conexion.enviados]
+    # El correo en pleno envío puede salir dos veces; los siguientes del lote, solo una
+    assert enviados.count("j1@equipo.com") == enviados.count("j2@equipo.com") == 1
+    db = Sesion()
+    assert {c.estado for c in db.query(models.CorreoSaliente)} == {ENVIADO}
+
+def test_recuperacion_encola_sin_smtp():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Sesion()
+    db.add(models.Administrador(id=1, nombre="Admin", email="admin@equipo.com", rol="admin", password="x"))
+    db.commit()
+    db.close()
+
+    def get_db_prueba():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = get_db_prueba
+    cliente = TestClient(app)
+    assert cliente.post("/api/admin/recuperar-password", json={"email": "admin@equipo.com"}).status_code == 200
+
+    # El estado de la bandeja (destinatarios incluidos) es solo para administradores
+    assert cliente.get("/api/admin/correos").status_code == 401
+    jugador = {"Authorization": f"Bearer {sesiones.emitir({'sub': '1000', 'rol': 'jugador', 'cedula': '1000'})}"}
+    assert cliente.get("/api/admin/correos/1", headers=jugador).status_code == 403
+    admin = {"Authorization": f"Bearer {sesiones.emitir({'sub': '1', 'rol': 'admin'})}"}
+
+    estado = cliente.get("/api/admin/correos", headers=admin).json()
+    assert estado["por_estado"][PENDIENTE] == 1
+    correo = estado["correos"][0]
+    assert (correo["destinatario"], correo["tipo"], correo["estado"]) == ("admin@equipo.com", "recuperacion", PENDIENTE)
+    assert cliente.get(f"/api/admin/correos/{correo['id']}", headers=admin).json()["estado"] == PENDIENTE
+    assert cliente.get("/api/admin/correos/999", headers=admin).status_code == 404
+
+def test_contra_servidor_aiosmtpd():
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        print("⏭️ aiosmtpd no está instalado: prueba contra servidor SMTP local omitida")
+        return
+
+    class Manejador:
+        def __init__(self):
+            self.mensajes = []
+            self.sesiones = set()
+
+        async def handle_DATA(self, server, session, envelope):
+            self.mensajes.append(envelope.rcpt_tos[0])
+            self.sesiones.add(id(session))
+            return "250 OK"
+
+    with socket.socket() as libre:
+        libre.bind(("127.0.0.1", 0))
+        puerto = libre.getsockname()[1]
+    manejador = Manejador()
+    controlador = Controller(manejador, hostname="127.0.0.1", port=puerto)
+    controlador.start()
+    try:
+        bandeja, Sesion = _bandeja()
+        bandeja.conexion = ConexionSMTP("127.0.0.1", puerto, "club@equipo.com", "", starttls=False)
+        _encolar(bandeja, Sesion, 5)
+        assert bandeja.procesar_pendientes() == 5
+        assert sorted(manejador.mensajes) == [f"j{i}@equipo.com" for i in range(5)]
+        assert len(manejador.sesiones) == 1  # los cinco correos por la misma conexión
+    finally:
+        controlador.stop()
+
+if __name__ == "__main__":
+    test_lote_por_una_conexion()
+    test_reintentos_y_fallos()
+    test_encolado_idempotente_y_reservas()
+    test_lote_lento_no_se_reenvia_desde_otro_worker()
+    test_recuperacion_encola_sin_smtp()
+    test_contra_servidor_aiosmtpd()
+    print("✅ Bandeja de salida de correos funcionando correctamente")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Pruebas del benchmark de endpoints.
+
+La comparación contra la línea base siempre se prueba; la corrida completa sobre el
+preset de 100 jugadores solo se ejecuta con RENDIMIENTO_BENCHMARKS=1 (tarda ~30 s).
+"""
+import sys
+import os
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rendimiento.benchmark_endpoints import comparar
+
+BASE = {"ranking_multas": {"latencia_ms": 40.0, "consultas": 5, "memoria_pico_kb": 200.0}}
+
+def test_comparar_detecta_regresiones():
+    assert comparar({"ranking_multas": {"latencia_ms": 45.0, "consultas": 5, "memoria_pico_kb": 210.0}}, BASE) == []
+    # Menos consultas o menor latencia nunca es regresión
+    assert comparar({"ranking_multas": {"latencia_ms": 5.0, "consultas": 1, "memoria_pico_kb": 50.0}}, BASE) == []
+
+    regresiones = comparar({"ranking_multas": {"latencia_ms": 90.0, "consultas": 6, "memoria_pico_kb": 400.0}}, BASE)
+    assert len(regresiones) == 3
+
+    # Solo consultas (modo CI): la latencia se ignora
+    assert len(comparar({"ranking_multas": {"latencia_ms": 90.0, "consultas": 6, "memoria_pico_kb": 400.0}},
+                        BASE, verificar_latencia=False)) == 1
+
+def test_benchmark_sin_regresiones_de_consultas():
+    if os.getenv("RENDIMIENTO_BENCHMARKS") != "1":
+        print("⏭️ Benchmark completo omitido (RENDIMIENTO_BENCHMARKS=1 para ejecutarlo)")
+        return
+    # En un proceso aparte: el benchmark debe fijar DATABASE_URL antes de importar la app
+    resultado = subprocess.run(
+        [sys.executable, "-m", "rendimiento.benchmark_endpoints", "--preset", "100",
+         "--repeticiones", "1", "--solo-consultas"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True
+    )
+    assert resultado.returncode == 0, resultado.stdout + resultado.stderr
+
+if __name__ == "__main__":
+    test_comparar_detecta_regresiones()
+    test_benchmark_sin_regresiones_de_consultas()
+    print("✅ Benchmark de endpoints funcionando correctamente")
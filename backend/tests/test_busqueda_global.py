@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la búsqueda global (/api/buscar) sobre una base SQLite en memoria
+"""
+import sys
+import os
+import time
+from datetime import date, datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from crud import busqueda as crud_busqueda
+from services import indice_busqueda
+from services.busqueda_jugadores import indice_jugadores
+
+def _crear_sesiones(con_indices: bool = True):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(bind=engine)
+    if con_indices:
+        assert indice_busqueda.asegurar_indices(engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Sesion()
+    db.add(models.Jugador(
+        cedula="1001", nombre="Andrés", apellido="Núñez", nombre_inscripcion="Andy",
+        telefono="3001", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+        contacto_emergencia_nombre="Ana", contacto_emergencia_telefono="3002"
+    ))
+    categoria = models.CategoriaEgreso(nombre="Implementos")
+    db.add(categoria)
+    db.flush()
+    db.add(models.Egreso(categoria_id=categoria.id, concepto="Balones nuevos", valor=120000,
+                         fecha=datetime(2025, 3, 1), comprobante="FAC-77"))
+    db.add(models.CausalMulta(descripcion="Llegar tarde al partido", valor=5000))
+    db.add(models.CausalMulta(descripcion="Insultar al Árbitro", valor=20000))
+    db.add(models.ArticuloNormativa(numero_articulo="5.2", titulo="Puntualidad en partidos",
+                                    contenido="Todo jugador debe llegar puntual."))
+    db.commit()
+    db.close()
+    indice_jugadores.invalidar()
+    return Sesion
+
+def test_busqueda_global_combina_fuentes():
+    Sesion = _crear_sesiones()
+    respuesta = crud_busqueda.buscar_global("lleg", session_factory=Sesion)
+    assert [r.tipo for r in respuesta.resultados] == ["causal"]
+    assert not respuesta.parcial
+
+    # En cualquier parte del texto, sin distinguir mayúsculas ni tildes
+    assert crud_busqueda.buscar_global("BALÓN", session_factory=Sesion).resultados[0].tipo == "egreso"
+    assert [r.titulo for r in crud_busqueda.buscar_global("nuevos", session_factory=Sesion).resultados] == ["Balones nuevos"]
+    assert [r.titulo for r in crud_busqueda.buscar_global("partido", session_factory=Sesion, fuentes=["causales"]).resultados] == \
+        ["Llegar tarde al partido"]
+    for termino in ("arbitro", "árbitro", "ARBITRO"):
+        assert [r.titulo for r in crud_busqueda.buscar_global(termino, session_factory=Sesion).resultados] == \
+            ["Insultar al Árbitro"], termino
+
+    respuesta = crud_busqueda.buscar_global("nunez", session_factory=Sesion)
+    assert respuesta.resultados[0].tipo == "jugador"
+
+    respuesta = crud_busqueda.buscar_global("FAC-77", session_factory=Sesion)
+    assert respuesta.resultados[0].tipo == "egreso"
+
+def test_puntaje_jugadores_en_escala_comun():
+    Sesion = _crear_sesiones()
+    db = Sesion()
+    db.add(models.Egreso(categoria_id=1, concepto="Transporte", valor=30000,
+                         fecha=datetime(2025, 3, 2), comprobante="NUNE"))
+    db.commit()
+    db.close()
+
+    # Prefijo del apellido (2) por debajo de la coincidencia exacta del comprobante (3)
+    respuesta = crud_busqueda.buscar_global("nune", session_factory=Sesion)
+    assert [(r.tipo, r.puntaje) for r in respuesta.resultados] == [("egreso", 3.0), ("jugador", 2.0)]
+
+    respuesta = crud_busqueda.buscar_global("nunez", session_factory=Sesion)
+    assert respuesta.resultados[0].puntaje == 3.0
+
+    # Error de escritura: el índice lo encuentra, pero con el puntaje más bajo
+    respuesta = crud_busqueda.buscar_global("nunes", session_factory=Sesion)
+    assert [(r.tipo, r.puntaje) for r in respuesta.resultados] == [("jugador", crud_busqueda.PUNTAJE_APROXIMADO)]
+
+def test_prefiltro_usa_indices():
+    Sesion = _crear_sesiones()
+    db = Sesion()
+    for nombre, modelo, columnas in [
+        ("causales", models.CausalMulta, [models.CausalMulta.descripcion]),
+        ("egresos", models.Egreso, [models.Egreso.concepto, models.Egreso.comprobante]),
+        ("aportes_grupales", models.Multa, [models.Multa.concepto_aporte]),
+    ]:
+        consulta = select(modelo.id).where(indice_busqueda.filtro(db, nombre, modelo.id, columnas, "balon"))
+        sql = str(consulta.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+        plan = " ".join(str(fila[-1]) for fila in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        # La tabla FTS resuelve el término; la tabla de origen solo se lee por id
+        assert "VIRTUAL TABLE INDEX" in plan, plan
+        assert f"SEARCH {modelo.__tablename__} " in plan, plan
+    db.close()
+
+def test_indices_siguen_las_escrituras():
+    Sesion = _crear_sesiones()
+    db = Sesion()
+    causal = db.query(models.CausalMulta).filter(models.CausalMulta.descripcion == "Llegar tarde al partido").one()
+    causal.descripcion = "Llegar tarde al entrenamiento"
+    db.commit()
+    assert crud_busqueda.buscar_global("partido", session_factory=Sesion, fuentes=["causales"]).resultados == []
+    assert len(crud_busqueda.buscar_global("entrenamiento", session_factory=Sesion).resultados) == 1
+
+    db.delete(causal)
+    db.commit()
+    assert crud_busqueda.buscar_global("entrenamiento", session_factory=Sesion).resultados == []
+    db.close()
+
+def test_sin_indices_busca_con_like():
+    Sesion = _crear_sesiones(con_indices=False)
+    assert [r.titulo for r in crud_busqueda.buscar_global("partido", session_factory=Sesion, fuentes=["causales"]).resultados] == \
+        ["Llegar tarde al partido"]
+    assert crud_busqueda.buscar_global("nuevos", session_factory=Sesion).resultados[0].tipo == "egreso"
+
+def test_consulta_lenta_cortada_en_la_base():
+    Sesion = _crear_sesiones()
+
+    def fuente_costosa(db, termino, consulta, limite):
+        db.execute(text(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n LIMIT 100000000) "
+            "SELECT count(*) FROM n"
+        )).scalar()
+        return []
+
+    inicio = time.perf_counter()
+    try:
+        crud_busqueda._ejecutar_fuente(fuente_costosa, Sesion, "x", "x", 5, 0.1)
+        assert False, "la consulta debía cortarse"
+    except TimeoutError:
+        pass
+    assert time.perf_counter() - inicio < 2
+
+    # La conexión queda sin plazo para el siguiente uso
+    db = Sesion()
+    time.sleep(0.15)
+    assert db.execute(text("SELECT count(*) FROM egresos")).scalar() == 1
+    db.close()
+
+def test_busqueda_global_resultados_parciales():
+    Sesion = _crear_sesiones()
+
+    def fuente_lenta(db, termino, consulta, limite):
+        time.sleep(0.5)
+        return []
+
+    original = dict(crud_busqueda.FUENTES_BUSQUEDA)
+    crud_busqueda.FUENTES_BUSQUEDA["lenta"] = fuente_lenta
+    try:
+        respuesta = crud_busqueda.buscar_global(
+            "balon", session_factory=Sesion, presupuesto_ms=150, timeout_fuente_ms=150
+        )
+    finally:
+        crud_busqueda.FUENTES_BUSQUEDA.clear()
+        crud_busqueda.FUENTES_BUSQUEDA.update(original)
+
+    assert respuesta.parcial
+    assert respuesta.fuentes["lenta"].estado == "timeout"
+    assert respuesta.fuentes["egresos"].estado == "ok"
+    assert respuesta.resultados[0].tipo == "egreso"
+
+if __name__ == "__main__":
+    test_busqueda_global_combina_fuentes()
+    test_puntaje_jugadores_en_escala_comun()
+    test_prefiltro_usa_indices()
+    test_indices_siguen_las_escrituras()
+    test_sin_indices_busca_con_like()
+    test_consulta_lenta_cortada_en_la_base()
+    test_busqueda_global_resultados_parciales()
+    print("✅ Búsqueda global funcionando correctamente")
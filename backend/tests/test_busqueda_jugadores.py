@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Pruebas y benchmark del índice de búsqueda de jugadores
+
+Para ver la latencia con un equipo sintético grande:
+    python tests/test_busqueda_jugadores.py
+"""
+import sys
+import os
+import random
+import time
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from crud import jugadores as crud
+from services.busqueda_jugadores import IndiceBusquedaJugadores, indice_jugadores, normalizar_texto
+
+JUGADORES = [
+    ("1001", "Andrés", "Núñez", "Andy"),
+    ("1002", "Juan", "Pérez", "Juancho"),
+    ("1003", "Juliana", "Gómez", "Juli"),
+    ("2044", "Carlos", "Nunez", "El Mono"),
+]
+
+def _indice():
+    indice = IndiceBusquedaJugadores()
+    indice.reconstruir(JUGADORES)
+    return indice
+
+def test_normalizar_texto():
+    assert normalizar_texto("  Núñez   PÉREZ ") == "nunez perez"
+    assert normalizar_texto(None) == ""
+
+def test_busqueda_sin_tildes():
+    cedulas = [cedula for cedula, _ in _indice().buscar("nuñez")]
+    assert set(cedulas[:2]) == {"1001", "2044"}
+
+def test_busqueda_por_prefijo_y_ranking():
+    resultados = _indice().buscar("ju")
+    assert {cedula for cedula, _ in resultados} == {"1002", "1003"}
+    # La coincidencia exacta de palabra va primero
+    assert _indice().buscar("juan")[0][0] == "1002"
+
+def test_busqueda_por_cedula_y_alias():
+    assert _indice().buscar("2044")[0][0] == "2044"
+    assert _indice().buscar("mono")[0][0] == "2044"
+
+def test_busqueda_aproximada():
+    # Error de escritura: "Gomes" en lugar de "Gómez"
+    assert _indice().buscar("julianna gomes")[0][0] == "1003"
+
+def test_limite_e_invalidacion():
+    indice = _indice()
+    assert len(indice.buscar("a", limite=2)) <= 2
+    indice.invalidar()
+    assert not indice.vigente
+
+def test_no_publica_reconstruccion_obsoleta():
+    indice = IndiceBusquedaJugadores()
+    generacion = indice.generacion
+    # Una escritura concurrente invalida mientras se leían los registros
+    indice.invalidar()
+    assert not indice.reconstruir(JUGADORES, generacion=generacion)
+    assert not indice.vigente
+    assert indice.reconstruir(JUGADORES, generacion=indice.generacion)
+    assert indice.vigente
+
+def _sesion():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+def _agregar_jugador(db, cedula, nombre):
+    db.add(models.Jugador(
+        cedula=cedula, nombre=nombre, apellido="Prueba", nombre_inscripcion=nombre, telefono=f"300{cedula}",
+        fecha_nacimiento=date(1990, 1, 1), talla_uniforme="M",
+        contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3000000000"
+    ))
+    db.commit()
+
+def test_escrituras_invalidan_el_indice_local():
+    db = _sesion()
+    indice_jugadores.invalidar()
+    _agregar_jugador(db, "5001", "Mateo")
+    assert [j.cedula for j in crud.buscar_jugadores(db, "mateo")] == ["5001"]
+    assert indice_jugadores.vigente
+
+    _agregar_jugador(db, "5002", "Matías")
+    assert not indice_jugadores.vigente
+    assert {j.cedula for j in crud.buscar_jugadores(db, "mat")} == {"5001", "5002"}
+    assert db.get(models.VersionDatos, "jugadores").version == 2
+
+def test_invalidacion_entre_procesos_por_version():
+    db = _sesion()
+    _agregar_jugador(db, "6001", "Felipe")
+
+    # Índice de "otro worker": no recibe la invalidación local, solo ve la versión compartida
+    otro_worker = IndiceBusquedaJugadores(revalidar_s=0)
+    otro_worker.reconstruir([("6001", "Felipe", None, None)], version=otro_worker.leer_version(db))
+    assert otro_worker.vigente_en(db)
+
+    db.query(models.Jugador).filter(models.Jugador.cedula == "6001").update({"nombre": "Andrés"})
+    db.commit()
+    assert not otro_worker.vigente_en(db)
+
+def test_edad_maxima_sin_cambios_de_version():
+    db = _sesion()
+    indice = IndiceBusquedaJugadores(revalidar_s=0, maximo_s=0)
+    indice.reconstruir(JUGADORES, version=indice.leer_version(db))
+    assert not indice.vigente_en(db)
+
+def benchmark(total_jugadores: int = 10000, consultas: int = 500):
+    """Mide reconstrucción y latencia de búsqueda con datos sintéticos"""
+    random.seed(7)
+    nombres = ["Andrés", "Juan", "Carlos", "Sebastián", "Mateo", "Julián", "Felipe", "Óscar"]
+    apellidos = ["Núñez", "Gómez", "Pérez", "Rodríguez", "Martínez", "López", "Díaz"]
+    registros = [
+        (str(10000000 + i), random.choice(nombres), random.choice(apellidos), f"alias{i}")
+        for i in range(total_jugadores)
+    ]
+
+    indice = IndiceBusquedaJugadores()
+    inicio = time.perf_counter()
+    indice.reconstruir(registros)
+    reconstruccion_ms = (time.perf_counter() - inicio) * 1000
+
+    terminos = ["nu", "gomez", "sebas", "alias12", "1000042", "rodrigues"]
+    latencias = []
+    for i in range(consultas):
+        inicio = time.perf_counter()
+        indice.buscar(terminos[i % len(terminos)], limite=20)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    latencias.sort()
+
+    print(f"Jugadores: {total_jugadores} | Reconstrucción: {reconstruccion_ms:.1f} ms")
+    print(f"Búsqueda p50: {latencias[len(latencias) // 2]:.2f} ms | "
+          f"p95: {latencias[int(len(latencias) * 0.95)]:.2f} ms | max: {latencias[-1]:.2f} ms")
+
+if __name__ == "__main__":
+    benchmark()
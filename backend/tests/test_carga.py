@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Pruebas del generador de carga de día de partido.
+
+Los usuarios virtuales se ejecutan contra una aplicación mínima en proceso
+(httpx.ASGITransport) que imita las rutas de los escenarios; así se prueban los
+escenarios y el reporte sin levantar uvicorn ni generar datos.
+"""
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from rendimiento.carga import percentil, ejecutar_carga, RETRASO_BUCLE
+
+def test_percentil_por_rango():
+    valores = [float(v) for v in range(1, 101)]
+    assert percentil(valores, 50) == 50.0
+    assert percentil(valores, 95) == 95.0
+    assert percentil(valores, 99) == 99.0
+    assert percentil([7.0], 99) == 7.0
+    assert percentil([], 50) == 0.0
+
+def crear_app_simulada(pagos_registrados: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/multas/causales/")
+    def causales():
+        return [{"id": 3, "descripcion": "Aporte grupal", "valor": 10000}]
+
+    @app.post("/api/auth/login")
+    def login(credenciales: dict):
+        if credenciales["password"] != str(10_000_000 + int(credenciales["email"][7:].split("@")[0])):
+            raise HTTPException(status_code=401)
+        return {"id": credenciales["password"]}
+
+    @app.get("/api/jugadores/{cedula}/estado-cuenta")
+    def estado_cuenta(cedula: str):
+        return {"jugador_cedula": cedula}
+
+    @app.post("/api/pagos/combinado/")
+    def pago_combinado(pago: dict):
+        mes = (pago["jugador_cedula"], pago["mensualidades"][0]["mes"], pago["mensualidades"][0]["ano"])
+        if mes in pagos_registrados:
+            raise HTTPException(status_code=400, detail="Mes ya pagado")
+        pagos_registrados.append(mes)
+        return {"mensualidades_registradas": 1}
+
+    @app.post("/api/aportes-grupales/")
+    def aporte(aporte: dict):
+        return {"causal_id": aporte["causal_id"]}
+
+    @app.get("/api/dashboard/resumen")
+    def resumen():
+        return {}
+
+    @app.get("/api/dashboard/ranking-multas")
+    def ranking():
+        return []
+
+    return app
+
+def test_escenarios_de_dia_de_partido():
+    pagos = []
+    transporte = httpx.ASGITransport(app=crear_app_simulada(pagos))
+    resultados = asyncio.run(ejecutar_carga(
+        "http://prueba", duracion_s=0.5, jugadores=5, admins=3, paneles=1,
+        pausa_s=0.01, total_jugadores=4, transport=transporte
+    ))
+    resumen = resultados.resumen()
+
+    assert {"POST /auth/login", "GET /jugadores/{cedula}/estado-cuenta", "POST /pagos/combinado",
+            "GET /dashboard/resumen", "GET /dashboard/ranking-multas"} <= set(resumen)
+    for endpoint, datos in resumen.items():
+        assert datos["errores"] == 0, endpoint
+        assert datos["p50_ms"] <= datos["p95_ms"] <= datos["p99_ms"] <= datos["max_ms"]
+        assert datos["rps"] > 0
+    # Con pocos jugadores y varios admins, los pagos nunca repiten mes
+    assert len(pagos) == len(set(pagos)) == resumen["POST /pagos/combinado"]["peticiones"]
+
+def test_escenario_solo_login():
+    transporte = httpx.ASGITransport(app=crear_app_simulada([]))
+    resultados = asyncio.run(ejecutar_carga(
+        "http://prueba", duracion_s=0.3, jugadores=4, admins=3, paneles=1,
+        pausa_s=0.01, total_jugadores=4, transport=transporte, escenario="login"
+    ))
+    resumen = resultados.resumen()
+    assert set(resumen) == {"POST /auth/login", RETRASO_BUCLE}
+    assert resumen["POST /auth/login"]["errores"] == 0
+
+if __name__ == "__main__":
+    test_percentil_por_rango()
+    test_escenarios_de_dia_de_partido()
+    test_escenario_solo_login()
+    print("✅ Generador de carga funcionando correctamente")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la caché de configuraciones del sistema
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from crud import configuraciones as crud
+from schemas.configuraciones import ConfiguracionCreate, ConfiguracionUpdate
+from services.configuracion_sistema import ConfiguracionSistema, ConfiguracionNoDefinida, configuracion_sistema
+
+def _sesiones():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    consultas = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: consultas.append(sql))
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine), consultas
+
+def test_lecturas_desde_cache_e_invalidacion_local():
+    Sesion, consultas = _sesiones()
+    db = Sesion()
+    configuracion_sistema.invalidar()
+    crud.create_configuracion(db, ConfiguracionCreate(clave="mensualidad", valor=20000))
+
+    assert configuracion_sistema.mensualidad(db) == 20000
+    consultas.clear()
+    for _ in range(100):
+        configuracion_sistema.mensualidad(db)
+    assert consultas == []
+
+    crud.update_configuracion(db, "mensualidad", ConfiguracionUpdate(valor=25000))
+    assert configuracion_sistema.mensualidad(db) == 25000
+
+    crud.delete_configuracion(db, "mensualidad")
+    try:
+        configuracion_sistema.mensualidad(db)
+        assert False, "Debió fallar sin configuración"
+    except ConfiguracionNoDefinida:
+        pass
+    assert configuracion_sistema.obtener(db, "mensualidad", 0.0) == 0.0
+
+def test_invalidacion_entre_procesos_por_version():
+    Sesion, _ = _sesiones()
+    db = Sesion()
+    crud.create_configuracion(db, ConfiguracionCreate(clave="mensualidad", valor=20000))
+
+    # Caché de "otro worker": no recibe la invalidación local, solo ve la versión compartida
+    otro_worker = ConfiguracionSistema(revalidar_s=0)
+    assert otro_worker.mensualidad(db) == 20000
+
+    crud.update_configuracion(db, "mensualidad", ConfiguracionUpdate(valor=30000))
+    assert otro_worker.mensualidad(db) == 30000
+    assert db.get(models.VersionDatos, "configuraciones").version == 2
+
+if __name__ == "__main__":
+    test_lecturas_desde_cache_e_invalidacion_local()
+    test_invalidacion_entre_procesos_por_version()
+    print("✅ Caché de configuraciones funcionando correctamente")
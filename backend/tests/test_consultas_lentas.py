@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Pruebas del registro de consultas lentas (enmascarado de datos personales, origen y plan)
+"""
+import sys
+import os
+import tempfile
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from crud import jugadores as crud_jugadores
+from routers.admin import router
+from services import consultas_lentas
+from services.sesiones import sesiones
+
+def test_enmascarar_parametros():
+    assert consultas_lentas.enmascarar_parametros({"cedula_1": "1001", "mes": 3}) == {"cedula_1": "***", "mes": 3}
+    assert consultas_lentas.enmascarar_parametros(("ana@correo.com", "3001234567", "Andrés", 5)) == \
+        ["***", "***", "Andrés", 5]
+    assert consultas_lentas.enmascarar_parametros(("x", 1), ["email_1", "param_2"]) == ["***", 1]
+    # Token de recuperación y cuerpo de un correo encolado (lleva el enlace con el token)
+    assert consultas_lentas.enmascarar_parametros({"token_1": "abc123", "cuerpo_html": "<a>...</a>", "tipo": "recuperacion"}) == \
+        {"token_1": "***", "cuerpo_html": "***", "tipo": "recuperacion"}
+
+def test_registro_con_origen_y_plan():
+    directorio = tempfile.mkdtemp()
+    originales = (consultas_lentas.UMBRAL_MS, consultas_lentas.MODO_EXPLAIN, consultas_lentas.ARCHIVO)
+    consultas_lentas.UMBRAL_MS = 0.000001
+    consultas_lentas.MODO_EXPLAIN = "1"
+    consultas_lentas.ARCHIVO = os.path.join(directorio, "consultas_lentas.log")
+    consultas_lentas._logger = None
+    try:
+        engine = create_engine("sqlite://")
+        models.Base.metadata.create_all(bind=engine)
+        db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        db.add(models.Jugador(
+            cedula="1001", nombre="Andrés", apellido="Núñez", nombre_inscripcion="Andy",
+            telefono="3001234567", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+            contacto_emergencia_nombre="Ana", contacto_emergencia_telefono="3002"
+        ))
+        db.commit()
+        crud_jugadores.get_jugador(db, "1001")
+
+        consultas = consultas_lentas.leer_consultas_lentas(limite=10)
+        select = next(c for c in consultas if c["sql"].startswith("SELECT jugadores"))
+        assert select["origen"].startswith("crud.jugadores.get_jugador")
+        assert "1001" not in str(select["parametros"])
+        assert select["plan"] and "jugadores" in " ".join(select["plan"])
+
+        insert = next(c for c in consultas if c["sql"].startswith("INSERT INTO jugadores"))
+        assert "3001234567" not in str(insert["parametros"])
+        assert "Andrés" in str(insert["parametros"])
+    finally:
+        consultas_lentas.UMBRAL_MS, consultas_lentas.MODO_EXPLAIN, consultas_lentas.ARCHIVO = originales
+        consultas_lentas._logger = None
+
+class CursorPostgresFalso:
+    """Cursor DBAPI que registra las sentencias; el EXPLAIN falla como un statement_timeout"""
+
+    def __init__(self, sentencias):
+        self.sentencias = sentencias
+        self.connection = self
+
+    def cursor(self):
+        return self
+
+    def execute(self, sentencia, parametros=None):
+        self.sentencias.append(sentencia.split(" SELECT")[0])
+        if sentencia.startswith("EXPLAIN"):
+            raise RuntimeError("canceling statement due to statement timeout")
+
+    def close(self):
+        pass
+
+def test_plan_no_aborta_la_transaccion():
+    original = consultas_lentas.MODO_EXPLAIN
+    try:
+        consultas_lentas.MODO_EXPLAIN = "1"
+        sentencias = []
+        plan = consultas_lentas._capturar_plan(CursorPostgresFalso(sentencias), "postgresql", "SELECT 1", ())
+        assert plan[0].startswith("No se pudo obtener el plan")
+        # El error queda dentro del savepoint: la transacción de la petición sigue utilizable
+        assert sentencias == ["SAVEPOINT plan_consulta_lenta", "EXPLAIN",
+                              "ROLLBACK TO SAVEPOINT plan_consulta_lenta", "RELEASE SAVEPOINT plan_consulta_lenta"]
+
+        # "analyze" ya no vuelve a ejecutar la consulta
+        consultas_lentas.MODO_EXPLAIN = "analyze"
+        sentencias = []
+        assert consultas_lentas._capturar_plan(CursorPostgresFalso(sentencias), "postgresql", "SELECT 1", ()) is None
+        assert sentencias == []
+    finally:
+        consultas_lentas.MODO_EXPLAIN = original
+
+def test_ruta_solo_para_administradores():
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    cliente = TestClient(app)
+    jugador = sesiones.emitir({"sub": "1000", "rol": "jugador", "cedula": "1000"})
+    admin = sesiones.emitir({"sub": "1", "rol": "admin"})
+
+    assert cliente.get("/api/admin/consultas-lentas").status_code == 401
+    assert cliente.get("/api/admin/consultas-lentas", headers={"Authorization": f"Bearer {jugador}"}).status_code == 403
+    respuesta = cliente.get("/api/admin/consultas-lentas", headers={"Authorization": f"Bearer {admin}"})
+    assert respuesta.status_code == 200 and "consultas" in respuesta.json()
+
+if __name__ == "__main__":
+    test_enmascarar_parametros()
+    test_registro_con_origen_y_plan()
+    test_plan_no_aborta_la_transaccion()
+    test_ruta_solo_para_administradores()
+    print("✅ Registro de consultas lentas funcionando correctamente")
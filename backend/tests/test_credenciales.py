@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Pruebas del hash de contraseñas con bcrypt, del rehash al iniciar sesión y del pool de hilos
+"""
+import sys
+import os
+import asyncio
+import hashlib
+import time
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import get_db
+from routers.auth import router
+from services.credenciales import Credenciales, credenciales
+from services.cache_finanzas import NOMBRE_VERSION
+
+def _sha256(texto: str) -> str:
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+def test_hash_y_verificacion():
+    kdf = Credenciales(rondas=4)
+    guardado = kdf.generar_hash("secreta")
+    assert guardado.startswith("$2b$04$")
+    assert guardado != kdf.generar_hash("secreta")  # sal aleatoria
+    assert kdf.verificar("secreta", guardado) == (True, False)
+    assert kdf.verificar("otra", guardado) == (False, False)
+    assert kdf.verificar("secreta", None) == (False, False)
+    assert kdf.verificar("secreta", "$2b$04$basura") == (False, False)
+    assert kdf.verificar("contraseña", kdf.generar_hash("contraseña")) == (True, False)
+
+    # SHA-256 heredado: válido, pero hay que reemplazarlos
+    assert kdf.verificar("12345678", _sha256("12345678")) == (True, True)
+    assert kdf.verificar("otra", _sha256("12345678")) == (False, True)
+
+    # Subir el costo migra los hashes anteriores al verificarlos
+    assert Credenciales(rondas=5).verificar("secreta", guardado) == (True, True)
+
+    try:
+        Credenciales(rondas=3)
+        assert False, "bcrypt necesita al menos 4 rondas"
+    except ValueError:
+        pass
+
+def test_pool_no_bloquea_el_bucle():
+    kdf = Credenciales(rondas=12, hilos=2)
+    guardado = kdf.generar_hash("secreta")
+    inicio = time.perf_counter()
+    kdf.verificar("secreta", guardado)
+    costo_s = time.perf_counter() - inicio
+
+    async def escenario():
+        retrasos = []
+
+        async def reloj():
+            for _ in range(int(costo_s * 4 / 0.005)):
+                antes = time.perf_counter()
+                await asyncio.sleep(0.005)
+                retrasos.append(time.perf_counter() - antes - 0.005)
+
+        resultados, _ = await asyncio.gather(
+            asyncio.gather(*(kdf.verificar_async("secreta", guardado) for _ in range(4))),
+            reloj()
+        )
+        return resultados, max(retrasos)
+
+    resultados, retraso_maximo = asyncio.run(escenario())
+    assert all(r.valida for r in resultados)
+    # El bucle siguió atendiendo mientras se calculaban cuatro hashes
+    assert retraso_maximo < costo_s / 2, (retraso_maximo, costo_s)
+
+def _cliente():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Sesion()
+    db.add(models.Administrador(id=1, nombre="Admin", email="admin@equipo.com", rol="admin",
+                                password=_sha256("admin123")))
+    db.add(models.Jugador(
+        cedula="12345678", nombre="Jugador", apellido="Prueba", nombre_inscripcion="J",
+        telefono="300", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+        contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3100",
+        email="jugador@equipo.com", password=_sha256("12345678")
+    ))
+    db.commit()
+    db.close()
+
+    def get_db_prueba():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = get_db_prueba
+    return TestClient(app), Sesion
+
+def _version_finanzas(db) -> int:
+    version = db.get(models.VersionDatos, NOMBRE_VERSION)
+    return version.version if version else 0
+
+def test_login_actualiza_hash_heredado():
+    cliente, Sesion = _cliente()
+    db = Sesion()
+    version = _version_finanzas(db)
+    db.close()
+
+    respuesta = cliente.post("/api/auth/login", json={"email": "jugador@equipo.com", "password": "12345678"})
+    assert respuesta.status_code == 200
+    assert respuesta.json()["cedula"] == "12345678"
+
+    db = Sesion()
+    guardado = db.get(models.Jugador, "12345678").password
+    assert guardado.startswith("$2b$")
+    assert credenciales.verificar("12345678", guardado).valida
+    # Cambiar la contraseña no toca las finanzas: no sube la versión de cache_finanzas
+    assert _version_finanzas(db) == version
+    db.close()
+
+    # Con el hash nuevo el login sigue funcionando; la contraseña incorrecta no
+    assert cliente.post("/api/auth/login", json={"email": "jugador@equipo.com", "password": "12345678"}).status_code == 200
+    assert cliente.post("/api/auth/login", json={"email": "jugador@equipo.com", "password": "otra"}).status_code == 401
+    assert cliente.post("/api/auth/login", json={"email": "nadie@equipo.com", "password": "x"}).status_code == 401
+
+    respuesta = cliente.post("/api/auth/login", json={"email": "admin@equipo.com", "password": "admin123"})
+    assert respuesta.json()["rol"] == "admin"
+    db = Sesion()
+    assert db.get(models.Administrador, 1).password.startswith("$2b$")
+    db.close()
+
+if __name__ == "__main__":
+    test_hash_y_verificacion()
+    test_pool_no_bloquea_el_bucle()
+    test_login_actualiza_hash_heredado()
+    print("✅ Credenciales funcionando correctamente")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Pruebas del documento de normativa cacheado con ETag
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import get_db
+from routers.articulos_normativa import router
+from crud import multas as crud_multas
+from schemas.multas import CausalMultaCreate
+from services.documento_normativa import DocumentoNormativa, documento_normativa
+
+def _sesiones():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _cliente():
+    Sesion = _sesiones()
+
+    def get_db_prueba():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = get_db_prueba
+    documento_normativa.invalidar()
+    return TestClient(app)
+
+def test_documento_con_etag_y_versionado():
+    cliente = _cliente()
+    creado = cliente.post("/api/articulos-normativa/", json={
+        "numero_articulo": "1.1", "titulo": "Puntualidad", "contenido": "Llegar a tiempo.", "tipo": "sancionable"
+    }).json()
+
+    respuesta = cliente.get("/api/articulos-normativa/documento")
+    assert respuesta.status_code == 200
+    etag = respuesta.headers["etag"]
+    assert respuesta.json()["total_articulos"] == 1
+
+    # Sin cambios: 304 y sin recompilar
+    version = documento_normativa.version
+    assert cliente.get("/api/articulos-normativa/documento", headers={"If-None-Match": etag}).status_code == 304
+    assert documento_normativa.version == version
+
+    # Un cambio en la normativa sube la versión y cambia el ETag
+    cliente.put(f"/api/articulos-normativa/{creado['id']}", json={"titulo": "Puntualidad en partidos"})
+    assert documento_normativa.version == version + 1
+    respuesta = cliente.get("/api/articulos-normativa/documento", headers={"If-None-Match": etag})
+    assert respuesta.status_code == 200
+    assert respuesta.headers["etag"] != etag
+    assert respuesta.json()["articulos"][0]["titulo"] == "Puntualidad en partidos"
+
+def test_invalidacion_entre_procesos_por_version():
+    db = _sesiones()()
+    articulo = models.ArticuloNormativa(numero_articulo="2.1", titulo="Respeto", contenido="Respetar al árbitro.")
+    db.add(articulo)
+    db.commit()
+
+    # Documento de "otro worker": no recibe la invalidación local, solo ve la versión compartida
+    otro_worker = DocumentoNormativa(revalidar_s=0)
+    contenido, etag = otro_worker.obtener_json(db)
+    assert otro_worker.obtener_json(db) == (contenido, etag)
+
+    crud_multas.crear_causal_multa(db, CausalMultaCreate(
+        descripcion="Insultar al árbitro", valor=20000, articulo_id=articulo.id
+    ))
+    assert db.get(models.VersionDatos, "normativa").version == 2
+    assert otro_worker.obtener_json(db)[1] != etag
+
+def test_escritura_revertida_no_sube_la_version():
+    db = _sesiones()()
+    db.add(models.ArticuloNormativa(numero_articulo="3.1", titulo="Uniforme", contenido="Usar el uniforme."))
+    db.commit()
+    db.add(models.ArticuloNormativa(numero_articulo="3.2", titulo="Borrador", contenido="..."))
+    db.flush()
+    db.rollback()
+    assert db.get(models.VersionDatos, "normativa").version == 1
+
+if __name__ == "__main__":
+    test_documento_con_etag_y_versionado()
+    test_invalidacion_entre_procesos_por_version()
+    test_escritura_revertida_no_sube_la_version()
+    print("✅ Documento de normativa funcionando correctamente")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Pruebas de egresos por categoría: filtros de período en el join y paginación por cursor
+"""
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from crud import egresos as crud_egresos
+from crud.estado_cuenta import obtener_egresos_por_categoria
+from database import get_db
+from routers.egresos import router
+from services.instrumentacion_sql import presupuesto_consultas
+
+def _sesiones():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Sesion()
+    db.add_all([
+        models.CategoriaEgreso(id=1, nombre="Arbitraje"),
+        models.CategoriaEgreso(id=2, nombre="Equipamiento"),
+        models.CategoriaEgreso(id=3, nombre="Transporte"),
+    ])
+    # 12 egresos de equipamiento en marzo; varios comparten fecha para probar el desempate por id
+    for i in range(12):
+        db.add(models.Egreso(categoria_id=2, concepto=f"Balón {i}", valor=1000,
+                             fecha=datetime(2025, 3, 1 + i // 3)))
+    db.add_all([
+        models.Egreso(categoria_id=1, concepto="Final", valor=50000, fecha=datetime(2025, 3, 15)),
+        models.Egreso(categoria_id=1, concepto="Amistoso", valor=30000, fecha=datetime(2025, 4, 1)),
+        # Transporte solo tiene egresos fuera de marzo
+        models.Egreso(categoria_id=3, concepto="Bus", valor=80000, fecha=datetime(2025, 2, 10)),
+    ])
+    db.commit()
+    db.close()
+    return Sesion
+
+def test_filtros_no_descartan_categorias_vacias():
+    db = _sesiones()()
+    with presupuesto_consultas(1):
+        marzo = obtener_egresos_por_categoria(db, datetime(2025, 3, 1), datetime(2025, 4, 1))
+
+    assert [c.categoria_nombre for c in marzo] == ["Arbitraje", "Equipamiento", "Transporte"]
+    por_nombre = {c.categoria_nombre: c for c in marzo}
+    assert (por_nombre["Arbitraje"].total_categoria, por_nombre["Arbitraje"].cantidad_egresos) == (50000, 1)
+    assert (por_nombre["Equipamiento"].total_categoria, por_nombre["Equipamiento"].cantidad_egresos) == (12000, 12)
+    assert (por_nombre["Transporte"].total_categoria, por_nombre["Transporte"].cantidad_egresos) == (0, 0)
+
+def test_resumen_con_primera_pagina_por_categoria():
+    db = _sesiones()()
+    with presupuesto_consultas(2):
+        resumen, total = crud_egresos.get_resumen_egresos(
+            db, datetime(2025, 3, 1), datetime(2025, 4, 1), egresos_por_categoria=5
+        )
+        # La categoría de cada egreso ya viene cargada
+        assert all(e.categoria.nombre == c.nombre for c in resumen for e in c.egresos)
+
+    assert total == 62000
+    equipamiento = next(c for c in resumen if c.nombre == "Equipamiento")
+    assert equipamiento.cantidad == 12 and len(equipamiento.egresos) == 5
+    assert equipamiento.siguiente_cursor is not None
+    arbitraje = next(c for c in resumen if c.nombre == "Arbitraje")
+    assert [e.concepto for e in arbitraje.egresos] == ["Final"]
+    assert arbitraje.siguiente_cursor is None
+
+def test_paginacion_por_cursor_recorre_todo_sin_repetir():
+    db = _sesiones()()
+    vistos, cursor = [], None
+    while True:
+        with presupuesto_consultas(1):
+            pagina, cursor = crud_egresos.get_egresos_categoria(db, 2, cursor=cursor, limite=5)
+        vistos.extend(pagina)
+        if not cursor:
+            break
+
+    assert len(vistos) == 12
+    assert len({e.id for e in vistos}) == 12
+    claves = [(e.fecha, e.id) for e in vistos]
+    assert claves == sorted(claves, reverse=True)
+
+def _paginar(db, categoria_id, limite):
+    vistos, cursor = [], None
+    for _ in range(20):
+        pagina, cursor = crud_egresos.get_egresos_categoria(db, categoria_id, cursor=cursor, limite=limite)
+        vistos.extend(e.id for e in pagina)
+        if not cursor:
+            return vistos
+    raise AssertionError("La paginación no avanza")
+
+def test_paginacion_con_fecha_por_defecto_de_la_base():
+    Sesion = _sesiones()
+    db = Sesion()
+    # Egresos antiguos que tomaron CURRENT_TIMESTAMP de SQLite: todos con la misma fecha sin microsegundos
+    for i in range(5):
+        db.execute(text(
+            "INSERT INTO egresos (categoria_id, concepto, valor, fecha) VALUES (3, :concepto, 5000, CURRENT_TIMESTAMP)"
+        ), {"concepto": f"Peaje {i}"})
+    db.commit()
+    assert db.execute(text("SELECT DISTINCT length(fecha) FROM egresos WHERE concepto LIKE 'Peaje%'")).scalars().all() == [19]
+
+    ruta = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "migrations", "normalizar_fecha_egresos.sql")
+    with open(ruta, encoding="utf-8") as archivo:
+        db.connection().connection.executescript(archivo.read())
+    db.commit()
+
+    ids = _paginar(db, 3, limite=2)
+    assert len(ids) == 6 and len(set(ids)) == 6
+
+    # Los egresos nuevos sin fecha la reciben desde Python, en el mismo formato que el cursor
+    for i in range(5):
+        db.add(models.Egreso(categoria_id=1, concepto=f"Tarjeta {i}", valor=2000))
+    db.commit()
+    ids = _paginar(db, 1, limite=2)
+    assert len(ids) == 7 and len(set(ids)) == 7
+
+def test_endpoints_de_egresos():
+    Sesion = _sesiones()
+
+    def get_db_prueba():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = get_db_prueba
+    cliente = TestClient(app)
+
+    resumen = cliente.get("/api/egresos/resumen/?egresos_por_categoria=2").json()
+    equipamiento = next(c for c in resumen if c["nombre"] == "Equipamiento")
+    assert len(equipamiento["egresos"]) == 2
+
+    siguiente = cliente.get(
+        f"/api/egresos/categorias/2/egresos/?limite=20&cursor={equipamiento['siguiente_cursor']}"
+    ).json()
+    assert len(siguiente["egresos"]) == 10 and siguiente["siguiente_cursor"] is None
+
+    assert cliente.get("/api/egresos/categorias/2/egresos/?cursor=basura").status_code == 400
+    assert cliente.get("/api/egresos/categorias/99/egresos/").status_code == 404
+
+if __name__ == "__main__":
+    test_filtros_no_descartan_categorias_vacias()
+    test_resumen_con_primera_pagina_por_categoria()
+    test_paginacion_por_cursor_recorre_todo_sin_repetir()
+    test_paginacion_con_fecha_por_defecto_de_la_base()
+    test_endpoints_de_egresos()
+    print("✅ Egresos por categoría funcionando correctamente")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Pruebas del estado de cuenta del jugador: número de consultas constante y movimientos memorizados
+"""
+import sys
+import os
+from datetime import date, datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from crud.jugadores import get_estado_cuenta_jugador
+from services.estado_cuenta_service import EstadoCuentaService, cargar_movimientos
+from services.instrumentacion_sql import presupuesto_consultas
+
+def _sesion(años_historial: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    hoy = date.today()
+    inicio = hoy.year - años_historial
+    db.add(models.Jugador(
+        cedula="1000", nombre="Jugador", apellido="Prueba", nombre_inscripcion="J",
+        telefono="300", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+        contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3100",
+        email="j@equipo.com", fecha_inscripcion=date(inicio, 1, 1)
+    ))
+    db.add_all([models.CausalMulta(id=1, descripcion="Llegada tarde", valor=5000),
+                models.CausalMulta(id=2, descripcion="Tarjeta roja", valor=20000)])
+    for año in range(inicio, hoy.year + 1):
+        for mes in range(1, 13):
+            if (año, mes) > (hoy.year, hoy.month):
+                break
+            db.add(models.Mensualidad(jugador_cedula="1000", mes=mes, ano=año, valor=20000,
+                                      fecha_pago=datetime(año, mes, 5)))
+            db.add(models.Multa(jugador_cedula="1000", causal_id=1 + mes % 2, valor=1000 * mes,
+                                fecha_multa=date(año, mes, 10), pagada=True, fecha_pago=datetime(año, mes, 20)))
+        db.add(models.OtroAporte(jugador_cedula="1000", concepto=f"Rifa {año}", valor=3000,
+                                 fecha_aporte=datetime(año, 6, 1)))
+    db.commit()
+    return db
+
+def test_consultas_constantes_con_historial_largo():
+    for años in (0, 8):
+        db = _sesion(años)
+        with presupuesto_consultas(2):
+            estado = get_estado_cuenta_jugador(db, "1000")
+        assert estado.estado == "AL DÍA"
+        assert len(estado.multas) == len(estado.meses_pagados)
+        assert len(estado.otros_aportes) == años + 1
+        assert estado.total_multas_pendientes == 0
+
+def test_contenido_del_estado_de_cuenta():
+    db = _sesion(1)
+    db.add(models.Multa(jugador_cedula="1000", causal_id=2, valor=15000,
+                        fecha_multa=date.today(), pagada=False))
+    db.commit()
+
+    estado = get_estado_cuenta_jugador(db, "1000")
+    assert estado.estado == "TIENE MULTAS PENDIENTES"
+    # Se usa el valor guardado en la multa, no el actual de la causal
+    assert estado.total_multas_pendientes == 15000
+    pendiente = [m for m in estado.multas if not m.pagada]
+    assert [(m.descripcion, m.valor, m.fecha_pago) for m in pendiente] == [("Tarjeta roja", 15000, None)]
+    assert estado.meses_pagados[0].fecha_pago == datetime(date.today().year - 1, 1, 5)
+    assert [(m.ano, m.mes) for m in estado.meses_pagados] == sorted((m.ano, m.mes) for m in estado.meses_pagados)
+    assert estado.otros_aportes[0].concepto == f"Rifa {date.today().year - 1}"
+
+def test_memoria_se_descarta_al_escribir():
+    db = _sesion(0)
+    jugador = db.get(models.Jugador, "1000")
+    with presupuesto_consultas(1):
+        cargar_movimientos(db, "1000")
+        assert EstadoCuentaService.calcular_estado_al_dia(jugador, db)
+
+    db.add(models.Multa(jugador_cedula="1000", causal_id=1, valor=5000, fecha_multa=date.today(), pagada=False))
+    db.flush()
+    assert not EstadoCuentaService.calcular_estado_al_dia(jugador, db)
+
+if __name__ == "__main__":
+    test_consultas_constantes_con_historial_largo()
+    test_contenido_del_estado_de_cuenta()
+    test_memoria_se_descarta_al_escribir()
+    print("✅ Estado de cuenta del jugador funcionando correctamente")
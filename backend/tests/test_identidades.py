@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Pruebas del índice unificado de identidades: login en una consulta y correos sin distinguir mayúsculas
+"""
+import sys
+import os
+import asyncio
+import hashlib
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import get_db
+from crud import identidades as crud_identidades
+from crud import admin as crud_admin
+from crud import jugadores as crud_jugadores
+from services.credenciales import credenciales
+from services.instrumentacion_sql import presupuesto_consultas
+
+def _sha256(texto: str) -> str:
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+def _jugador(cedula: str, email, password=None):
+    return models.Jugador(
+        cedula=cedula, nombre=f"Jugador{cedula}", apellido="Prueba", nombre_inscripcion=f"J{cedula}",
+        telefono=f"300{cedula}", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+        contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3100",
+        email=email, password=password
+    )
+
+def _sesion():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    db.add(models.Administrador(id=1, nombre="Admin", email="Admin@Equipo.com", rol="admin",
+                                password=credenciales.generar_hash("admin123")))
+    db.add(_jugador("1000", "jugador@equipo.com", _sha256("1000")))
+    db.add(_jugador("1001", "sinclave@equipo.com"))
+    db.add(_jugador("1002", None))
+    db.add(_jugador("1003", None))
+    db.commit()
+    return db
+
+def test_login_en_una_consulta():
+    db = _sesion()
+    with presupuesto_consultas(1):
+        assert asyncio.run(crud_identidades.autenticar(db, "nadie@equipo.com", "x")) is None
+    with presupuesto_consultas(1):
+        assert asyncio.run(crud_identidades.autenticar(db, "admin@equipo.com", "otra")) is None
+    # Un jugador sin contraseña no puede iniciar sesión
+    assert asyncio.run(crud_identidades.autenticar(db, "sinclave@equipo.com", "")) is None
+
+    with presupuesto_consultas(1):
+        admin = asyncio.run(crud_identidades.autenticar(db, "  ADMIN@equipo.COM ", "admin123"))
+    assert admin == ("admin", "1", "Admin", "Admin@Equipo.com", admin.password)
+
+    # Hash heredado: se actualiza en la misma tabla de la identidad
+    jugador = asyncio.run(crud_identidades.autenticar(db, "Jugador@Equipo.com", "1000"))
+    assert (jugador.rol, jugador.id) == ("jugador", "1000")
+    db.expire_all()
+    assert db.get(models.Jugador, "1000").password.startswith("$2b$")
+
+    # Los endpoints por rol siguen devolviendo el modelo
+    assert asyncio.run(crud_admin.autenticar_admin(db, "admin@equipo.com", "admin123")).id == 1
+    assert asyncio.run(crud_admin.autenticar_admin(db, "jugador@equipo.com", "1000")) is None
+    assert asyncio.run(crud_jugadores.autenticar_jugador(db, "JUGADOR@equipo.com", "1000")).cedula == "1000"
+
+def test_indices_y_unicidad():
+    db = _sesion()
+    plan = " ".join(str(fila) for fila in db.execute(text(
+        "EXPLAIN QUERY PLAN " + str(crud_identidades._consulta_identidad("x").compile(compile_kwargs={"literal_binds": True}))
+    )))
+    assert "ix_administradores_email_normalizado" in plan and "ix_jugadores_email_normalizado" in plan, plan
+
+    db.add(_jugador("1004", "JUGADOR@equipo.com"))
+    try:
+        db.commit()
+        assert False, "El índice debió rechazar el correo duplicado"
+    except IntegrityError:
+        db.rollback()
+
+    assert crud_identidades.email_en_uso(db, "admin@EQUIPO.com")
+    assert crud_identidades.email_en_uso(db, "SinClave@equipo.com")
+    assert not crud_identidades.email_en_uso(db, "nuevo@equipo.com")
+    assert not crud_identidades.email_en_uso(db, "")
+    propia = crud_identidades.buscar_identidad(db, "jugador@equipo.com")
+    assert not crud_identidades.email_en_uso(db, "jugador@equipo.com", excepto=propia)
+
+    assert crud_admin.get_admin_by_email(db, "ADMIN@equipo.com").id == 1
+    assert crud_jugadores.get_jugador_by_email(db, "Jugador@Equipo.com").cedula == "1000"
+
+def test_jugadores_sin_correo():
+    from routers.jugadores import router
+    db = _sesion()
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: db
+    cliente = TestClient(app)
+
+    # Varios jugadores sin correo: se guardan con NULL y no chocan en el índice único
+    for cedula, email in (("2000", ""), ("2001", "   ")):
+        respuesta = cliente.post("/api/jugadores/", json={
+            "nombre": "Sin", "apellido": "Correo", "cedula": cedula, "telefono": f"300{cedula}", "email": email,
+            "fecha_nacimiento": "1995-01-01", "talla_uniforme": "M", "numero_camiseta": None,
+            "contacto_emergencia_nombre": "Contacto", "contacto_emergencia_telefono": "3100",
+            "nombre_inscripcion": f"S{cedula}"
+        })
+        assert respuesta.status_code == 200, respuesta.text
+        assert respuesta.json()["email"] is None
+    assert db.query(models.Jugador).filter(models.Jugador.email.is_(None)).count() == 4
+
+    assert crud_jugadores.actualizar_credenciales_jugador(db, "1001", " ", "nueva")
+    db.expire_all()
+    assert db.get(models.Jugador, "1001").email is None
+
+if __name__ == "__main__":
+    test_login_en_una_consulta()
+    test_indices_y_unicidad()
+    test_jugadores_sin_correo()
+    print("✅ Índice unificado de identidades funcionando correctamente")
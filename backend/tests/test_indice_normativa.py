@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Pruebas del índice de texto completo de la normativa (FTS5 en SQLite)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from crud import articulos_normativa as crud
+from schemas.articulos_normativa import ArticuloNormativaCreate, ArticuloNormativaUpdate
+from services import indice_normativa
+
+def _sesion():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    assert indice_normativa.asegurar_indice(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+def test_busqueda_por_relevancia_con_fragmentos():
+    db = _sesion()
+    crud.create_articulo(db, ArticuloNormativaCreate(
+        numero_articulo="1.1", titulo="Uniforme", contenido="El jugador debe usar el uniforme completo."
+    ))
+    crud.create_articulo(db, ArticuloNormativaCreate(
+        numero_articulo="5.2", titulo="Puntualidad",
+        contenido="La puntualidad es obligatoria. Llegar tarde a un partido genera multa."
+    ))
+
+    resultados = crud.buscar_articulos(db, "puntual")
+    assert [a.numero_articulo for a, _ in resultados] == ["5.2"]
+    assert "<mark>" in resultados[0][1].fragmento
+
+    # Sin tildes y por prefijo
+    assert [a.numero_articulo for a, _ in crud.buscar_articulos(db, "partído")] == ["5.2"]
+
+def test_indice_se_mantiene_al_actualizar_duplicar_y_eliminar():
+    db = _sesion()
+    articulo = crud.create_articulo(db, ArticuloNormativaCreate(
+        numero_articulo="2.1", titulo="Conducta", contenido="Respeto a los árbitros."
+    ))
+    crud.update_articulo(db, articulo.id, ArticuloNormativaUpdate(contenido="Respeto a los rivales."))
+    assert crud.buscar_articulos(db, "arbitros") == []
+    assert len(crud.buscar_articulos(db, "rivales")) == 1
+
+    crud.duplicar_articulo(db, articulo.id, "2.2")
+    assert len(crud.buscar_articulos(db, "rivales")) == 2
+
+    crud.delete_articulo(db, articulo.id)
+    assert [a.numero_articulo for a, _ in crud.buscar_articulos(db, "rivales")] == ["2.2"]
+
+    # get_articulos usa el índice cuando hay término de búsqueda
+    assert [a.numero_articulo for a in crud.get_articulos(db, buscar="rival")] == ["2.2"]
+
+def test_disponibilidad_por_base_de_datos():
+    con_indice = _sesion()
+    # Otra base SQLite del mismo proceso, sin la tabla FTS: usa la búsqueda con ILIKE
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    sin_indice = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    assert indice_normativa.disponible(con_indice)
+    assert not indice_normativa.disponible(sin_indice)
+
+    crud.create_articulo(sin_indice, ArticuloNormativaCreate(
+        numero_articulo="2.1", titulo="Puntualidad", contenido="Llegar a tiempo."
+    ))
+    assert [a.numero_articulo for a in crud.get_articulos(sin_indice, buscar="Puntual")] == ["2.1"]
+
+if __name__ == "__main__":
+    test_busqueda_por_relevancia_con_fragmentos()
+    test_indice_se_mantiene_al_actualizar_duplicar_y_eliminar()
+    test_disponibilidad_por_base_de_datos()
+    print("✅ Índice de normativa funcionando correctamente")
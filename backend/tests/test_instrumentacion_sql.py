@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la instrumentación SQL por petición (Server-Timing, N+1 y presupuesto de consultas)
+"""
+import sys
+import os
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import get_db
+from routers.jugadores import router
+from services.instrumentacion_sql import (
+    forma_sentencia, instrumentar_peticion, presupuesto_consultas, registrar_consultas, verificar_presupuesto
+)
+
+def _preparar(cantidad_jugadores: int = 15):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Sesion()
+    for i in range(cantidad_jugadores):
+        db.add(models.Jugador(
+            cedula=f"{1000 + i}", nombre=f"Jugador{i}", apellido="Prueba", nombre_inscripcion=f"J{i}",
+            telefono=f"300{i}", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+            contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3100",
+            email=f"j{i}@equipo.com"
+        ))
+    db.commit()
+    db.close()
+
+    def get_db_prueba():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.middleware("http")(instrumentar_peticion)
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = get_db_prueba
+    return TestClient(app), Sesion
+
+def test_server_timing_y_presupuesto_por_endpoint():
+    cliente, _ = _preparar()
+    respuesta = verificar_presupuesto(cliente.get("/api/jugadores/"), 1)
+    assert respuesta.status_code == 200
+    assert respuesta.headers["Server-Timing"].startswith("db;dur=")
+
+    try:
+        verificar_presupuesto(cliente.get("/api/jugadores/"), 0)
+        assert False, "Debió superar el presupuesto"
+    except AssertionError as e:
+        assert "GET /api/jugadores/" in str(e)
+
+def test_presupuesto_de_un_bloque():
+    _, Sesion = _preparar()
+    db = Sesion()
+    with presupuesto_consultas(1):
+        db.query(models.Jugador).all()
+    try:
+        with presupuesto_consultas(1):
+            db.query(models.Jugador).all()
+            db.query(models.Multa).all()
+        assert False, "Debió superar el presupuesto"
+    except AssertionError as e:
+        assert "2 consultas" in str(e)
+
+def test_deteccion_n_mas_1():
+    _, Sesion = _preparar()
+    db = Sesion()
+    with registrar_consultas() as registro:
+        for jugador in db.query(models.Jugador).all():
+            # Una consulta por jugador: el patrón N+1 clásico
+            db.query(models.Multa).filter(models.Multa.jugador_cedula == jugador.cedula).all()
+    repetidas = registro.repetidas(umbral=10)
+    assert len(repetidas) == 1 and repetidas[0][1] == 15
+    assert "FROM multas" in repetidas[0][0]
+
+def test_forma_sentencia_agrupa_literales_e_in():
+    assert forma_sentencia("SELECT * FROM t WHERE id IN (?, ?, ?) AND x = 5") == \
+        forma_sentencia("SELECT * FROM t WHERE id IN (?, ?)   AND x = 7")
+
+if __name__ == "__main__":
+    test_server_timing_y_presupuesto_por_endpoint()
+    test_presupuesto_de_un_bloque()
+    test_deteccion_n_mas_1()
+    test_forma_sentencia_agrupa_literales_e_in()
+    print("✅ Instrumentación SQL funcionando correctamente")
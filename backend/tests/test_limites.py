@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los límites de tasa (token bucket) y de los cupos de admisión con respuesta 429
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import get_db
+from routers.auth import router
+from services.limites import (
+    AlmacenMemoria, AlmacenSQLite, Limites, Regla, admitir_reporte, ip_cliente, limites, rechazos_total,
+    redes_confiables
+)
+
+def test_cubeta_de_tokens():
+    almacen = AlmacenMemoria()
+    regla = Regla.desde_texto("3/60")  # ráfaga de 3, un token cada 20 s
+    assert [almacen.consumir("ip:1", regla, ahora=0) for _ in range(3)] == [0, 0, 0]
+    assert almacen.consumir("ip:1", regla, ahora=0) == 20
+    assert almacen.consumir("ip:2", regla, ahora=0) == 0  # otra clave, otra cubeta
+    assert almacen.consumir("ip:1", regla, ahora=10) == 10
+    assert almacen.consumir("ip:1", regla, ahora=20) == 0
+    # Nunca acumula más que la capacidad
+    assert [almacen.consumir("ip:1", regla, ahora=10000) for _ in range(4)][-1] > 0
+
+    for texto in ("0/60", "5/0", "5"):
+        try:
+            Regla.desde_texto(texto)
+            assert False, texto
+        except ValueError:
+            pass
+
+def test_almacen_compartido_entre_workers():
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "limites.db")
+        worker_a, worker_b = AlmacenSQLite(ruta), AlmacenSQLite(ruta)
+        regla = Regla(2, 60)
+        assert worker_a.consumir("login_ip:1", regla, ahora=1000) == 0
+        assert worker_b.consumir("login_ip:1", regla, ahora=1000) == 0
+        # El segundo worker ve los tokens que tomó el primero
+        assert worker_a.consumir("login_ip:1", regla, ahora=1000) == 30
+        assert worker_b.consumir("login_ip:1", regla, ahora=1030) == 0
+
+def _peticion(ip, *reenviados):
+    encabezados = [(b"x-forwarded-for", valor.encode()) for valor in reenviados]
+    return Request({"type": "http", "headers": encabezados, "client": (ip, 1234)})
+
+def test_ip_detras_de_proxies():
+    proxies = redes_confiables("10.0.0.0/8, 127.0.0.1")
+    # Sin proxies confiables el encabezado se ignora
+    assert ip_cliente(_peticion("10.1.2.3", "1.1.1.1"), ()) == "10.1.2.3"
+    # Conexión directa de un cliente: su X-Forwarded-For no cuenta
+    assert ip_cliente(_peticion("8.8.8.8", "1.1.1.1"), proxies) == "8.8.8.8"
+
+    # El proxy agrega la IP real al final; lo que el cliente inventó a la izquierda se descarta
+    assert ip_cliente(_peticion("10.1.2.3", "1.1.1.1"), proxies) == "1.1.1.1"
+    assert ip_cliente(_peticion("10.1.2.3", "6.6.6.6, 1.1.1.1"), proxies) == "1.1.1.1"
+    assert ip_cliente(_peticion("10.1.2.3", "6.6.6.6", "1.1.1.1, 10.9.9.9"), proxies) == "1.1.1.1"
+    # Solo proxies: el más lejano; valores que no son IP no se toman por proxies
+    assert ip_cliente(_peticion("10.1.2.3", "127.0.0.1, 10.9.9.9"), proxies) == "127.0.0.1"
+    assert ip_cliente(_peticion("10.1.2.3", "basura"), proxies) == "basura"
+    assert ip_cliente(_peticion("10.1.2.3"), proxies) == "10.1.2.3"
+
+def test_cupos_de_admision():
+    propios = Limites(almacen=AlmacenMemoria(), reglas={"x": "1/1"}, concurrencia={"reportes": 1}, habilitado=True)
+    with propios.admitir("reportes"):
+        try:
+            with propios.admitir("reportes"):
+                assert False, "No debía haber cupo"
+        except HTTPException as e:
+            assert e.status_code == 429 and int(e.headers["Retry-After"]) >= 1
+        assert propios.en_uso() == {("reportes",): 1}
+    assert propios.en_uso() == {("reportes",): 0}
+    with propios.admitir("reportes"):
+        pass
+
+    # Deshabilitado no limita nada
+    libres = Limites(almacen=AlmacenMemoria(), reglas={"x": "1/60"}, concurrencia={"reportes": 1}, habilitado=False)
+    for _ in range(3):
+        libres.verificar("x", "clave")
+    with libres.admitir("reportes"), libres.admitir("reportes"):
+        pass
+
+def _cliente():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db_prueba():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = get_db_prueba
+
+    @app.get("/api/reporte", dependencies=[Depends(admitir_reporte)])
+    def reporte():
+        return {"ok": True}
+
+    return TestClient(app)
+
+def test_endpoints_responden_429():
+    originales = (limites.almacen, dict(limites.reglas), limites.habilitado)
+    limites.almacen, limites.habilitado = AlmacenMemoria(), True
+    limites.reglas.update(login_ip=Regla(3, 60), login_email=Regla(2, 60), reportes_ip=Regla(5, 60))
+    try:
+        cliente = _cliente()
+        rechazos = rechazos_total.valor(regla="login_email")
+        credenciales = {"email": "Nadie@equipo.com", "password": "x"}
+        assert [cliente.post("/api/auth/login", json=credenciales).status_code for _ in range(2)] == [401, 401]
+        # Mismo correo con otras mayúsculas: misma cubeta
+        respuesta = cliente.post("/api/auth/login", json={**credenciales, "email": "nadie@EQUIPO.com"})
+        assert respuesta.status_code == 429 and int(respuesta.headers["Retry-After"]) == 30
+        assert rechazos_total.valor(regla="login_email") == rechazos + 1
+        # Otro correo, pero la IP ya hizo tres intentos
+        assert cliente.post("/api/auth/login", json={"email": "otro@equipo.com", "password": "x"}).status_code == 429
+
+        assert cliente.get("/api/reporte").status_code == 200
+        with limites.admitir("reportes"), limites.admitir("reportes"):
+            respuesta = cliente.get("/api/reporte")
+        assert respuesta.status_code == 429 and "Retry-After" in respuesta.headers
+        assert cliente.get("/api/reporte").status_code == 200
+        assert limites.en_uso()[("reportes",)] == 0
+    finally:
+        limites.almacen, limites.reglas, limites.habilitado = originales[0], originales[1], originales[2]
+
+if __name__ == "__main__":
+    test_cubeta_de_tokens()
+    test_almacen_compartido_entre_workers()
+    test_ip_detras_de_proxies()
+    test_cupos_de_admision()
+    test_endpoints_responden_429()
+    print("✅ Límites de tasa y admisión funcionando correctamente")
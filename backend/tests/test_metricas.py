@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Pruebas de las métricas en formato Prometheus
+"""
+import sys
+import os
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import get_db
+from routers.jugadores import router
+from services.metricas import (
+    RegistroMetricas, duracion_peticiones, duracion_reportes, medir_peticion, metricas, registrar_pool
+)
+
+def test_formato_de_exposicion():
+    registro = RegistroMetricas()
+    contador = registro.contador("pruebas_total", "Prueba", ("tipo",))
+    histograma = registro.histograma("pruebas_segundos", "Prueba", ("tipo",), buckets=(0.1, 1.0))
+    contador.inc(tipo='con "comillas"')
+    histograma.observar(0.05, tipo="a")
+    histograma.observar(0.5, tipo="a")
+    histograma.observar(5, tipo="a")
+
+    texto = registro.exponer()
+    assert "# TYPE pruebas_total counter" in texto
+    assert 'pruebas_total{tipo="con \\"comillas\\""} 1' in texto
+    assert 'pruebas_segundos_bucket{tipo="a",le="0.1"} 1' in texto
+    assert 'pruebas_segundos_bucket{tipo="a",le="1"} 2' in texto
+    assert 'pruebas_segundos_bucket{tipo="a",le="+Inf"} 3' in texto
+    assert 'pruebas_segundos_count{tipo="a"} 3' in texto
+    assert 'pruebas_segundos_sum{tipo="a"} 5.55' in texto
+
+def test_metricas_por_ruta_y_reportes():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Sesion()
+    db.add(models.Jugador(
+        cedula="1001", nombre="Andrés", apellido="Núñez", nombre_inscripcion="Andy",
+        telefono="3001", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+        contacto_emergencia_nombre="Ana", contacto_emergencia_telefono="3002"
+    ))
+    db.commit()
+    db.close()
+
+    def get_db_prueba():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.middleware("http")(medir_peticion)
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = get_db_prueba
+    app.get("/metrics")(lambda: PlainTextResponse(metricas.exponer()))
+    registrar_pool(engine)
+    cliente = TestClient(app)
+
+    antes = duracion_peticiones.conteo(method="GET", route="/api/jugadores/{cedula}")
+    cliente.get("/api/jugadores/123")
+    cliente.get("/api/jugadores/456")
+    assert duracion_peticiones.conteo(method="GET", route="/api/jugadores/{cedula}") == antes + 2
+
+    reportes_antes = duracion_reportes.conteo(reporte="jugadores_listado_basico")
+    respuesta = cliente.get("/api/jugadores/export/listado-basico/pdf")
+    assert respuesta.status_code == 200
+    assert duracion_reportes.conteo(reporte="jugadores_listado_basico") == reportes_antes + 1
+
+    texto = cliente.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/api/jugadores/{cedula}",status="404"}' in texto
+    assert "http_requests_in_flight" in texto
+    assert "db_pool_connections" in texto
+
+if __name__ == "__main__":
+    test_formato_de_exposicion()
+    test_metricas_por_ruta_y_reportes()
+    print("✅ Métricas funcionando correctamente")
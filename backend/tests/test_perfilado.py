@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Pruebas del perfilado de peticiones bajo demanda (firmas, middleware y artefactos)
+"""
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from services import perfilado
+
+def configurar(directorio: str, muestreo: float = 0.0):
+    perfilado.SECRETO = "secreto-de-prueba"
+    perfilado.MUESTREO = muestreo
+    perfilado.DIRECTORIO = directorio
+    perfilado.INTERVALO_S = 0.002
+    # El endpoint de prueba vive en tests/, que normalmente no cuenta como código de la aplicación
+    perfilado.CARPETAS_APLICACION = ("routers", "crud", "services", "reportes", "tests")
+
+def calculo_pesado(milisegundos: float) -> int:
+    fin = time.perf_counter() + milisegundos / 1000
+    total = 0
+    while time.perf_counter() < fin:
+        total += sum(range(100))
+    return total
+
+def crear_app() -> FastAPI:
+    app = FastAPI()
+    app.middleware("http")(perfilado.perfilar_peticion)
+
+    @app.get("/lento")
+    def lento():
+        return {"total": calculo_pesado(80)}
+
+    return app
+
+def test_firmas():
+    configurar(tempfile.mkdtemp())
+    token = perfilado.firmar("/api/dashboard/resumen", 60)
+    assert perfilado.verificar_firma(token, "/api/dashboard/resumen")
+    # Otra ruta, firma alterada o vencida
+    assert not perfilado.verificar_firma(token, "/api/pagos/")
+    assert not perfilado.verificar_firma(token[:-1] + ("0" if token[-1] != "0" else "1"), "/api/dashboard/resumen")
+    assert not perfilado.verificar_firma(perfilado.firmar("/api/dashboard/resumen", -1), "/api/dashboard/resumen")
+    assert not perfilado.verificar_firma("basura", "/api/dashboard/resumen")
+    assert not perfilado.verificar_firma(f"{int(time.time()) + 60}.ñ", "/api/dashboard/resumen")
+
+def test_nombre_de_funcion_sin_co_qualname():
+    # Los objetos de código de Python < 3.11 no tienen co_qualname
+    class Codigo:
+        co_name = "calcular"
+    assert perfilado._nombre_funcion(Codigo()) == "calcular"
+    assert perfilado._nombre_funcion(perfilado.Muestreador.run.__code__).endswith("run")
+
+def test_peticion_firmada_genera_flame_graph():
+    directorio = tempfile.mkdtemp()
+    configurar(directorio)
+    cliente = TestClient(crear_app())
+
+    # Sin firma no se perfila
+    respuesta = cliente.get("/lento")
+    assert respuesta.status_code == 200
+    assert "X-Perfil" not in respuesta.headers
+    assert perfilado.listar_perfiles() == []
+
+    respuesta = cliente.get("/lento", headers={"X-Perfilar": perfilado.firmar("/lento")})
+    nombre = respuesta.headers["X-Perfil"]
+    assert [p["nombre"] for p in perfilado.listar_perfiles()] == [nombre]
+
+    with open(perfilado.ruta_perfil(nombre, "folded"), encoding="utf-8") as f:
+        pilas = f.read()
+    assert "calculo_pesado" in pilas
+    with open(perfilado.ruta_perfil(nombre), encoding="utf-8") as f:
+        assert "calculo_pesado" in f.read()
+
+    # Firma por parámetro de consulta; una firma de otra ruta no sirve
+    assert "X-Perfil" in cliente.get(f"/lento?perfilar={perfilado.firmar('/lento')}").headers
+    assert "X-Perfil" not in cliente.get("/lento", headers={"X-Perfilar": perfilado.firmar("/otra")}).headers
+
+    # El nombre se valida para no salir de la carpeta
+    assert perfilado.ruta_perfil("../secretos") is None
+
+def test_muestreo_continuo():
+    configurar(tempfile.mkdtemp(), muestreo=1.0)
+    cliente = TestClient(crear_app())
+    assert "X-Perfil" in cliente.get("/lento").headers
+    perfilado.MUESTREO = 0.0
+    assert "X-Perfil" not in cliente.get("/lento").headers
+
+def test_retencion_de_perfiles():
+    configurar(tempfile.mkdtemp(), muestreo=1.0)
+    perfilado.MAXIMO_PERFILES = 2
+    try:
+        cliente = TestClient(crear_app())
+        for _ in range(4):
+            cliente.get("/lento")
+        assert len(perfilado.listar_perfiles()) == 2
+        assert len(os.listdir(perfilado.DIRECTORIO)) == 4  # html + folded de cada uno
+    finally:
+        perfilado.MAXIMO_PERFILES = 100
+        perfilado.MUESTREO = 0.0
+
+def test_rutas_solo_para_administradores():
+    from routers.admin import router
+    from services.sesiones import sesiones
+    configurar(tempfile.mkdtemp())
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    cliente = TestClient(app)
+    admin = {"Authorization": f"Bearer {sesiones.emitir({'sub': '1', 'rol': 'admin'})}"}
+    jugador = {"Authorization": f"Bearer {sesiones.emitir({'sub': '1000', 'rol': 'jugador', 'cedula': '1000'})}"}
+
+    assert cliente.get("/api/admin/perfiles").status_code == 401
+    assert cliente.get("/api/admin/perfiles", headers=jugador).status_code == 403
+    assert cliente.get("/api/admin/perfiles/abc").status_code == 401
+    assert cliente.get("/api/admin/perfiles", headers=admin).json()["perfiles"] == []
+    assert cliente.get("/api/admin/perfiles/abc", headers=admin).status_code == 404
+
+if __name__ == "__main__":
+    test_firmas()
+    test_nombre_de_funcion_sin_co_qualname()
+    test_peticion_firmada_genera_flame_graph()
+    test_muestreo_continuo()
+    test_retencion_de_perfiles()
+    test_rutas_solo_para_administradores()
+    print("✅ Perfilado de peticiones funcionando correctamente")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la política de carga de relaciones y de la guardia SQL_CARGA_PEREZOSA=raise
+"""
+import sys
+import os
+from datetime import date, datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SQL_CARGA_PEREZOSA", "raise")
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker, joinedload
+from sqlalchemy.pool import StaticPool
+
+import models
+from crud import egresos as crud_egresos
+from crud import jugadores as crud_jugadores
+from crud import articulos_normativa as crud_articulos
+from schemas import egresos as schemas_egresos
+from schemas.articulos_normativa import ArticuloNormativaCompleto
+from schemas.jugadores import JugadorDetalle
+from services.instrumentacion_sql import presupuesto_consultas
+
+def _sesion():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    for cedula, recomendador in (("1000", None), ("1001", "1000"), ("1002", "1000")):
+        db.add(models.Jugador(
+            cedula=cedula, nombre=f"Jugador{cedula}", apellido="Prueba", nombre_inscripcion=f"J{cedula}",
+            telefono=f"300{cedula}", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+            contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3100",
+            email=f"j{cedula}@equipo.com", recomendado_por_cedula=recomendador
+        ))
+    db.add(models.ArticuloNormativa(id=1, numero_articulo="1", titulo="Puntualidad", contenido="Llegar a tiempo"))
+    db.add(models.CausalMulta(id=1, descripcion="Llegada tarde", valor=5000, articulo_id=1))
+    db.add(models.CategoriaEgreso(id=1, nombre="Equipamiento"))
+    db.add(models.Administrador(id=1, nombre="Admin", email="admin@equipo.com", password="x", rol="admin"))
+    db.add(models.Multa(jugador_cedula="1001", causal_id=1, valor=5000, fecha_multa=date(2025, 1, 1)))
+    db.commit()
+    db.expunge_all()
+    return db
+
+def test_guardia_activa_en_pruebas():
+    assert models.CARGA_PEREZOSA == "raise_on_sql"
+    db = _sesion()
+    multa = db.query(models.Multa).first()
+    try:
+        multa.causal
+        assert False, "La carga perezosa debió fallar"
+    except InvalidRequestError:
+        pass
+
+    # Con la opción de carga explícita no hay consultas extra
+    multa = db.query(models.Multa).options(joinedload(models.Multa.causal)).populate_existing().first()
+    with presupuesto_consultas(0):
+        assert multa.causal.descripcion == "Llegada tarde"
+
+def test_identity_map_sigue_permitido():
+    db = _sesion()
+    causal = db.get(models.CausalMulta, 1)
+    multa = db.query(models.Multa).first()
+    with presupuesto_consultas(0):
+        assert multa.causal is causal
+
+def test_endpoints_con_opciones_de_carga():
+    db = _sesion()
+    with presupuesto_consultas(2):
+        detalle = JugadorDetalle.model_validate(crud_jugadores.get_jugador_detalle(db, "1000"), from_attributes=True)
+    assert sorted(j.cedula for j in detalle.recomendados) == ["1001", "1002"]
+
+    with presupuesto_consultas(2):
+        articulo = ArticuloNormativaCompleto.model_validate(crud_articulos.get_articulo_con_causales(db, 1))
+    assert [c.descripcion for c in articulo.causales] == ["Llegada tarde"]
+
+    egreso = crud_egresos.crear_egreso(db, schemas_egresos.EgresoCreate(
+        categoria_id=1, concepto="Balones", valor=30000, registrado_por=1, fecha=date(2025, 3, 1)
+    ), admin_id=1)
+    assert schemas_egresos.Egreso.model_validate(egreso).categoria.nombre == "Equipamiento"
+
+    db.expunge_all()
+    with presupuesto_consultas(1):
+        egresos = [schemas_egresos.Egreso.model_validate(e) for e in crud_egresos.get_egresos(db)]
+    assert egresos[0].categoria.nombre == "Equipamiento"
+
+if __name__ == "__main__":
+    test_guardia_activa_en_pruebas()
+    test_identity_map_sigue_permitido()
+    test_endpoints_con_opciones_de_carga()
+    print("✅ Política de carga de relaciones funcionando correctamente")
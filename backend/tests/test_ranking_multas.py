@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Pruebas del ranking de multas: una sola consulta agregada que respeta todos los filtros
+"""
+import sys
+import os
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from crud.dashboard import obtener_ranking_jugadores_multas
+from services.instrumentacion_sql import presupuesto_consultas
+
+# (cédula, valor, fecha, pagada)
+MULTAS = [
+    ("1001", 5000, date(2025, 1, 10), False),
+    ("1001", 5000, date(2025, 2, 10), True),
+    ("1001", 10000, date(2025, 3, 10), False),
+    ("1002", 20000, date(2025, 1, 20), True),
+    ("1002", 20000, date(2025, 3, 20), True),
+    ("1003", 3000, date(2024, 12, 1), False),
+]
+
+def _sesion():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    for i, cedula in enumerate(["1001", "1002", "1003", "1004"]):
+        db.add(models.Jugador(
+            cedula=cedula, nombre=f"Jugador{i}", apellido="Prueba", nombre_inscripcion=f"J{i}",
+            telefono=f"300{i}", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+            contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3100",
+            email=f"j{i}@equipo.com"
+        ))
+    db.add(models.CausalMulta(id=1, descripcion="Llegada tarde", valor=5000))
+    for cedula, valor, fecha, pagada in MULTAS:
+        db.add(models.Multa(jugador_cedula=cedula, causal_id=1, valor=valor, fecha_multa=fecha, pagada=pagada))
+    db.commit()
+    return db
+
+def _por_cedula(respuesta):
+    return {jugador.cedula: jugador for jugador in respuesta.ranking}
+
+def test_ranking_completo_en_una_consulta():
+    db = _sesion()
+    with presupuesto_consultas(1):
+        respuesta = obtener_ranking_jugadores_multas(db)
+
+    assert [j.cedula for j in respuesta.ranking] == ["1001", "1002", "1003"]
+    assert [j.posicion for j in respuesta.ranking] == [1, 2, 3]
+    primero = respuesta.ranking[0]
+    assert (primero.total_multas, primero.multas_pendientes, primero.multas_pagadas) == (3, 2, 1)
+    assert (primero.valor_total_multas, primero.valor_multas_pendientes, primero.valor_multas_pagadas) == (20000, 15000, 5000)
+    assert primero.ultima_multa == date(2025, 3, 10)
+
+    # Con jugadores sin multas y límite
+    todos = obtener_ranking_jugadores_multas(db, incluir_solo_con_multas=False)
+    assert _por_cedula(todos)["1004"].total_multas == 0
+    assert _por_cedula(todos)["1004"].ultima_multa is None
+    assert len(obtener_ranking_jugadores_multas(db, limite=2).ranking) == 2
+
+def test_filtros_de_fecha_y_estado():
+    db = _sesion()
+    enero_febrero = _por_cedula(obtener_ranking_jugadores_multas(
+        db, fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 2, 28)
+    ))
+    assert set(enero_febrero) == {"1001", "1002"}
+    assert enero_febrero["1001"].total_multas == 2
+    assert enero_febrero["1002"].valor_total_multas == 20000
+    assert enero_febrero["1001"].ultima_multa == date(2025, 2, 10)
+
+    pendientes = _por_cedula(obtener_ranking_jugadores_multas(db, incluir_pagadas=False))
+    assert set(pendientes) == {"1001", "1003"}
+    assert pendientes["1001"].multas_pagadas == 0
+    assert pendientes["1001"].valor_total_multas == 15000
+
+    pagadas = obtener_ranking_jugadores_multas(db, incluir_pendientes=False)
+    assert [j.cedula for j in pagadas.ranking] == ["1002", "1001"]
+    assert pagadas.ranking[0].valor_multas_pendientes == 0
+
+if __name__ == "__main__":
+    test_ranking_completo_en_una_consulta()
+    test_filtros_de_fecha_y_estado()
+    print("✅ Ranking de multas funcionando correctamente")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los recordatorios masivos de deuda: consulta de morosos, campañas idempotentes y avance
+"""
+import sys
+import os
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import get_db
+from crud.morosos import get_morosos
+from services.bandeja_correo import BandejaCorreo, ConexionSMTP, ENVIADO, PENDIENTE
+from services.configuracion_sistema import configuracion_sistema
+from services.estado_cuenta_service import EstadoCuentaService
+from services.recordatorios_deuda import RecordatoriosDeuda, TIPO
+from services.sesiones import sesiones
+
+class SMTPFalso:
+    """Servidor SMTP en memoria que cuenta conexiones y envíos"""
+    conexiones = []
+
+    def __init__(self, servidor, puerto, timeout=None):
+        self.enviados = []
+        SMTPFalso.conexiones.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, usuario, password):
+        pass
+
+    def sendmail(self, remitente, destinatario, mensaje):
+        self.enviados.append(destinatario)
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+def _restar_meses(hoy: date, meses: int) -> date:
+    indice = hoy.year * 12 + hoy.month - 1 - meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+def _jugador(db, cedula, inscripcion, email=None, posicion=None, activo=True):
+    db.add(models.Jugador(
+        cedula=cedula, nombre=f"Nombre{cedula}", apellido="Pérez", nombre_inscripcion=f"alias{cedula}",
+        telefono=f"300{cedula}", fecha_nacimiento=date(1990, 1, 1), talla_uniforme="M",
+        contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3000000000",
+        fecha_inscripcion=inscripcion, posicion=posicion, activo=activo,
+        email=email if email is not None else f"j{cedula}@equipo.com"
+    ))
+
+def _datos():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    hoy = date.today()
+    db = Sesion()
+    db.add(models.CausalMulta(id=1, descripcion="Llegada tarde", valor=5000))
+    db.add(models.Configuracion(clave="mensualidad", valor=30000))
+
+    # 1: inscrito hace 3 meses, pagó solo el primero -> debe 3 (incluye el actual)
+    _jugador(db, "1", _restar_meses(hoy, 3))
+    inicio = _restar_meses(hoy, 3)
+    db.add(models.Mensualidad(jugador_cedula="1", ano=inicio.year, mes=inicio.month, valor=30000))
+    # 2: al día (pagó este mes, inscrito este mes)
+    _jugador(db, "2", hoy.replace(day=1))
+    db.add(models.Mensualidad(jugador_cedula="2", ano=hoy.year, mes=hoy.month, valor=30000))
+    # 3: arquero con una multa pendiente y otra pagada; no debe mensualidades
+    _jugador(db, "3", _restar_meses(hoy, 6), posicion="arquero")
+    db.add(models.Multa(jugador_cedula="3", causal_id=1, valor=5000, pagada=False))
+    db.add(models.Multa(jugador_cedula="3", causal_id=1, valor=8000, pagada=True))
+    # 4: arquero sin multas: al día
+    _jugador(db, "4", _restar_meses(hoy, 6), posicion="arquero")
+    # 5: debe mensualidades y multas; un pago duplicado del mismo mes no cuenta dos veces
+    _jugador(db, "5", _restar_meses(hoy, 1))
+    db.add(models.Mensualidad(jugador_cedula="5", ano=hoy.year, mes=hoy.month, valor=30000))
+    db.add(models.Mensualidad(jugador_cedula="5", ano=hoy.year, mes=hoy.month, valor=30000))
+    db.add(models.Multa(jugador_cedula="5", causal_id=1, valor=5000, pagada=False))
+    db.add(models.Multa(jugador_cedula="5", causal_id=1, valor=7000, pagada=False))
+    # 6: moroso inactivo y 7: moroso sin correo, no reciben recordatorio
+    _jugador(db, "6", _restar_meses(hoy, 2), activo=False)
+    _jugador(db, "7", _restar_meses(hoy, 2), email="")
+    db.commit()
+    db.close()
+    configuracion_sistema.invalidar()
+    return Sesion, hoy
+
+def _recordatorios(Sesion, **opciones):
+    SMTPFalso.conexiones = []
+    conexion = ConexionSMTP("smtp.prueba", 587, "club@equipo.com", "clave", starttls=True, fabrica=SMTPFalso)
+    bandeja = BandejaCorreo(session_factory=Sesion, conexion=conexion, lote=2)
+    bandeja.remitente = "club@equipo.com"
+    return RecordatoriosDeuda(bandeja=bandeja, **opciones), bandeja
+
+def test_morosos_en_una_consulta():
+    Sesion, hoy = _datos()
+    db = Sesion()
+    morosos = {m.cedula: m for m in get_morosos(db, hoy)}
+    assert set(morosos) == {"1", "3", "5"}
+    assert (morosos["1"].mensualidades_pendientes, morosos["1"].multas_pendientes) == (3, 0)
+    assert (morosos["3"].mensualidades_pendientes, morosos["3"].multas_pendientes) == (0, 1)
+    assert morosos["3"].valor_multas_pendientes == 5000
+    assert (morosos["5"].mensualidades_pendientes, morosos["5"].multas_pendientes) == (1, 2)
+    assert morosos["5"].valor_multas_pendientes == 12000
+
+    # Mismo resultado que el estado de cuenta jugador por jugador
+    for jugador in db.query(models.Jugador).filter(models.Jugador.activo == True, models.Jugador.email != ""):
+        detalles = EstadoCuentaService.obtener_detalles_estado(jugador, db)
+        assert (jugador.cedula not in morosos) == detalles["al_dia"], jugador.cedula
+        if jugador.cedula in morosos:
+            assert morosos[jugador.cedula].mensualidades_pendientes == detalles.get("mensualidades_pendientes", 0)
+            assert morosos[jugador.cedula].multas_pendientes == detalles["multas_pendientes"]
+
+def test_campana_idempotente_y_avance():
+    Sesion, hoy = _datos()
+    recordatorios, bandeja = _recordatorios(Sesion, lote=2)
+    db = Sesion()
+    resultado = recordatorios.encolar(db, "2030-01", hoy)
+    assert resultado == {"periodo": "2030-01", "morosos": 3, "encolados": 3, "omitidos": 0}
+
+    correos = {c.destinatario: c for c in db.query(models.CorreoSaliente)}
+    assert set(correos) == {"j1@equipo.com", "j3@equipo.com", "j5@equipo.com"}
+    assert all(c.tipo == TIPO and c.estado == PENDIENTE for c in correos.values())
+    cuerpo = correos["j5@equipo.com"].cuerpo_html
+    assert "Nombre5 Pérez" in cuerpo and "1 mensualidad(es) pendiente(s) por $30,000" in cuerpo
+    assert "2 multa(s) pendiente(s) por $12,000" in cuerpo
+    assert "mensualidad" not in correos["j3@equipo.com"].cuerpo_html
+
+    # Repetir la campaña no duplica; otra campaña sí vuelve a encolar
+    assert recordatorios.encolar(db, "2030-01", hoy)["omitidos"] == 3
+    assert db.query(models.CorreoSaliente).count() == 3
+
+    avance = recordatorios.progreso(db, "2030-01")
+    assert avance["total"] == 3 and avance["por_estado"][PENDIENTE] == 3 and not avance["completado"]
+
+    # Dos lotes por una sola conexión SMTP
+    assert bandeja.procesar_pendientes() == 3
+    assert len(SMTPFalso.conexiones) == 1 and len(SMTPFalso.conexiones[0].enviados) == 3
+    avance = recordatorios.progreso(db, "2030-01")
+    assert avance["por_estado"][ENVIADO] == 3 and avance["porcentaje"] == 100.0 and avance["completado"]
+
+    assert recordatorios.encolar(db, "2030-02", hoy)["encolados"] == 3
+    assert recordatorios.progreso(db, "2030-02")["total"] == 3
+    db.close()
+
+def test_rutas():
+    from routers import admin
+    Sesion, hoy = _datos()
+    recordatorios, _ = _recordatorios(Sesion)
+    original = admin.recordatorios_deuda
+    admin.recordatorios_deuda = recordatorios
+
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api")
+
+    def _get_db():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+    app.dependency_overrides[get_db] = _get_db
+    cliente = TestClient(app)
+    como_jugador = {"Authorization": f"Bearer {sesiones.emitir({'sub': '1', 'rol': 'jugador', 'cedula': '1'})}"}
+    como_admin = {"Authorization": f"Bearer {sesiones.emitir({'sub': '1', 'rol': 'admin'})}"}
+    try:
+        # Solo un administrador lanza campañas o consulta su avance
+        assert cliente.post("/api/admin/recordatorios-deuda?periodo=2030-03").status_code == 401
+        assert cliente.get("/api/admin/recordatorios-deuda/2030-03").status_code == 401
+        assert cliente.post("/api/admin/recordatorios-deuda?periodo=2030-03", headers=como_jugador).status_code == 403
+
+        assert cliente.get("/api/admin/recordatorios-deuda/2030-03", headers=como_admin).status_code == 404
+        assert cliente.post("/api/admin/recordatorios-deuda?periodo=2030-13", headers=como_admin).status_code == 422
+
+        respuesta = cliente.post("/api/admin/recordatorios-deuda?periodo=2030-03", headers=como_admin)
+        assert respuesta.status_code == 200 and respuesta.json()["encolados"] == 3
+        avance = cliente.get("/api/admin/recordatorios-deuda/2030-03", headers=como_admin).json()
+        assert avance["total"] == 3 and avance["por_estado"]["pendiente"] == 3
+
+        # Sin periodo la campaña es la del mes actual
+        assert cliente.post("/api/admin/recordatorios-deuda", headers=como_admin).json()["periodo"] == hoy.strftime("%Y-%m")
+    finally:
+        admin.recordatorios_deuda = original
+
+if __name__ == "__main__":
+    test_morosos_en_una_consulta()
+    test_campana_idempotente_y_avance()
+    test_rutas()
+    print("✅ Pruebas de recordatorios de deuda completadas")
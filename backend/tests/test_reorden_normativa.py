@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Pruebas del reordenamiento de artículos de normativa (una sola sentencia UPDATE)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import models
+from crud import articulos_normativa as crud
+from schemas.articulos_normativa import ReordenArticulo
+
+def _sesion_con_articulos(cantidad: int):
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    for i in range(cantidad):
+        db.add(models.ArticuloNormativa(
+            numero_articulo=f"{i + 1}", titulo=f"Artículo {i + 1}", contenido="...", orden_display=i + 1
+        ))
+    db.commit()
+
+    # Solo los UPDATE de artículos: la versión de la normativa en versiones_datos es aparte
+    updates = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, sql, *args: updates.append(sql) if sql.startswith("UPDATE articulos_normativa") else None)
+    return db, updates
+
+def _orden(db):
+    return [numero for numero, in db.query(models.ArticuloNormativa.numero_articulo).order_by(
+        models.ArticuloNormativa.orden_display, models.ArticuloNormativa.numero_articulo
+    )]
+
+def test_reordenar_en_una_sentencia():
+    db, updates = _sesion_con_articulos(50)
+    ids = [i for i, in db.query(models.ArticuloNormativa.id).all()]
+    reordenes = [ReordenArticulo(id=articulo_id, orden_display=len(ids) - i) for i, articulo_id in enumerate(ids)]
+
+    assert crud.reordenar_articulos(db, reordenes)
+    assert len(updates) == 1
+    assert _orden(db)[:3] == ["50", "49", "48"]
+
+def test_mover_con_huecos_toca_una_fila():
+    db, updates = _sesion_con_articulos(5)
+    # Sin huecos (1, 2, 3...) mover obliga a renumerar, también en una sola sentencia
+    articulo = crud.mover_articulo(db, articulo_id=5, despues_de_id=1)
+    assert _orden(db) == ["1", "5", "2", "3", "4"]
+    assert articulo.orden_display == 20
+    assert len(updates) == 1
+
+    # Con huecos, los siguientes movimientos solo actualizan el artículo movido
+    updates.clear()
+    crud.mover_articulo(db, articulo_id=4, despues_de_id=None)
+    crud.mover_articulo(db, articulo_id=1, despues_de_id=3)
+    assert _orden(db) == ["4", "5", "2", "3", "1"]
+    assert len(updates) == 2
+
+    assert crud.mover_articulo(db, articulo_id=999, despues_de_id=1) is None
+
+def test_renumerar_conserva_orden():
+    db, updates = _sesion_con_articulos(4)
+    crud.reordenar_articulos(db, [ReordenArticulo(id=3, orden_display=0)])
+    assert crud.renumerar_articulos(db, paso=100)
+    assert _orden(db) == ["3", "1", "2", "4"]
+    assert [o for o, in db.query(models.ArticuloNormativa.orden_display).order_by(
+        models.ArticuloNormativa.orden_display)] == [100, 200, 300, 400]
+
+if __name__ == "__main__":
+    test_reordenar_en_una_sentencia()
+    test_mover_con_huecos_toca_una_fila()
+    test_renumerar_conserva_orden()
+    print("✅ Reordenamiento de normativa funcionando correctamente")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Pruebas del resumen del dashboard (una consulta, cifras reales del mes) y de su caché financiera
+"""
+import sys
+import os
+from datetime import date, datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from crud.dashboard import obtener_resumen_dashboard
+from services.cache_finanzas import CacheFinanzas, cache_finanzas
+from services.instrumentacion_sql import presupuesto_consultas
+
+HOY = date(2025, 6, 15)
+
+def _sesiones():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    consultas = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: consultas.append(sql))
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Sesion()
+    for i in range(5):
+        db.add(models.Jugador(
+            cedula=f"{1000 + i}", nombre=f"Jugador{i}", apellido="Prueba", nombre_inscripcion=f"J{i}",
+            telefono=f"300{i}", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+            contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3100",
+            email=f"j{i}@equipo.com"
+        ))
+    db.add(models.CausalMulta(id=1, descripcion="Llegada tarde", valor=5000))
+    db.add(models.CategoriaEgreso(id=1, nombre="Equipamiento"))
+    # Mayo (mes anterior) y junio (mes actual)
+    db.add_all([
+        models.Mensualidad(jugador_cedula="1000", mes=5, ano=2025, valor=20000, fecha_pago=datetime(2025, 5, 3)),
+        models.Mensualidad(jugador_cedula="1000", mes=6, ano=2025, valor=20000, fecha_pago=datetime(2025, 6, 1)),
+        models.Mensualidad(jugador_cedula="1001", mes=6, ano=2025, valor=20000, fecha_pago=datetime(2025, 6, 30, 23, 59)),
+        models.OtroAporte(jugador_cedula="1002", concepto="Rifa", valor=7000, fecha_aporte=datetime(2025, 6, 10)),
+        models.Egreso(categoria_id=1, concepto="Balones", valor=30000, fecha=datetime(2025, 5, 20)),
+        models.Egreso(categoria_id=1, concepto="Petos", valor=12000, fecha=datetime(2025, 6, 12)),
+        models.Multa(jugador_cedula="1001", causal_id=1, valor=5000, fecha_multa=date(2025, 5, 1),
+                     pagada=True, fecha_pago=datetime(2025, 6, 2)),
+        models.Multa(jugador_cedula="1001", causal_id=1, valor=5000, fecha_multa=date(2025, 6, 1), pagada=False),
+        models.Multa(jugador_cedula="1002", causal_id=1, valor=8000, fecha_multa=date(2025, 6, 1), pagada=False),
+        models.Multa(jugador_cedula="1003", causal_id=1, valor=3000, fecha_multa=date(2025, 4, 1),
+                     pagada=True, fecha_pago=datetime(2025, 4, 2)),
+        # Julio no cuenta para junio
+        models.Mensualidad(jugador_cedula="1002", mes=7, ano=2025, valor=20000, fecha_pago=datetime(2025, 7, 1)),
+    ])
+    db.commit()
+    db.close()
+    return Sesion, consultas
+
+def test_resumen_en_una_consulta_con_cifras_del_mes():
+    Sesion, _ = _sesiones()
+    db = Sesion()
+    with presupuesto_consultas(1):
+        resumen = obtener_resumen_dashboard(db, hoy=HOY)
+
+    # Junio: 2 mensualidades + aporte + multa pagada el 2 de junio
+    assert resumen.ingresos_mes_actual == 20000 + 20000 + 7000 + 5000
+    assert resumen.egresos_mes_actual == 12000
+    # Histórico: 80000 mensualidades + 7000 aporte + 8000 multas pagadas - 42000 egresos
+    assert resumen.saldo_actual == 80000 + 7000 + 8000 - 42000
+    assert (resumen.total_jugadores, resumen.jugadores_con_multas, resumen.jugadores_al_dia) == (5, 2, 3)
+    assert [j.cedula for j in resumen.top_3_jugadores_multas] == ["1001", "1002", "1003"]
+    assert resumen.top_3_jugadores_multas[0].total_multas == 2
+    assert [j.posicion for j in resumen.top_3_jugadores_multas] == [1, 2, 3]
+
+def test_resumen_sin_multas():
+    Sesion, _ = _sesiones()
+    db = Sesion()
+    db.query(models.Multa).delete()
+    db.commit()
+    resumen = obtener_resumen_dashboard(db, hoy=HOY)
+    assert resumen.top_3_jugadores_multas == []
+    assert resumen.jugadores_con_multas == 0
+
+def test_cache_se_invalida_con_escrituras():
+    Sesion, consultas = _sesiones()
+    db = Sesion()
+    cache_finanzas.invalidar()
+    calcular = lambda: obtener_resumen_dashboard(db, hoy=HOY)
+
+    assert cache_finanzas.obtener(db, "resumen", calcular).egresos_mes_actual == 12000
+    consultas.clear()
+    for _ in range(20):
+        cache_finanzas.obtener(db, "resumen", calcular)
+    assert consultas == []
+
+    # Escritura del ORM: se invalida al hacer commit
+    db.add(models.Egreso(categoria_id=1, concepto="Arbitraje", valor=50000, fecha=datetime(2025, 6, 14)))
+    db.commit()
+    assert cache_finanzas.obtener(db, "resumen", calcular).egresos_mes_actual == 62000
+
+    # Actualización masiva (query.update), como al pagar multas
+    db.query(models.Multa).filter(models.Multa.jugador_cedula == "1002").update({
+        models.Multa.pagada: True, models.Multa.fecha_pago: datetime(2025, 6, 14)
+    })
+    db.commit()
+    assert cache_finanzas.obtener(db, "resumen", calcular).jugadores_con_multas == 1
+
+    # Un rollback no sube la versión
+    version = db.get(models.VersionDatos, "finanzas").version
+    db.add(models.Egreso(categoria_id=1, concepto="Cancelado", valor=1, fecha=datetime(2025, 6, 14)))
+    db.flush()
+    db.rollback()
+    assert db.get(models.VersionDatos, "finanzas").version == version
+
+def test_invalidacion_entre_procesos_por_version():
+    Sesion, _ = _sesiones()
+    db = Sesion()
+    # Caché de "otro worker": no recibe la invalidación local, solo ve la versión compartida
+    otro_worker = CacheFinanzas(revalidar_s=0)
+    calcular = lambda: obtener_resumen_dashboard(db, hoy=HOY)
+    assert otro_worker.obtener(db, "resumen", calcular).egresos_mes_actual == 12000
+
+    db.add(models.Egreso(categoria_id=1, concepto="Arbitraje", valor=50000, fecha=datetime(2025, 6, 14)))
+    db.commit()
+    assert otro_worker.obtener(db, "resumen", calcular).egresos_mes_actual == 62000
+
+if __name__ == "__main__":
+    test_resumen_en_una_consulta_con_cifras_del_mes()
+    test_resumen_sin_multas()
+    test_cache_se_invalida_con_escrituras()
+    test_invalidacion_entre_procesos_por_version()
+    print("✅ Resumen del dashboard funcionando correctamente")
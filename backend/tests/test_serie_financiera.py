@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la serie financiera mensual y de los rangos de fechas semiabiertos
+"""
+import sys
+import os
+from datetime import date, datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, column, event, DateTime
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from crud import estado_cuenta as crud
+from database import get_db
+from routers.estado_cuenta import router
+from services.cache_finanzas import cache_finanzas
+from services.instrumentacion_sql import presupuesto_consultas
+
+def _sesiones():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Sesion()
+    db.add(models.Jugador(
+        cedula="1000", nombre="Jugador", apellido="Prueba", nombre_inscripcion="J",
+        telefono="300", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+        contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3100", email="j@equipo.com"
+    ))
+    db.add(models.CausalMulta(id=1, descripcion="Llegada tarde", valor=5000))
+    db.add(models.CategoriaEgreso(id=1, nombre="Equipamiento"))
+    db.add_all([
+        # Antes del rango: saldo inicial de 50000 - 10000
+        models.Mensualidad(jugador_cedula="1000", mes=12, ano=2024, valor=50000, fecha_pago=datetime(2024, 12, 31, 23, 59)),
+        models.Egreso(categoria_id=1, concepto="Balones", valor=10000, fecha=datetime(2024, 12, 5)),
+        # Enero
+        models.Mensualidad(jugador_cedula="1000", mes=1, ano=2025, valor=20000, fecha_pago=datetime(2025, 1, 1)),
+        models.Multa(jugador_cedula="1000", causal_id=1, valor=7000, fecha_multa=date(2024, 12, 1),
+                     pagada=True, fecha_pago=datetime(2025, 1, 15)),
+        models.Multa(jugador_cedula="1000", causal_id=1, valor=9000, fecha_multa=date(2025, 1, 1), pagada=False),
+        models.Egreso(categoria_id=1, concepto="Petos", valor=5000, fecha=datetime(2025, 1, 31, 23, 59, 59)),
+        # Febrero sin movimientos; marzo empieza justo a medianoche
+        models.OtroAporte(jugador_cedula="1000", concepto="Rifa", valor=3000, fecha_aporte=datetime(2025, 3, 1)),
+        # Después del rango: solo cuenta para el saldo actual
+        models.Egreso(categoria_id=1, concepto="Arbitraje", valor=1000, fecha=datetime(2025, 4, 1)),
+    ])
+    db.commit()
+    db.close()
+    return Sesion
+
+def test_serie_en_una_consulta():
+    db = _sesiones()()
+    with presupuesto_consultas(1):
+        serie = crud.obtener_serie_financiera(db, date(2025, 1, 20), date(2025, 3, 5))
+
+    assert (serie.desde, serie.hasta) == (date(2025, 1, 1), date(2025, 3, 31))
+    assert serie.saldo_inicial == 40000
+    assert [(m.ano, m.mes) for m in serie.meses] == [(2025, 1), (2025, 2), (2025, 3)]
+
+    enero, febrero, marzo = serie.meses
+    assert (enero.ingresos_mensualidades, enero.ingresos_multas, enero.otros_aportes) == (20000, 7000, 0)
+    assert (enero.total_ingresos, enero.total_egresos, enero.diferencia) == (27000, 5000, 22000)
+    assert enero.saldo_acumulado == 62000
+    assert febrero.total_ingresos == febrero.total_egresos == 0
+    assert febrero.saldo_acumulado == 62000
+    assert marzo.otros_aportes == 3000
+    assert marzo.saldo_acumulado == 65000
+    assert serie.saldo_actual == 64000
+
+def test_resumen_mensual_usa_la_serie():
+    db = _sesiones()()
+    with presupuesto_consultas(1):
+        resumen = crud.obtener_resumen_financiero_mensual(db, 2025, 1)
+    assert (resumen.total_ingresos_mes_actual, resumen.total_egresos_mes_actual) == (27000, 5000)
+    assert resumen.saldo_actual == 64000
+    # El saldo rápido coincide con el de la serie
+    assert crud.obtener_saldo_actual(db) == 64000
+
+def test_rangos_semiabiertos():
+    assert crud.rango_mes(2025, 12) == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+    db = _sesiones()()
+    # El aporte del 1 de marzo a medianoche no pertenece a febrero
+    febrero = crud.calcular_estado_cuenta_equipo(db, *crud.rango_mes(2025, 2))
+    assert febrero.total_ingresos == 0
+    # En PostgreSQL el mes se agrupa con to_char, sin EXTRACT sobre la columna
+    expresion = crud._clave_mes(column("fecha", DateTime), "postgresql")
+    assert "to_char" in str(expresion.compile(dialect=postgresql.dialect()))
+
+def test_rango_de_fechas_usa_indices():
+    Sesion = _sesiones()
+    db = Sesion()
+    sentencias = []
+    capturar = lambda conn, cursor, sql, parametros, *args: sentencias.append((sql, parametros))
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        crud.calcular_estado_cuenta_equipo(db, *crud.rango_mes(2025, 2))
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+
+    planes = " | ".join(
+        " ".join(str(fila[-1]) for fila in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parametros))
+        for sql, parametros in sentencias
+    )
+    for indice in ("ix_mensualidades_fecha_pago", "ix_multas_fecha_pago",
+                   "ix_otros_aportes_fecha_aporte", "ix_egresos_fecha"):
+        assert indice in planes, planes
+
+def test_endpoint_serie_financiera():
+    Sesion = _sesiones()
+
+    def get_db_prueba():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = get_db_prueba
+    cliente = TestClient(app)
+    cache_finanzas.invalidar()
+
+    respuesta = cliente.get("/api/serie-financiera/?desde=2025-01-01&hasta=2025-03-31")
+    assert respuesta.status_code == 200
+    assert [m["saldo_acumulado"] for m in respuesta.json()["meses"]] == [62000, 62000, 65000]
+    assert len(cliente.get("/api/serie-financiera/").json()["meses"]) == 12
+
+    assert cliente.get("/api/serie-financiera/?desde=2025-03-01&hasta=2025-01-01").status_code == 400
+    assert cliente.get("/api/serie-financiera/?desde=2000-01-01&hasta=2025-01-01").status_code == 400
+
+if __name__ == "__main__":
+    test_serie_en_una_consulta()
+    test_resumen_mensual_usa_la_serie()
+    test_rangos_semiabiertos()
+    test_rango_de_fechas_usa_indices()
+    test_endpoint_serie_financiera()
+    print("✅ Serie financiera funcionando correctamente")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los tokens de sesión firmados: verificación sin base de datos, renovación y revocación
+"""
+import sys
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import get_db
+from routers.auth import router
+from auth_middleware import CurrentUser, require_admin, can_access_jugador_data
+from services.sesiones import Sesiones, TokenInvalido, TIPO_REFRESCO
+from services.instrumentacion_sql import presupuesto_consultas
+
+def _sha256(texto: str) -> str:
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+def test_firma_y_expiracion():
+    sesiones = Sesiones(secreto="clave-de-pruebas-" + "x" * 32, acceso_s=60)
+    token = sesiones.emitir({"sub": "1000", "rol": "jugador", "cedula": "1000"})
+    datos = sesiones.verificar(token)
+    assert (datos["sub"], datos["rol"], datos["cedula"], datos["tipo"]) == ("1000", "jugador", "1000", "acceso")
+
+    encabezado, carga, firma = token.split(".")
+    for alterado in (f"{encabezado}.{carga}x.{firma}", f"{encabezado}.{carga}.{firma[:-2]}", "basura", "",
+                     f"{encabezado}.x.ñ", f"{encabezado}.{carga}.ñ", None):
+        try:
+            sesiones.verificar(alterado)
+            assert False, alterado
+        except TokenInvalido:
+            pass
+
+    # Otra clave, otro tipo o expirado: se rechaza
+    for verificar in (lambda: Sesiones(secreto="otra-clave-de-pruebas-" + "y" * 32).verificar(token),
+                      lambda: sesiones.verificar(token, TIPO_REFRESCO),
+                      lambda: sesiones.verificar(sesiones.emitir({"sub": "1", "rol": "admin"}, ahora=0))):
+        try:
+            verificar()
+            assert False
+        except TokenInvalido:
+            pass
+
+    # Claves que permitirían fabricar tokens: el ejemplo de .env.example o una corta
+    for secreto in ("cambia-esta-clave", "corta"):
+        try:
+            Sesiones(secreto=secreto)
+            assert False, secreto
+        except ValueError:
+            pass
+
+    sesiones.revocar(datos)
+    try:
+        sesiones.verificar(token)
+        assert False, "El token revocado debió rechazarse"
+    except TokenInvalido:
+        pass
+
+    # Los tokens expirados salen de la lista de revocación
+    sesiones.revocar({"jti": "viejo", "exp": 1})
+    sesiones.revocar({"jti": "otro", "exp": 1})
+    assert sesiones.revocados() == 2
+
+def test_refresco_se_consume_una_vez():
+    sesiones = Sesiones(secreto="clave-de-pruebas-" + "x" * 32)
+    token = sesiones.emitir({"sub": "1000", "rol": "jugador"}, TIPO_REFRESCO)
+    salida = threading.Barrier(8)
+
+    def renovar(_):
+        salida.wait()
+        try:
+            return sesiones.consumir(token)["jti"]
+        except TokenInvalido:
+            return None
+
+    # Ocho renovaciones simultáneas con el mismo token: solo una obtiene un par nuevo
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        resultados = list(pool.map(renovar, range(8)))
+    assert sum(r is not None for r in resultados) == 1
+    try:
+        sesiones.verificar(token, TIPO_REFRESCO)
+        assert False, "El token consumido debió quedar revocado"
+    except TokenInvalido:
+        pass
+
+def _cliente():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Sesion()
+    db.add(models.Administrador(id=1, nombre="Admin", email="admin@equipo.com", rol="admin",
+                                password=_sha256("admin123")))
+    db.add(models.Jugador(
+        cedula="12345678", nombre="Jugador", apellido="Prueba", nombre_inscripcion="J",
+        telefono="300", fecha_nacimiento=date(1995, 1, 1), talla_uniforme="M",
+        contacto_emergencia_nombre="Contacto", contacto_emergencia_telefono="3100",
+        email="jugador@equipo.com", password=_sha256("12345678")
+    ))
+    db.commit()
+    db.close()
+
+    def get_db_prueba():
+        db = Sesion()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = get_db_prueba
+
+    @app.get("/api/solo-admin")
+    def solo_admin(usuario: CurrentUser = Depends(require_admin)):
+        return {"id": usuario.id}
+
+    return TestClient(app)
+
+def _login(cliente, email, password):
+    respuesta = cliente.post("/api/auth/login", json={"email": email, "password": password})
+    assert respuesta.status_code == 200
+    return respuesta.json()
+
+def test_flujo_de_sesion():
+    cliente = _cliente()
+    sesion = _login(cliente, "jugador@equipo.com", "12345678")
+    assert sesion["token_type"] == "bearer" and sesion["cedula"] == "12345678"
+    cabecera = {"Authorization": f"Bearer {sesion['access_token']}"}
+
+    # El usuario sale del token: ninguna consulta a la base de datos
+    with presupuesto_consultas(0):
+        yo = cliente.get("/api/auth/me", headers=cabecera)
+    assert yo.json() == {"id": "12345678", "nombre": "Jugador", "email": "jugador@equipo.com",
+                         "rol": "jugador", "cedula": "12345678"}
+    usuario = CurrentUser(**{k: v for k, v in yo.json().items()})
+    assert can_access_jugador_data(usuario, "12345678") and not can_access_jugador_data(usuario, "1")
+
+    assert cliente.get("/api/auth/me").status_code == 401
+    assert cliente.get("/api/auth/me", headers={"Authorization": "Bearer basura"}).status_code == 401
+    encabezado = sesion["access_token"].split(".")[0]
+    assert cliente.get("/api/auth/me", headers={"Authorization": f"Bearer {encabezado}.x.ñ".encode("latin-1")}).status_code == 401
+    assert cliente.get("/api/solo-admin", headers=cabecera).status_code == 403
+    # El token de refresco no sirve como token de acceso
+    assert cliente.get("/api/auth/me", headers={"Authorization": f"Bearer {sesion['refresh_token']}"}).status_code == 401
+
+    # Renovar rota el par: el token de refresco anterior no se puede reutilizar
+    renovada = cliente.post("/api/auth/refresh", json={"refresh_token": sesion["refresh_token"]})
+    assert renovada.status_code == 200
+    assert cliente.post("/api/auth/refresh", json={"refresh_token": sesion["refresh_token"]}).status_code == 401
+    nueva = renovada.json()
+    cabecera_nueva = {"Authorization": f"Bearer {nueva['access_token']}"}
+    assert cliente.get("/api/auth/me", headers=cabecera_nueva).json()["cedula"] == "12345678"
+
+    # Logout revoca el token de acceso y el de refresco
+    assert cliente.post("/api/auth/logout", json={"refresh_token": nueva["refresh_token"]},
+                        headers=cabecera_nueva).status_code == 200
+    assert cliente.get("/api/auth/me", headers=cabecera_nueva).status_code == 401
+    assert cliente.post("/api/auth/refresh", json={"refresh_token": nueva["refresh_token"]}).status_code == 401
+
+def test_admin():
+    cliente = _cliente()
+    sesion = _login(cliente, "admin@equipo.com", "admin123")
+    cabecera = {"Authorization": f"Bearer {sesion['access_token']}"}
+    assert cliente.get("/api/solo-admin", headers=cabecera).json() == {"id": "1"}
+    renovada = cliente.post("/api/auth/refresh", json={"refresh_token": sesion["refresh_token"]}).json()
+    assert cliente.get("/api/auth/me", headers={"Authorization": f"Bearer {renovada['access_token']}"}).json()["rol"] == "admin"
+
+if __name__ == "__main__":
+    test_firma_y_expiracion()
+    test_refresco_se_consume_una_vez()
+    test_flujo_de_sesion()
+    test_admin()
+    print("✅ Sesiones con tokens firmados funcionando correctamente")
@@ -111,6 +111,12 @@ class PDFGenerator:
         self.story.append(Paragraph(title, self.styles['CustomHeading2']))
         self.story.append(Spacer(1, 10))
     
+    def add_paragraph(self, text: str):
+        """Agregar un párrafo de texto (se escapan los caracteres especiales)"""
+        from xml.sax.saxutils import escape
+        self.story.append(Paragraph(escape(text).replace("\n", "<br/>"), self.styles['CustomNormal']))
+        self.story.append(Spacer(1, 8))
+    
     def add_metrics_grid(self, metrics: List[Dict[str, Any]]):
         """Agregar grid de métricas importantes"""
         if not metrics:
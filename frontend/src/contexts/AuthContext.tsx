@@ -44,18 +44,26 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
     // Verificar si hay una sesión guardada al cargar la aplicación
     const checkAuthStatus = () => {
       const savedUser = localStorage.getItem('user')
-      if (savedUser) {
+      if (savedUser && localStorage.getItem('refresh_token')) {
         try {
           const userData = JSON.parse(savedUser)
           setUser(userData)
         } catch (error) {
           localStorage.removeItem('user')
         }
+      } else {
+        // Sesión de una versión anterior, sin tokens: pedir login de nuevo
+        localStorage.removeItem('user')
       }
       setIsLoading(false)
     }
 
     checkAuthStatus()
+
+    // El interceptor de api.ts avisa cuando no pudo renovar el token
+    const onSesionExpirada = () => setUser(null)
+    window.addEventListener('sesion-expirada', onSesionExpirada)
+    return () => window.removeEventListener('sesion-expirada', onSesionExpirada)
   }, [])
 
   const login = async (email: string, password: string): Promise<boolean> => {
@@ -79,6 +87,8 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
         
         setUser(userData)
         localStorage.setItem('user', JSON.stringify(userData))
+        localStorage.setItem('token', response.data.access_token)
+        localStorage.setItem('refresh_token', response.data.refresh_token)
         return true
       }
       
@@ -92,8 +102,19 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   }
 
   const logout = () => {
+    // Revocar los tokens en el servidor; la sesión local se cierra aunque falle
+    // El token va explícito: el interceptor corre después de limpiar localStorage
+    const token = localStorage.getItem('token')
+    const refreshToken = localStorage.getItem('refresh_token')
+    if (token) {
+      api.post('/api/auth/logout', { refresh_token: refreshToken }, {
+        headers: { Authorization: `Bearer ${token}` }
+      }).catch(() => {})
+    }
     setUser(null)
     localStorage.removeItem('user')
+    localStorage.removeItem('token')
+    localStorage.removeItem('refresh_token')
   }
 
   // Definir permisos basados en roles
@@ -17,10 +17,45 @@ api.interceptors.request.use((config) => {
   return config
 })
 
+// Renovación del token de acceso: una sola petición de refresco aunque fallen varias a la vez
+let renovacionEnCurso: Promise<string | null> | null = null
+
+const renovarToken = async (): Promise<string | null> => {
+  const refreshToken = localStorage.getItem('refresh_token')
+  if (!refreshToken) return null
+  try {
+    // axios directo para no pasar por los interceptores de esta instancia
+    const response = await axios.post(`${api.defaults.baseURL}/api/auth/refresh`, {
+      refresh_token: refreshToken
+    })
+    localStorage.setItem('token', response.data.access_token)
+    localStorage.setItem('refresh_token', response.data.refresh_token)
+    return response.data.access_token
+  } catch (error) {
+    localStorage.removeItem('token')
+    localStorage.removeItem('refresh_token')
+    localStorage.removeItem('user')
+    window.dispatchEvent(new Event('sesion-expirada'))
+    return null
+  }
+}
+
 // Interceptor para manejo de errores
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const original = error.config
+    const esRutaDeSesion = original?.url?.includes('/api/auth/')
+    if (error.response?.status === 401 && original && !original._reintento && !esRutaDeSesion) {
+      // Token de acceso vencido: renovarlo y repetir la petición una vez
+      original._reintento = true
+      renovacionEnCurso = renovacionEnCurso || renovarToken().finally(() => { renovacionEnCurso = null })
+      const token = await renovacionEnCurso
+      if (token) {
+        original.headers.Authorization = `Bearer ${token}`
+        return api(original)
+      }
+    }
     console.error('API Error:', error)
     return Promise.reject(error)
   }
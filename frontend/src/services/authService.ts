@@ -44,7 +44,16 @@ export const authService = {
   },
 
   logout(): void {
+    // El token va explícito: el interceptor corre después de limpiar localStorage
+    const token = localStorage.getItem('token')
+    const refreshToken = localStorage.getItem('refresh_token')
+    if (token) {
+      api.post('/api/auth/logout', { refresh_token: refreshToken }, {
+        headers: { Authorization: `Bearer ${token}` }
+      }).catch(() => {})
+    }
     localStorage.removeItem('user')
-    // En una implementación real, aquí también invalidarías el token en el servidor
+    localStorage.removeItem('token')
+    localStorage.removeItem('refresh_token')
   }
 }